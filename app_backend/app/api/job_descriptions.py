@@ -0,0 +1,38 @@
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+from app.schemas.auth_schemas import UserResponse
+from app.services.job_description_service import (ParsedJobDescription, get_application_jd_hash, get_job_description,
+                                                  get_job_description_by_hash, link_job_application)
+
+def resolve_job_description(job_description_text: Optional[str], job_application_id: Optional[UUID], current_user: UserResponse) -> ParsedJobDescription:
+    """The parsed job description for a request that pastes the text, names a job application, or both.
+    With both, the application is linked to the pasted description for later requests."""
+    user_id_str = str(current_user.id)
+    if job_description_text is not None:
+        parsed = get_job_description(job_description_text)
+        if not parsed.text:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Job description text is empty.")
+        if job_application_id is not None:
+            try:
+                link_job_application(str(job_application_id), user_id_str, parsed.jd_hash)
+            except LookupError:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job application {job_application_id} not found or access denied.")
+            except Exception as e:
+                print(f"Could not link job application {job_application_id} to its job description: {e}") # The request itself can go on
+        return parsed
+
+    try:
+        jd_hash = get_application_jd_hash(str(job_application_id), user_id_str)
+    except LookupError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job application {job_application_id} not found or access denied.")
+    except Exception as e:
+        print(f"Database error while fetching job application {job_application_id}: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error fetching job application.")
+    parsed = get_job_description_by_hash(jd_hash) if jd_hash else None
+    if parsed is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"Job application {job_application_id} has no stored job description; send job_description_text once to link one.")
+    return parsed
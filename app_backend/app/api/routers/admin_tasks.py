@@ -1,5 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Header
 from app.services.notification_service import check_job_deadlines_and_notify
+from app.services.analysis_history_service import prune_expired_history
+from app.services import metrics
+from app.services.llm_service import prompt_cache_stats, route_stats
 from app.core.config import settings # To get BACKGROUND_TASK_ADMIN_SECRET
 from typing import Annotated # For Header type hint
 
@@ -21,3 +24,18 @@ async def trigger_deadline_check_endpoint(background_tasks: BackgroundTasks):
     # The check_job_deadlines_and_notify function is async, background_tasks.add_task handles it.
     background_tasks.add_task(check_job_deadlines_and_notify)
     return {"message": "Job deadline check process initiated in the background. Check server logs for details and results."}
+
+
+@router.post("/prune-analysis-history",
+             summary="Delete stored analysis and interview-prep results older than the retention period",
+             dependencies=[Depends(verify_admin_secret)])
+async def prune_analysis_history_endpoint(background_tasks: BackgroundTasks):
+    background_tasks.add_task(prune_expired_history)
+    return {"message": "Analysis history pruning initiated in the background. Check server logs for details and results."}
+
+
+@router.get("/metrics",
+            summary="In-process latency and counter metrics for this worker",
+            dependencies=[Depends(verify_admin_secret)])
+async def get_metrics_endpoint():
+    return {**metrics.snapshot(), "llm_routes": route_stats(), "llm_prompt_cache": prompt_cache_stats()}
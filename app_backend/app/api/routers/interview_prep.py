@@ -1,34 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Optional, Tuple
+from uuid import UUID
+import time
 
 from app.schemas.auth_schemas import UserResponse # For current_user
 from app.api.deps import get_current_user # Dependency
+from app.api.sse import sse_event, SSE_HEADERS
+from app.api.job_descriptions import resolve_job_description
 from app.services.supabase_client import supabase_client # To fetch resume text
 from app.services.llm_service import generate_interview_questions_with_llm # The new LLM function
+from app.services.llm_service import stream_interview_questions_with_llm, InterviewQuestion, InterviewStreamError
 # Ensure InterviewPrepResult is not needed here if response model is InterviewQuestionResponse
 from app.schemas.interview_prep_schemas import InterviewQuestionRequest, InterviewQuestionResponse # Schemas for this endpoint
+from app.schemas.history_schemas import HistorySummary, InterviewPrepHistoryRead
+from app.services.resume_profile import ResumeProfile, profile_from_stored
+from app.services.analysis_history_service import INTERVIEW_PREP_TABLE, get_history_item, get_stored_result, hash_text, list_history, store_result
 
 router = APIRouter()
 
-@router.post("/generate-questions", response_model=Optional[InterviewQuestionResponse], status_code=status.HTTP_200_OK)
-async def generate_interview_questions_endpoint(
-    request_data: InterviewQuestionRequest,
-    current_user: UserResponse = Depends(get_current_user)
-):
+async def _resolve_inputs(request_data: InterviewQuestionRequest, current_user: UserResponse) -> Tuple[str, Optional[ResumeProfile], str]:
+    """The resume text, its stored profile when the resume comes from the database, and the normalized job description."""
     if supabase_client is None:
         raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Supabase client not available")
 
     resume_text_to_use = ""
+    profile = None
     if request_data.resume_text:
         resume_text_to_use = request_data.resume_text
     elif request_data.resume_id: # resume_id must be present if resume_text is not, due to Pydantic validator
         user_id_str = str(current_user.id)
         try:
-            # Fetch the raw_text of the resume
-            response = supabase_client.table("resumes").select("raw_text").eq("id", str(request_data.resume_id)).eq("user_id", user_id_str).maybe_single().execute()
+            # Fetch the raw_text of the resume, and the profile built from it at upload
+            response = supabase_client.table("resumes").select("raw_text, profile").eq("id", str(request_data.resume_id)).eq("user_id", user_id_str).maybe_single().execute()
 
             if response.data and "raw_text" in response.data and response.data["raw_text"] is not None:
                 resume_text_to_use = response.data["raw_text"]
+                profile = profile_from_stored(response.data.get("profile"))
             else:
                 # This case covers: no record found, or record found but raw_text is null/missing.
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Resume with id {request_data.resume_id} not found, has no text, or access denied.")
@@ -40,14 +48,111 @@ async def generate_interview_questions_endpoint(
     # This check is after attempting to load/use provided text.
     if not resume_text_to_use.strip():
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Resume text for analysis is empty.")
-    if not request_data.job_description_text.strip():
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Job description text is empty.")
+    job_description_text = resolve_job_description(request_data.job_description_text, request_data.job_application_id, current_user).text
+
+    return resume_text_to_use, profile, job_description_text
+
+def _stored_result(request_data: InterviewQuestionRequest, resume_text: str, job_description_text: str,
+                   current_user: UserResponse) -> Optional[InterviewQuestionResponse]:
+    if request_data.refresh:
+        return None
+    stored = get_stored_result(INTERVIEW_PREP_TABLE, str(current_user.id), hash_text(resume_text), hash_text(job_description_text), "full")
+    return InterviewQuestionResponse(**{**stored, "from_history": True}) if stored is not None else None
+
+def _store(request_data: InterviewQuestionRequest, resume_text: str, job_description_text: str, current_user: UserResponse,
+           result: InterviewQuestionResponse):
+    store_result(INTERVIEW_PREP_TABLE, str(current_user.id), request_data.resume_id, resume_text, job_description_text,
+                 "full", result.model_dump(mode="json", exclude={"from_history"}))
+
+@router.post("/generate-questions", response_model=Optional[InterviewQuestionResponse], status_code=status.HTTP_200_OK)
+async def generate_interview_questions_endpoint(
+    request_data: InterviewQuestionRequest,
+    background_tasks: BackgroundTasks,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    resume_text_to_use, profile, job_description_text = await _resolve_inputs(request_data, current_user)
+    stored = _stored_result(request_data, resume_text_to_use, job_description_text, current_user)
+    if stored is not None:
+        return stored
 
     # Call the LLM service function
-    interview_prep_result = await generate_interview_questions_with_llm(resume_text_to_use, request_data.job_description_text)
+    interview_prep_result = await generate_interview_questions_with_llm(resume_text_to_use, job_description_text, profile=profile)
 
     if interview_prep_result is None:
         # This means the LLM service had an issue (OpenAI API error, parsing error, etc.)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to generate interview questions from LLM service.")
 
-    return interview_prep_result
+    response = InterviewQuestionResponse(**interview_prep_result.model_dump())
+    background_tasks.add_task(_store, request_data, resume_text_to_use, job_description_text, current_user, response)
+    return response
+
+@router.post("/generate-questions/stream", status_code=status.HTTP_200_OK)
+async def stream_interview_questions_endpoint(
+    request_data: InterviewQuestionRequest,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Server-Sent Events variant of /generate-questions.
+
+    Emits a `question` event per InterviewQuestion as soon as the model finishes it, then a `result`
+    event with the validated InterviewQuestionResponse and a `done` event with timings. Failures
+    after the stream has started are reported as an `error` event.
+    """
+    # Validate the request up front so bad input still gets a normal HTTP error status
+    resume_text_to_use, profile, job_description_text = await _resolve_inputs(request_data, current_user)
+    stored = _stored_result(request_data, resume_text_to_use, job_description_text, current_user)
+
+    async def event_stream() -> AsyncIterator[str]:
+        started = time.perf_counter()
+        time_to_first_question_ms = None
+        result = None
+        if stored is not None:
+            # Same events as a live run, just all at once
+            for question in stored.generated_questions:
+                yield sse_event("question", question.model_dump())
+            yield sse_event("result", stored.model_dump())
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+            yield sse_event("done", {"time_to_first_question_ms": elapsed_ms, "total_ms": elapsed_ms})
+            return
+        try:
+            async for item in stream_interview_questions_with_llm(resume_text_to_use, job_description_text, profile=profile):
+                if isinstance(item, InterviewQuestion):
+                    if time_to_first_question_ms is None:
+                        time_to_first_question_ms = round((time.perf_counter() - started) * 1000, 1)
+                    yield sse_event("question", item.model_dump())
+                else:
+                    result = InterviewQuestionResponse(**item.model_dump())
+                    yield sse_event("result", result.model_dump())
+        except InterviewStreamError as e:
+            yield sse_event("error", {"detail": f"Failed to generate interview questions from LLM service: {e}"})
+            return
+        yield sse_event("done", {
+            "time_to_first_question_ms": time_to_first_question_ms,
+            "total_ms": round((time.perf_counter() - started) * 1000, 1),
+        })
+        if result is not None:
+            _store(request_data, resume_text_to_use, job_description_text, current_user, result) # After `done`, so it adds nothing to what the client waits for
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@router.get("/history", response_model=List[HistorySummary])
+async def list_interview_prep_history(resume_id: Optional[UUID] = None, skip: int = Query(0, ge=0), limit: int = Query(20, ge=1, le=100),
+                                      current_user: UserResponse = Depends(get_current_user)):
+    """Past interview-prep results, newest first; filter by resume_id and page with skip/limit."""
+    if supabase_client is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Supabase client not available")
+    try:
+        return [HistorySummary(**item) for item in list_history(INTERVIEW_PREP_TABLE, str(current_user.id), resume_id, skip, limit)]
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error: {str(e)}")
+
+@router.get("/history/{item_id}", response_model=InterviewPrepHistoryRead)
+async def get_interview_prep_history_item(item_id: UUID, current_user: UserResponse = Depends(get_current_user)):
+    if supabase_client is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Supabase client not available")
+    try:
+        item = get_history_item(INTERVIEW_PREP_TABLE, str(current_user.id), item_id)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error: {str(e)}")
+    if not item:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Interview prep result not found or access denied")
+    return InterviewPrepHistoryRead(**item)
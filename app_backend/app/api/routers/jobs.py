@@ -6,6 +6,8 @@ import datetime
 from app.schemas.job_schemas import JobApplicationCreate, JobApplicationRead, JobApplicationUpdate
 from app.schemas.auth_schemas import UserResponse
 from app.api.deps import get_current_user
+from app.api.job_descriptions import resolve_job_description
+from app.services.job_description_service import ParsedJobDescription
 from app.services.supabase_client import supabase_client # Import the initialized client
 
 router = APIRouter()
@@ -91,6 +93,16 @@ async def read_job_application(
         # Catch generic errors, e.g. if job_id is not a valid UUID format for DB
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error: {str(e)}")
 
+@router.get("/{job_id}/description", response_model=ParsedJobDescription)
+async def read_job_application_description(
+    job_id: UUID,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """The normalized, parsed job description linked to this application by an analysis or interview-prep request."""
+    if supabase_client is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Supabase client not available")
+    return resolve_job_description(None, job_id, current_user)
+
 
 @router.put("/{job_id}", response_model=JobApplicationRead)
 async def update_job_application(
@@ -1,16 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status, UploadFile, File
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
 from uuid import UUID
 import mimetypes
+import time
 
-from app.schemas.resume_schemas import ResumeCreate, ResumeRead, ResumeMetadata
+from app.schemas.resume_schemas import ResumeCreate, ResumeRead, ResumeMetadata, ResumeSearchRequest, ResumeSearchResult
 from app.schemas.auth_schemas import UserResponse
 from app.api.deps import get_current_user
+from app.api.sse import sse_event, SSE_HEADERS
+from app.api.job_descriptions import resolve_job_description
+from app.core.config import settings
 from app.services.supabase_client import supabase_client
-from app.services.file_parser_service import parse_pdf, parse_docx, calculate_sha256_hash
-from app.services.llm_service import analyze_resume_with_llm
-from app.schemas.analysis_schemas import ResumeAnalysisRequest, ResumeAnalysisResponse
-from app.services.vector_service import upsert_resume_embedding, delete_resume_embedding # Added for Qdrant
+from app.services.file_parser_service import calculate_sha256_hash
+from app.services.ats_analyzer import ATS_ANALYZER_VERSION, analyze_document
+from app.services.job_description_service import get_job_description
+from app.services.resume_profile import ResumeProfile, build_profile, profile_from_stored
+from app.services.llm_service import analyze_resume_with_llm, analyze_resume_narrative_with_llm
+from app.services.scoring_service import score_resume_locally, describe_local_score
+from app.schemas.analysis_schemas import ResumeAnalysisRequest, ResumeAnalysisResponse, BatchAnalysisRequest
+from app.schemas.history_schemas import HistorySummary, AnalysisHistoryRead
+from app.services.analysis_history_service import ANALYSIS_TABLE, get_history_item, get_stored_result, hash_text, list_history, store_result
+from app.services.batch_analysis_service import BatchAnalysisPair, run_batch_analysis, summarize_batch
+from app.services.vector_service import upsert_resume_embedding, delete_resume_embedding, get_text_embedding, search_resumes # Added for Qdrant
 
 router = APIRouter()
 
@@ -45,8 +57,28 @@ async def upload_resume(
     content_hash = calculate_sha256_hash(file_content)
 
     try:
-        existing_response = supabase_client.table("resumes").select("id, filename, content_hash, raw_text, storage_path, user_id, created_at, updated_at").eq("user_id", user_id_str).eq("content_hash", content_hash).maybe_single().execute()
+        existing_response = supabase_client.table("resumes").select("id, filename, content_hash, raw_text, storage_path, ats_report, profile, user_id, created_at, updated_at").eq("user_id", user_id_str).eq("content_hash", content_hash).maybe_single().execute()
         if existing_response.data:
+            # Resumes uploaded before the ATS analyzer or the profile existed (or by an older version) get them now
+            backfill = {}
+            existing_report = existing_response.data.get("ats_report") or {}
+            if existing_report.get("version") != ATS_ANALYZER_VERSION:
+                try:
+                    _, ats_report = analyze_document(file_content, mime_type, content_hash)
+                    backfill["ats_report"] = ats_report.model_dump(mode="json")
+                except Exception as a_e:
+                    print(f"ATS report backfill for existing resume {existing_response.data.get('id')} failed: {a_e}")
+            if profile_from_stored(existing_response.data.get("profile")) is None and existing_response.data.get("raw_text"):
+                try:
+                    backfill["profile"] = build_profile(existing_response.data["raw_text"]).model_dump(mode="json")
+                except Exception as p_e:
+                    print(f"Profile backfill for existing resume {existing_response.data.get('id')} failed: {p_e}")
+            if backfill:
+                try:
+                    supabase_client.table("resumes").update(backfill).eq("id", existing_response.data["id"]).execute()
+                    existing_response.data.update(backfill)
+                except Exception as u_e:
+                    print(f"Backfill update for existing resume {existing_response.data.get('id')} failed: {u_e}")
             # If duplicate for this user, still good to ensure embedding exists
             try:
                 existing_resume_id = UUID(existing_response.data["id"])
@@ -60,11 +92,8 @@ async def upload_resume(
     except Exception as e:
         print(f"Could not check for existing resume hash: {e}")
 
-    raw_text = ""
-    if mime_type == "application/pdf":
-        raw_text = parse_pdf(file_content)
-    elif mime_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-        raw_text = parse_docx(file_content)
+    # Text and the structural ATS report come out of a single parse of the file
+    raw_text, ats_report = analyze_document(file_content, mime_type, content_hash)
 
     if not raw_text:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Could not extract text from the resume.")
@@ -74,6 +103,9 @@ async def upload_resume(
         "filename": file.filename,
         "content_hash": content_hash,
         "raw_text": raw_text,
+        "ats_report": ats_report.model_dump(mode="json"),
+        # Built once here so analysis and interview prompts can send it instead of the whole text
+        "profile": build_profile(raw_text).model_dump(mode="json"),
     }
 
     try:
@@ -114,6 +146,62 @@ async def list_resumes(current_user: UserResponse = Depends(get_current_user)):
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error: {str(e)}")
 
+@router.post("/search", response_model=List[ResumeSearchResult])
+async def search_resumes_route(request_data: ResumeSearchRequest, current_user: UserResponse = Depends(get_current_user)):
+    """The user's resumes ranked by semantic similarity to a query or a job description, best first."""
+    if supabase_client is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Supabase client not available")
+    if request_data.query is not None:
+        query_text = request_data.query
+    else:
+        query_text = resolve_job_description(request_data.job_description_text, request_data.job_application_id, current_user).text
+
+    query_vector = await get_text_embedding(query_text)
+    if query_vector is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Embedding service unavailable, please retry shortly.")
+    try:
+        hits = await search_resumes(current_user.id, query_vector, request_data.limit, request_data.score_threshold, request_data.created_after)
+    except Exception as e:
+        print(f"Resume search failed for user {current_user.id}: {e}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Resume search is temporarily unavailable.")
+    if not hits:
+        return []
+
+    user_id_str = str(current_user.id)
+    try:
+        response = supabase_client.table("resumes").select("id, filename, content_hash, storage_path, created_at, updated_at") \
+            .eq("user_id", user_id_str).in_("id", [hit.resume_id for hit in hits]).execute()
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error: {str(e)}")
+    resumes_by_id = {str(resume["id"]): resume for resume in response.data or []}
+    # In score order; points whose resume was deleted in the meantime are skipped
+    return [ResumeSearchResult(**resumes_by_id[hit.resume_id], score=hit.score, matched_section=hit.section)
+            for hit in hits if hit.resume_id in resumes_by_id]
+
+# Declared before /{resume_id} so "analyses" isn't parsed as a resume id
+@router.get("/analyses", response_model=List[HistorySummary])
+async def list_analyses(resume_id: Optional[UUID] = None, skip: int = Query(0, ge=0), limit: int = Query(20, ge=1, le=100),
+                        current_user: UserResponse = Depends(get_current_user)):
+    """Past analyses, newest first; filter by resume_id and page with skip/limit."""
+    if supabase_client is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Supabase client not available")
+    try:
+        return [HistorySummary(**item) for item in list_history(ANALYSIS_TABLE, str(current_user.id), resume_id, skip, limit)]
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error: {str(e)}")
+
+@router.get("/analyses/{analysis_id}", response_model=AnalysisHistoryRead)
+async def get_analysis(analysis_id: UUID, current_user: UserResponse = Depends(get_current_user)):
+    if supabase_client is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Supabase client not available")
+    try:
+        item = get_history_item(ANALYSIS_TABLE, str(current_user.id), analysis_id)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error: {str(e)}")
+    if not item:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Analysis not found or access denied")
+    return AnalysisHistoryRead(**item)
+
 @router.get("/{resume_id}", response_model=ResumeRead)
 async def get_resume_details(resume_id: UUID, current_user: UserResponse = Depends(get_current_user)):
     # ... (rest of the function remains the same)
@@ -158,32 +246,176 @@ async def delete_resume(resume_id: UUID, current_user: UserResponse = Depends(ge
 
     return
 
-@router.post("/analyze", response_model=Optional[ResumeAnalysisResponse], status_code=status.HTTP_200_OK)
-async def analyze_resume_endpoint_route(request_data: ResumeAnalysisRequest, current_user: UserResponse = Depends(get_current_user)):
-    # ... (rest of the function remains the same)
-    if supabase_client is None:
-        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Supabase client not available")
-
+async def _resolve_resume(resume_id: Optional[UUID], resume_text: Optional[str], current_user: UserResponse) -> Tuple[str, Optional[dict], Optional[ResumeProfile]]:
+    """The text to analyze, plus the stored ATS report and profile when the resume comes from the database."""
     resume_text_to_analyze = ""
-    if request_data.resume_text:
-        resume_text_to_analyze = request_data.resume_text
-    elif request_data.resume_id:
+    ats_report = None
+    profile = None
+    if resume_text:
+        resume_text_to_analyze = resume_text
+    elif resume_id:
         user_id_str = str(current_user.id)
         try:
-            response = supabase_client.table("resumes").select("raw_text").eq("id", str(request_data.resume_id)).eq("user_id", user_id_str).maybe_single().execute()
+            response = supabase_client.table("resumes").select("raw_text, ats_report, profile").eq("id", str(resume_id)).eq("user_id", user_id_str).maybe_single().execute()
             if response.data and "raw_text" in response.data and response.data["raw_text"] is not None:
                 resume_text_to_analyze = response.data["raw_text"]
+                ats_report = response.data.get("ats_report")
+                profile = profile_from_stored(response.data.get("profile"))
             else:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Resume with id {request_data.resume_id} not found, has no text, or access denied.")
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Resume with id {resume_id} not found, has no text, or access denied.")
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error: {str(e)}")
 
     if not resume_text_to_analyze.strip():
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Resume text for analysis is empty.")
-    if not request_data.job_description_text.strip():
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Job description text is empty.")
+    return resume_text_to_analyze, ats_report, profile
+
+def _stored_ats_summary(ats_report: Optional[dict]) -> Optional[str]:
+    return ats_report.get("summary") if ats_report else None
+
+async def _run_analysis(request_data: ResumeAnalysisRequest, resume_text_to_analyze: str, job_description_text: str,
+                        ats_report: Optional[dict], profile: Optional[ResumeProfile] = None) -> ResumeAnalysisResponse:
+    # The structural report from ingestion is authoritative; the LLM only sees the extracted text, so it isn't asked
+    ats_summary = _stored_ats_summary(ats_report)
+    if request_data.mode == "full":
+        analysis_result = await analyze_resume_with_llm(resume_text_to_analyze, job_description_text, profile=profile, ats_summary=ats_summary)
+        if analysis_result is None:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="LLM analysis failed.")
+        return ResumeAnalysisResponse(**analysis_result.model_dump(), mode="full")
+
+    local_score = await score_resume_locally(resume_text_to_analyze, job_description_text)
+    if request_data.mode == "fast":
+        narrative = describe_local_score(local_score)
+    else:
+        narrative_result = await analyze_resume_narrative_with_llm(resume_text_to_analyze, job_description_text, local_score.missing_keywords,
+                                                                   profile=profile, ats_summary=ats_summary)
+        if narrative_result is None:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="LLM analysis failed.")
+        narrative = narrative_result.model_dump()
+    if ats_summary:
+        narrative["ats_compatibility_check"] = ats_summary
+    return ResumeAnalysisResponse(
+        match_score=local_score.match_score,
+        missing_keywords=local_score.missing_keywords,
+        mode=request_data.mode,
+        local_score=local_score,
+        **narrative
+    )
+
+@router.post("/analyze", response_model=Optional[ResumeAnalysisResponse], status_code=status.HTTP_200_OK)
+async def analyze_resume_endpoint_route(request_data: ResumeAnalysisRequest, background_tasks: BackgroundTasks, current_user: UserResponse = Depends(get_current_user)):
+    if supabase_client is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Supabase client not available")
+
+    resume_text_to_analyze, ats_report, profile = await _resolve_resume(request_data.resume_id, request_data.resume_text, current_user)
+    # Normalized and parsed once per distinct posting; everything below sees the normalized text
+    job_description_text = resolve_job_description(request_data.job_description_text, request_data.job_application_id, current_user).text
+
+    user_id_str = str(current_user.id)
+    # Fast mode is cheaper to recompute than to look up
+    if request_data.mode != "fast" and not request_data.refresh:
+        stored = get_stored_result(ANALYSIS_TABLE, user_id_str, hash_text(resume_text_to_analyze), hash_text(job_description_text), request_data.mode)
+        if stored is not None:
+            return ResumeAnalysisResponse(**{**stored, "from_history": True})
+
+    analysis = await _run_analysis(request_data, resume_text_to_analyze, job_description_text, ats_report, profile)
+    background_tasks.add_task(
+        store_result, ANALYSIS_TABLE, user_id_str, request_data.resume_id, resume_text_to_analyze, job_description_text,
+        request_data.mode, analysis.model_dump(mode="json", exclude={"from_history"}), analysis.match_score)
+    return analysis
+
+BATCH_RESUME_COLUMNS = "id, raw_text, ats_report, profile"
+
+def _fetch_resume_page(user_id: str, resume_ids: Optional[List[UUID]], start: int, size: int) -> List[dict]:
+    query = supabase_client.table("resumes").select(BATCH_RESUME_COLUMNS).eq("user_id", user_id)
+    if resume_ids is not None:
+        query = query.in_("id", [str(resume_id) for resume_id in resume_ids])
+    # Newest first; the id breaks ties so pages neither overlap nor skip rows
+    return query.order("updated_at", desc=True).order("id").range(start, start + size - 1).execute().data or []
+
+def _resume_pairs(rows: List[dict], job_description_text: str) -> List[BatchAnalysisPair]:
+    return [
+        BatchAnalysisPair(item_id=str(row["id"]), resume_text=row["raw_text"], job_description_text=job_description_text,
+                          resume_profile=profile_from_stored(row.get("profile")), ats_summary=_stored_ats_summary(row.get("ats_report")),
+                          resume_id=row["id"])
+        for row in rows if (row.get("raw_text") or "").strip()
+    ]
+
+def _resume_batches(user_id: str, resume_ids: Optional[List[UUID]], job_description_text: str, first_page: List[dict]) -> Iterator[List[BatchAnalysisPair]]:
+    """The pairs for every matching resume, one page of LLM_BATCH_MAX_ITEMS rows at a time. `first_page`
+    was already fetched by the route; later pages are fetched as the previous one is done."""
+    page_size, start, rows = settings.LLM_BATCH_MAX_ITEMS, 0, first_page
+    while True:
+        pairs = _resume_pairs(rows, job_description_text)
+        if pairs:
+            yield pairs
+        if len(rows) < page_size:
+            return
+        start += page_size
+        rows = _fetch_resume_page(user_id, resume_ids, start, page_size)
+
+@router.post("/analyze/batch", status_code=status.HTTP_200_OK)
+async def analyze_resumes_batch_route(request_data: BatchAnalysisRequest, current_user: UserResponse = Depends(get_current_user)):
+    """Scores one job description against many resumes, or one resume against many job descriptions.
+
+    Streams Server-Sent Events: an `item` event per analysis as soon as it completes (so in completion
+    order, keyed by `item_id`), then a `summary` event with aggregate latency. Without `resume_ids`, every
+    resume of the user is scored, LLM_BATCH_MAX_ITEMS at a time; if a later page can't be loaded, an
+    `error` event precedes the summary.
+    """
+    if supabase_client is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Supabase client not available")
+
+    user_id_str = str(current_user.id)
+    if request_data.job_description_text is not None:
+        job_description_text = get_job_description(request_data.job_description_text).text
+        if not job_description_text:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Job description text is empty.")
+        if request_data.resume_ids is not None and len(request_data.resume_ids) > settings.LLM_BATCH_MAX_ITEMS:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Batch too large: {len(request_data.resume_ids)} items, the limit is {settings.LLM_BATCH_MAX_ITEMS}.")
+        try:
+            first_page = _fetch_resume_page(user_id_str, request_data.resume_ids, 0, settings.LLM_BATCH_MAX_ITEMS)
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error: {str(e)}")
+        if len(first_page) < settings.LLM_BATCH_MAX_ITEMS and not _resume_pairs(first_page, job_description_text):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Nothing to analyze: no resumes with text or job descriptions found.")
+        batches = _resume_batches(user_id_str, request_data.resume_ids, job_description_text, first_page)
+        shared_first = "job_description" # The JD is the part every prompt in this batch has in common
+    else:
+        resume_text, ats_report, resume_profile = await _resolve_resume(request_data.resume_id, request_data.resume_text, current_user)
+        job_description_texts = [get_job_description(text).text for text in request_data.job_description_texts]
+        if not all(job_description_texts):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Job description text is empty.")
+        pairs = [
+            BatchAnalysisPair(item_id=str(index), resume_text=resume_text, job_description_text=text, resume_profile=resume_profile,
+                              ats_summary=_stored_ats_summary(ats_report), resume_id=request_data.resume_id)
+            for index, text in enumerate(job_description_texts)
+        ]
+        if not pairs:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Nothing to analyze: no resumes with text or job descriptions found.")
+        if len(pairs) > settings.LLM_BATCH_MAX_ITEMS:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Batch too large: {len(pairs)} items, the limit is {settings.LLM_BATCH_MAX_ITEMS}.")
+        batches = iter([pairs])
+        shared_first = "resume"
+
+    async def event_stream() -> AsyncIterator[str]:
+        started = time.perf_counter()
+        items = []
+        while True:
+            try:
+                pairs = next(batches, None)
+            except Exception as e:
+                print(f"Batch analysis: loading the next page of resumes failed: {e}")
+                yield sse_event("error", {"detail": f"Database error: {str(e)}"})
+                break
+            if pairs is None:
+                break
+            async for item in run_batch_analysis(pairs, settings.LLM_BATCH_CONCURRENCY, shared_first=shared_first, user_id=user_id_str):
+                items.append(item)
+                yield sse_event("item", item.model_dump(mode="json"))
+        summary = summarize_batch(items, (time.perf_counter() - started) * 1000)
+        yield sse_event("summary", summary.model_dump())
 
-    analysis_result = await analyze_resume_with_llm(resume_text_to_analyze, request_data.job_description_text)
-    if analysis_result is None:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="LLM analysis failed.")
-    return analysis_result
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+import time
+
+from app.schemas.auth_schemas import UserResponse
+from app.api.deps import get_current_user
+from app.services.supabase_client import supabase_client
+from app.services.skill_taxonomy import extract_skills, summarize_skills, compare_skills
+from app.schemas.skill_schemas import SkillExtractionRequest, SkillExtractionResponse
+
+router = APIRouter()
+
+@router.post("/extract", response_model=SkillExtractionResponse, status_code=status.HTTP_200_OK)
+async def extract_skills_endpoint(request_data: SkillExtractionRequest, current_user: UserResponse = Depends(get_current_user)):
+    """Normalized skills found in the text (e.g. "k8s" -> Kubernetes) with their character offsets."""
+    text = request_data.text
+    if request_data.resume_id is not None:
+        if supabase_client is None:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Supabase client not available")
+        try:
+            response = supabase_client.table("resumes").select("raw_text").eq("id", str(request_data.resume_id)).eq("user_id", str(current_user.id)).maybe_single().execute()
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error: {str(e)}")
+        if not response or not response.data or response.data.get("raw_text") is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Resume with id {request_data.resume_id} not found, has no text, or access denied.")
+        text = response.data["raw_text"]
+
+    started = time.perf_counter()
+    skills = summarize_skills(extract_skills(text))
+    comparison = compare_skills(text, request_data.job_description_text) if request_data.job_description_text else None
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    return SkillExtractionResponse(skills=skills, comparison=comparison, scanned_chars=len(text), elapsed_ms=round(elapsed_ms, 3))
@@ -0,0 +1,8 @@
+import json
+
+def sse_event(event: str, data: dict) -> str:
+    # One Server-Sent Events message; `data` must already be JSON-serializable
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+# Keep reverse proxies (nginx) from buffering the stream and delaying events
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
@@ -6,12 +6,110 @@ class Settings(BaseSettings):
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
+    OPENAI_BASE_URL: Optional[str] = os.getenv("OPENAI_BASE_URL", None) # Defaults to the official API
+
+    # Where chat completions come from: "openai", "openai_compatible" (OPENAI_BASE_URL, API key optional) or "fake"
+    LLM_BACKEND: str = os.getenv("LLM_BACKEND", "openai")
+    LLM_MODEL: str = os.getenv("LLM_MODEL", "gpt-3.5-turbo-0125")
+    # Tiered routing: a cheap and a strong model, and a route per feature: "default" (LLM_MODEL), "fast", "strong",
+    # or "tiered" (fast first, strong only when the fast answer fails validation or a confidence check)
+    LLM_FAST_MODEL: str = os.getenv("LLM_FAST_MODEL", "gpt-4o-mini")
+    LLM_STRONG_MODEL: str = os.getenv("LLM_STRONG_MODEL", "gpt-4o")
+    LLM_ROUTE_ANALYSIS: str = os.getenv("LLM_ROUTE_ANALYSIS", "default")
+    LLM_ROUTE_NARRATIVE: str = os.getenv("LLM_ROUTE_NARRATIVE", "default")
+    LLM_ROUTE_INTERVIEW: str = os.getenv("LLM_ROUTE_INTERVIEW", "default")
+    # Tiered analysis escalates when the fast model's match score is further than this from the local score
+    LLM_ROUTE_MAX_SCORE_GAP: int = int(os.getenv("LLM_ROUTE_MAX_SCORE_GAP", 40))
+    # Fake backend (load tests, benchmarks): response delay in ms and its jitter (none, uniform, normal, lognormal, exponential)
+    FAKE_LLM_LATENCY_MS: float = float(os.getenv("FAKE_LLM_LATENCY_MS", 800))
+    FAKE_LLM_JITTER: str = os.getenv("FAKE_LLM_JITTER", "lognormal")
+    FAKE_LLM_JITTER_MS: float = float(os.getenv("FAKE_LLM_JITTER_MS", 250))
+    FAKE_LLM_SEED: int = int(os.getenv("FAKE_LLM_SEED", 0))
+
+    # Outbound OpenAI call governor: rate limits (per minute, 0 = unlimited), concurrency, retries, circuit breaker
+    OPENAI_CHAT_RPM: float = float(os.getenv("OPENAI_CHAT_RPM", 500))
+    OPENAI_CHAT_TPM: float = float(os.getenv("OPENAI_CHAT_TPM", 200000))
+    OPENAI_EMBEDDING_RPM: float = float(os.getenv("OPENAI_EMBEDDING_RPM", 3000))
+    OPENAI_EMBEDDING_TPM: float = float(os.getenv("OPENAI_EMBEDDING_TPM", 1000000))
+    OPENAI_MAX_CONCURRENCY: int = int(os.getenv("OPENAI_MAX_CONCURRENCY", 16))
+    OPENAI_MAX_RETRIES: int = int(os.getenv("OPENAI_MAX_RETRIES", 3))
+    OPENAI_RETRY_BASE_DELAY: float = float(os.getenv("OPENAI_RETRY_BASE_DELAY", 0.5)) # seconds
+    OPENAI_RETRY_MAX_DELAY: float = float(os.getenv("OPENAI_RETRY_MAX_DELAY", 20))
+    OPENAI_CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("OPENAI_CIRCUIT_FAILURE_THRESHOLD", 5))
+    OPENAI_CIRCUIT_RESET_SECONDS: float = float(os.getenv("OPENAI_CIRCUIT_RESET_SECONDS", 30))
+
+    # How prompts carry the resume: "profile" (the compact profile built at upload) or "text" (the compacted raw text)
+    LLM_RESUME_INPUT: str = os.getenv("LLM_RESUME_INPUT", "profile")
+    # Per-section prompt token budgets; longer inputs are compacted before being sent to the LLM
+    LLM_RESUME_TOKEN_BUDGET: int = int(os.getenv("LLM_RESUME_TOKEN_BUDGET", 2000))
+    LLM_JD_TOKEN_BUDGET: int = int(os.getenv("LLM_JD_TOKEN_BUDGET", 1000))
+
+    # Batch analysis: max concurrent LLM calls per batch request, and max items per batch
+    LLM_BATCH_CONCURRENCY: int = int(os.getenv("LLM_BATCH_CONCURRENCY", 4))
+    LLM_BATCH_MAX_ITEMS: int = int(os.getenv("LLM_BATCH_MAX_ITEMS", 50))
+
+    # Where embeddings come from: "openai" (EMBEDDING_MODEL), "local" (LOCAL_EMBEDDING_MODEL on the CPU, needs
+    # sentence-transformers) or "hashing" (word hashing, no model; tests and offline development).
+    # The resume collection's vector size follows the backend: changing it means reindexing into a new QDRANT_RESUME_COLLECTION
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "openai")
+    EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002")
+    LOCAL_EMBEDDING_MODEL: str = os.getenv("LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    LOCAL_EMBEDDING_RUNTIME: str = os.getenv("LOCAL_EMBEDDING_RUNTIME", "torch") # "torch" or "onnx" (needs onnxruntime)
+    LOCAL_EMBEDDING_BATCH_SIZE: int = int(os.getenv("LOCAL_EMBEDDING_BATCH_SIZE", 32))
+    # Fewer output dimensions (0 = the model's own): text-embedding-3 and Matryoshka-trained local models; hashing defaults to 1024
+    EMBEDDING_DIMENSIONS: int = int(os.getenv("EMBEDDING_DIMENSIONS", 0))
+
+    # Embedding requests arriving within the window share one API call, up to max items / estimated tokens (0 ms disables)
+    EMBEDDING_BATCH_WINDOW_MS: float = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", 5))
+    EMBEDDING_BATCH_MAX_ITEMS: int = int(os.getenv("EMBEDDING_BATCH_MAX_ITEMS", 256))
+    EMBEDDING_BATCH_MAX_TOKENS: int = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", 100000))
+
+    # Embeddings kept per worker in memory (entries, ~6 KB each) and in a SQLite file shared by all workers ("" = memory only)
+    EMBEDDING_CACHE_SIZE: int = int(os.getenv("EMBEDDING_CACHE_SIZE", 2048))
+    EMBEDDING_CACHE_PATH: str = os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3")
+
+    # Local scoring (fast/hybrid analysis modes): also blend in embedding similarity (costs two embedding calls)
+    LOCAL_SCORING_USE_EMBEDDINGS: bool = os.getenv("LOCAL_SCORING_USE_EMBEDDINGS", "False").lower() == "true"
+
+    # ATS compatibility reports kept in memory, keyed by resume content hash
+    ATS_REPORT_CACHE_SIZE: int = int(os.getenv("ATS_REPORT_CACHE_SIZE", 1024))
+
+    # Parsed job descriptions kept in memory, keyed by the hash of the normalized text (all are also stored in job_descriptions)
+    JD_CACHE_SIZE: int = int(os.getenv("JD_CACHE_SIZE", 2048))
+
+    # Stored analysis/interview-prep results: rows kept per user per table, and maximum age (0 disables either limit)
+    ANALYSIS_HISTORY_MAX_PER_USER: int = int(os.getenv("ANALYSIS_HISTORY_MAX_PER_USER", 500))
+    ANALYSIS_HISTORY_RETENTION_DAYS: int = int(os.getenv("ANALYSIS_HISTORY_RETENTION_DAYS", 180))
+
+    # Where resume vectors are kept: "qdrant", "numpy" (embedded in the process, snapshots in VECTOR_STORE_PATH;
+    # single worker only) or "auto" (Qdrant if it answers at startup, the embedded store otherwise)
+    VECTOR_STORE: str = os.getenv("VECTOR_STORE", "qdrant")
+    VECTOR_STORE_PATH: str = os.getenv("VECTOR_STORE_PATH", ".cache/vector_index") # "" keeps it in memory only
+    VECTOR_STORE_SNAPSHOT_EVERY: int = int(os.getenv("VECTOR_STORE_SNAPSHOT_EVERY", 1000)) # Changes between background snapshots
 
     # Qdrant Settings
     QDRANT_HOST: str = os.getenv("QDRANT_HOST", "localhost")
-    QDRANT_PORT: int = int(os.getenv("QDRANT_PORT", 6334)) # Default HTTP port
+    QDRANT_PORT: int = int(os.getenv("QDRANT_PORT", 6333)) # REST port
+    QDRANT_GRPC_PORT: int = int(os.getenv("QDRANT_GRPC_PORT", 6334))
+    QDRANT_PREFER_GRPC: bool = os.getenv("QDRANT_PREFER_GRPC", "False").lower() == "true" # Talk gRPC on QDRANT_GRPC_PORT instead of REST
+    QDRANT_TIMEOUT_SECONDS: int = int(os.getenv("QDRANT_TIMEOUT_SECONDS", 10))
     QDRANT_API_KEY: Optional[str] = os.getenv("QDRANT_API_KEY", None)
-    QDRANT_RESUME_COLLECTION: str = os.getenv("QDRANT_RESUME_COLLECTION", "user_resumes")
+    QDRANT_RESUME_COLLECTION: str = os.getenv("QDRANT_RESUME_COLLECTION", "user_resumes") # A collection, or the alias vector_reindex maintains
+    # How the resume collection stores and searches vectors: "default" (float32 in RAM), "on_disk" (float32 memory-mapped),
+    # "int8" or "binary" (quantized vectors in RAM, float32 originals on disk to rescore). Applied by the startup bootstrap
+    QDRANT_COLLECTION_PROFILE: str = os.getenv("QDRANT_COLLECTION_PROFILE", "default")
+    # HNSW graph links per node and build-time beam width, and the search-time beam width (0 = Qdrant's defaults)
+    QDRANT_HNSW_M: int = int(os.getenv("QDRANT_HNSW_M", 0))
+    QDRANT_HNSW_EF_CONSTRUCT: int = int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", 0))
+    QDRANT_SEARCH_HNSW_EF: int = int(os.getenv("QDRANT_SEARCH_HNSW_EF", 0))
+    # Quantized profiles: candidates fetched per result and rescored with the originals (0 = the profile's default)
+    QDRANT_QUANTIZATION_OVERSAMPLING: float = float(os.getenv("QDRANT_QUANTIZATION_OVERSAMPLING", 0))
+    # Resumes are indexed as one point per section chunk of at most this many tokens, up to this many chunks
+    VECTOR_CHUNK_MAX_TOKENS: int = int(os.getenv("VECTOR_CHUNK_MAX_TOKENS", 512))
+    VECTOR_MAX_CHUNKS: int = int(os.getenv("VECTOR_MAX_CHUNKS", 24))
+    # Resume points upserted within the window are written in one call (0 ms disables)
+    QDRANT_UPSERT_BATCH_WINDOW_MS: float = float(os.getenv("QDRANT_UPSERT_BATCH_WINDOW_MS", 5))
+    QDRANT_UPSERT_BATCH_MAX_POINTS: int = int(os.getenv("QDRANT_UPSERT_BATCH_MAX_POINTS", 256))
 
     # Email Settings (for fastapi-mail)
     MAIL_USERNAME: Optional[str] = os.getenv("MAIL_USERNAME", None)
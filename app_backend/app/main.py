@@ -1,17 +1,53 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+import math
 from app.api.routers import auth as auth_router
 from app.api.routers import jobs as jobs_router
 from app.api.routers import resumes as resumes_router
 from app.api.routers import interview_prep as interview_prep_router
 from app.api.routers import admin_tasks as admin_tasks_router # Added
+from app.api.routers import skills as skills_router
+from app.services.llm_governor import UpstreamUnavailableError
+from app.services.skill_taxonomy import get_skill_matcher
+from app.services import embedding_cache, vector_service
+from app.services.embedding_backend import get_embedding_backend
 
-app = FastAPI(title="Application Tracker Backend")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Compile the skill automaton now rather than on the first request that needs it
+    matcher = get_skill_matcher()
+    print(f"Skill matcher ready: {matcher.alias_count} aliases ({matcher.backend})")
+    # Likewise a local embedding model; an unknown or unusable EMBEDDING_BACKEND fails startup
+    embeddings = get_embedding_backend()
+    print(f"Embedding backend ready: {embeddings.name} ({embeddings.model}, {embeddings.dimension} dimensions)")
+    # One vector store for the app's lifetime (with Qdrant, one async client, so index calls share its connections)
+    if await vector_service.init_vector_store() is not None:
+        await vector_service.bootstrap_resume_collection()
+    yield
+    await vector_service.close_vector_store()
+    embedding_cache.close()
+
+app = FastAPI(title="Application Tracker Backend", lifespan=lifespan)
 app.include_router(auth_router.router, prefix="/auth", tags=["Authentication"])
 app.include_router(jobs_router.router, prefix="/jobs", tags=["Job Applications"])
 app.include_router(resumes_router.router, prefix="/resumes", tags=["Resumes"])
 app.include_router(interview_prep_router.router, prefix="/interview", tags=["Interview Preparation"])
 app.include_router(admin_tasks_router.router, prefix="/admin-tasks", tags=["Admin Tasks"]) # Added
+app.include_router(skills_router.router, prefix="/skills", tags=["Skills"])
+
+@app.exception_handler(UpstreamUnavailableError)
+async def upstream_unavailable_handler(request: Request, exc: UpstreamUnavailableError):
+    # OpenAI is rate limiting us or down: tell the client to retry later rather than failing with a 500
+    headers = {"Retry-After": str(math.ceil(exc.retry_after))} if exc.retry_after else None
+    return JSONResponse(status_code=503, content={"detail": "LLM service is temporarily unavailable, please retry shortly."}, headers=headers)
 
 @app.get("/health", tags=["Health"])
 async def health_check():
     return {"status": "ok"}
+
+@app.get("/health/ready", tags=["Health"])
+async def readiness_check():
+    # The app serves without the vector index (uploads skip it), so this reports rather than fails
+    vector_index = vector_service.collection_ready()
+    return {"status": "ok" if vector_index else "degraded", "vector_index": vector_index}
@@ -1,13 +1,21 @@
 from pydantic import BaseModel, model_validator as pydantic_model_validator_v2
-from typing import Optional
+from typing import List, Literal, Optional
 from uuid import UUID
 # Assuming LLMAnalysisResult will be imported correctly in the router or defined/imported here
 from app.services.llm_service import LLMAnalysisResult
+from app.services.scoring_service import LocalScore
 
 class ResumeAnalysisRequest(BaseModel):
     resume_id: Optional[UUID] = None
     resume_text: Optional[str] = None
-    job_description_text: str
+    job_description_text: Optional[str] = None
+    # The job application the description belongs to: linked to job_description_text when both are sent,
+    # or used instead of it to reuse the description stored for that application
+    job_application_id: Optional[UUID] = None
+    # full: everything from the LLM. fast: local scoring only, no LLM call.
+    # hybrid: match_score/missing_keywords computed locally, the LLM only writes the narrative fields.
+    mode: Literal["fast", "full", "hybrid"] = "full"
+    refresh: bool = False # Re-run even if an identical request was answered before
 
     @pydantic_model_validator_v2(mode='before') # Use 'before' for Pydantic v2 if needed, or just 'pre=True' in Pydantic v1 validator
     @classmethod # model_validator in Pydantic v2 should be a classmethod if used with mode='before'
@@ -25,7 +33,39 @@ class ResumeAnalysisRequest(BaseModel):
                 raise ValueError('Either resume_id or resume_text must be provided')
             if resume_id is not None and resume_text is not None:
                 raise ValueError('Provide resume_id or resume_text, not both')
+            if data.get('job_description_text') is None and data.get('job_application_id') is None:
+                raise ValueError('Either job_description_text or job_application_id must be provided')
         return data
 
 class ResumeAnalysisResponse(LLMAnalysisResult): # Inherits from the one in llm_service
-    pass
+    mode: Optional[str] = None
+    local_score: Optional[LocalScore] = None # Score components, for fast and hybrid modes
+    from_history: bool = False # Served from a stored result of an identical earlier request
+
+class BatchAnalysisRequest(BaseModel):
+    # Either one job description against many resumes (resume_ids, or all of the user's resumes when omitted)...
+    job_description_text: Optional[str] = None
+    resume_ids: Optional[List[UUID]] = None
+    # ...or one resume against many job descriptions
+    resume_id: Optional[UUID] = None
+    resume_text: Optional[str] = None
+    job_description_texts: Optional[List[str]] = None
+
+    @pydantic_model_validator_v2(mode='before')
+    @classmethod
+    def check_batch_mode(cls, data):
+        if isinstance(data, dict):
+            if data.get('resume_text') == "":
+                data['resume_text'] = None
+            one_jd = data.get('job_description_text') is not None
+            many_jds = data.get('job_description_texts') is not None
+            if one_jd == many_jds:
+                raise ValueError('Provide job_description_text (to score many resumes) or job_description_texts (to score one resume), not both')
+            if one_jd and (data.get('resume_id') is not None or data.get('resume_text') is not None):
+                raise ValueError('Use resume_ids, not resume_id/resume_text, when scoring one job description against many resumes')
+            if many_jds:
+                if data.get('resume_ids') is not None:
+                    raise ValueError('Use resume_id or resume_text, not resume_ids, when scoring one resume against many job descriptions')
+                if (data.get('resume_id') is None) == (data.get('resume_text') is None):
+                    raise ValueError('Provide resume_id or resume_text, not both')
+        return data
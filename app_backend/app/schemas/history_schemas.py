@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Optional
+from uuid import UUID
+import datetime
+from app.schemas.analysis_schemas import ResumeAnalysisResponse
+from app.schemas.interview_prep_schemas import InterviewQuestionResponse
+
+class HistorySummary(BaseModel): # List views, without the stored result
+    id: UUID
+    resume_id: Optional[UUID] = None
+    jd_hash: str
+    mode: str
+    match_score: Optional[int] = None # Analyses only
+    job_description_excerpt: Optional[str] = None
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+
+class AnalysisHistoryRead(HistorySummary):
+    result: ResumeAnalysisResponse
+
+class InterviewPrepHistoryRead(HistorySummary):
+    result: InterviewQuestionResponse
@@ -6,7 +6,9 @@ from app.services.llm_service import InterviewPrepResult # Import the structure
 class InterviewQuestionRequest(BaseModel):
     resume_id: Optional[UUID] = None
     resume_text: Optional[str] = None
-    job_description_text: str
+    job_description_text: Optional[str] = None
+    job_application_id: Optional[UUID] = None # Linked to job_description_text, or used instead of it (see ResumeAnalysisRequest)
+    refresh: bool = False # Re-run even if an identical request was answered before
 
     @pydantic_model_validator_v2(mode='before')
     @classmethod # Pydantic v2 model_validator with mode='before' should be a classmethod
@@ -26,7 +28,9 @@ class InterviewQuestionRequest(BaseModel):
             raise ValueError('Either resume_id or resume_text must be provided')
         if resume_id is not None and resume_text is not None: # Both provided
             raise ValueError('Provide either resume_id or resume_text, not both')
+        if data.get('job_description_text') is None and data.get('job_application_id') is None:
+            raise ValueError('Either job_description_text or job_application_id must be provided')
         return data
 
 class InterviewQuestionResponse(InterviewPrepResult): # Inherits from the one in llm_service
-    pass
+    from_history: bool = False # Served from a stored result of an identical earlier request
@@ -16,6 +16,7 @@ class JobApplicationCreate(JobApplicationBase):
 class JobApplicationRead(JobApplicationBase):
     id: UUID
     user_id: UUID # To associate with the user who created it
+    jd_hash: Optional[str] = None # Stored job description linked by an analysis or interview-prep request
     created_at: datetime.datetime
     updated_at: datetime.datetime
 
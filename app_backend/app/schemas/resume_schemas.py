@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional
 from uuid import UUID
 import datetime
+from app.services.ats_analyzer import ATSReport
+from app.services.resume_profile import ResumeProfile
 
 class ResumeBase(BaseModel):
     filename: Optional[str] = None
@@ -19,6 +21,8 @@ class ResumeRead(ResumeBase):
     # raw_text can be large, consider if it should always be returned in list views
     # For now, including it. Could have a ResumeReadList without raw_text.
     raw_text: Optional[str] = None
+    ats_report: Optional[ATSReport] = None # Structural ATS compatibility check, computed at upload
+    profile: Optional[ResumeProfile] = None # Compact profile used in LLM prompts, computed at upload
     created_at: datetime.datetime
     updated_at: datetime.datetime
 
@@ -34,3 +38,31 @@ class ResumeMetadata(BaseModel): # For listing resumes without full text
     updated_at: datetime.datetime
     class Config:
         orm_mode = True
+
+class ResumeSearchRequest(BaseModel):
+    # What to rank the user's resumes against: a free-text query, or a job description (pasted, or the one
+    # stored for a job application)
+    query: Optional[str] = None
+    job_description_text: Optional[str] = None
+    job_application_id: Optional[UUID] = None
+    limit: int = Field(10, ge=1, le=50)
+    score_threshold: Optional[float] = Field(None, ge=-1, le=1) # Cosine similarity
+    created_after: Optional[datetime.datetime] = None
+
+    @model_validator(mode='before')
+    @classmethod
+    def check_query_source(cls, data):
+        if isinstance(data, dict):
+            if data.get('query') == "":
+                data['query'] = None
+            has_query = data.get('query') is not None
+            has_job_description = data.get('job_description_text') is not None or data.get('job_application_id') is not None
+            if not has_query and not has_job_description:
+                raise ValueError('Either query, job_description_text or job_application_id must be provided')
+            if has_query and has_job_description:
+                raise ValueError('Provide query or a job description, not both')
+        return data
+
+class ResumeSearchResult(ResumeMetadata):
+    score: float # Cosine similarity of the resume's best-matching section to the query, higher is closer
+    matched_section: Optional[str] = None # That section, e.g. "experience" or "skills"
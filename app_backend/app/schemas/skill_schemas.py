@@ -0,0 +1,27 @@
+from pydantic import BaseModel, model_validator as pydantic_model_validator_v2
+from typing import List, Optional
+from uuid import UUID
+from app.services.skill_taxonomy import ExtractedSkill, SkillComparison
+
+class SkillExtractionRequest(BaseModel):
+    # Text to scan, or the id of one of the user's resumes
+    text: Optional[str] = None
+    resume_id: Optional[UUID] = None
+    # When given, the response also compares the job description's skills with those found in `text`/`resume_id`
+    job_description_text: Optional[str] = None
+
+    @pydantic_model_validator_v2(mode='before')
+    @classmethod
+    def check_text_source(cls, data):
+        if isinstance(data, dict):
+            if data.get('text') == "":
+                data['text'] = None
+            if (data.get('text') is None) == (data.get('resume_id') is None):
+                raise ValueError('Provide either text or resume_id')
+        return data
+
+class SkillExtractionResponse(BaseModel):
+    skills: List[ExtractedSkill]
+    comparison: Optional[SkillComparison] = None
+    scanned_chars: int
+    elapsed_ms: float
@@ -0,0 +1,100 @@
+# Persisted analysis and interview-prep results.
+#
+# Every result is stored per (user, resume text hash, job description hash, mode) so past results can be
+# listed without re-running the LLM, and an identical request is answered from storage. Keying on the
+# resume's text rather than only its id also covers requests that send resume_text directly; resume_id
+# is stored alongside for filtering. Growth is bounded by a per-user row cap, enforced on every write,
+# and an age limit enforced by prune_expired_history (run from the admin tasks endpoint).
+import datetime
+import hashlib
+import re
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.services.supabase_client import supabase_client
+
+ANALYSIS_TABLE = "resume_analyses"
+INTERVIEW_PREP_TABLE = "interview_preps"
+HISTORY_TABLES = (ANALYSIS_TABLE, INTERVIEW_PREP_TABLE)
+
+SUMMARY_COLUMNS = "id, resume_id, jd_hash, mode, match_score, job_description_excerpt, created_at, updated_at"
+EXCERPT_CHARS = 200
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def hash_text(text: str) -> str:
+    """Hash of the text with whitespace collapsed, so re-pasted copies of the same JD hit the same row."""
+    return hashlib.sha256(_WHITESPACE_RE.sub(" ", text).strip().encode("utf-8")).hexdigest()
+
+def get_stored_result(table: str, user_id: str, resume_hash: str, jd_hash: str, mode: str) -> Optional[Dict[str, Any]]:
+    if supabase_client is None:
+        return None
+    try:
+        response = supabase_client.table(table).select("result").eq("user_id", user_id).eq("resume_hash", resume_hash)\
+            .eq("jd_hash", jd_hash).eq("mode", mode).maybe_single().execute()
+        if response and response.data:
+            return response.data["result"]
+    except Exception as e:
+        print(f"Could not read stored result from {table}: {e}") # Fall through to a fresh run
+    return None
+
+def store_result(table: str, user_id: str, resume_id: Optional[UUID], resume_text: str, job_description_text: str,
+                 mode: str, result: Dict[str, Any], match_score: Optional[int] = None):
+    """Upserts the result, then drops the user's oldest rows beyond ANALYSIS_HISTORY_MAX_PER_USER.
+
+    Called as a background task after the response is sent, so failures are logged, not raised.
+    """
+    if supabase_client is None:
+        return
+    row = {
+        "user_id": user_id,
+        "resume_id": str(resume_id) if resume_id else None,
+        "resume_hash": hash_text(resume_text),
+        "jd_hash": hash_text(job_description_text),
+        "mode": mode,
+        "match_score": match_score,
+        "job_description_excerpt": job_description_text.strip()[:EXCERPT_CHARS],
+        "result": result,
+        "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+    try:
+        supabase_client.table(table).upsert(row, on_conflict="user_id,resume_hash,jd_hash,mode").execute()
+        cap = settings.ANALYSIS_HISTORY_MAX_PER_USER
+        if cap > 0:
+            overflow = supabase_client.table(table).select("id").eq("user_id", user_id)\
+                .order("updated_at", desc=True).range(cap, cap + 999).execute()
+            if overflow.data:
+                supabase_client.table(table).delete().in_("id", [item["id"] for item in overflow.data]).execute()
+    except Exception as e:
+        print(f"Could not store result in {table}: {e}")
+
+def list_history(table: str, user_id: str, resume_id: Optional[UUID] = None, skip: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
+    query = supabase_client.table(table).select(SUMMARY_COLUMNS).eq("user_id", user_id)
+    if resume_id is not None:
+        query = query.eq("resume_id", str(resume_id))
+    response = query.order("updated_at", desc=True).range(skip, skip + limit - 1).execute()
+    return response.data or []
+
+def get_history_item(table: str, user_id: str, item_id: UUID) -> Optional[Dict[str, Any]]:
+    response = supabase_client.table(table).select(SUMMARY_COLUMNS + ", result").eq("id", str(item_id)).eq("user_id", user_id).maybe_single().execute()
+    return response.data if response else None
+
+async def prune_expired_history() -> Dict[str, Any]:
+    """Deletes stored results older than ANALYSIS_HISTORY_RETENTION_DAYS from both tables."""
+    if supabase_client is None:
+        print("Supabase client not available. Cannot prune analysis history.")
+        return {"status": "error", "message": "Supabase client not available."}
+    if settings.ANALYSIS_HISTORY_RETENTION_DAYS <= 0:
+        return {"status": "skipped", "message": "Retention is disabled (ANALYSIS_HISTORY_RETENTION_DAYS=0)."}
+    cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=settings.ANALYSIS_HISTORY_RETENTION_DAYS)
+    deleted = {}
+    for table in HISTORY_TABLES:
+        try:
+            response = supabase_client.table(table).delete().lt("updated_at", cutoff.isoformat()).execute()
+            deleted[table] = len(response.data or [])
+        except Exception as e:
+            print(f"Could not prune {table}: {e}")
+            deleted[table] = None
+    print(f"Pruned analysis history older than {cutoff.date()}: {deleted}")
+    return {"status": "ok", "deleted": deleted}
@@ -0,0 +1,105 @@
+# Deterministic ATS-compatibility check from the document's structure.
+#
+# Applicant tracking systems read resumes the way our parser does: they extract the text layer and
+# reassemble it in content-stream order. Layouts that break that (columns read across, text in images
+# or text boxes, tables, contact details in page headers, fonts without a Unicode map) are visible in
+# the DocumentStructure collected by file_parser_service during the same parse, so the check needs no
+# LLM call and costs next to nothing on top of text extraction.
+import time
+from collections import OrderedDict
+from typing import List, Literal, Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.services.file_parser_service import DocumentStructure, parse_document
+
+# Bump when the rules change; stored reports with an older version are recomputed on re-upload
+ATS_ANALYZER_VERSION = 1
+
+SEVERITY_PENALTY = {"high": 25, "medium": 10, "low": 5}
+MIN_TEXT_CHARS = 300 # Less extractable text than this is not a full resume
+MAX_FONTS = 4
+
+class ATSFinding(BaseModel):
+    code: str
+    severity: Literal["high", "medium", "low"]
+    message: str
+
+class ATSReport(BaseModel):
+    version: int = ATS_ANALYZER_VERSION
+    score: int # 0-100, higher is more ATS-friendly
+    summary: str # Served as ats_compatibility_check
+    findings: List[ATSFinding]
+    structure: DocumentStructure
+    elapsed_ms: float = 0.0
+
+def _findings(structure: DocumentStructure) -> List[ATSFinding]:
+    findings = []
+
+    def add(code: str, severity: str, message: str):
+        findings.append(ATSFinding(code=code, severity=severity, message=message))
+
+    if structure.parse_error:
+        add("unreadable", "high", "The file could not be read; an ATS will most likely reject it.")
+        return findings
+    if structure.text_chars == 0 or (structure.page_count and structure.pages_without_text == structure.page_count):
+        add("no_text_layer", "high", "No selectable text was found (scanned or image-only document); an ATS will see an empty resume.")
+        return findings
+
+    if structure.pages_without_text:
+        add("pages_without_text", "high", f"{structure.pages_without_text} of {structure.page_count} pages have no selectable text.")
+    if structure.image_heavy_pages > structure.pages_without_text:
+        add("text_in_images", "medium", "Some pages are mostly images with little text; content inside images is invisible to an ATS.")
+    if structure.unmapped_fonts:
+        add("unmapped_fonts", "high", f"Text in {', '.join(structure.unmapped_fonts)} cannot be mapped back to characters and will extract as garbage.")
+    if structure.text_box_count:
+        add("text_boxes", "high", f"{structure.text_box_count} text box(es) found; many ATS skip text boxes entirely.")
+    if structure.multi_column_pages:
+        add("multi_column", "medium", "Multi-column layout detected; an ATS may read across the columns and mix up sections.")
+    if structure.table_count:
+        severity = "high" if structure.table_text_chars > structure.text_chars else "medium"
+        add("tables", severity, f"{structure.table_count} table(s) found; table cells are often dropped or merged by an ATS.")
+    if structure.header_footer_chars:
+        add("header_footer", "low", "Text in page headers/footers (often contact details) is ignored by some ATS; keep it in the body.")
+    if structure.symbol_fonts:
+        add("symbol_fonts", "low", f"Icon or symbol fonts ({', '.join(structure.symbol_fonts)}) extract as stray characters.")
+    if structure.kind == "docx" and structure.image_count:
+        add("images", "low", f"{structure.image_count} image(s) found; any text in them is not read.")
+    if len(structure.fonts) > MAX_FONTS:
+        add("many_fonts", "low", f"{len(structure.fonts)} different fonts used; a simple, consistent font parses most reliably.")
+    if structure.text_chars < MIN_TEXT_CHARS:
+        add("little_text", "medium", f"Only {structure.text_chars} characters of text could be extracted.")
+    return findings
+
+def analyze_structure(structure: DocumentStructure) -> ATSReport:
+    started = time.perf_counter()
+    findings = _findings(structure)
+    score = max(0, 100 - sum(SEVERITY_PENALTY[finding.severity] for finding in findings))
+    if findings:
+        summary = f"ATS compatibility {score}/100. " + " ".join(finding.message for finding in findings)
+    else:
+        summary = f"ATS compatibility {score}/100. Single-column layout with a selectable text layer; no structural issues found."
+    return ATSReport(score=score, summary=summary, findings=findings, structure=structure, elapsed_ms=(time.perf_counter() - started) * 1000)
+
+# content_hash -> (text, report); identical files uploaded again (e.g. by another user) skip parsing
+_cache: "OrderedDict[str, Tuple[str, ATSReport]]" = OrderedDict()
+
+def get_cached_report(content_hash: str) -> Optional[ATSReport]:
+    entry = _cache.get(content_hash)
+    return entry[1] if entry else None
+
+def analyze_document(file_content: bytes, mime_type: str, content_hash: Optional[str] = None) -> Tuple[str, ATSReport]:
+    """Parses the file once and returns its text together with its ATS report."""
+    if content_hash and content_hash in _cache:
+        _cache.move_to_end(content_hash)
+        return _cache[content_hash]
+    started = time.perf_counter()
+    parsed = parse_document(file_content, mime_type)
+    report = analyze_structure(parsed.structure)
+    report.elapsed_ms = (time.perf_counter() - started) * 1000
+    if content_hash and settings.ATS_REPORT_CACHE_SIZE > 0:
+        _cache[content_hash] = (parsed.text, report)
+        while len(_cache) > settings.ATS_REPORT_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return parsed.text, report
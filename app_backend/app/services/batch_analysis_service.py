@@ -0,0 +1,95 @@
+import asyncio
+import time
+from typing import AsyncIterator, List, Optional
+from uuid import UUID
+from pydantic import BaseModel
+
+from app.services import metrics
+from app.services.analysis_history_service import ANALYSIS_TABLE, get_stored_result, hash_text, store_result
+from app.services.llm_governor import UpstreamUnavailableError
+from app.services.llm_service import LLMAnalysisResult, analyze_resume_with_llm
+from app.services.resume_profile import ResumeProfile
+
+class BatchAnalysisPair(BaseModel):
+    item_id: str # resume id, or the index of the job description, echoed back to the client
+    resume_text: str
+    job_description_text: str
+    resume_profile: Optional[ResumeProfile] = None # The stored profile, when the resume comes from the database
+    ats_summary: Optional[str] = None # The stored ATS report's summary, served as ats_compatibility_check as in /analyze
+    resume_id: Optional[UUID] = None # Recorded with the stored result, when the resume comes from the database
+
+class BatchAnalysisItemResult(BaseModel):
+    item_id: str
+    result: Optional[LLMAnalysisResult] = None
+    error: Optional[str] = None
+    latency_ms: float
+    from_history: bool = False # Served from the stored result of an identical earlier analysis
+
+class BatchAnalysisSummary(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    total_ms: float
+    item_p50_ms: float
+    item_p95_ms: float
+    item_max_ms: float
+
+async def _stored_analysis(user_id: str, pair: BatchAnalysisPair) -> Optional[LLMAnalysisResult]:
+    stored = await asyncio.to_thread(get_stored_result, ANALYSIS_TABLE, user_id, hash_text(pair.resume_text),
+                                     hash_text(pair.job_description_text), "full")
+    return LLMAnalysisResult(**stored) if stored is not None else None
+
+async def run_batch_analysis(pairs: List[BatchAnalysisPair], concurrency: int, shared_first: str = "resume",
+                             user_id: Optional[str] = None) -> AsyncIterator[BatchAnalysisItemResult]:
+    """Analyzes every pair with at most `concurrency` LLM calls in flight, yielding results in completion order.
+
+    With a `user_id`, pairs are served from that user's stored full-mode analyses where possible, and
+    every fresh result is stored, exactly as /resumes/analyze does.
+    If the consumer stops early (e.g. the client disconnected), the remaining calls are cancelled.
+    """
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def analyze(pair: BatchAnalysisPair) -> BatchAnalysisItemResult:
+        async with semaphore:
+            started = time.perf_counter()
+            result = await _stored_analysis(user_id, pair) if user_id else None
+            from_history, error = result is not None, None
+            if result is None:
+                try:
+                    result = await analyze_resume_with_llm(pair.resume_text, pair.job_description_text, shared_first=shared_first,
+                                                           profile=pair.resume_profile, ats_summary=pair.ats_summary)
+                    error = None if result is not None else "LLM analysis failed."
+                except UpstreamUnavailableError:
+                    result, error = None, "LLM is temporarily unavailable, please retry shortly."
+                except Exception as e:
+                    print(f"Batch analysis item {pair.item_id} failed: {e}")
+                    result, error = None, "LLM analysis failed."
+            latency_ms = (time.perf_counter() - started) * 1000
+        metrics.observe_latency("batch_analysis.item_ms", latency_ms)
+        if user_id and result is not None and not from_history:
+            await asyncio.to_thread(store_result, ANALYSIS_TABLE, user_id, pair.resume_id, pair.resume_text, pair.job_description_text,
+                                    "full", {**result.model_dump(mode="json"), "mode": "full"}, result.match_score)
+        return BatchAnalysisItemResult(item_id=pair.item_id, result=result, error=error, latency_ms=round(latency_ms, 1), from_history=from_history)
+
+    tasks = [asyncio.create_task(analyze(pair)) for pair in pairs]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+def summarize_batch(items: List[BatchAnalysisItemResult], total_ms: float) -> BatchAnalysisSummary:
+    latencies = [item.latency_ms for item in items]
+    succeeded = sum(1 for item in items if item.result is not None)
+    metrics.observe_latency("batch_analysis.total_ms", total_ms)
+    return BatchAnalysisSummary(
+        total=len(items),
+        succeeded=succeeded,
+        failed=len(items) - succeeded,
+        total_ms=round(total_ms, 1),
+        item_p50_ms=round(metrics.percentile(latencies, 50), 1),
+        item_p95_ms=round(metrics.percentile(latencies, 95), 1),
+        item_max_ms=round(max(latencies), 1) if latencies else 0.0,
+    )
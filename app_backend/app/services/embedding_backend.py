@@ -0,0 +1,179 @@
+# Where embeddings come from. vector_service batches, caches and indexes them; a backend only turns a list
+# of texts into vectors of its `dimension`, which is also the size of the resume collection:
+#   - OpenAIEmbeddingBackend: the OpenAI embeddings API, or a compatible server via OPENAI_BASE_URL.
+#     Calls go through the outbound governor (rate limits, retries, circuit breaker).
+#   - LocalEmbeddingBackend: a sentence-transformers model on the CPU (PyTorch or ONNX Runtime), loaded once
+#     per process. Batches are encoded in a worker thread, one at a time, so the event loop keeps serving.
+#     Needs the optional sentence-transformers package; no network once the model is downloaded.
+#   - HashingEmbeddingBackend: feature hashing of words and word pairs, NumPy only. Deterministic and
+#     instant, for tests and offline development. It matches words, not meaning.
+# EMBEDDING_BACKEND picks one ("openai", "local" or "hashing"); set_embedding_backend() overrides it in-process.
+import asyncio
+import hashlib
+import re
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import openai
+
+from app.core.config import settings
+from app.services.llm_governor import get_governor
+from app.services.prompt_builder import count_tokens
+
+try:
+    import sentence_transformers
+except ImportError: # Only needed for EMBEDDING_BACKEND=local
+    sentence_transformers = None
+
+Embedding = Optional[List[float]]
+
+class EmbeddingBackend:
+    name = "base"
+    model = "base" # Part of the embedding cache key, with the dimension
+
+    @property
+    def dimension(self) -> int:
+        raise NotImplementedError
+
+    async def embed(self, texts: List[str]) -> List[Embedding]:
+        """Embeddings for `texts`, in order; None for each text that could not be embedded."""
+        raise NotImplementedError
+
+# --- OpenAI ---
+
+NATIVE_OPENAI_DIMENSIONS = {"text-embedding-ada-002": 1536, "text-embedding-3-small": 1536, "text-embedding-3-large": 3072}
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    name = "openai"
+
+    def __init__(self, model: str, dimensions: int = 0):
+        self.model = model
+        self.dimensions = dimensions # 0 = the model's own; text-embedding-3 models can return shortened vectors
+
+    @property
+    def dimension(self) -> int:
+        return self.dimensions or NATIVE_OPENAI_DIMENSIONS.get(self.model, 1536)
+
+    async def embed(self, texts: List[str]) -> List[Embedding]:
+        if not settings.OPENAI_API_KEY:
+            print("OPENAI_API_KEY not set. Cannot generate embeddings.")
+            return [None] * len(texts)
+        try:
+            governor = get_governor("openai_embeddings")
+            aclient = openai.AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                base_url=settings.OPENAI_BASE_URL or None,
+                max_retries=0, # The governor retries
+                http_client=governor.http_client()
+            )
+            estimated_tokens = sum(count_tokens(text) for text in texts)
+            options = {"dimensions": self.dimensions} if self.dimensions else {}
+            response = await governor.call(lambda: aclient.embeddings.create(input=texts, model=self.model, **options), estimated_tokens=estimated_tokens)
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        except Exception as e:
+            print(f"Error generating embedding: {e}")
+            return [None] * len(texts)
+
+# --- Local model ---
+
+class LocalEmbeddingBackend(EmbeddingBackend):
+    name = "local"
+
+    def __init__(self, model: str, runtime: str = "torch", batch_size: int = 32, dimensions: int = 0):
+        if runtime not in ("torch", "onnx"):
+            raise ValueError(f"Unknown LOCAL_EMBEDDING_RUNTIME {runtime!r}; expected torch or onnx")
+        self.model = model
+        self.runtime = runtime
+        self.batch_size = batch_size
+        self.dimensions = dimensions # 0 = the model's own; Matryoshka-trained models can be truncated
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._encode_lock = threading.Lock() # The model already uses every core; concurrent batches would only thrash
+
+    def load(self):
+        """The model, loaded on first use (a download the very first time, then a few seconds from the local cache)."""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    if sentence_transformers is None:
+                        raise RuntimeError("EMBEDDING_BACKEND=local needs the sentence-transformers package "
+                                           "(pip install sentence-transformers, plus onnxruntime for the onnx runtime)")
+                    self._model = sentence_transformers.SentenceTransformer(
+                        self.model, device="cpu", backend=self.runtime, truncate_dim=self.dimensions or None)
+                    print(f"Local embedding model {self.model} loaded ({self.runtime}, {self._model.get_sentence_embedding_dimension()} dimensions).")
+        return self._model
+
+    @property
+    def dimension(self) -> int:
+        return self.load().get_sentence_embedding_dimension()
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        with self._encode_lock:
+            vectors = self.load().encode(texts, batch_size=self.batch_size, normalize_embeddings=True, convert_to_numpy=True)
+        return vectors.astype(np.float32).tolist()
+
+    async def embed(self, texts: List[str]) -> List[Embedding]:
+        try:
+            return await asyncio.to_thread(self._encode, texts)
+        except Exception as e:
+            print(f"Error generating local embedding: {e}")
+            return [None] * len(texts)
+
+# --- Hashing ---
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    name = "hashing"
+    _TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+    def __init__(self, dimension: int = 1024):
+        self._dimension = dimension
+        self.model = f"hashing-{dimension}"
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def vector(self, text: str) -> List[float]:
+        words = self._TOKEN_RE.findall(text.lower())
+        features = words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+        vector = np.zeros(self._dimension, dtype=np.float32)
+        for feature in features:
+            digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            # A hash-chosen sign keeps colliding features from adding up into false similarity
+            vector[(digest >> 1) % self._dimension] += 1.0 if digest & 1 else -1.0
+        norm = float(np.linalg.norm(vector))
+        if not norm:
+            vector[0], norm = 1.0, 1.0 # No words: still a valid cosine vector
+        return (vector / norm).tolist()
+
+    async def embed(self, texts: List[str]) -> List[Embedding]:
+        return [self.vector(text) for text in texts]
+
+# --- Selection ---
+
+_backend_override: Optional[EmbeddingBackend] = None
+_backends: Dict[str, EmbeddingBackend] = {}
+
+def _build_backend(name: str) -> EmbeddingBackend:
+    if name == "openai":
+        return OpenAIEmbeddingBackend(settings.EMBEDDING_MODEL, settings.EMBEDDING_DIMENSIONS)
+    if name == "local":
+        return LocalEmbeddingBackend(settings.LOCAL_EMBEDDING_MODEL, settings.LOCAL_EMBEDDING_RUNTIME,
+                                     settings.LOCAL_EMBEDDING_BATCH_SIZE, settings.EMBEDDING_DIMENSIONS)
+    if name == "hashing":
+        return HashingEmbeddingBackend(settings.EMBEDDING_DIMENSIONS or 1024)
+    raise ValueError(f"Unknown EMBEDDING_BACKEND {name!r}; expected openai, local or hashing")
+
+def get_embedding_backend() -> EmbeddingBackend:
+    if _backend_override is not None:
+        return _backend_override
+    name = settings.EMBEDDING_BACKEND
+    if name not in _backends:
+        _backends[name] = _build_backend(name)
+    return _backends[name]
+
+def set_embedding_backend(backend: Optional[EmbeddingBackend]) -> None:
+    """Use `backend` for every embedding in this process; None goes back to EMBEDDING_BACKEND."""
+    global _backend_override
+    _backend_override = backend
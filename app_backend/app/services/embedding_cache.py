@@ -0,0 +1,173 @@
+# Embeddings already computed, keyed by (sha256 of the normalized text, model, dimension).
+#
+# Duplicate uploads, re-uploads, bulk imports and reindexing send the same texts again and again.
+# get_text_embedding looks here first. There are two tiers. A bounded in-memory LRU per worker holds
+# float32 arrays. A SQLite file (EMBEDDING_CACHE_PATH) holds the vectors as float32 blobs, about 6 KB per
+# 1536-d vector. It runs in WAL mode, so every uvicorn worker on the host shares it: readers never block,
+# and writers wait for each other briefly. A disk tier that can't be opened or written is logged and
+# skipped; the cache never fails an embedding. Async callers use get_many/put_many: the memory tier is
+# looked up inline, the disk tier (opening the file, reads and writes) runs in a worker thread so a busy
+# database never stalls the event loop.
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services import metrics
+from app.services.prompt_builder import normalize_whitespace
+
+class CacheKey(NamedTuple):
+    text_hash: str
+    model: str
+    dimension: int
+
+def normalize_text(text: str) -> str:
+    """What gets embedded and hashed: texts differing only in spacing or repeated lines share an entry."""
+    return normalize_whitespace(text or "")
+
+def cache_key(normalized_text: str, model: str, dimension: int) -> CacheKey:
+    return CacheKey(hashlib.sha256(normalized_text.encode("utf-8")).hexdigest(), model, dimension)
+
+_lock = threading.Lock() # The memory tier; only ever held for a dict operation
+_db_lock = threading.Lock() # The connection; held for disk I/O, so taken in worker threads by the async API
+_memory: "OrderedDict[CacheKey, np.ndarray]" = OrderedDict() # Most recently used last
+_connection: Optional[sqlite3.Connection] = None
+_connection_path: Optional[str] = None
+_failed_path: Optional[str] = None # Not retried on every call once it failed to open
+
+def _db() -> Optional[sqlite3.Connection]:
+    global _connection, _connection_path, _failed_path
+    path = settings.EMBEDDING_CACHE_PATH
+    if not path or path == _failed_path:
+        return None
+    if _connection is not None and _connection_path == path:
+        return _connection
+    try:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        connection = sqlite3.connect(path, timeout=1, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL") # Losing the last writes on power loss only costs re-embedding them
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (text_hash TEXT NOT NULL, model TEXT NOT NULL, dimension INTEGER NOT NULL, "
+            "vector BLOB NOT NULL, PRIMARY KEY (text_hash, model, dimension)) WITHOUT ROWID"
+        )
+    except Exception as e:
+        print(f"Embedding cache at {path} unavailable, using memory only: {e}")
+        _failed_path = path
+        return None
+    if _connection is not None:
+        _connection.close()
+    _connection, _connection_path = connection, path
+    return _connection
+
+def _remember(key: CacheKey, vector: np.ndarray) -> None:
+    if settings.EMBEDDING_CACHE_SIZE > 0:
+        _memory[key] = vector
+        _memory.move_to_end(key)
+        while len(_memory) > settings.EMBEDDING_CACHE_SIZE:
+            _memory.popitem(last=False)
+
+def _memory_get(key: CacheKey) -> Optional[List[float]]:
+    with _lock:
+        vector = _memory.get(key)
+        if vector is None:
+            return None
+        _memory.move_to_end(key)
+    metrics.increment("embedding_cache.memory_hits")
+    return vector.tolist()
+
+def _read_disk(keys: Sequence[CacheKey]) -> List[Optional[np.ndarray]]:
+    with _db_lock:
+        connection = _db()
+        if connection is None:
+            return [None] * len(keys)
+        vectors = []
+        for key in keys:
+            try:
+                row = connection.execute("SELECT vector FROM embeddings WHERE text_hash = ? AND model = ? AND dimension = ?", key).fetchone()
+            except Exception as e:
+                print(f"Embedding cache read failed: {e}")
+                row = None
+            vectors.append(np.frombuffer(row[0], dtype=np.float32) if row is not None else None)
+        return vectors
+
+def _write_disk(items: Sequence[Tuple[CacheKey, np.ndarray]]) -> None:
+    with _db_lock:
+        connection = _db()
+        if connection is None:
+            return
+        try:
+            connection.executemany("INSERT OR REPLACE INTO embeddings (text_hash, model, dimension, vector) VALUES (?, ?, ?, ?)",
+                                   [(*key, vector.tobytes()) for key, vector in items])
+        except Exception as e:
+            print(f"Embedding cache write failed: {e}") # Another worker holding the lock too long; memory still has it
+
+def _from_disk(keys: Sequence[CacheKey], vectors: List[Optional[np.ndarray]]) -> List[Optional[List[float]]]:
+    found = []
+    for key, vector in zip(keys, vectors):
+        if vector is None:
+            metrics.increment("embedding_cache.misses")
+            found.append(None)
+            continue
+        with _lock:
+            _remember(key, vector)
+        metrics.increment("embedding_cache.disk_hits")
+        found.append(vector.tolist())
+    return found
+
+def _store(items: Sequence[Tuple[CacheKey, List[float]]]) -> List[Tuple[CacheKey, np.ndarray]]:
+    vectors = [(key, np.asarray(embedding, dtype=np.float32)) for key, embedding in items]
+    with _lock:
+        for key, vector in vectors:
+            _remember(key, vector)
+    return vectors
+
+def get(key: CacheKey) -> Optional[List[float]]:
+    """Blocking lookup in both tiers, for scripts and worker threads; async code uses get_many."""
+    embedding = _memory_get(key)
+    if embedding is not None:
+        return embedding
+    return _from_disk([key], _read_disk([key]))[0]
+
+def put(key: CacheKey, embedding: List[float]) -> None:
+    """Blocking write to both tiers, for scripts and worker threads; async code uses put_many."""
+    _write_disk(_store([(key, embedding)]))
+
+async def get_many(keys: Sequence[CacheKey]) -> List[Optional[List[float]]]:
+    """The cached embedding for each key, or None. Memory hits are answered inline; the rest are read from
+    the disk tier in one worker thread."""
+    embeddings = [_memory_get(key) for key in keys]
+    missing = [index for index, embedding in enumerate(embeddings) if embedding is None]
+    if missing:
+        missing_keys = [keys[index] for index in missing]
+        vectors = await asyncio.to_thread(_read_disk, missing_keys) if settings.EMBEDDING_CACHE_PATH else [None] * len(missing)
+        for index, embedding in zip(missing, _from_disk(missing_keys, vectors)):
+            embeddings[index] = embedding
+    return embeddings
+
+async def put_many(items: Sequence[Tuple[CacheKey, List[float]]]) -> None:
+    """Caches each (key, embedding): in memory right away, on disk from a worker thread."""
+    vectors = _store(items)
+    if vectors and settings.EMBEDDING_CACHE_PATH:
+        await asyncio.to_thread(_write_disk, vectors)
+
+def clear_memory() -> None:
+    with _lock:
+        _memory.clear()
+
+def close() -> None:
+    """Clears the memory tier and closes the disk tier (the file and its entries stay)."""
+    global _connection, _connection_path, _failed_path
+    with _lock:
+        _memory.clear()
+    with _db_lock:
+        if _connection is not None:
+            _connection.close()
+        _connection, _connection_path, _failed_path = None, None, None
@@ -2,28 +2,192 @@ import PyPDF2
 import docx
 import io
 import hashlib
+import re
+from collections import Counter, defaultdict
+from typing import Callable, List, Optional, Tuple
+from pydantic import BaseModel, Field
 
-def parse_pdf(file_content: bytes) -> str:
-    text = ""
+# Layout facts gathered while extracting text; ats_analyzer turns them into findings
+class DocumentStructure(BaseModel):
+    kind: str # "pdf" or "docx"
+    page_count: Optional[int] = None # Not knowable for DOCX without rendering
+    text_chars: int = 0
+    pages_without_text: int = 0 # PDF pages with (almost) no extractable text
+    image_heavy_pages: int = 0 # PDF pages with images and little text, i.e. text that probably lives in the image
+    image_count: int = 0
+    multi_column_pages: int = 0
+    table_count: int = 0
+    table_text_chars: int = 0
+    header_footer_chars: int = 0 # DOCX header/footer text, or PDF lines repeated at the top/bottom of pages
+    text_box_count: int = 0
+    fonts: List[str] = Field(default_factory=list)
+    symbol_fonts: List[str] = Field(default_factory=list) # Icon/symbol fonts, whose glyphs extract as junk
+    unmapped_fonts: List[str] = Field(default_factory=list) # Fonts whose text can't be mapped back to Unicode
+    parse_error: Optional[str] = None
+
+class ParsedDocument(BaseModel):
+    text: str
+    structure: DocumentStructure
+
+MIN_PAGE_TEXT_CHARS = 40 # Less than this on a page: no usable text layer there
+IMAGE_HEAVY_PAGE_TEXT_CHARS = 400
+_SYMBOL_FONT_RE = re.compile(r"symbol|dingbat|wingding|webding|fontawesome|awesome|icon|glyph|emoji", re.IGNORECASE)
+_STANDARD_ENCODINGS = {"/WinAnsiEncoding", "/MacRomanEncoding", "/StandardEncoding", "/PDFDocEncoding"}
+_DIGITS_RE = re.compile(r"\d+")
+
+def _font_name(font) -> str:
+    name = str(font.get("/BaseFont", "unknown")).lstrip("/")
+    return name.split("+", 1)[-1] # Drop the subset prefix ("ABCDEF+Calibri")
+
+def _is_multi_column(runs, page_width: float) -> bool:
+    """True if the page's text runs leave an empty vertical gutter in the middle with text on both sides."""
+    lines = defaultdict(list) # Baseline y -> [(x_start, x_end)]
+    for x, y, text, size in runs:
+        lines[round(y / 2)].append((x, x + len(text) * size * 0.5)) # Half an em per character is close enough
+    if len(lines) < 8:
+        return False
+    buckets = 40
+    covered = [0] * buckets
+    left = right = 0
+    for segments in lines.values():
+        touched = set()
+        for start, end in segments:
+            first = max(int(start / page_width * buckets), 0)
+            last = min(int(end / page_width * buckets), buckets - 1)
+            touched.update(range(first, last + 1))
+        for bucket in touched:
+            covered[bucket] += 1
+        left += any(start < page_width * 0.35 for start, _ in segments)
+        right += any(start >= page_width * 0.45 for start, _ in segments)
+    # The gutter has to sit in the middle 30-70% of the page and be crossed by almost no line
+    middle = range(int(buckets * 0.3), int(buckets * 0.7))
+    gutter = min(covered[bucket] for bucket in middle)
+    return gutter <= len(lines) * 0.05 and left >= len(lines) * 0.3 and right >= len(lines) * 0.3
+
+def _pdf_page_texts(pdf_reader: PyPDF2.PdfReader) -> Tuple[List[str], List[list]]:
+    """Each page's text, and its text runs (x, y, text, font size) for the layout probes."""
+    page_texts, page_runs = [], []
+    for page in pdf_reader.pages:
+        runs = []
+
+        def visit(run_text, cm, tm, font_dict, font_size):
+            if not run_text.strip():
+                return
+            try:
+                x = tm[4] * cm[0] + tm[5] * cm[2] + cm[4]
+                y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+                size = font_size * abs(tm[0] * cm[0]) or font_size
+            except (TypeError, ValueError, IndexError):
+                return # Position unknown: only the layout probes miss this run, the text keeps it
+            runs.append((x, y, run_text.strip(), size))
+
+        page_texts.append(page.extract_text(visitor_text=visit) or "")
+        page_runs.append(runs)
+    return page_texts, page_runs
+
+def _probe_pdf_layout(pdf_reader: PyPDF2.PdfReader, page_texts: List[str], page_runs: List[list], structure: DocumentStructure) -> None:
+    fonts, symbol_fonts, unmapped_fonts = set(), set(), set()
+    edge_lines = Counter() # Text near the top/bottom edge, digits stripped, counted once per page
+    for page, page_text, runs in zip(pdf_reader.pages, page_texts, page_runs):
+        resources = page.get("/Resources") or {}
+        resources = resources.get_object() if hasattr(resources, "get_object") else resources
+        xobjects = resources.get("/XObject") or {}
+        images = sum(1 for ref in xobjects.values() if ref.get_object().get("/Subtype") == "/Image")
+        structure.image_count += images
+        for ref in (resources.get("/Font") or {}).values():
+            font = ref.get_object()
+            name = _font_name(font)
+            fonts.add(name)
+            if _SYMBOL_FONT_RE.search(name) or font.get("/Subtype") == "/Type3":
+                symbol_fonts.add(name)
+            elif "/ToUnicode" not in font and str(font.get("/Encoding", "")) not in _STANDARD_ENCODINGS and font.get("/Subtype") == "/Type0":
+                unmapped_fonts.add(name) # Composite font without a Unicode map: extracts as garbage or nothing
+        if images and len(page_text.strip()) < IMAGE_HEAVY_PAGE_TEXT_CHARS:
+            structure.image_heavy_pages += 1
+
+        page_width = float(page.mediabox.width)
+        page_height = float(page.mediabox.height)
+        if _is_multi_column(runs, page_width):
+            structure.multi_column_pages += 1
+        page_edges = {_DIGITS_RE.sub("#", run[2]) for run in runs if run[1] > page_height * 0.93 or run[1] < page_height * 0.07}
+        edge_lines.update(page_edges)
+
+    if structure.page_count > 1:
+        structure.header_footer_chars = sum(len(line) * count for line, count in edge_lines.items() if count > 1)
+    structure.fonts = sorted(fonts)
+    structure.symbol_fonts = sorted(symbol_fonts)
+    structure.unmapped_fonts = sorted(unmapped_fonts)
+
+def _parse_pdf(file_content: bytes, structure: DocumentStructure) -> str:
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+    page_texts, page_runs = _pdf_page_texts(pdf_reader)
+    structure.page_count = len(page_texts)
+    page_chars = [len(page_text.strip()) for page_text in page_texts]
+    structure.text_chars = sum(page_chars)
+    structure.pages_without_text = sum(1 for chars in page_chars if chars < MIN_PAGE_TEXT_CHARS)
+    _probe_layout(structure, _probe_pdf_layout, pdf_reader, page_texts, page_runs)
+    return "".join(page_texts)
+
+def _probe_docx_layout(doc, structure: DocumentStructure) -> None:
+    qn = docx.oxml.ns.qn
+    fonts = {run.font.name for para in doc.paragraphs for run in para.runs if run.font.name}
+    structure.table_count = len(doc.tables)
+    structure.table_text_chars = sum(len(cell.text) for table in doc.tables for row in table.rows for cell in row.cells)
+    for section in doc.sections:
+        for part in (section.header, section.footer):
+            if not part.is_linked_to_previous:
+                structure.header_footer_chars += sum(len(para.text.strip()) for para in part.paragraphs)
+
+    body = doc.element.body
+    for cols in body.findall(".//" + qn("w:sectPr") + "/" + qn("w:cols")): # One sectPr per section
+        columns = cols.get(qn("w:num")) or ""
+        if columns.isdigit() and int(columns) > 1:
+            structure.multi_column_pages += 1 # Per section; DOCX has no fixed pages
+    structure.text_box_count = len(body.findall(".//" + qn("w:txbxContent")))
+    structure.image_count = len(body.findall(".//" + qn("pic:pic")))
     try:
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-        for page_num in range(len(pdf_reader.pages)):
-            page = pdf_reader.pages[page_num]
-            text += page.extract_text() or ""
-    except Exception as e:
-        print(f"Error parsing PDF: {e}")
-        # Depending on strictness, could raise an error here
+        normal_font = doc.styles["Normal"].font.name # Other template styles are usually unused
+    except KeyError: # A template without a Normal style
+        normal_font = None
+    if normal_font:
+        fonts.add(normal_font)
+    structure.fonts = sorted(fonts)
+    structure.symbol_fonts = sorted(font for font in fonts if _SYMBOL_FONT_RE.search(font))
+
+def _parse_docx(file_content: bytes, structure: DocumentStructure) -> str:
+    doc = docx.Document(io.BytesIO(file_content))
+    text = "".join(para.text + "\n" for para in doc.paragraphs)
+    structure.text_chars = len(text.strip())
+    _probe_layout(structure, _probe_docx_layout, doc)
     return text
 
-def parse_docx(file_content: bytes) -> str:
+def _probe_layout(structure: DocumentStructure, probe: Callable[..., None], *args) -> None:
+    """Runs a layout probe over an already extracted document. A failing probe is recorded as the
+    parse error, but the text extracted before it is kept."""
+    try:
+        probe(*args, structure)
+    except Exception as e:
+        print(f"Error reading the {structure.kind.upper()} layout: {e}")
+        structure.parse_error = str(e)
+
+def parse_document(file_content: bytes, mime_type: str) -> ParsedDocument:
+    """Extracts the text and, in the same pass, the layout facts the ATS analyzer needs. A file whose text
+    can't be extracted gives "" and a parse error; one whose layout can't be probed keeps its text."""
+    kind = "pdf" if mime_type == "application/pdf" else "docx"
+    structure = DocumentStructure(kind=kind)
     text = ""
     try:
-        doc = docx.Document(io.BytesIO(file_content))
-        for para in doc.paragraphs:
-            text += para.text + "\n"
+        text = _parse_pdf(file_content, structure) if kind == "pdf" else _parse_docx(file_content, structure)
     except Exception as e:
-        print(f"Error parsing DOCX: {e}")
-    return text
+        print(f"Error parsing {kind.upper()}: {e}")
+        structure.parse_error = str(e)
+    return ParsedDocument(text=text, structure=structure)
+
+def parse_pdf(file_content: bytes) -> str:
+    return parse_document(file_content, "application/pdf").text
+
+def parse_docx(file_content: bytes) -> str:
+    return parse_document(file_content, "application/vnd.openxmlformats-officedocument.wordprocessingml.document").text
 
 def calculate_sha256_hash(file_content: bytes) -> str:
     sha256_hash = hashlib.sha256()
@@ -0,0 +1,186 @@
+# Normalized, parsed job descriptions, stored once per content hash and shared by every request.
+#
+# The same posting gets pasted again and again, by one user and by many, often straight from a job board
+# with its HTML, "Apply now" buttons and equal-opportunity footer. get_job_description() normalizes the
+# text (HTML to text, boilerplate and benefits dropped, repeated lines removed), hashes the result and
+# parses it once: title, requirements, responsibilities and skills. The parse is kept in memory and in
+# the job_descriptions table, and the normalized text is what the prompts, the local scorer and the
+# stored results see, so every copy of a posting costs the same tokens and hits the same cache entries.
+# A job application can point at its posting (job_applications.jd_hash), so later requests can name the
+# application instead of pasting the text again.
+import datetime
+import html
+import re
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+from app.services import metrics
+from app.services.analysis_history_service import hash_text
+from app.services.prompt_builder import count_tokens, normalize_whitespace, split_sections, strip_boilerplate
+from app.services.skill_taxonomy import skill_names
+from app.services.supabase_client import supabase_client
+
+# Bump when normalization or parsing changes; stored rows with an older version are parsed again
+JOB_DESCRIPTION_VERSION = 1
+JOB_DESCRIPTIONS_TABLE = "job_descriptions"
+
+# Sections that never help the analysis or the interview questions
+DROPPED_SECTIONS = ("benefits",)
+MAX_ITEMS = 30
+MAX_TITLE_CHARS = 120
+
+_HTML_TAG_RE = re.compile(r"<\s*/?\s*[a-zA-Z][^>]*>")
+_HTML_DROP_RE = re.compile(r"<\s*(script|style|head)\b.*?<\s*/\s*\1\s*>", re.IGNORECASE | re.DOTALL)
+_HTML_BREAK_RE = re.compile(r"<\s*(br|/p|/div|/h[1-6]|/tr|/ul|/ol)\b[^>]*>|<\s*(p|div|h[1-6]|tr|ul|ol)\b[^>]*>", re.IGNORECASE)
+_HTML_ITEM_RE = re.compile(r"<\s*li\b[^>]*>", re.IGNORECASE)
+_BULLET_RE = re.compile(r"^\s*(?:[-*•▪◦‣●]|\d+[.)])\s*")
+
+class ParsedJobDescription(BaseModel):
+    version: int = JOB_DESCRIPTION_VERSION
+    jd_hash: str
+    text: str # Normalized; what prompts and scoring use
+    title: Optional[str] = None
+    requirements: List[str] = Field(default_factory=list)
+    responsibilities: List[str] = Field(default_factory=list)
+    skills: List[str] = Field(default_factory=list) # Canonical taxonomy names, in order of first mention
+    source_tokens: int = 0 # Of the text as pasted
+    tokens: int = 0
+
+def _html_to_text(text: str) -> str:
+    if _HTML_TAG_RE.search(text):
+        text = _HTML_DROP_RE.sub("", text)
+        text = _HTML_ITEM_RE.sub("\n- ", text)
+        text = _HTML_BREAK_RE.sub("\n", text)
+        text = _HTML_TAG_RE.sub("", text)
+    return html.unescape(text).replace(" ", " ")
+
+def _dedupe_lines(text: str) -> str:
+    # Job boards repeat the title, the location line and whole paragraphs; keep the first of each
+    seen = set()
+    kept = []
+    for line in text.splitlines():
+        key = _BULLET_RE.sub("", line).strip().lower()
+        if key and key in seen:
+            continue
+        seen.add(key)
+        kept.append(line)
+    return "\n".join(kept)
+
+def normalize_job_description(text: str) -> str:
+    text = normalize_whitespace(strip_boilerplate(_html_to_text(text or "")))
+    sections = [body for name, body in split_sections(text) if name not in DROPPED_SECTIONS]
+    return normalize_whitespace(_dedupe_lines("\n\n".join(sections)))
+
+def _items(body: str) -> List[str]:
+    # Section bodies start with their heading line
+    return [_BULLET_RE.sub("", line).strip() for line in body.splitlines()[1:] if line.strip()]
+
+def parse_job_description(text: str) -> ParsedJobDescription:
+    normalized = normalize_job_description(text)
+    title, requirements, responsibilities = None, [], []
+    for name, body in split_sections(normalized):
+        if name == "header":
+            first_line = body.strip().splitlines()[0] if body.strip() else ""
+            title = first_line[:MAX_TITLE_CHARS] or None
+        elif name == "skills": # Requirements, qualifications, must/nice to have
+            requirements += _items(body)
+        elif name == "experience": # Responsibilities, what you'll do
+            responsibilities += _items(body)
+    return ParsedJobDescription(
+        jd_hash=hash_text(normalized),
+        text=normalized,
+        title=title,
+        requirements=requirements[:MAX_ITEMS],
+        responsibilities=responsibilities[:MAX_ITEMS],
+        skills=skill_names(normalized),
+        source_tokens=count_tokens(text or ""),
+        tokens=count_tokens(normalized),
+    )
+
+# jd_hash -> parse, most recently used last
+_cache: "OrderedDict[str, ParsedJobDescription]" = OrderedDict()
+
+def _remember(parsed: ParsedJobDescription) -> ParsedJobDescription:
+    if settings.JD_CACHE_SIZE > 0:
+        _cache[parsed.jd_hash] = parsed
+        _cache.move_to_end(parsed.jd_hash)
+        while len(_cache) > settings.JD_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return parsed
+
+def clear_cache() -> None:
+    _cache.clear()
+
+def _load_stored(jd_hash: str) -> Optional[ParsedJobDescription]:
+    if supabase_client is None:
+        return None
+    try:
+        response = supabase_client.table(JOB_DESCRIPTIONS_TABLE).select("parsed").eq("jd_hash", jd_hash).maybe_single().execute()
+        if response and response.data and (response.data.get("parsed") or {}).get("version") == JOB_DESCRIPTION_VERSION:
+            return ParsedJobDescription.model_validate(response.data["parsed"])
+    except Exception as e:
+        print(f"Could not read stored job description {jd_hash[:12]}: {e}") # Parse it again instead
+    return None
+
+def _store(parsed: ParsedJobDescription) -> None:
+    if supabase_client is None:
+        return
+    row = {
+        "jd_hash": parsed.jd_hash,
+        "version": parsed.version,
+        "title": parsed.title,
+        "parsed": parsed.model_dump(mode="json"),
+        "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+    try:
+        supabase_client.table(JOB_DESCRIPTIONS_TABLE).upsert(row, on_conflict="jd_hash").execute()
+    except Exception as e:
+        print(f"Could not store job description {parsed.jd_hash[:12]}: {e}")
+
+def get_job_description(text: str) -> ParsedJobDescription:
+    """The normalized, parsed job description: from memory, else from the job_descriptions table, else
+    parsed now and stored. Counted in jd_cache.memory_hits / .store_hits / .parsed."""
+    started = time.perf_counter()
+    normalized = normalize_job_description(text)
+    jd_hash = hash_text(normalized)
+    parsed = _cache.get(jd_hash)
+    if parsed is not None:
+        _cache.move_to_end(jd_hash)
+        metrics.increment("jd_cache.memory_hits")
+        return parsed
+    parsed = _load_stored(jd_hash)
+    if parsed is not None:
+        metrics.increment("jd_cache.store_hits")
+    else:
+        parsed = parse_job_description(text)
+        _store(parsed)
+        metrics.increment("jd_cache.parsed")
+        metrics.observe_latency("jd_cache.parse_ms", (time.perf_counter() - started) * 1000)
+    return _remember(parsed)
+
+def get_job_description_by_hash(jd_hash: str) -> Optional[ParsedJobDescription]:
+    parsed = _cache.get(jd_hash)
+    if parsed is not None:
+        metrics.increment("jd_cache.memory_hits")
+        return parsed
+    parsed = _load_stored(jd_hash)
+    if parsed is not None:
+        metrics.increment("jd_cache.store_hits")
+        _remember(parsed)
+    return parsed
+
+def get_application_jd_hash(job_application_id: str, user_id: str) -> Optional[str]:
+    """The job description linked to the user's job application; raises LookupError if there is no such application."""
+    response = supabase_client.table("job_applications").select("id, jd_hash").eq("id", job_application_id).eq("user_id", user_id).maybe_single().execute()
+    if not response or not response.data:
+        raise LookupError(f"Job application {job_application_id} not found")
+    return response.data.get("jd_hash")
+
+def link_job_application(job_application_id: str, user_id: str, jd_hash: str) -> None:
+    """Points the user's job application at a stored job description; raises LookupError if there is no such application."""
+    if get_application_jd_hash(job_application_id, user_id) != jd_hash:
+        supabase_client.table("job_applications").update({"jd_hash": jd_hash}).eq("id", job_application_id).eq("user_id", user_id).execute()
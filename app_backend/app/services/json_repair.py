@@ -0,0 +1,260 @@
+# Salvages almost-right JSON from LLM responses, so a paid call isn't thrown away (and paid for again when
+# the user retries) over a code fence, a trailing remark, a trailing comma, a truncated tail or a score of 105.
+#   - parse_json_lenient(): text -> JSON object, plus the names of the repairs that were needed
+#   - repair_fields(): coerces the fields of a parsed object towards a schema (types, ranges, key spelling)
+#     and reports the required fields that are still missing, so the caller can ask for just those
+import ast
+import json
+import math
+import re
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+class JSONRepairError(ValueError):
+    """The response holds no recoverable JSON object."""
+
+class MissingFieldsError(ValueError):
+    """Required fields are absent or unusable. `partial` holds the fields that could be repaired."""
+
+    def __init__(self, fields: List[str], partial: Dict[str, Any]):
+        super().__init__(f"Missing or unusable fields: {', '.join(fields)}")
+        self.fields = fields
+        self.partial = partial
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.DOTALL)
+_LITERALS = ((re.compile(r"\bTrue\b"), "true"), (re.compile(r"\bFalse\b"), "false"), (re.compile(r"\bNone\b"), "null"))
+_TRAILING_COMMA_RE = re.compile(r",(\s*[}\]])")
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"'})
+_CLOSERS = {"{": "}", "[": "]"}
+
+def _scan(text: str, start: int) -> Tuple[Optional[int], List[str], bool]:
+    """From the opening brace at `start`: the index just past its matching close (None if the text ends
+    first), the brackets still open at that point, and whether it ends inside a string."""
+    stack: List[str] = []
+    in_string = escaped = False
+    for pos in range(start, len(text)):
+        char = text[pos]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append(char)
+        elif char in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                return pos + 1, [], False
+    return None, stack, in_string
+
+def _split_strings(text: str) -> List[Tuple[bool, str]]:
+    """(is_string, span) pieces, so fixes can be applied outside string literals only."""
+    spans, current, in_string, escaped = [], [], False, False
+    for char in text:
+        if in_string:
+            current.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                spans.append((True, "".join(current)))
+                current, in_string = [], False
+        elif char == '"':
+            if current:
+                spans.append((False, "".join(current)))
+            current, in_string = [char], True
+        else:
+            current.append(char)
+    if current:
+        spans.append((in_string, "".join(current)))
+    return spans
+
+def _fix_tokens(text: str, repairs: List[str]) -> str:
+    pieces = []
+    for is_string, span in _split_strings(text):
+        if not is_string:
+            fixed = span
+            for pattern, replacement in _LITERALS:
+                fixed = pattern.sub(replacement, fixed)
+            if fixed != span and "python_literals" not in repairs:
+                repairs.append("python_literals")
+            without_commas = _TRAILING_COMMA_RE.sub(r"\1", fixed)
+            if without_commas != fixed and "trailing_commas" not in repairs:
+                repairs.append("trailing_commas")
+            span = without_commas
+        pieces.append(span)
+    return "".join(pieces)
+
+def _close_truncated(text: str, stack: List[str], in_string: bool) -> str:
+    """Ends a document cut off mid-way: closes the open string, drops a dangling key or comma, then
+    closes the open brackets."""
+    if in_string:
+        text += '"'
+    while True:
+        text = text.rstrip()
+        if text.endswith(","):
+            text = text[:-1]
+            continue
+        dangling_key = re.search(r'[{,]\s*"(?:[^"\\]|\\.)*"\s*:?$', text) if stack and stack[-1] == "{" else None
+        if dangling_key is not None:
+            text = text[:dangling_key.start() + 1] # Keep the "{" or ","; a kept comma is dropped next round
+            continue
+        if text.endswith(":"):
+            text = text[:-1]
+            continue
+        break
+    return text + "".join(_CLOSERS[bracket] for bracket in reversed(stack))
+
+def _loads(text: str) -> Any:
+    return json.loads(text, strict=False) # strict=False: raw newlines inside strings are common and harmless
+
+def parse_json_lenient(text: str) -> Tuple[Any, List[str]]:
+    """Parses an LLM response that should be a JSON object. Returns the value and the repairs applied
+    (empty for valid JSON). Raises JSONRepairError if nothing usable can be recovered."""
+    text = (text or "").strip()
+    try:
+        return _loads(text), []
+    except json.JSONDecodeError:
+        pass
+
+    repairs: List[str] = []
+    fence = _FENCE_RE.search(text)
+    if fence:
+        text = fence.group(1).strip()
+        repairs.append("code_fence")
+    text = text.translate(_SMART_QUOTES)
+    start = text.find("{")
+    if start < 0:
+        raise JSONRepairError("No JSON object in response")
+    if text[:start].strip():
+        repairs.append("leading_text")
+
+    end, stack, in_string = _scan(text, start)
+    if end is not None:
+        if text[end:].strip():
+            repairs.append("trailing_content")
+        candidate = text[start:end]
+    else:
+        candidate = text[start:]
+    try:
+        return _loads(candidate), repairs
+    except json.JSONDecodeError:
+        pass
+
+    fixed = _fix_tokens(candidate, repairs)
+    if end is None:
+        _, stack, in_string = _scan(fixed, 0)
+        fixed = _close_truncated(fixed, stack, in_string)
+        repairs.append("truncated")
+    try:
+        return _loads(fixed), repairs
+    except json.JSONDecodeError:
+        pass
+    try:
+        value = ast.literal_eval(candidate) # Python dict syntax: single quotes and the like
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        value = None
+    if isinstance(value, dict):
+        repairs.append("python_literal")
+        return value, repairs
+    raise JSONRepairError("Response is not recoverable JSON")
+
+# --- Field coercion ---
+
+class FieldRule(NamedTuple):
+    coerce: Callable[[Any], Any] # Raises ValueError/TypeError when the value is unusable
+    required: bool = True
+
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+_BULLET_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s*")
+
+def coerce_score(value: Any) -> int:
+    """0-100 from 85, 85.4, 0.85, "85", "0.85", "85%", "8.5/10" or "85/100"; out-of-range values are clamped.
+    Infinity and NaN (which json.loads accepts) are rejected."""
+    if isinstance(value, bool) or value is None:
+        raise TypeError(f"Not a score: {value!r}")
+    if isinstance(value, str):
+        numbers = _NUMBER_RE.findall(value)
+        if not numbers:
+            raise ValueError(f"Not a score: {value!r}")
+        number = float(numbers[0])
+        if "/" in value and len(numbers) > 1 and float(numbers[1]) > 0:
+            number = number / float(numbers[1]) * 100
+        elif "%" not in value and 0 < number < 1: # A fraction, as for numbers
+            number *= 100
+    elif isinstance(value, (int, float)):
+        number = float(value)
+        if 0 < number < 1: # A fraction
+            number *= 100
+    else:
+        raise TypeError(f"Not a score: {value!r}")
+    if not math.isfinite(number):
+        raise ValueError(f"Not a score: {value!r}")
+    return int(min(100, max(0, round(number))))
+
+def coerce_text(value: Any) -> str:
+    if value is None or isinstance(value, dict):
+        raise TypeError(f"Not text: {value!r}")
+    if isinstance(value, list):
+        return " ".join(coerce_text(item) for item in value if item is not None).strip()
+    return str(value).strip()
+
+def coerce_text_list(value: Any, split_commas: bool = False) -> List[str]:
+    """A list of strings from a list, or from one string with one item per line (bullets stripped),
+    per semicolon, or per comma if `split_commas`."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        items = value.splitlines() if "\n" in value.strip() else re.split(r"[;,]" if split_commas else ";", value)
+        value = [_BULLET_RE.sub("", item) for item in items]
+    if not isinstance(value, list):
+        value = [value]
+    items = []
+    for item in value:
+        try:
+            text = coerce_text(item)
+        except TypeError:
+            continue
+        if text:
+            items.append(text)
+    return items
+
+def normalize_key(key: str) -> str:
+    """"matchScore", "Match Score" and "match-score" all become "match_score"."""
+    key = re.sub(r"(?<=[a-z0-9])(?=[A-Z])", "_", str(key).strip())
+    return re.sub(r"[\s\-]+", "_", key).lower()
+
+def repair_fields(data: Any, rules: Dict[str, FieldRule]) -> Tuple[Dict[str, Any], List[str]]:
+    """Coerces `data` to the fields in `rules` (unknown keys are dropped). Returns the fields and the
+    names of those whose value had to change. Raises MissingFieldsError for required fields that are
+    absent or can't be coerced."""
+    if not isinstance(data, dict):
+        raise JSONRepairError(f"Expected a JSON object, got {type(data).__name__}")
+    normalized = {normalize_key(key): value for key, value in data.items()}
+    fields: Dict[str, Any] = {}
+    changed, missing = [], []
+    for name, rule in rules.items():
+        if name not in normalized:
+            if rule.required:
+                missing.append(name)
+            continue
+        raw = normalized[name]
+        try:
+            value = rule.coerce(raw)
+        except (TypeError, ValueError):
+            if rule.required:
+                missing.append(name)
+            continue
+        fields[name] = value
+        if value != raw:
+            changed.append(name)
+    if any(key not in data for key in fields):
+        changed.append("key_names")
+    if missing:
+        raise MissingFieldsError(missing, fields)
+    return fields, changed
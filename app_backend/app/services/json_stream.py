@@ -0,0 +1,68 @@
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+class JsonArrayItemStream:
+    """Incrementally extracts the objects of one top-level JSON array as text streams in.
+
+    Feed it chunks of a JSON document such as {"generated_questions": [{...}, {...}], ...};
+    feed() returns each object of the named array as soon as its closing brace arrives,
+    long before the document as a whole is complete. The full text is kept in `buffer`
+    so the caller can still parse and validate the final document.
+    """
+
+    def __init__(self, array_key: str):
+        self._array_start_re = re.compile(r'"' + re.escape(array_key) + r'"\s*:\s*\[')
+        self.buffer = ""
+        self._scan_pos: Optional[int] = None # Where scanning resumes inside the array; None until the array is found
+        self._array_done = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._item_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        self.buffer += chunk
+        if self._array_done:
+            return []
+        if self._scan_pos is None:
+            match = self._array_start_re.search(self.buffer)
+            if match is None:
+                return []
+            self._scan_pos = match.end()
+
+        items = []
+        buffer = self.buffer
+        pos = self._scan_pos
+        while pos < len(buffer):
+            char = buffer[pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if self._depth == 0 and char == "{":
+                    self._item_start = pos
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 0 and char == "]": # End of the array itself
+                    self._array_done = True
+                    pos += 1
+                    break
+                self._depth -= 1
+                if self._depth == 0 and self._item_start is not None:
+                    try:
+                        item = json.loads(buffer[self._item_start:pos + 1])
+                        if isinstance(item, dict):
+                            items.append(item)
+                    except json.JSONDecodeError:
+                        pass # Malformed item; the final parse of the whole document decides what happens
+                    self._item_start = None
+            pos += 1
+        self._scan_pos = pos
+        return items
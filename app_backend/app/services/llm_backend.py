@@ -0,0 +1,292 @@
+# Where chat completions come from. llm_service builds the prompts and parses the results; a backend only
+# turns messages into text:
+#   - OpenAIBackend: the OpenAI API, or any OpenAI-compatible server (vLLM, Ollama, LiteLLM, ...) via
+#     OPENAI_BASE_URL. Calls go through the outbound governor (rate limits, retries, circuit breaker).
+#   - FakeLLMBackend: local and deterministic, with configurable latency and jitter, for load tests and
+#     benchmarks that must not spend money or touch the network.
+# LLM_BACKEND picks one ("openai", "openai_compatible" or "fake"); set_llm_backend() overrides it in-process.
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+from collections import OrderedDict
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import openai
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.services.llm_governor import get_governor
+from app.services.prompt_builder import count_tokens
+
+Messages = List[Dict[str, str]]
+
+class LLMCompletion(BaseModel):
+    content: str
+    model: str
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    cached_tokens: Optional[int] = None # Prompt tokens served from the provider's prefix cache, if it says
+
+class LLMStream:
+    """Text deltas of a streamed completion. close() stops the upstream generation early.
+    Backends that learn the token usage fill in prompt_tokens and cached_tokens by the end of the stream."""
+
+    def __init__(self, deltas: AsyncIterator[str], close: Optional[Callable[[], Awaitable[None]]] = None):
+        self._deltas = deltas
+        self._close = close
+        self.prompt_tokens: Optional[int] = None
+        self.cached_tokens: Optional[int] = None
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        return self._deltas.__aiter__()
+
+    async def close(self) -> None:
+        if self._close is not None:
+            await self._close()
+
+class LLMBackend:
+    name = "base"
+
+    def is_configured(self) -> bool:
+        return True
+
+    async def complete(self, messages: Messages, max_tokens: Optional[int] = None, temperature: Optional[float] = None,
+                       model: Optional[str] = None) -> LLMCompletion:
+        """A JSON-mode chat completion."""
+        raise NotImplementedError
+
+    async def stream(self, messages: Messages, max_tokens: Optional[int] = None, temperature: Optional[float] = None,
+                     model: Optional[str] = None) -> LLMStream:
+        """Starts a streamed JSON-mode chat completion. Errors starting the request are raised here, not
+        while iterating."""
+        raise NotImplementedError
+
+def prompt_tokens(messages: Messages) -> int:
+    return sum(count_tokens(message["content"]) for message in messages)
+
+def estimate_tokens(messages: Messages, max_tokens: Optional[int]) -> int:
+    # Prompt plus the completion we allow, for the TPM bucket
+    return prompt_tokens(messages) + (max_tokens or 1000)
+
+def _usage_count(usage, field: str) -> Optional[int]:
+    # Compatible servers don't always report usage
+    value = getattr(usage, field, None)
+    return value if isinstance(value, int) else None
+
+def _cached_tokens(usage) -> Optional[int]:
+    return _usage_count(getattr(usage, "prompt_tokens_details", None), "cached_tokens")
+
+class OpenAIBackend(LLMBackend):
+    """Settings are read per call, so a changed key or base URL applies without a restart."""
+
+    def __init__(self, require_api_key: bool = True):
+        self.name = "openai" if require_api_key else "openai_compatible"
+        self.require_api_key = require_api_key
+
+    def is_configured(self) -> bool:
+        if self.require_api_key:
+            return bool(settings.OPENAI_API_KEY)
+        return bool(settings.OPENAI_BASE_URL)
+
+    def _client(self) -> openai.AsyncOpenAI:
+        # Retries are the governor's job, so the SDK's own retry loop is disabled.
+        # Self-hosted compatible servers usually ignore the key, but the SDK insists on one.
+        return openai.AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY or "not-needed",
+            base_url=settings.OPENAI_BASE_URL or None,
+            max_retries=0,
+            http_client=get_governor("openai_chat").http_client()
+        )
+
+    def _params(self, messages: Messages, max_tokens: Optional[int], temperature: Optional[float], model: Optional[str]) -> dict:
+        params = {"model": model or settings.LLM_MODEL, "response_format": {"type": "json_object"}, "messages": messages}
+        if max_tokens is not None:
+            params["max_tokens"] = max_tokens
+        if temperature is not None:
+            params["temperature"] = temperature
+        return params
+
+    async def complete(self, messages, max_tokens=None, temperature=None, model=None) -> LLMCompletion:
+        client = self._client()
+        params = self._params(messages, max_tokens, temperature, model)
+        completion = await get_governor("openai_chat").call(
+            lambda: client.chat.completions.create(**params),
+            estimated_tokens=estimate_tokens(messages, max_tokens)
+        )
+        usage = getattr(completion, "usage", None)
+        return LLMCompletion(content=completion.choices[0].message.content or "", model=params["model"],
+                             prompt_tokens=_usage_count(usage, "prompt_tokens"), completion_tokens=_usage_count(usage, "completion_tokens"),
+                             cached_tokens=_cached_tokens(usage))
+
+    async def stream(self, messages, max_tokens=None, temperature=None, model=None) -> LLMStream:
+        client = self._client()
+        params = self._params(messages, max_tokens, temperature, model)
+        if self.require_api_key: # The usage chunk is an OpenAI extension that not every compatible server accepts
+            params["stream_options"] = {"include_usage": True}
+        upstream = await get_governor("openai_chat").call(
+            lambda: client.chat.completions.create(**params, stream=True),
+            estimated_tokens=estimate_tokens(messages, max_tokens)
+        )
+
+        async def deltas() -> AsyncIterator[str]:
+            async for chunk in upstream:
+                usage = getattr(chunk, "usage", None)
+                if usage is not None: # The last chunk, with no choices
+                    stream.prompt_tokens, stream.cached_tokens = _usage_count(usage, "prompt_tokens"), _cached_tokens(usage)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+        stream = LLMStream(deltas(), upstream.close if hasattr(upstream, "close") else None)
+        return stream
+
+# --- Fake backend ---
+
+JITTER_DISTRIBUTIONS = ("none", "uniform", "normal", "lognormal", "exponential")
+# Prefix caching as OpenAI does it: the longest previously seen prompt prefix, in 128-token steps, from 1024 tokens
+PREFIX_CACHE_MIN_TOKENS = 1024
+PREFIX_CACHE_STEP_TOKENS = 128
+_PREFIX_BLOCK_CHARS = 256
+_PREFIX_CACHE_BLOCKS = 50_000
+_KEYS_RE = re.compile(r"Return JSON with keys: ([a-z_, ]+)")
+_FAKE_QUESTION_CATEGORIES = ("Behavioral", "Technical", "Situational")
+
+class FakeLLMBackend(LLMBackend):
+    """Answers instantly-computed, deterministic JSON after a sampled delay.
+
+    The delay is `latency_ms` shaped by `jitter`:
+      none         always latency_ms
+      uniform      latency_ms ± jitter_ms
+      normal       mean latency_ms, standard deviation jitter_ms (never below 0)
+      lognormal    mean latency_ms, standard deviation jitter_ms, right-skewed like real LLM latency
+      exponential  latency_ms plus an exponential tail with mean jitter_ms
+    Streams send the first delta after `first_token_fraction` of the delay and spread the rest evenly.
+    Usage reports cached_tokens from a simulated prefix cache (see cached_tokens()), so prompt layouts can
+    be compared offline.
+    """
+    name = "fake"
+
+    def __init__(self, latency_ms: float = 0.0, jitter: str = "none", jitter_ms: float = 0.0, seed: int = 0,
+                 first_token_fraction: float = 0.3, stream_chunk_chars: int = 24):
+        if jitter not in JITTER_DISTRIBUTIONS:
+            raise ValueError(f"Unknown jitter distribution {jitter!r}; expected one of {', '.join(JITTER_DISTRIBUTIONS)}")
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.jitter_ms = jitter_ms
+        self.first_token_fraction = first_token_fraction
+        self.stream_chunk_chars = stream_chunk_chars
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock() # Also used from the fake HTTP server's threads
+        self._prefix_blocks: "OrderedDict[str, None]" = OrderedDict()
+        self._prefix_lock = threading.Lock()
+
+    def sample_latency_ms(self) -> float:
+        with self._rng_lock:
+            if self.jitter == "none" or self.jitter_ms <= 0:
+                return self.latency_ms
+            if self.jitter == "uniform":
+                return max(0.0, self._rng.uniform(self.latency_ms - self.jitter_ms, self.latency_ms + self.jitter_ms))
+            if self.jitter == "normal":
+                return max(0.0, self._rng.gauss(self.latency_ms, self.jitter_ms))
+            if self.jitter == "lognormal":
+                if self.latency_ms <= 0:
+                    return 0.0
+                sigma2 = math.log(1 + (self.jitter_ms / self.latency_ms) ** 2)
+                return self._rng.lognormvariate(math.log(self.latency_ms) - sigma2 / 2, math.sqrt(sigma2))
+            return self.latency_ms + self._rng.expovariate(1 / self.jitter_ms)
+
+    def cached_tokens(self, messages: Messages) -> int:
+        """Tokens of the longest prefix of this prompt that an earlier prompt also started with, rounded
+        down to PREFIX_CACHE_STEP_TOKENS and 0 below PREFIX_CACHE_MIN_TOKENS. Remembers this prompt's prefix."""
+        prompt = "".join(f"<{message['role']}>{message['content']}" for message in messages)
+        chain, keys = hashlib.sha256(), []
+        for start in range(0, len(prompt) - _PREFIX_BLOCK_CHARS + 1, _PREFIX_BLOCK_CHARS):
+            chain.update(prompt[start:start + _PREFIX_BLOCK_CHARS].encode("utf-8"))
+            keys.append(chain.hexdigest()) # Each key covers the whole prefix up to the end of its block
+        with self._prefix_lock:
+            hits = 0
+            while hits < len(keys) and keys[hits] in self._prefix_blocks:
+                hits += 1
+            for key in keys:
+                self._prefix_blocks[key] = None
+                self._prefix_blocks.move_to_end(key)
+            while len(self._prefix_blocks) > _PREFIX_CACHE_BLOCKS:
+                self._prefix_blocks.popitem(last=False)
+        tokens = count_tokens(prompt[:hits * _PREFIX_BLOCK_CHARS]) if hits else 0
+        tokens -= tokens % PREFIX_CACHE_STEP_TOKENS
+        return tokens if tokens >= PREFIX_CACHE_MIN_TOKENS else 0
+
+    def render(self, messages: Messages) -> str:
+        """The response document: same messages, same answer."""
+        prompt = "\n".join(message["content"] for message in messages)
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        if "generated_questions" in prompt:
+            questions = [{"category": _FAKE_QUESTION_CATEGORIES[i % 3], "question": f"Fake question {i + 1} ({digest[i]:02x})?"}
+                         for i in range(3 + digest[0] % 4)]
+            return json.dumps({"generated_questions": questions, "preparation_tips": ["Review the job description.", "Prepare STAR stories."]})
+        keys = _KEYS_RE.search(prompt)
+        document = {}
+        for key in (keys.group(1).split(", ") if keys else ["match_score"]):
+            key = key.strip()
+            if key == "match_score":
+                document[key] = 35 + digest[1] % 61
+            elif key in ("missing_keywords", "improvement_suggestions"):
+                document[key] = [f"fake {key[:-1].replace('_', ' ')} {i + 1}" for i in range(digest[2] % 4)]
+            else:
+                document[key] = f"Fake {key.replace('_', ' ')}."
+        return json.dumps(document)
+
+    async def complete(self, messages, max_tokens=None, temperature=None, model=None) -> LLMCompletion:
+        await asyncio.sleep(self.sample_latency_ms() / 1000)
+        content = self.render(messages)
+        return LLMCompletion(content=content, model=model or "fake", prompt_tokens=prompt_tokens(messages), completion_tokens=count_tokens(content),
+                             cached_tokens=self.cached_tokens(messages))
+
+    async def stream(self, messages, max_tokens=None, temperature=None, model=None) -> LLMStream:
+        delay = self.sample_latency_ms() / 1000
+        content = self.render(messages)
+        cached_tokens = self.cached_tokens(messages)
+        chunks = [content[start:start + self.stream_chunk_chars] for start in range(0, len(content), self.stream_chunk_chars)]
+
+        async def deltas() -> AsyncIterator[str]:
+            await asyncio.sleep(delay * self.first_token_fraction)
+            gap = delay * (1 - self.first_token_fraction) / max(len(chunks) - 1, 1)
+            for index, chunk in enumerate(chunks):
+                if index:
+                    await asyncio.sleep(gap)
+                yield chunk
+            stream.prompt_tokens, stream.cached_tokens = prompt_tokens(messages), cached_tokens
+
+        stream = LLMStream(deltas())
+        return stream
+
+# --- Selection ---
+
+_backend_override: Optional[LLMBackend] = None
+_backends: Dict[str, LLMBackend] = {}
+
+def _build_backend(name: str) -> LLMBackend:
+    if name == "openai":
+        return OpenAIBackend()
+    if name == "openai_compatible":
+        return OpenAIBackend(require_api_key=False)
+    if name == "fake":
+        return FakeLLMBackend(latency_ms=settings.FAKE_LLM_LATENCY_MS, jitter=settings.FAKE_LLM_JITTER,
+                              jitter_ms=settings.FAKE_LLM_JITTER_MS, seed=settings.FAKE_LLM_SEED)
+    raise ValueError(f"Unknown LLM_BACKEND {name!r}; expected openai, openai_compatible or fake")
+
+def get_llm_backend() -> LLMBackend:
+    if _backend_override is not None:
+        return _backend_override
+    name = settings.LLM_BACKEND
+    if name not in _backends:
+        _backends[name] = _build_backend(name)
+    return _backends[name]
+
+def set_llm_backend(backend: Optional[LLMBackend]) -> None:
+    """Use `backend` for every LLM call in this process; None goes back to LLM_BACKEND."""
+    global _backend_override
+    _backend_override = backend
@@ -0,0 +1,275 @@
+# Shared governor for outbound OpenAI calls (chat completions and embeddings).
+#
+# Every call goes through OutboundGovernor.call(), which applies, in order:
+#   - a circuit breaker that fails fast while the upstream keeps erroring,
+#   - request and token buckets sized to our RPM/TPM limits, adjusted AIMD-style
+#     from the x-ratelimit-* response headers and 429s,
+#   - a concurrency cap,
+#   - jittered exponential retry for retryable errors (429, 5xx, timeouts, connection errors).
+import asyncio
+import random
+import re
+import time
+import weakref
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+import openai
+
+from app.core.config import settings
+from app.services import metrics
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+class UpstreamUnavailableError(Exception):
+    """The upstream API is rate limiting or failing and the call could not be completed."""
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class TokenBucket:
+    def __init__(self, rate_per_minute: float, burst_seconds: float = 10.0):
+        self.burst_seconds = burst_seconds
+        self.set_rate(rate_per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def set_rate(self, rate_per_minute: float) -> None:
+        self.rate_per_minute = rate_per_minute
+        self.capacity = max(rate_per_minute / 60 * self.burst_seconds, 1.0)
+        if hasattr(self, "_tokens"):
+            self._tokens = min(self._tokens, self.capacity)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_minute / 60)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """Waits until `amount` is available and takes it; returns the seconds spent waiting."""
+        if self.rate_per_minute <= 0: # Unlimited
+            return 0.0
+        amount = min(amount, self.capacity) # A request bigger than the bucket would otherwise wait forever
+        waited = 0.0
+        while True:
+            self._refill()
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return waited
+            delay = (amount - self._tokens) / (self.rate_per_minute / 60)
+            await asyncio.sleep(delay)
+            waited += delay
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def before_call(self) -> None:
+        if self.state == self.OPEN:
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            if remaining > 0:
+                raise UpstreamUnavailableError("Upstream is unavailable (circuit open).", retry_after=remaining)
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            # Only one probe at a time decides whether the upstream has recovered
+            if self._probe_in_flight:
+                raise UpstreamUnavailableError("Upstream is unavailable (circuit half-open).", retry_after=self.reset_timeout)
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+        self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        self._consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def release_probe(self) -> None:
+        # The call ended without telling us anything about upstream health (e.g. a 400)
+        self._probe_in_flight = False
+
+def _parse_reset_seconds(value: Optional[str]) -> Optional[float]:
+    # OpenAI reset headers look like "1s", "6m0s", "20ms"
+    if not value:
+        return None
+    total = 0.0
+    for amount, unit in re.findall(r"([\d.]+)(ms|s|m|h)", value):
+        total += float(amount) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+    return total
+
+def _retry_after_seconds(headers) -> Optional[float]:
+    if headers is None:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return _parse_reset_seconds(headers.get("x-ratelimit-reset-requests"))
+
+def _status_code(error: Exception) -> Optional[int]:
+    return getattr(error, "status_code", None)
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)):
+        return True
+    return _status_code(error) in RETRYABLE_STATUS_CODES
+
+class OutboundGovernor:
+    def __init__(self, name: str, rpm: float, tpm: float, max_concurrency: int, max_retries: int,
+                 base_delay: float, max_delay: float, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.max_rpm, self.max_tpm = rpm, tpm # Ceilings: configured, lowered if the API reports a smaller limit
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_concurrency = max_concurrency
+        # Per event loop, so loop-bound primitives are never shared across loops (e.g. between tests)
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._http_clients = weakref.WeakKeyDictionary()
+        self.max_retries = max_retries
+        self.base_delay, self.max_delay = base_delay, max_delay
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+    # --- AIMD rate adjustment ---
+
+    def _scale_rates(self, factor: float) -> None:
+        self.requests.set_rate(max(self.requests.rate_per_minute * factor, self.max_rpm * 0.05))
+        self.tokens.set_rate(max(self.tokens.rate_per_minute * factor, self.max_tpm * 0.05))
+
+    def on_throttled(self) -> None:
+        # Multiplicative decrease
+        self._scale_rates(0.5)
+        metrics.increment(f"{self.name}.throttled")
+
+    def on_success(self) -> None:
+        # Additive increase, back up to the configured limits
+        self.requests.set_rate(min(self.requests.rate_per_minute + self.max_rpm * 0.05, self.max_rpm))
+        self.tokens.set_rate(min(self.tokens.rate_per_minute + self.max_tpm * 0.05, self.max_tpm))
+
+    def observe_headers(self, status_code: int, headers) -> None:
+        """Adjusts rates from an upstream response's rate-limit headers."""
+        if status_code == 429:
+            self.on_throttled()
+            return
+        for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+            try:
+                limit = float(headers.get(f"x-ratelimit-limit-{kind}") or 0)
+                remaining = float(headers.get(f"x-ratelimit-remaining-{kind}") or -1)
+            except ValueError:
+                continue
+            if limit <= 0 or remaining < 0:
+                continue
+            ceiling = self.max_rpm if kind == "requests" else self.max_tpm
+            if ceiling <= 0 or limit < ceiling: # Our account limit is lower than configured; never plan above it
+                ceiling = limit
+                if kind == "requests":
+                    self.max_rpm = limit
+                else:
+                    self.max_tpm = limit
+                bucket.set_rate(min(bucket.rate_per_minute, limit) if bucket.rate_per_minute > 0 else limit)
+            if remaining / limit < 0.1:
+                bucket.set_rate(max(bucket.rate_per_minute * 0.5, ceiling * 0.05))
+                metrics.increment(f"{self.name}.near_limit")
+
+    async def _on_response(self, response) -> None:
+        self.observe_headers(response.status_code, response.headers)
+
+    def http_client(self):
+        # Passed to openai.AsyncOpenAI so every response's headers (success or not) reach observe_headers.
+        # Shared per event loop so calls reuse pooled connections.
+        loop = asyncio.get_running_loop()
+        client = self._http_clients.get(loop)
+        if client is None:
+            client = self._http_clients[loop] = openai.DefaultAsyncHttpxClient(event_hooks={"response": [self._on_response]})
+        return client
+
+    # --- Calls ---
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        # Full jitter, but never sooner than the server asked us to wait
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+    async def call(self, fn: Callable[[], Awaitable[T]], estimated_tokens: int = 0) -> T:
+        for attempt in range(self.max_retries + 1):
+            self.breaker.before_call()
+            # Everything after before_call is inside the try: a half-open probe cancelled or failing while it
+            # waits for the buckets or a slot must still clear the probe flag, or the circuit never closes
+            try:
+                waited = await self.requests.acquire(1)
+                waited += await self.tokens.acquire(estimated_tokens)
+                if waited:
+                    metrics.observe_latency(f"{self.name}.rate_limit_wait_ms", waited * 1000)
+                async with self._semaphore():
+                    result = await fn()
+            except Exception as e:
+                if not is_retryable(e):
+                    self.breaker.release_probe()
+                    raise
+                error = e
+            except BaseException: # Cancelled (client disconnect, single-flight cancel)
+                self.breaker.release_probe()
+                raise
+            else:
+                self.breaker.record_success()
+                self.on_success()
+                return result
+
+            status_code = _status_code(error)
+            retry_after = _retry_after_seconds(getattr(getattr(error, "response", None), "headers", None))
+            if status_code == 429:
+                self.breaker.release_probe() # Throttling is not an outage
+            else:
+                self.breaker.record_failure()
+            metrics.increment(f"{self.name}.retryable_errors")
+            if attempt == self.max_retries:
+                raise UpstreamUnavailableError(f"{self.name} call failed after {attempt + 1} attempts: {error}", retry_after=retry_after) from error
+            delay = self._backoff(attempt, retry_after)
+            print(f"{self.name} call failed ({error.__class__.__name__}), retrying in {delay:.2f}s (attempt {attempt + 1}/{self.max_retries})")
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+_governors: Dict[str, OutboundGovernor] = {}
+
+def get_governor(name: str) -> OutboundGovernor:
+    """Process-wide governor for "openai_chat" or "openai_embeddings"."""
+    governor = _governors.get(name)
+    if governor is None:
+        rpm, tpm = {
+            "openai_chat": (settings.OPENAI_CHAT_RPM, settings.OPENAI_CHAT_TPM),
+            "openai_embeddings": (settings.OPENAI_EMBEDDING_RPM, settings.OPENAI_EMBEDDING_TPM),
+        }[name]
+        governor = _governors[name] = OutboundGovernor(
+            name, rpm=rpm, tpm=tpm,
+            max_concurrency=settings.OPENAI_MAX_CONCURRENCY,
+            max_retries=settings.OPENAI_MAX_RETRIES,
+            base_delay=settings.OPENAI_RETRY_BASE_DELAY,
+            max_delay=settings.OPENAI_RETRY_MAX_DELAY,
+            failure_threshold=settings.OPENAI_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.OPENAI_CIRCUIT_RESET_SECONDS,
+        )
+    return governor
+
+def reset_governors() -> None:
+    _governors.clear()
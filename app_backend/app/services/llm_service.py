@@ -1,11 +1,24 @@
 import openai
 from app.core.config import settings
-import json
-from pydantic import BaseModel, Field, validator as pydantic_validator_v1
-from typing import List, Optional
+from app.services.prompt_builder import PromptInputs, build_prompt_inputs
+from app.services.prompt_templates import (ANALYSIS_STORED_ATS_TEMPLATE, ANALYSIS_TEMPLATE, INTERVIEW_TEMPLATE, NARRATIVE_STORED_ATS_TEMPLATE,
+                                          NARRATIVE_TEMPLATE, TEMPLATES, build_messages)
+from app.services.resume_profile import ResumeProfile, get_resume_profile, render_profile
+from app.services.llm_governor import UpstreamUnavailableError
+from app.services.llm_backend import get_llm_backend
+from app.services.json_stream import JsonArrayItemStream
+from app.services.json_repair import FieldRule, JSONRepairError, MissingFieldsError, coerce_score, coerce_text, coerce_text_list, normalize_key, parse_json_lenient, repair_fields
+from app.services.skill_taxonomy import compare_skills
+from app.services.scoring_service import compute_local_score
+from app.services import metrics
+import asyncio
+import hashlib
+import time
+from pydantic import BaseModel, Field, ValidationError, validator as pydantic_validator_v1
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple, Type, TypeVar, Union
 
-# Basic check, actual client instantiation with key is done per call or globally
-if not settings.OPENAI_API_KEY:
+# Basic check; the backend itself is picked per call (see llm_backend.get_llm_backend)
+if settings.LLM_BACKEND == "openai" and not settings.OPENAI_API_KEY:
     print("Warning: OPENAI_API_KEY not set. LLM service will not function.")
 
 class LLMAnalysisResult(BaseModel):
@@ -13,7 +26,7 @@ class LLMAnalysisResult(BaseModel):
     missing_keywords: List[str] = Field(default_factory=list)
     strength_summary: str = Field(...)
     improvement_suggestions: List[str] = Field(default_factory=list)
-    ats_compatibility_check: str = Field(...)
+    ats_compatibility_check: str = Field("", description="Empty until filled in from the stored ATS report, when the model isn't asked for it.")
 
     @pydantic_validator_v1('match_score')
     def score_in_range(cls, v):
@@ -21,40 +34,353 @@ class LLMAnalysisResult(BaseModel):
             raise ValueError('Match score must be 0-100')
         return v
 
-async def analyze_resume_with_llm(resume_text: str, job_description_text: str) -> Optional[LLMAnalysisResult]:
-    if not settings.OPENAI_API_KEY:
-        print("Error: OPENAI_API_KEY is not configured. Cannot perform LLM analysis.")
-        return None
-    # Simplified prompt for subtask stability
-    prompt = f"Analyze this resume: {resume_text} against this job description: {job_description_text}. Return JSON with keys: match_score, missing_keywords, strength_summary, improvement_suggestions, ats_compatibility_check."
+def _keyword_list(value: Any) -> List[str]:
+    return coerce_text_list(value, split_commas=True)
+
+ANALYSIS_FIELDS = {
+    "match_score": FieldRule(coerce_score),
+    "missing_keywords": FieldRule(_keyword_list, required=False),
+    "strength_summary": FieldRule(coerce_text),
+    "improvement_suggestions": FieldRule(coerce_text_list, required=False),
+    "ats_compatibility_check": FieldRule(coerce_text),
+}
+
+def _without_ats_check(fields: Dict[str, FieldRule]) -> Dict[str, FieldRule]:
+    return {key: rule for key, rule in fields.items() if key != "ats_compatibility_check"}
+
+# --- Single-flight request coalescing ---
+# Identical concurrent requests (double submits, several open tabs) share one in-flight
+# OpenAI call instead of each paying for their own.
+
+T = TypeVar("T")
+
+class _InflightCall:
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+_inflight_calls: Dict[str, _InflightCall] = {}
+
+def make_request_key(kind: str, *parts: str) -> str:
+    digest = hashlib.sha256(kind.encode("utf-8"))
+    for part in parts:
+        digest.update(b"\x00") # Separator so ("ab", "c") and ("a", "bc") don't collide
+        digest.update((part or "").encode("utf-8"))
+    return f"{kind}:{digest.hexdigest()}"
+
+def _forget_inflight_call(key: str, call: _InflightCall) -> None:
+    if _inflight_calls.get(key) is call:
+        del _inflight_calls[key]
+
+async def run_single_flight(key: str, call_factory: Callable[[], Awaitable[T]]) -> T:
+    """Runs call_factory() once for all concurrent callers sharing `key`.
+
+    The shared call runs in its own task; each caller waits on it through asyncio.shield,
+    so a caller that is cancelled (e.g. the client disconnected) does not cancel the call
+    for the others. The shared call is only cancelled once its last waiter has gone.
+    """
+    call = _inflight_calls.get(key)
+    if call is None:
+        call = _InflightCall(asyncio.create_task(call_factory()))
+        _inflight_calls[key] = call
+        call.task.add_done_callback(lambda _task, key=key, call=call: _forget_inflight_call(key, call))
+
+    call.waiters += 1
     try:
-        client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-        completion = await client.chat.completions.create(
-            model="gpt-3.5-turbo-0125", # Ensure this model is available
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": "You are an AI Resume Analyzer. Output ONLY JSON that strictly matches the requested schema."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        raw_response = completion.choices[0].message.content
-        if not raw_response:
-            print("LLM analysis error: Empty response from API.")
-            return None
-
-        # Attempt to parse the JSON, handling potential errors
+        return await asyncio.shield(call.task)
+    except asyncio.CancelledError:
+        if call.waiters == 1 and not call.task.done():
+            # Last waiter left: nobody wants the result any more, stop paying for it.
+            _forget_inflight_call(key, call)
+            call.task.cancel()
+        raise
+    finally:
+        call.waiters -= 1
+
+# --- Tiered model routing ---
+# Each feature has a route in Settings (LLM_ROUTE_ANALYSIS, LLM_ROUTE_NARRATIVE, LLM_ROUTE_INTERVIEW):
+#   default  LLM_MODEL
+#   fast     LLM_FAST_MODEL
+#   strong   LLM_STRONG_MODEL
+#   tiered   LLM_FAST_MODEL, escalating to LLM_STRONG_MODEL when the answer doesn't validate (bad JSON,
+#            missing keys, score out of range) or a confidence check on it trips
+# Per feature, llm_route.<feature>.calls / .escalations / .escalations.<reason> counters and
+# llm_route.<feature>.<tier>_ms latencies go to the metrics module; route_stats() summarizes them.
+
+ROUTES = ("default", "fast", "strong", "tiered")
+ROUTED_FEATURES = ("analysis", "narrative", "interview")
+
+def _route_name(feature: str) -> str:
+    return getattr(settings, f"LLM_ROUTE_{feature.upper()}")
+
+def route_tiers(feature: str) -> List[Tuple[str, str]]:
+    """(tier, model) pairs to try, in order."""
+    route = _route_name(feature)
+    if route == "default":
+        return [("default", settings.LLM_MODEL)]
+    if route == "fast":
+        return [("fast", settings.LLM_FAST_MODEL)]
+    if route == "strong":
+        return [("strong", settings.LLM_STRONG_MODEL)]
+    if route == "tiered":
+        return [("fast", settings.LLM_FAST_MODEL), ("strong", settings.LLM_STRONG_MODEL)]
+    raise ValueError(f"Unknown LLM_ROUTE_{feature.upper()} {route!r}; expected one of {', '.join(ROUTES)}")
+
+def _record_escalation(feature: str, model: str, reason: str) -> None:
+    metrics.increment(f"llm_route.{feature}.escalations")
+    metrics.increment(f"llm_route.{feature}.escalations.{reason}")
+    print(f"LLM route {feature}: answer from {model} rejected ({reason}), escalating.")
+
+# --- Prompt cache accounting ---
+# Prompts follow prompt_templates, so the provider can serve the shared prefix (instructions, then the
+# resume) from its prompt cache. Every completion's usage is added to llm_prompt.<feature>.requests /
+# .prompt_tokens / .cached_tokens / .cache_hits; prompt_cache_stats() turns them into hit rates per template.
+
+def _record_prompt_usage(feature: str, prompt_tokens: Optional[int], cached_tokens: Optional[int]) -> None:
+    metrics.increment(f"llm_prompt.{feature}.requests")
+    if prompt_tokens is None or cached_tokens is None: # Not every compatible server reports cache usage
+        return
+    metrics.increment(f"llm_prompt.{feature}.prompt_tokens", prompt_tokens)
+    metrics.increment(f"llm_prompt.{feature}.cached_tokens", cached_tokens)
+    if cached_tokens:
+        metrics.increment(f"llm_prompt.{feature}.cache_hits")
+
+def prompt_cache_stats() -> Dict[str, dict]:
+    """Template, request count and prompt-cache hit rates per feature, since start-up or the last metrics reset.
+    cached_token_rate is the share of reported prompt tokens served from the provider's cache."""
+    stats = {}
+    for feature in ROUTED_FEATURES:
+        requests = metrics.get_counter(f"llm_prompt.{feature}.requests")
+        prompt_tokens = metrics.get_counter(f"llm_prompt.{feature}.prompt_tokens")
+        cached_tokens = metrics.get_counter(f"llm_prompt.{feature}.cached_tokens")
+        cache_hits = metrics.get_counter(f"llm_prompt.{feature}.cache_hits")
+        stats[feature] = {
+            "template": TEMPLATES[feature].name,
+            "requests": int(requests),
+            "prompt_tokens": int(prompt_tokens),
+            "cached_tokens": int(cached_tokens),
+            "cache_hit_rate": round(cache_hits / requests, 4) if requests else 0.0,
+            "cached_token_rate": round(cached_tokens / prompt_tokens, 4) if prompt_tokens else 0.0,
+        }
+    return stats
+
+# --- Response repair ---
+# Slightly malformed answers (code fences, trailing text or commas, truncation, "score": "85%", a score of
+# 105, camelCase keys) are repaired instead of failing the call; when required fields are still missing,
+# the same model is asked once for just those. llm_repair.<feature>.repaired / .reasks count both.
+
+class ResponseSchema(NamedTuple):
+    model: Type[BaseModel]
+    fields: Dict[str, FieldRule]
+    list_key: Optional[str] = None # A bare JSON array answer is taken as this field
+
+PARSE_ERRORS = (JSONRepairError, MissingFieldsError, ValidationError, TypeError)
+
+def _parse_rejection(error: Exception) -> str:
+    if isinstance(error, JSONRepairError):
+        return "invalid_json"
+    if isinstance(error, MissingFieldsError):
+        return "missing_fields"
+    return "invalid_schema"
+
+def _build_result(feature: str, schema: ResponseSchema, data: Any, repairs: List[str]) -> Any:
+    if isinstance(data, list) and schema.list_key:
+        data, repairs = {schema.list_key: data}, repairs + ["bare_list"]
+    fields, changed = repair_fields(data, schema.fields)
+    result = schema.model(**fields)
+    repairs = repairs + changed
+    if repairs:
+        metrics.increment(f"llm_repair.{feature}.repaired")
+        print(f"LLM {feature}: repaired response ({', '.join(repairs)}).")
+    return result
+
+async def _parse_response(feature: str, schema: ResponseSchema, content: str, model: str, messages: List[Dict[str, str]], **params) -> Any:
+    """Parses and repairs `content`; if required fields are still missing, asks `model` for only those, once.
+    Raises one of PARSE_ERRORS if the answer can't be used."""
+    data, repairs = parse_json_lenient(content)
+    try:
+        return _build_result(feature, schema, data, repairs)
+    except MissingFieldsError as e:
+        missing = e
+    metrics.increment(f"llm_repair.{feature}.reasks")
+    keys = ", ".join(missing.fields)
+    follow_up = messages + [
+        {"role": "assistant", "content": content},
+        {"role": "user", "content": f"Your answer is missing or has unusable values for: {keys}. Return JSON with keys: {keys}."}
+    ]
+    completion = await get_llm_backend().complete(follow_up, model=model, **params)
+    _record_prompt_usage(feature, completion.prompt_tokens, completion.cached_tokens)
+    extra, extra_repairs = parse_json_lenient(completion.content)
+    if not isinstance(extra, dict):
+        raise JSONRepairError("Follow-up answer is not a JSON object")
+    merged = {**missing.partial, **{normalize_key(key): value for key, value in extra.items()}}
+    return _build_result(feature, schema, merged, repairs + extra_repairs + ["reask"])
+
+async def _run_tiers(feature: str, tiers: List[Tuple[str, str]], messages: List[Dict[str, str]], schema: ResponseSchema,
+                     confidence_issue: Callable[[T], Optional[str]], fallback: Optional[T] = None, **params) -> T:
+    """Returns the first answer that parses and passes `confidence_issue` (None if the answer looks fine,
+    else a short reason). The last tier's answer is final: returned if it parses, otherwise the earlier
+    low-confidence `fallback` if there is one, otherwise its parse error is raised."""
+    backend = get_llm_backend()
+    for index, (tier, model) in enumerate(tiers):
+        final = index == len(tiers) - 1
+        started = time.perf_counter()
+        completion = await backend.complete(messages, model=model, **params)
+        metrics.observe_latency(f"llm_route.{feature}.{tier}_ms", (time.perf_counter() - started) * 1000)
+        _record_prompt_usage(feature, completion.prompt_tokens, completion.cached_tokens)
         try:
-            data = json.loads(raw_response)
-        except json.JSONDecodeError as e:
-            print(f"LLM analysis error: Failed to decode JSON response: {e}")
-            print(f"Raw response was: {raw_response}")
-            return None # Or perhaps raise a specific error / return a default error structure
-
-        # Validate with Pydantic model
-        return LLMAnalysisResult(**data)
+            result = await _parse_response(feature, schema, completion.content, model, messages, **params)
+        except PARSE_ERRORS as e:
+            if final:
+                if fallback is None:
+                    raise
+                metrics.increment(f"llm_route.{feature}.fallbacks")
+                return fallback
+            _record_escalation(feature, model, _parse_rejection(e))
+            continue
+        reason = None if final else confidence_issue(result)
+        if reason is None:
+            return result
+        fallback = result
+        _record_escalation(feature, model, reason)
+    raise ValueError("A route needs at least one tier")
+
+async def _complete_routed(feature: str, messages: List[Dict[str, str]], schema: ResponseSchema,
+                           confidence_issue: Callable[[T], Optional[str]], **params) -> T:
+    tiers = route_tiers(feature)
+    metrics.increment(f"llm_route.{feature}.calls")
+    return await _run_tiers(feature, tiers, messages, schema, confidence_issue, **params)
+
+def route_stats() -> Dict[str, dict]:
+    """Route, call count and escalation rate per feature, since start-up or the last metrics reset."""
+    stats = {}
+    for feature in ROUTED_FEATURES:
+        calls = metrics.get_counter(f"llm_route.{feature}.calls")
+        escalations = metrics.get_counter(f"llm_route.{feature}.escalations")
+        stats[feature] = {
+            "route": _route_name(feature),
+            "calls": int(calls),
+            "escalations": int(escalations),
+            "escalation_rate": round(escalations / calls, 4) if calls else 0.0,
+        }
+    return stats
+
+def _prompt_inputs(resume_text: str, job_description_text: str, profile: Optional[ResumeProfile]) -> PromptInputs:
+    """Prompt inputs with the resume as its compact profile (LLM_RESUME_INPUT=profile) or as compacted text."""
+    if settings.LLM_RESUME_INPUT == "profile":
+        profile = profile or get_resume_profile(resume_text)
+        if profile.roles or profile.skills: # Otherwise the layout wasn't recognised; the text is safer
+            return build_prompt_inputs(render_profile(profile), job_description_text)
+    return build_prompt_inputs(resume_text, job_description_text)
+
+def _skills_context(resume_text: str, job_description_text: str) -> str:
+    # Skills found by the taxonomy matcher over the full (uncompacted) texts, so the model starts from
+    # a reliable keyword inventory instead of re-deriving it
+    skills = compare_skills(resume_text, job_description_text)
+    if not skills.job_skills and not skills.resume_skills:
+        return ""
+    return (f"Skills required by the job description: {', '.join(skills.job_skills) or 'none detected'}.\n"
+            f"Skills found in the resume: {', '.join(skills.resume_skills) or 'none detected'}.\n"
+            f"Required skills not found in the resume: {', '.join(skills.missing) or 'none'}.")
+
+async def analyze_resume_with_llm(resume_text: str, job_description_text: str, shared_first: str = "resume",
+                                  profile: Optional[ResumeProfile] = None, ats_summary: Optional[str] = None) -> Optional[LLMAnalysisResult]:
+    """`shared_first` picks which input leads the prompt ("resume" or "job_description"). Batches put the
+    input shared by every item first so the provider can reuse the cached prompt prefix across items.
+    `profile` is the resume's stored profile, if it has one; it is built from the text otherwise.
+    `ats_summary` is the summary of the resume's stored ATS report, if it has one: it is served as
+    ats_compatibility_check, and the model isn't asked for that field."""
+    key = make_request_key("analysis", resume_text, job_description_text, shared_first, ats_summary)
+    result = await run_single_flight(key, lambda: _analyze_resume_with_llm(resume_text, job_description_text, shared_first, profile, ats_summary))
+    # Each caller gets its own copy so one request can't mutate another's response
+    return result.model_copy(deep=True) if result is not None else None
+
+async def _analyze_resume_with_llm(resume_text: str, job_description_text: str, shared_first: str = "resume",
+                                   profile: Optional[ResumeProfile] = None, ats_summary: Optional[str] = None) -> Optional[LLMAnalysisResult]:
+    backend = get_llm_backend()
+    if not backend.is_configured():
+        print(f"Error: LLM backend {backend.name!r} is not configured. Cannot perform LLM analysis.")
+        return None
+    # Keep both inputs within their token budgets so huge resumes don't blow up latency, cost or the context window
+    inputs = _prompt_inputs(resume_text, job_description_text, profile)
+    skills_context = _skills_context(resume_text, job_description_text)
+    template, fields = (ANALYSIS_STORED_ATS_TEMPLATE, _without_ats_check(ANALYSIS_FIELDS)) if ats_summary else (ANALYSIS_TEMPLATE, ANALYSIS_FIELDS)
+    messages = build_messages(template, inputs.resume.text, inputs.job_description.text, skills_context, shared_first)
+    try:
+        result = await _complete_routed("analysis", messages, ResponseSchema(LLMAnalysisResult, fields),
+                                        lambda result: _analysis_confidence_issue(result, resume_text, job_description_text, not ats_summary))
+    except UpstreamUnavailableError:
+        raise # Rate limited or upstream down: let the API answer 503 instead of a generic failure
+    except JSONRepairError as e:
+        print(f"LLM analysis error: Failed to decode JSON response: {e}")
+        return None
     except Exception as e:
         print(f"LLM analysis error: {e}")
         return None
+    if ats_summary:
+        result.ats_compatibility_check = ats_summary
+    return result
+
+def _analysis_confidence_issue(result: LLMAnalysisResult, resume_text: str, job_description_text: str, check_ats: bool = True) -> Optional[str]:
+    if not result.strength_summary.strip() or (check_ats and not result.ats_compatibility_check.strip()):
+        return "thin_output"
+    # The local score is cheap and deterministic; a model far away from it has probably misread the inputs
+    local = compute_local_score(resume_text, job_description_text)
+    if abs(result.match_score - local.match_score) > settings.LLM_ROUTE_MAX_SCORE_GAP:
+        return "score_disagreement"
+    return None
+
+class LLMNarrativeResult(BaseModel):
+    strength_summary: str = Field(...)
+    improvement_suggestions: List[str] = Field(default_factory=list)
+    ats_compatibility_check: str = Field("", description="Empty until filled in from the stored ATS report, when the model isn't asked for it.")
+
+NARRATIVE_FIELDS = {
+    "strength_summary": FieldRule(coerce_text),
+    "improvement_suggestions": FieldRule(coerce_text_list, required=False),
+    "ats_compatibility_check": FieldRule(coerce_text),
+}
+
+async def analyze_resume_narrative_with_llm(resume_text: str, job_description_text: str, missing_keywords: List[str],
+                                            profile: Optional[ResumeProfile] = None, ats_summary: Optional[str] = None) -> Optional[LLMNarrativeResult]:
+    """Hybrid mode: the score and missing keywords are computed locally, so the LLM only writes the narrative fields.
+    The locally found gaps are passed in so the narrative agrees with them. `ats_summary` is served as
+    ats_compatibility_check instead of asking the model, as in analyze_resume_with_llm."""
+    key = make_request_key("analysis_narrative", resume_text, job_description_text, ats_summary, *missing_keywords)
+    result = await run_single_flight(key, lambda: _analyze_resume_narrative_with_llm(resume_text, job_description_text, missing_keywords, profile, ats_summary))
+    return result.model_copy(deep=True) if result is not None else None
+
+async def _analyze_resume_narrative_with_llm(resume_text: str, job_description_text: str, missing_keywords: List[str],
+                                             profile: Optional[ResumeProfile] = None, ats_summary: Optional[str] = None) -> Optional[LLMNarrativeResult]:
+    backend = get_llm_backend()
+    if not backend.is_configured():
+        print(f"Error: LLM backend {backend.name!r} is not configured. Cannot perform LLM analysis.")
+        return None
+    inputs = _prompt_inputs(resume_text, job_description_text, profile)
+    gaps = ", ".join(missing_keywords) or "none found"
+    details = "\n".join(filter(None, [_skills_context(resume_text, job_description_text),
+                                      f"Keywords from the job description missing in the resume: {gaps}."]))
+    template, fields = (NARRATIVE_STORED_ATS_TEMPLATE, _without_ats_check(NARRATIVE_FIELDS)) if ats_summary else (NARRATIVE_TEMPLATE, NARRATIVE_FIELDS)
+    messages = build_messages(template, inputs.resume.text, inputs.job_description.text, details)
+    try:
+        result = await _complete_routed("narrative", messages, ResponseSchema(LLMNarrativeResult, fields),
+                                        lambda result: _narrative_confidence_issue(result, missing_keywords, not ats_summary),
+                                        max_tokens=600) # Narrative only, no score to reason about
+    except UpstreamUnavailableError:
+        raise
+    except Exception as e:
+        print(f"LLM narrative error: {e}")
+        return None
+    if ats_summary:
+        result.ats_compatibility_check = ats_summary
+    return result
+
+def _narrative_confidence_issue(result: LLMNarrativeResult, missing_keywords: List[str], check_ats: bool = True) -> Optional[str]:
+    if not result.strength_summary.strip() or (check_ats and not result.ats_compatibility_check.strip()):
+        return "thin_output"
+    if missing_keywords and not result.improvement_suggestions:
+        return "no_suggestions" # There are known gaps, so there is something to suggest
+    return None
 
 # Added for Interview Prep
 class InterviewQuestion(BaseModel):
@@ -65,70 +391,63 @@ class InterviewPrepResult(BaseModel):
     generated_questions: List[InterviewQuestion] = Field(default_factory=list)
     preparation_tips: List[str] = Field(default_factory=list, description="General tips based on the JD/resume.")
 
-async def generate_interview_questions_with_llm(resume_text: str, job_description_text: str) -> Optional[InterviewPrepResult]:
-    if not settings.OPENAI_API_KEY:
-        print("OpenAI API key not configured. Cannot generate interview questions.")
-        return None
-
-    system_prompt = '''You are an AI Interview Coach. Your task is to generate insightful interview questions based on a candidate's resume and a specific job description.
-Provide your output ONLY as a JSON object with the following structure:
-{
-  "generated_questions": [
-    { "category": "Behavioral", "question": "<Generated behavioral question>" },
-    { "category": "Technical", "question": "<Generated technical question relevant to skills in JD/resume>" },
-    { "category": "Situational", "question": "<Generated situational question based on JD challenges>" }
-  ],
-  "preparation_tips": [
-    "<General tip 1 for preparing for an interview for this role, based on JD/resume>",
-    "<General tip 2...>"
-  ]
-}
-Focus on questions that help the candidate showcase their experience relevant to the job.
-For technical questions, ensure they relate to skills mentioned in the resume or required by the job description.
-Aim for a mix of 5-7 good questions in total.
-'''
+def _coerce_questions(value: Any) -> List[Dict[str, str]]:
+    """Question objects from a list of objects or plain strings, or from {"<category>": [questions]}.
+    Items without question text are dropped; a missing category becomes "General"."""
+    if isinstance(value, dict):
+        value = [{"category": category, "question": question} for category, questions in value.items()
+                 for question in (questions if isinstance(questions, list) else [questions])]
+    if not isinstance(value, list):
+        raise TypeError(f"Not a question list: {value!r}")
+    questions = []
+    for item in value:
+        if isinstance(item, dict):
+            item = {normalize_key(key): field for key, field in item.items()}
+            text, category = item.get("question") or item.get("text"), item.get("category") or item.get("type")
+        else:
+            text, category = item, None
+        try:
+            text = coerce_text(text)
+            category = coerce_text(category) if category is not None else ""
+        except TypeError:
+            continue
+        if text:
+            questions.append({"question": text, "category": category or "General"})
+    if not questions:
+        raise ValueError("No usable questions")
+    return questions
 
-    user_prompt = f'''Please generate interview questions and preparation tips based on the following resume and job description.
+INTERVIEW_SCHEMA = ResponseSchema(InterviewPrepResult, {
+    "generated_questions": FieldRule(_coerce_questions),
+    "preparation_tips": FieldRule(coerce_text_list, required=False),
+}, list_key="generated_questions")
 
-**Resume:**
----
-{resume_text}
----
+async def generate_interview_questions_with_llm(resume_text: str, job_description_text: str,
+                                               profile: Optional[ResumeProfile] = None) -> Optional[InterviewPrepResult]:
+    key = make_request_key("interview_prep", resume_text, job_description_text)
+    result = await run_single_flight(key, lambda: _generate_interview_questions_with_llm(resume_text, job_description_text, profile))
+    return result.model_copy(deep=True) if result is not None else None
 
-**Job Description:**
----
-{job_description_text}
----
+def _build_interview_messages(resume_text: str, job_description_text: str, profile: Optional[ResumeProfile] = None) -> List[Dict[str, str]]:
+    inputs = _prompt_inputs(resume_text, job_description_text, profile)
+    return build_messages(INTERVIEW_TEMPLATE, inputs.resume.text, inputs.job_description.text)
 
-Provide your output in the specified JSON format.
-'''
+async def _generate_interview_questions_with_llm(resume_text: str, job_description_text: str,
+                                                profile: Optional[ResumeProfile] = None) -> Optional[InterviewPrepResult]:
+    backend = get_llm_backend()
+    if not backend.is_configured():
+        print(f"LLM backend {backend.name!r} not configured. Cannot generate interview questions.")
+        return None
 
+    messages = _build_interview_messages(resume_text, job_description_text, profile)
     try:
-        client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-        completion = await client.chat.completions.create(
-            model="gpt-3.5-turbo-0125",
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.5,
-            max_tokens=1800 # Increased token limit
-        )
-
-        raw_response_content = completion.choices[0].message.content
-        if not raw_response_content:
-            print("LLM returned empty content for interview questions.")
-            return None
-
-        parsed_json = json.loads(raw_response_content)
-        return InterviewPrepResult(**parsed_json)
-
-    except json.JSONDecodeError as e:
+        return await _complete_routed("interview", messages, INTERVIEW_SCHEMA, _interview_confidence_issue,
+                                      temperature=0.5, max_tokens=1800) # Increased token limit
+    except JSONRepairError as e:
         print(f"Failed to parse LLM response for interview questions as JSON: {e}")
-        raw_content_for_print = raw_response_content if 'raw_response_content' in locals() else 'N/A'
-        print(f"Raw LLM response: {raw_content_for_print}")
         return None
+    except UpstreamUnavailableError:
+        raise
     except openai.APIError as e: # Specific catch for OpenAI API errors
         print(f"OpenAI API error during interview question generation: {e.type if hasattr(e, 'type') else 'Unknown API Error'}") # More detailed error logging
         if hasattr(e, 'response') and e.response is not None:
@@ -142,3 +461,96 @@ Provide your output in the specified JSON format.
     except Exception as e:
         print(f"An unexpected error occurred during interview question generation: {e}")
         return None
+
+MIN_INTERVIEW_QUESTIONS = 3 # Fewer distinct questions than this from a fast tier escalates
+
+def _interview_confidence_issue(result: InterviewPrepResult) -> Optional[str]:
+    questions = {question.question.strip().lower() for question in result.generated_questions if question.question.strip()}
+    if len(questions) < MIN_INTERVIEW_QUESTIONS:
+        return "too_few_questions"
+    return None
+
+class InterviewStreamError(Exception):
+    pass
+
+async def stream_interview_questions_with_llm(resume_text: str, job_description_text: str,
+                                              profile: Optional[ResumeProfile] = None) -> AsyncIterator[Union[InterviewQuestion, InterviewPrepResult]]:
+    """Streams the interview-prep completion, yielding each InterviewQuestion as soon as the model
+    has finished writing it, then the validated InterviewPrepResult parsed from the full response.
+
+    Only the route's first tier is streamed. On a tiered route, an answer the fast model gets wrong is
+    escalated to the strong model without streaming; the final result then replaces the streamed questions.
+
+    Raises InterviewStreamError if the API call fails or the final document doesn't validate.
+    """
+    backend = get_llm_backend()
+    if not backend.is_configured():
+        raise InterviewStreamError(f"LLM backend {backend.name!r} not configured.")
+    try:
+        tiers = route_tiers("interview")
+    except ValueError as e:
+        raise InterviewStreamError(str(e)) from e
+    metrics.increment("llm_route.interview.calls")
+
+    started = time.perf_counter()
+    first_question_seen = False
+    parser = JsonArrayItemStream("generated_questions")
+    messages = _build_interview_messages(resume_text, job_description_text, profile)
+    tier, model = tiers[0]
+    try:
+        stream = await backend.stream(messages, temperature=0.5, max_tokens=1800, model=model)
+    except UpstreamUnavailableError as e:
+        raise InterviewStreamError("LLM is temporarily unavailable, please retry shortly.") from e
+    except Exception as e:
+        print(f"OpenAI API error starting interview question stream: {e}")
+        raise InterviewStreamError("LLM request failed.") from e
+
+    try:
+        async for delta in stream:
+            for item in parser.feed(delta):
+                try:
+                    question = InterviewQuestion(**item)
+                except ValidationError:
+                    continue # Incomplete question object; the final validation still covers it
+                if not first_question_seen:
+                    first_question_seen = True
+                    metrics.observe_latency("interview_stream.time_to_first_question_ms", (time.perf_counter() - started) * 1000)
+                yield question
+    except Exception as e:
+        print(f"Error while reading interview question stream: {e}")
+        raise InterviewStreamError("LLM stream was interrupted.") from e
+    finally:
+        # Stop the upstream generation too if our client went away mid-stream
+        await stream.close()
+
+    metrics.observe_latency(f"llm_route.interview.{tier}_ms", (time.perf_counter() - started) * 1000)
+    _record_prompt_usage("interview", stream.prompt_tokens, stream.cached_tokens)
+
+    result, reason = None, None
+    try:
+        result = await _parse_response("interview", INTERVIEW_SCHEMA, parser.buffer, model, messages, temperature=0.5, max_tokens=1800)
+    except UpstreamUnavailableError as e:
+        raise InterviewStreamError("LLM is temporarily unavailable, please retry shortly.") from e
+    except PARSE_ERRORS as e:
+        print(f"Failed to parse streamed interview questions: {e}")
+        print(f"Raw LLM response: {parser.buffer}")
+        if len(tiers) == 1:
+            raise InterviewStreamError("LLM returned an invalid response.") from e
+        reason = _parse_rejection(e)
+    except Exception as e:
+        print(f"Follow-up request for missing interview fields failed: {e}")
+        raise InterviewStreamError("LLM request failed.") from e
+    if result is not None and len(tiers) > 1:
+        reason = _interview_confidence_issue(result)
+    if reason is not None:
+        _record_escalation("interview", model, reason)
+        try:
+            result = await _run_tiers("interview", tiers[1:], messages, INTERVIEW_SCHEMA, _interview_confidence_issue,
+                                      fallback=result, temperature=0.5, max_tokens=1800)
+        except UpstreamUnavailableError as e:
+            raise InterviewStreamError("LLM is temporarily unavailable, please retry shortly.") from e
+        except Exception as e:
+            print(f"Escalated interview question generation failed: {e}")
+            raise InterviewStreamError("LLM returned an invalid response.") from e
+    metrics.observe_latency("interview_stream.total_ms", (time.perf_counter() - started) * 1000)
+    yield result
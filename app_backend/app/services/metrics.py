@@ -0,0 +1,58 @@
+# Minimal in-process metrics: counters and latency histograms kept per worker.
+# Exposed through GET /admin-tasks/metrics; good enough to compare latencies and rates
+# between deployments without running a metrics backend.
+import math
+import threading
+from collections import defaultdict, deque
+from typing import Deque, Dict, Iterable
+
+LATENCY_SAMPLE_SIZE = 1000 # Most recent samples kept per latency metric
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = defaultdict(float)
+_latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=LATENCY_SAMPLE_SIZE))
+_latency_totals: Dict[str, int] = defaultdict(int)
+
+def increment(name: str, value: float = 1) -> None:
+    with _lock:
+        _counters[name] += value
+
+def observe_latency(name: str, milliseconds: float) -> None:
+    with _lock:
+        _latencies[name].append(milliseconds)
+        _latency_totals[name] += 1
+
+def percentile(samples: Iterable[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0) # Nearest-rank percentile
+    return ordered[rank]
+
+def get_counter(name: str) -> float:
+    with _lock:
+        return _counters.get(name, 0)
+
+def snapshot() -> dict:
+    with _lock:
+        counters = dict(_counters)
+        latencies = {name: (list(samples), _latency_totals[name]) for name, samples in _latencies.items()}
+    return {
+        "counters": counters,
+        "latencies_ms": {
+            name: {
+                "count": total,
+                "p50": round(percentile(samples, 50), 2),
+                "p95": round(percentile(samples, 95), 2),
+                "p99": round(percentile(samples, 99), 2),
+                "max": round(max(samples), 2) if samples else 0.0,
+            }
+            for name, (samples, total) in latencies.items()
+        },
+    }
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _latencies.clear()
+        _latency_totals.clear()
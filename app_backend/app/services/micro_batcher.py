@@ -0,0 +1,73 @@
+# Gathers items submitted concurrently into one batched call.
+#
+# Concurrent uploads each need an embedding and a Qdrant write. One at a time, every upload pays a full
+# API round trip and an RPM slot. A MicroBatcher holds submitted items for at most `window_ms` (or until
+# `max_items` / `max_cost` is reached), hands them to `flush` as one list, and resolves each caller with
+# its own result. If the batched call fails, every caller in that batch gets the exception.
+# Per batcher it records <name>.batches, <name>.items and <name>.wait_ms (the latency batching adds).
+import asyncio
+import time
+from typing import Awaitable, Callable, Generic, List, Optional, Set, Tuple, TypeVar
+
+from app.services import metrics
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+class MicroBatcher(Generic[T, R]):
+    def __init__(self, name: str, flush: Callable[[List[T]], Awaitable[List[R]]], window_ms: float,
+                 max_items: int, max_cost: int = 0):
+        self.name = name
+        self._flush = flush
+        self._window = window_ms / 1000
+        self._max_items = max(max_items, 1)
+        self._max_cost = max_cost # 0 = no cost limit
+        self._pending: List[Tuple[T, asyncio.Future, float]] = []
+        self._pending_cost = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Set[asyncio.Task] = set() # Keeps running flushes referenced
+
+    async def submit(self, item: T, cost: int = 0) -> R:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop: # Pending items of another (closed) loop can never be resolved
+            self._loop, self._pending, self._pending_cost, self._timer = loop, [], 0, None
+        if self._max_cost and self._pending and self._pending_cost + cost > self._max_cost:
+            self._flush_pending() # This item would push the batch over its limit: send what we have
+        future = loop.create_future()
+        self._pending.append((item, future, time.perf_counter()))
+        self._pending_cost += cost
+        if self._window <= 0 or len(self._pending) >= self._max_items or (self._max_cost and self._pending_cost >= self._max_cost):
+            self._flush_pending()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window, self._flush_pending)
+        return await future
+
+    def _flush_pending(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._pending_cost = self._pending, [], 0
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[T, asyncio.Future, float]]) -> None:
+        started = time.perf_counter()
+        metrics.increment(f"{self.name}.batches")
+        metrics.increment(f"{self.name}.items", len(batch))
+        for _, _, submitted in batch:
+            metrics.observe_latency(f"{self.name}.wait_ms", (started - submitted) * 1000)
+        try:
+            results = await self._flush([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"{self.name}: batch of {len(batch)} returned {len(results)} results")
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done(): # A caller may have been cancelled while waiting
+                    future.set_exception(e)
+            return
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
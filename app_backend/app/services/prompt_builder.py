@@ -0,0 +1,237 @@
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+
+try:
+    import tiktoken
+except ImportError: # tiktoken is optional; fall back to an approximate counter
+    tiktoken = None
+
+DEFAULT_TOKENIZER_MODEL = "gpt-3.5-turbo-0125"
+
+# --- Tokenizers ---
+
+class _TiktokenTokenizer:
+    def __init__(self, encoding):
+        self.name = encoding.name
+        self._encoding = encoding
+
+    def count(self, text: str) -> int:
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        tokens = self._encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return self._encoding.decode(tokens[:max(max_tokens, 0)])
+
+class _ApproximateTokenizer:
+    # Words, numbers and individual punctuation marks each count as one token.
+    # Close enough to BPE counts on English resume text to enforce a budget.
+    name = "approximate"
+    _TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+    def count(self, text: str) -> int:
+        return len(self._TOKEN_RE.findall(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if max_tokens <= 0:
+            return ""
+        for index, match in enumerate(self._TOKEN_RE.finditer(text), start=1):
+            if index == max_tokens:
+                return text[:match.end()]
+        return text
+
+@lru_cache(maxsize=8)
+def get_tokenizer(model: str = DEFAULT_TOKENIZER_MODEL):
+    # Loaded once per model; building a tiktoken encoding takes ~100ms and may need network on first use
+    if tiktoken is not None:
+        try:
+            try:
+                return _TiktokenTokenizer(tiktoken.encoding_for_model(model))
+            except KeyError: # A model tiktoken doesn't know yet
+                return _TiktokenTokenizer(tiktoken.get_encoding("cl100k_base"))
+        except Exception as e: # Also the fallback, e.g. offline without a cached BPE file
+            print(f"Could not load tiktoken encoding for {model}, using approximate token counts: {e}")
+    return _ApproximateTokenizer()
+
+def count_tokens(text: str, model: str = DEFAULT_TOKENIZER_MODEL) -> int:
+    return get_tokenizer(model).count(text)
+
+# --- Section detection ---
+
+# Dropped first to last when the text is over budget. Skills, summary and experience are never
+# dropped: they carry the evidence the analysis is about.
+LOW_VALUE_SECTIONS = ["references", "hobbies", "personal", "volunteer", "publications", "awards", "languages", "objective", "benefits", "about_company"]
+
+_SECTION_HEADINGS = {
+    "summary": ["summary", "professional summary", "profile", "career summary", "about me"],
+    "objective": ["objective", "career objective"],
+    "skills": ["skills", "technical skills", "core skills", "key skills", "core competencies", "competencies", "technologies", "tech stack",
+               "requirements", "qualifications", "required qualifications", "preferred qualifications", "must have", "nice to have"],
+    "experience": ["experience", "work experience", "professional experience", "employment", "employment history", "work history",
+                   "projects", "key projects", "responsibilities", "what you'll do", "what you will do", "the role"],
+    "education": ["education", "academic background", "certifications", "certificates", "training"],
+    "awards": ["awards", "honors", "honours", "achievements"],
+    "publications": ["publications"],
+    "volunteer": ["volunteer", "volunteering", "volunteer experience"],
+    "languages": ["languages"],
+    "hobbies": ["hobbies", "interests", "hobbies and interests", "hobbies & interests"],
+    "references": ["references"],
+    "personal": ["personal details", "personal information", "personal data"],
+    "benefits": ["benefits", "perks", "what we offer", "compensation", "perks and benefits"],
+    "about_company": ["about us", "about the company", "who we are", "our mission", "company overview"],
+}
+_HEADING_LOOKUP = {heading: name for name, headings in _SECTION_HEADINGS.items() for heading in headings}
+
+_BOILERPLATE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in [
+    r"^references (are )?available (up)?on request\.?$",
+    r"^page \d+( of \d+)?$",
+    r"^curriculum vitae$",
+    r"^r[ée]sum[ée]$",
+    r"^(confidential|private and confidential)$",
+    r".*\b(is an|are an|is a proud) equal (employment )?opportunity employer\b.*",
+    r".*\ball qualified applicants will receive consideration\b.*",
+    r"^(apply now|click here to apply|share this job)\.?$",
+    r"^(https?://|www\.)\S+$",
+]]
+
+def _heading_name(line: str) -> Optional[str]:
+    candidate = line.strip().strip(":#*-•|").strip().lower()
+    if not candidate or len(candidate) > 40:
+        return None
+    return _HEADING_LOOKUP.get(candidate)
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """Splits text into (section_name, body) pairs; text before the first heading is 'header'."""
+    sections: List[Tuple[str, List[str]]] = [("header", [])]
+    for line in text.splitlines():
+        name = _heading_name(line)
+        if name is not None:
+            sections.append((name, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, "\n".join(lines)) for name, lines in sections if "\n".join(lines).strip()]
+
+def normalize_whitespace(text: str) -> str:
+    lines = []
+    previous = None
+    for raw_line in text.splitlines():
+        line = re.sub(r"[ \t ]+", " ", raw_line).strip()
+        if line == previous and line: # Repeated lines, e.g. a name header on every PDF page
+            continue
+        if not line and (not lines or not lines[-1]):
+            continue
+        lines.append(line)
+        previous = line
+    return "\n".join(lines).strip()
+
+def strip_boilerplate(text: str) -> str:
+    kept = [line for line in text.splitlines() if not any(p.match(line.strip()) for p in _BOILERPLATE_PATTERNS)]
+    return "\n".join(kept)
+
+# --- Budgeted compaction ---
+
+class CompactedText(BaseModel):
+    text: str
+    original_tokens: int
+    tokens: int
+    budget: int
+    steps: List[str] = Field(default_factory=list, description="Compaction steps that were applied, in order.")
+    dropped_sections: List[str] = Field(default_factory=list)
+
+    @property
+    def was_compacted(self) -> bool:
+        return bool(self.steps)
+
+def _join_sections(sections: List[Tuple[str, str]]) -> str:
+    return "\n\n".join(body.strip() for _, body in sections if body.strip())
+
+def compact_to_budget(text: str, budget: int, model: str = DEFAULT_TOKENIZER_MODEL) -> CompactedText:
+    """Fits text into `budget` tokens, applying progressively lossier steps only while over budget:
+    whitespace/duplicate-line cleanup, boilerplate removal, dropping low-value sections, and finally
+    truncating sections (skills, summary and experience keep their share of the budget first)."""
+    tokenizer = get_tokenizer(model)
+    original_tokens = tokenizer.count(text)
+    result = CompactedText(text=text, original_tokens=original_tokens, tokens=original_tokens, budget=budget)
+    if original_tokens <= budget:
+        return result
+
+    current = normalize_whitespace(text)
+    result.steps.append("normalize_whitespace")
+    if tokenizer.count(current) > budget:
+        current = normalize_whitespace(strip_boilerplate(current))
+        result.steps.append("strip_boilerplate")
+
+    if tokenizer.count(current) > budget:
+        # Count each section once; the running total stands in for re-counting the joined text.
+        sections = [(name, body, tokenizer.count(body)) for name, body in split_sections(current)]
+        total = sum(count for _, _, count in sections)
+        for low_value in LOW_VALUE_SECTIONS:
+            if total <= budget:
+                break
+            if any(name == low_value for name, _, _ in sections):
+                total -= sum(count for name, _, count in sections if name == low_value)
+                sections = [section for section in sections if section[0] != low_value]
+                result.dropped_sections.append(low_value)
+        if result.dropped_sections:
+            result.steps.append("drop_low_value_sections")
+
+        if total > budget:
+            sections = _truncate_sections(sections, budget, tokenizer)
+            result.steps.append("truncate_sections")
+        current = _join_sections([(name, body) for name, body, _ in sections])
+
+    # Section separators can add a token or two; hard cap as a last resort.
+    if tokenizer.count(current) > budget:
+        current = tokenizer.truncate(current, budget)
+    result.text = current
+    result.tokens = tokenizer.count(current)
+    return result
+
+# Order in which sections claim the remaining budget during truncation; unlisted sections come last.
+_TRUNCATION_PRIORITY = ["skills", "summary", "experience", "header", "education"]
+
+def _truncate_sections(sections: List[Tuple[str, str, int]], budget: int, tokenizer) -> List[Tuple[str, str, int]]:
+    # Sections claim budget greedily in priority order (skills and experience before anything else),
+    # then are emitted in their original document order.
+    def priority(index: int) -> Tuple[int, int]:
+        name = sections[index][0]
+        rank = _TRUNCATION_PRIORITY.index(name) if name in _TRUNCATION_PRIORITY else len(_TRUNCATION_PRIORITY)
+        return rank, index
+
+    shares = {}
+    remaining = budget
+    for index in sorted(range(len(sections)), key=priority):
+        shares[index] = min(sections[index][2], remaining)
+        remaining -= shares[index]
+
+    truncated = []
+    for index, (name, body, count) in enumerate(sections):
+        share = shares[index]
+        if share <= 0:
+            continue
+        truncated.append((name, tokenizer.truncate(body, share), share) if share < count else (name, body, count))
+    return truncated
+
+# --- Prompt inputs ---
+
+class PromptInputs(BaseModel):
+    resume: CompactedText
+    job_description: CompactedText
+
+@lru_cache(maxsize=256)
+def _compact_cached(text: str, budget: int, model: str) -> CompactedText:
+    # Batches send the same resume or job description with every item; compact it once
+    return compact_to_budget(text, budget, model)
+
+def build_prompt_inputs(resume_text: str, job_description_text: str, model: str = DEFAULT_TOKENIZER_MODEL) -> PromptInputs:
+    resume = _compact_cached(resume_text, settings.LLM_RESUME_TOKEN_BUDGET, model)
+    job_description = _compact_cached(job_description_text, settings.LLM_JD_TOKEN_BUDGET, model)
+    if resume.was_compacted or job_description.was_compacted:
+        print(f"Prompt compacted: resume {resume.original_tokens}->{resume.tokens} tokens, "
+              f"job description {job_description.original_tokens}->{job_description.tokens} tokens.")
+    return PromptInputs(resume=resume, job_description=job_description)
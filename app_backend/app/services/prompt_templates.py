@@ -0,0 +1,114 @@
+# Versioned prompt templates, laid out so the provider can cache the shared prompt prefix.
+#
+# OpenAI (and compatible servers with prefix caching) reuse the work done for the longest prefix they
+# have seen recently. That prefix must be byte-identical and at least 1024 tokens long, and it grows in
+# 128-token steps. Cached input tokens are billed at a discount and skip most of the time to first token.
+# So every template puts its parts in the order of how often they are reused:
+#   1. the system message: the static instructions and output format, identical for every call of a feature
+#   2. the resume: the same for every job description that resume is checked against
+#   3. the job description
+#   4. the few lines that depend on both (skills found, gaps)
+# Batches that share the job description across every item flip 2 and 3 (shared_first="job_description").
+# Nothing that varies per call may go into the system message. Any change to a template's text must bump
+# its version, so cache hit rates and results can be compared per version.
+from typing import Dict, List, NamedTuple
+
+Messages = List[Dict[str, str]]
+
+class PromptTemplate(NamedTuple):
+    feature: str
+    version: int
+    system: str
+    variant: str = ""
+
+    @property
+    def name(self) -> str:
+        return f"{self.feature}-{self.variant}-v{self.version}" if self.variant else f"{self.feature}-v{self.version}"
+
+ANALYSIS_TEMPLATE = PromptTemplate("analysis", 2, """You are an AI Resume Analyzer. You compare one candidate's resume with one job description and report how well the candidate fits the role.
+
+The user message contains, in this order or with the first two swapped:
+- the resume, between "Resume:" and a line with three dashes. It is either the resume text or a compact profile of it (summary, seniority, skills by category, roles with their strongest achievements, education).
+- the job description, between "Job description:" and a line with three dashes.
+- a skills inventory produced by a keyword matcher over the full texts. Treat it as reliable evidence of which skills are present or missing, but judge depth and recency yourself.
+
+How to score (match_score, an integer from 0 to 100):
+- 90-100: meets every hard requirement and most preferred ones, at the seniority the job asks for.
+- 70-89: meets the core requirements; a few secondary skills or some years of experience are missing.
+- 50-69: relevant background, but one or more core requirements are missing or only weakly shown.
+- 30-49: adjacent role or a different stack; the candidate would need substantial ramp-up.
+- 0-29: unrelated background.
+Weigh required skills and experience above nice-to-haves, and demonstrated results above listed keywords. Do not reward keyword stuffing, and do not penalise a skill the resume shows under a different name.
+
+Field rules:
+- missing_keywords: skills, tools, certifications or qualifications the job description asks for that the resume does not show. Use the job description's wording. Most important first. At most 15.
+- strength_summary: two to four sentences on what makes this candidate a fit, citing concrete evidence from the resume.
+- improvement_suggestions: three to six specific, actionable edits to the resume for this job (what to add, quantify, reword or move). No generic advice.
+- ats_compatibility_check: one or two sentences on whether an applicant tracking system would parse this resume and match it to the job, based on section headings, keyword coverage and wording.
+
+Output ONLY JSON that strictly matches the requested schema, with no markdown and no commentary.
+Return JSON with keys: match_score, missing_keywords, strength_summary, improvement_suggestions, ats_compatibility_check.""")
+
+NARRATIVE_TEMPLATE = PromptTemplate("narrative", 2, """You are an AI Resume Analyzer. You compare one candidate's resume with one job description and write the narrative part of the analysis. The match score and the missing keywords have already been computed by a deterministic scorer; your text must agree with them.
+
+The user message contains, in this order or with the first two swapped:
+- the resume, between "Resume:" and a line with three dashes. It is either the resume text or a compact profile of it (summary, seniority, skills by category, roles with their strongest achievements, education).
+- the job description, between "Job description:" and a line with three dashes.
+- a skills inventory produced by a keyword matcher over the full texts, and the keywords from the job description the scorer found missing in the resume.
+
+Field rules:
+- strength_summary: two to four sentences on what makes this candidate a fit, citing concrete evidence from the resume.
+- improvement_suggestions: three to six specific, actionable edits to the resume for this job (what to add, quantify, reword or move). Cover the most important missing keywords the candidate could honestly claim. No generic advice.
+- ats_compatibility_check: one or two sentences on whether an applicant tracking system would parse this resume and match it to the job, based on section headings, keyword coverage and wording.
+
+Output ONLY JSON that strictly matches the requested schema, with no markdown and no commentary.
+Return JSON with keys: strength_summary, improvement_suggestions, ats_compatibility_check.""")
+
+INTERVIEW_TEMPLATE = PromptTemplate("interview", 2, '''You are an AI Interview Coach. Your task is to generate insightful interview questions based on a candidate's resume and a specific job description.
+The user message contains the resume, between "Resume:" and a line with three dashes, then the job description, between "Job description:" and a line with three dashes.
+The resume is either the resume text or a compact profile of it (summary, seniority, skills by category, roles with their strongest achievements, education).
+The questions should help the candidate prepare for an interview for the role described in the job description.
+Generate a mix of behavioral, technical (if applicable), and situational questions.
+Also, provide 2-3 general preparation tips relevant to the role or company type (if discernible).
+Output ONLY a valid JSON object with the following exact structure:
+{
+  "generated_questions": [
+    { "category": "Behavioral", "question": "<Generated behavioral question>" },
+    { "category": "Technical", "question": "<Generated technical question relevant to skills in JD/resume>" },
+    { "category": "Situational", "question": "<Generated situational question based on JD challenges>" }
+  ],
+  "preparation_tips": [
+    "<General tip 1 for preparing for an interview for this role, based on JD/resume>",
+    "<General tip 2...>"
+  ]
+}
+Focus on questions that help the candidate showcase their experience relevant to the job.
+For technical questions, ensure they relate to skills mentioned in the resume or required by the job description.
+Aim for a mix of 5-7 good questions in total.
+''')
+
+def without_ats_check(template: PromptTemplate) -> PromptTemplate:
+    """`template` for a resume with a stored ATS report. The report's summary is served as ats_compatibility_check,
+    so the model isn't asked for it; the variant is as static as the template, so it caches the same way."""
+    rule = next(line for line in template.system.splitlines() if line.startswith("- ats_compatibility_check:"))
+    system = template.system.replace(rule + "\n", "").replace(", ats_compatibility_check.", ".")
+    return template._replace(system=system, variant="stored-ats")
+
+ANALYSIS_STORED_ATS_TEMPLATE = without_ats_check(ANALYSIS_TEMPLATE)
+NARRATIVE_STORED_ATS_TEMPLATE = without_ats_check(NARRATIVE_TEMPLATE)
+
+TEMPLATES: Dict[str, PromptTemplate] = {template.feature: template for template in (ANALYSIS_TEMPLATE, NARRATIVE_TEMPLATE, INTERVIEW_TEMPLATE)}
+
+def build_messages(template: PromptTemplate, resume_text: str, job_description_text: str, details: str = "",
+                   shared_first: str = "resume") -> Messages:
+    """The chat messages for `template`, most reusable content first. `details` are the lines that depend
+    on both the resume and the job description, so they go last."""
+    resume = f"Resume:\n{resume_text}\n---"
+    job_description = f"Job description:\n{job_description_text}\n---"
+    blocks = [job_description, resume] if shared_first == "job_description" else [resume, job_description]
+    if details:
+        blocks.append(details)
+    return [
+        {"role": "system", "content": template.system},
+        {"role": "user", "content": "\n\n".join(blocks)}
+    ]
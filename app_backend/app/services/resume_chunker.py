@@ -0,0 +1,60 @@
+# Splits a resume into section-level chunks for the vector index.
+#
+# One vector for a whole resume averages every section together, and the embedding model truncates
+# long resumes. Each chunk here is one section, or a window of consecutive lines of a long section,
+# prefixed with its heading for context and kept under VECTOR_CHUNK_MAX_TOKENS. Searches then match
+# the section that answers the query, and vector_service aggregates the hits per resume.
+import math
+from typing import List, NamedTuple
+
+from app.core.config import settings
+from app.services.prompt_builder import count_tokens, normalize_whitespace, split_sections, strip_boilerplate
+
+# Never what a search is about
+SKIPPED_SECTIONS = ("references", "hobbies", "personal")
+
+class ResumeChunk(NamedTuple):
+    index: int
+    section: str
+    text: str
+
+def _split_long_line(line: str, budget: int) -> List[str]:
+    # PDF extraction sometimes yields a whole page as one line
+    tokens = count_tokens(line)
+    if tokens <= budget:
+        return [line]
+    words = line.split()
+    parts = math.ceil(tokens / budget)
+    size = math.ceil(len(words) / parts)
+    return [" ".join(words[start:start + size]) for start in range(0, len(words), size)]
+
+def _windows(lines: List[str], budget: int) -> List[List[str]]:
+    windows, window, used = [], [], 0
+    for line in lines:
+        for part in _split_long_line(line, budget):
+            part_tokens = count_tokens(part)
+            if window and used + part_tokens > budget:
+                windows.append(window)
+                window, used = [], 0
+            window.append(part)
+            used += part_tokens
+    if window:
+        windows.append(window)
+    return windows
+
+def chunk_resume(text: str, max_tokens: int = 0, max_chunks: int = 0) -> List[ResumeChunk]:
+    """The resume's chunks in document order, at most `max_chunks` (defaults from settings)."""
+    max_tokens = max_tokens or settings.VECTOR_CHUNK_MAX_TOKENS
+    max_chunks = max_chunks or settings.VECTOR_MAX_CHUNKS
+    cleaned = normalize_whitespace(strip_boilerplate(text or ""))
+    chunks: List[ResumeChunk] = []
+    for name, body in split_sections(cleaned):
+        if name in SKIPPED_SECTIONS:
+            continue
+        lines = [line for line in body.splitlines() if line.strip()]
+        heading = "" if name == "header" else lines.pop(0) # Section bodies start with their heading line
+        budget = max(max_tokens - count_tokens(heading), 1)
+        for window in _windows(lines, budget):
+            chunk_text = "\n".join([heading] + window if heading else window)
+            chunks.append(ResumeChunk(len(chunks), name, chunk_text))
+    return chunks[:max_chunks]
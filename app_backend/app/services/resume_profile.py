@@ -0,0 +1,236 @@
+# Compact, job-description-independent profile of a resume, built once at upload and stored with it.
+#
+# Without it every analysis and interview-prep prompt carries the whole resume, and the model re-derives
+# the same skills, seniority and highlights each time. The profile keeps what those prompts need
+# (summary, seniority, skills by category, each role with its strongest bullets, education) and drops
+# what they don't (contact details, hobbies, references, PDF artefacts). It is deterministic and
+# built from the taxonomy matcher and section splitter the prompts already use, so it costs a few
+# milliseconds and no LLM call.
+import datetime
+import re
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field, ValidationError
+
+from app.services.prompt_builder import count_tokens, normalize_whitespace, split_sections, strip_boilerplate
+from app.services.skill_taxonomy import extract_skills, summarize_skills
+
+# Bump when the extraction changes; stored profiles with an older version are rebuilt
+RESUME_PROFILE_VERSION = 1
+
+MAX_ROLES = 6
+MAX_HIGHLIGHTS_PER_ROLE = 3
+MAX_EDUCATION_LINES = 4
+MAX_SUMMARY_WORDS = 60
+MAX_LINE_CHARS = 220
+
+SENIORITY_LEVELS = ("unknown", "intern", "junior", "mid", "senior", "lead", "principal", "executive")
+# Checked from the most senior down, so "Senior Engineering Manager" is lead rather than senior
+_TITLE_LEVELS = [
+    ("executive", re.compile(r"\b(cto|ceo|cio|coo|vp|vice president|director|head of|chief)\b", re.IGNORECASE)),
+    ("principal", re.compile(r"\b(principal|staff|distinguished|architect)\b", re.IGNORECASE)),
+    ("lead", re.compile(r"\b(lead|manager|team lead|tech lead)\b", re.IGNORECASE)),
+    ("senior", re.compile(r"\b(senior|sr\.?)(?=\s|$)", re.IGNORECASE)),
+    ("junior", re.compile(r"\b(junior|jr\.?|associate|graduate|entry[- ]level)(?=\s|$)", re.IGNORECASE)),
+    ("intern", re.compile(r"\b(intern|internship|trainee|apprentice)\b", re.IGNORECASE)),
+]
+
+_MONTHS = {name: index for index, names in enumerate(
+    [("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"), ("may",), ("jun", "june"),
+     ("jul", "july"), ("aug", "august"), ("sep", "sept", "september"), ("oct", "october"), ("nov", "november"), ("dec", "december")],
+    start=1) for name in names}
+_DATE = r"(?:(?P<{p}month>[A-Za-z]{{3,9}})\.?\s+|(?P<{p}num>\d{{1,2}})/)?(?P<{p}year>(?:19|20)\d{{2}})"
+_RANGE_RE = re.compile(
+    _DATE.format(p="s") + r"\s*(?:-|–|—|to|until)\s*(?:" + _DATE.format(p="e") + r"|(?P<present>present|current|now|today|date))",
+    re.IGNORECASE)
+_YEARS_RE = re.compile(r"\b(\d{1,2})\+?\s*(?:years|yrs)\b", re.IGNORECASE)
+_BULLET_RE = re.compile(r"^\s*(?:[-*•▪◦‣●]|\d+[.)])\s+")
+_CONTACT_RE = re.compile(r"@|https?://|www\.|linkedin\.com|github\.com|\+?\d[\d\s().-]{7,}\d")
+
+class ProfileRole(BaseModel):
+    title: str # The role line without its dates, e.g. "Senior Engineer, Acme Corp"
+    dates: Optional[str] = None
+    highlights: List[str] = Field(default_factory=list)
+
+class ProfileSection(BaseModel):
+    name: str
+    tokens: int
+
+class ResumeProfile(BaseModel):
+    version: int = RESUME_PROFILE_VERSION
+    summary: str = ""
+    seniority: str = "unknown" # One of SENIORITY_LEVELS
+    years_experience: Optional[float] = None
+    skills: Dict[str, List[str]] = Field(default_factory=dict) # Category -> canonical skills, most mentioned first
+    roles: List[ProfileRole] = Field(default_factory=list) # Most recent first, as written
+    education: List[str] = Field(default_factory=list)
+    sections: List[ProfileSection] = Field(default_factory=list) # Section breakdown of the source text
+    source_tokens: int = 0
+    profile_tokens: int = 0 # Of render_profile(), what prompts actually carry
+    elapsed_ms: float = 0.0
+
+def _clip(line: str, limit: int = MAX_LINE_CHARS) -> str:
+    line = line.strip()
+    return line if len(line) <= limit else line[:limit].rsplit(" ", 1)[0] + "…"
+
+def _body_lines(body: str) -> List[str]:
+    # Section bodies start with their heading line
+    return [line.strip() for line in body.splitlines()[1:] if line.strip()]
+
+def _month_index(match: re.Match, prefix: str) -> Optional[int]:
+    year = match.group(f"{prefix}year")
+    if year is None:
+        return None
+    month_name, month_number = match.group(f"{prefix}month"), match.group(f"{prefix}num")
+    # A bare year counts from mid-year, so "2019 - 2021" is two years
+    month = _MONTHS.get((month_name or "").lower()) or (int(month_number) if month_number and 1 <= int(month_number) <= 12 else 7)
+    return int(year) * 12 + month - 1
+
+def _range_months(match: re.Match, today: datetime.date) -> Optional[Tuple[int, int]]:
+    now = today.year * 12 + today.month - 1
+    start = _month_index(match, "s")
+    end = now if match.group("present") else _month_index(match, "e")
+    if start is None or end is None or end < start:
+        return None
+    return start, min(end, now)
+
+def _total_years(ranges: List[Tuple[int, int]]) -> Optional[float]:
+    if not ranges:
+        return None
+    months, current_start, current_end = 0, None, None
+    for start, end in sorted(ranges): # Overlapping roles count once
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                months += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    months += current_end - current_start
+    return round(months / 12, 1)
+
+def _bullet_score(line: str) -> int:
+    # Quantified outcomes and concrete skills are what the analysis and the questions feed on
+    return 2 * bool(re.search(r"\d", line)) + len(extract_skills(line))
+
+def _roles(lines: List[str], today: datetime.date) -> Tuple[List[ProfileRole], List[Tuple[int, int]]]:
+    roles: List[Tuple[ProfileRole, List[str]]] = []
+    ranges = []
+    previous_plain = None
+    for line in lines:
+        is_bullet = bool(_BULLET_RE.match(line))
+        match = None if is_bullet else _RANGE_RE.search(line)
+        if match:
+            months = _range_months(match, today)
+            if months:
+                ranges.append(months)
+            title = (line[:match.start()] + line[match.end():]).strip(" \t,|–—-()[]")
+            if not title and previous_plain: # Dates on a line of their own, under the title
+                title = previous_plain
+                if roles and roles[-1][1] and roles[-1][1][-1] == previous_plain:
+                    roles[-1][1].pop()
+            roles.append((ProfileRole(title=_clip(title or "Role"), dates=match.group(0).strip()), []))
+        elif roles:
+            roles[-1][1].append(_BULLET_RE.sub("", line))
+        previous_plain = None if is_bullet else line
+
+    result = []
+    for role, bullets in roles[:MAX_ROLES]:
+        ranked = sorted(range(len(bullets)), key=lambda index: (-_bullet_score(bullets[index]), index))[:MAX_HIGHLIGHTS_PER_ROLE]
+        role.highlights = [_clip(bullets[index]) for index in sorted(ranked)]
+        result.append(role)
+    return result, ranges
+
+def _seniority(roles: List[ProfileRole], years: Optional[float]) -> str:
+    if roles:
+        for level, pattern in _TITLE_LEVELS:
+            if pattern.search(roles[0].title):
+                return level
+    if years is None:
+        return "unknown"
+    if years < 2:
+        return "junior"
+    return "mid" if years < 5 else "senior" # Years alone never make someone a lead
+
+def _summary(summary_lines: List[str]) -> str:
+    words = " ".join(summary_lines).split()
+    text = " ".join(words[:MAX_SUMMARY_WORDS])
+    return text + ("…" if len(words) > MAX_SUMMARY_WORDS else "")
+
+def build_profile(text: str, today: Optional[datetime.date] = None) -> ResumeProfile:
+    started = time.perf_counter()
+    today = today or datetime.date.today()
+    cleaned = normalize_whitespace(strip_boilerplate(text))
+    sections = split_sections(cleaned)
+
+    summary_lines, experience_lines, education_lines = [], [], []
+    for name, body in sections:
+        if name == "summary":
+            summary_lines += _body_lines(body)
+        elif name == "experience":
+            experience_lines += _body_lines(body)
+        elif name == "education":
+            education_lines += [line for line in _body_lines(body) if not _CONTACT_RE.search(line)]
+
+    roles, ranges = _roles(experience_lines, today)
+    years = _total_years(ranges)
+    if years is None:
+        stated = [int(match.group(1)) for match in _YEARS_RE.finditer(" ".join(summary_lines))]
+        years = float(max(stated)) if stated else None
+
+    skills: Dict[str, List[str]] = {}
+    for skill in sorted(summarize_skills(extract_skills(cleaned)), key=lambda entry: -entry.count): # Stable: ties keep first-mention order
+        skills.setdefault(skill.category, []).append(skill.skill)
+
+    profile = ResumeProfile(
+        summary=_summary(summary_lines),
+        seniority=_seniority(roles, years),
+        years_experience=years,
+        skills=skills,
+        roles=roles,
+        education=[_clip(line) for line in education_lines[:MAX_EDUCATION_LINES]],
+        sections=[ProfileSection(name=name, tokens=count_tokens(body)) for name, body in sections],
+        source_tokens=count_tokens(text),
+    )
+    profile.profile_tokens = count_tokens(render_profile(profile))
+    profile.elapsed_ms = (time.perf_counter() - started) * 1000
+    return profile
+
+def render_profile(profile: ResumeProfile) -> str:
+    """The profile as prompt text."""
+    lines = []
+    if profile.summary:
+        lines.append(f"Summary: {profile.summary}")
+    if profile.seniority != "unknown" or profile.years_experience is not None:
+        years = f" (~{profile.years_experience:g} years)" if profile.years_experience is not None else ""
+        lines.append(f"Seniority: {profile.seniority}{years}")
+    if profile.skills:
+        lines.append("Skills: " + "; ".join(f"{category}: {', '.join(skills)}" for category, skills in profile.skills.items()))
+    if profile.roles:
+        lines.append("Experience:")
+        for role in profile.roles:
+            dates = f" ({role.dates})" if role.dates else ""
+            lines.append(f"- {role.title}{dates}")
+            lines += [f"  - {highlight}" for highlight in role.highlights]
+    if profile.education:
+        lines.append("Education: " + "; ".join(profile.education))
+    return "\n".join(lines)
+
+def profile_from_stored(data: Optional[dict]) -> Optional[ResumeProfile]:
+    """A stored profile, or None if there is none or it was built by an older version."""
+    if not data or data.get("version") != RESUME_PROFILE_VERSION:
+        return None
+    try:
+        return ResumeProfile.model_validate(data)
+    except ValidationError:
+        return None
+
+@lru_cache(maxsize=256)
+def _profile_cached(text: str) -> ResumeProfile:
+    # Pasted resumes have no stored profile; batches and retries send the same text again
+    return build_profile(text)
+
+def get_resume_profile(text: str, stored: Optional[dict] = None) -> ResumeProfile:
+    """The stored profile when it is current, otherwise one built from `text`."""
+    return profile_from_stored(stored) or _profile_cached(text)
@@ -0,0 +1,214 @@
+# Deterministic resume/job-description scoring, computed locally in milliseconds.
+#
+# The job description is the query; the resume is split into chunks (roughly paragraphs) which
+# form the document collection for BM25. JD terms (unigrams and bigrams) are weighted by sublinear
+# TF times IDF, where the IDF is taken over the resume chunks plus the JD's own lines, so terms
+# that appear everywhere count for less. The final score blends:
+#   - weighted keyword coverage: how much of the JD's term weight appears in the resume at all,
+#   - BM25 strength: how well the best-matching resume chunks score against the JD terms,
+#   - TF-IDF cosine similarity of the two documents,
+#   - optionally, cosine similarity of their embeddings.
+import asyncio
+import math
+import re
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+from app.services.skill_taxonomy import canonicalize, compare_skills, extract_skills
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[.\-/][a-z0-9+#]+)*")
+# Bigrams never span these, so list items like "Redis, Docker" don't produce a "redis docker" phrase
+_PHRASE_BREAK_RE = re.compile(r"[,;:\n()|\u2022]|[.!?](?:\s|$)|\s[-\u2013\u2014]\s")
+
+STOPWORDS = set("""
+a about above after again against all also am an and any are as at be because been before being below between both but by
+can could did do does doing down during each etc few for from further had has have having he her here hers herself him himself
+his how i if in into is it its itself just let me more most my myself no nor not of off on once only or other our ours
+ourselves out over own per same she should so some such than that the their theirs them themselves then there these they
+this those through to too under until up us very via was we were what when where which while who whom why will with within
+would you your yours yourself yourselves
+""".split())
+
+# Words common to nearly every job posting or resume; they say nothing about fit.
+GENERIC_TERMS = set("""
+ability able build building candidate candidates company day environment excellent experience experienced familiarity
+good great help ideal including job join knowledge looking must new nice opportunity plus preferred position product provide
+required requirements responsibilities responsible role skills strong successful team teams understanding use using well
+work working world year years within across ensure etc based key like highly related relevant best high level proven solid
+demonstrated hands-on
+""".split())
+
+# Blend weights for the final score, fitted on the fixture corpus together with CALIBRATION_K
+COVERAGE_WEIGHT = 0.50
+BM25_WEIGHT = 0.50
+COSINE_WEIGHT = 0.00 # Reported, but adds nothing over coverage + BM25 on the fixture corpus
+EMBEDDING_WEIGHT = 0.30 # Replaces an equal share of the lexical blend when embeddings are available
+BIGRAM_WEIGHT = 0.5 # Phrases count for less than their words, which are also terms
+# The blend is rarely above ~0.6 even for an excellent fit (resumes never repeat the whole JD), while LLM scores
+# use the full 0-100 range; score = 100 * (1 - exp(-k * blend)) maps one onto the other. k is fitted on the
+# fixture corpus, see benchmarks/bench_local_scoring.py.
+CALIBRATION_K = 2.9
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+class LocalScore(BaseModel):
+    match_score: int
+    missing_keywords: List[str] = Field(default_factory=list)
+    matched_keywords: List[str] = Field(default_factory=list)
+    coverage: float
+    bm25_strength: float
+    cosine_similarity: float
+    embedding_similarity: Optional[float] = None
+
+def _is_term(token: Optional[str]) -> bool:
+    return bool(token) and token not in STOPWORDS and not token[0].isdigit() # Drops numbers and "5+" (years)
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in (raw.rstrip(".-/") for raw in _TOKEN_RE.findall(text.lower())) if _is_term(token)]
+
+def _terms(text: str) -> List[str]:
+    # Unigrams plus bigrams of directly adjacent words within a phrase, so "machine learning" counts as a phrase
+    # but "FastAPI or Django" doesn't produce "fastapi django"
+    terms = []
+    for phrase in _PHRASE_BREAK_RE.split(text.lower()):
+        tokens = [raw.rstrip(".-/") for raw in _TOKEN_RE.findall(phrase)]
+        terms.extend(token for token in tokens if _is_term(token))
+        terms.extend(f"{a} {b}" for a, b in zip(tokens, tokens[1:]) if _is_term(a) and _is_term(b))
+    return terms
+
+def _chunks(text: str, lines_per_chunk: int = 4) -> List[str]:
+    lines = [line for line in text.splitlines() if line.strip()]
+    if not lines:
+        return [text]
+    return ["\n".join(lines[i:i + lines_per_chunk]) for i in range(0, len(lines), lines_per_chunk)]
+
+def _is_keyword(term: str) -> bool:
+    parts = term.split(" ")
+    if any(part in GENERIC_TERMS for part in parts):
+        return False
+    return all(len(part) > 1 for part in parts)
+
+def compute_local_score(resume_text: str, job_description_text: str, embedding_similarity: Optional[float] = None, max_missing: int = 10) -> LocalScore:
+    resume_skills, job_skills = extract_skills(resume_text), extract_skills(job_description_text)
+    skills = compare_skills(resume_text, job_description_text, resume_skills, job_skills)
+    # Score on canonical skill names, so a resume saying "k8s" covers a JD asking for "Kubernetes"
+    resume_text, job_description_text = canonicalize(resume_text, resume_skills), canonicalize(job_description_text, job_skills)
+    jd_terms = [term for term in _terms(job_description_text) if _is_keyword(term)]
+    if not jd_terms:
+        return LocalScore(match_score=0, missing_keywords=skills.missing[:max_missing], coverage=0.0, bm25_strength=0.0, cosine_similarity=0.0, embedding_similarity=embedding_similarity)
+
+    vocabulary: Dict[str, int] = {}
+    for term in jd_terms:
+        vocabulary.setdefault(term, len(vocabulary))
+
+    # Term matrix: one row per resume chunk, then one row per JD line (used only for IDF), columns = JD vocabulary
+    resume_chunks = _chunks(resume_text)
+    jd_lines = [line for line in job_description_text.splitlines() if line.strip()] or [job_description_text]
+    documents = resume_chunks + jd_lines
+    matrix = np.zeros((len(documents), len(vocabulary)), dtype=np.float32)
+    lengths = np.zeros(len(documents), dtype=np.float32)
+    for row, document in enumerate(documents):
+        terms = _terms(document)
+        lengths[row] = max(len(terms), 1)
+        for term in terms:
+            column = vocabulary.get(term)
+            if column is not None:
+                matrix[row, column] += 1
+
+    resume_matrix = matrix[:len(resume_chunks)]
+    document_frequency = (matrix > 0).sum(axis=0)
+    idf = np.log(1 + (len(documents) - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    jd_tf = np.zeros(len(vocabulary), dtype=np.float32)
+    for term in jd_terms:
+        jd_tf[vocabulary[term]] += 1
+    is_bigram = np.array([" " in term for term in vocabulary], dtype=bool)
+    # Sublinear TF, so repeated JD terms matter but don't dominate
+    query_weights = (1 + np.log(jd_tf)) * idf * np.where(is_bigram, BIGRAM_WEIGHT, 1.0)
+
+    # Coverage: share of the JD's term weight that appears anywhere in the resume
+    present = resume_matrix.sum(axis=0) > 0
+    coverage = float(query_weights[present].sum() / query_weights.sum())
+
+    # BM25 of every resume chunk against the JD terms, vectorized over the whole matrix
+    resume_lengths = lengths[:len(resume_chunks)]
+    average_length = float(resume_lengths.mean())
+    saturation = resume_matrix * (BM25_K1 + 1) / (resume_matrix + BM25_K1 * (1 - BM25_B + BM25_B * resume_lengths[:, None] / average_length))
+    chunk_scores = saturation @ query_weights
+    # Normalize against the ideal: every JD term matched once in a chunk of average length
+    ideal = float(query_weights.sum())
+    top_chunks = np.sort(chunk_scores)[::-1][:3]
+    bm25_strength = float(min(top_chunks.sum() / ideal, 1.0)) if ideal else 0.0
+
+    # TF-IDF cosine between the JD and the resume as a whole
+    resume_tf = resume_matrix.sum(axis=0)
+    resume_vector = np.where(resume_tf > 0, 1 + np.log(np.maximum(resume_tf, 1)), 0) * idf
+    denominator = float(np.linalg.norm(query_weights) * np.linalg.norm(resume_vector))
+    cosine = float(query_weights @ resume_vector / denominator) if denominator else 0.0
+
+    lexical = COVERAGE_WEIGHT * coverage + BM25_WEIGHT * bm25_strength + COSINE_WEIGHT * cosine
+    if embedding_similarity is not None:
+        # Ada-style embeddings put unrelated texts around 0.7 cosine; rescale 0.7-1.0 to 0-1
+        semantic = min(max((embedding_similarity - 0.7) / 0.3, 0.0), 1.0)
+        blended = (1 - EMBEDDING_WEIGHT) * lexical + EMBEDDING_WEIGHT * semantic
+    else:
+        blended = lexical
+    match_score = int(round(100 * (1 - math.exp(-CALIBRATION_K * max(blended, 0.0)))))
+
+    ranked = sorted(vocabulary, key=lambda term: float(query_weights[vocabulary[term]]), reverse=True)
+    missing = [term for term in ranked if not present[vocabulary[term]]]
+    # A phrase whose words all appear separately isn't really missing ("payments" and "apis" cover "payments apis")
+    missing_words = {term for term in missing if " " not in term}
+    missing = [term for term in missing if " " not in term or any(part in missing_words for part in term.split(" "))]
+    # Prefer the phrase over its parts: drop unigrams already covered by a missing bigram
+    missing_phrases = {part for term in missing if " " in term for part in term.split(" ")}
+    missing = [term for term in missing if " " in term or term not in missing_phrases]
+    matched = [term for term in ranked if present[vocabulary[term]] and " " not in term]
+    # Taxonomy skills lead both lists: they are real skills under their proper names; lexical terms fill the rest
+    skill_words = {word for skill in skills.job_skills for word in tokenize(skill)}
+    missing = skills.missing + [term for term in missing if not set(term.split(" ")) & skill_words]
+    matched = skills.matched + [term for term in matched if term not in skill_words]
+
+    return LocalScore(
+        match_score=match_score,
+        missing_keywords=missing[:max_missing],
+        matched_keywords=matched[:max_missing],
+        coverage=round(coverage, 4),
+        bm25_strength=round(bm25_strength, 4),
+        cosine_similarity=round(cosine, 4),
+        embedding_similarity=embedding_similarity,
+    )
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    a_vec, b_vec = np.asarray(a, dtype=np.float32), np.asarray(b, dtype=np.float32)
+    denominator = float(np.linalg.norm(a_vec) * np.linalg.norm(b_vec))
+    return float(a_vec @ b_vec / denominator) if denominator else 0.0
+
+async def score_resume_locally(resume_text: str, job_description_text: str) -> LocalScore:
+    embedding_similarity = None
+    if settings.LOCAL_SCORING_USE_EMBEDDINGS:
+        from app.services.vector_service import get_text_embedding # Avoid a hard dependency for the lexical path
+        # Requested together so they share one batched embeddings call
+        resume_embedding, jd_embedding = await asyncio.gather(get_text_embedding(resume_text), get_text_embedding(job_description_text))
+        if resume_embedding is not None and jd_embedding is not None:
+            embedding_similarity = round(_cosine(resume_embedding, jd_embedding), 4)
+    return compute_local_score(resume_text, job_description_text, embedding_similarity=embedding_similarity)
+
+def describe_local_score(score: LocalScore) -> Dict[str, object]:
+    """Narrative fields for fast mode, derived from the local score without an LLM."""
+    matched = ", ".join(score.matched_keywords[:5]) or "none"
+    summary = f"Covers {score.coverage:.0%} of the job description's key terms. Strongest overlap: {matched}."
+    suggestions = []
+    if score.missing_keywords:
+        suggestions.append(f"If you have experience with them, mention: {', '.join(score.missing_keywords[:5])}.")
+    if score.bm25_strength < 0.3:
+        suggestions.append("Describe your most relevant experience using the job description's terminology.")
+    return {
+        "strength_summary": summary,
+        "improvement_suggestions": suggestions,
+        "ats_compatibility_check": "Not assessed in fast mode.",
+    }
@@ -0,0 +1,214 @@
+# Skill extraction against the curated taxonomy in skill_taxonomy_data.py.
+#
+# Every alias is compiled once into an Aho-Corasick automaton, so a document is scanned in a single
+# linear pass no matter how many skills the taxonomy holds. Uses the pyahocorasick C extension when
+# it is installed and falls back to an equivalent pure-Python automaton otherwise.
+import string
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from app.services.skill_taxonomy_data import SKILL_TAXONOMY, ALIAS_ONLY_NAMES, CASE_SENSITIVE_ALIASES, AMBIGUOUS_ALIAS_CONTEXT
+
+try:
+    import ahocorasick
+except ImportError: # Optional speed-up
+    ahocorasick = None
+
+class SkillMatch(NamedTuple): # A tuple rather than a model: documents can hold thousands of mentions
+    skill: str # Canonical name, e.g. "Kubernetes" for "k8s"
+    category: str
+    start: int # Character offsets into the scanned text, end exclusive
+    end: int
+    text: str # The text as written
+
+class ExtractedSkill(BaseModel):
+    skill: str
+    category: str
+    count: int
+    offsets: List[Tuple[int, int]] = Field(default_factory=list)
+
+class SkillComparison(BaseModel):
+    job_skills: List[str] = Field(default_factory=list)
+    resume_skills: List[str] = Field(default_factory=list)
+    matched: List[str] = Field(default_factory=list)
+    missing: List[str] = Field(default_factory=list) # In the job description, not in the resume
+
+_WHITESPACE_TO_SPACE = str.maketrans("\t\n\r\f\v\u00a0", "      ")
+
+def _normalize(text: str) -> str:
+    # Lowercase and turn line breaks/tabs into plain spaces without changing the length,
+    # so offsets into the normalized text are offsets into the original
+    lowered = text.lower()
+    if len(lowered) != len(text): # A few characters (e.g. "İ") lowercase to two
+        lowered = "".join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+    return lowered.translate(_WHITESPACE_TO_SPACE)
+
+_WORD_CHARS = frozenset(string.ascii_lowercase + string.digits + "_")
+_WORD_CHARS_AFTER = _WORD_CHARS | {"+", "#"}
+
+class _PyAutomaton:
+    """Pure-Python Aho-Corasick automaton over characters."""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, int]]] = [[]] # (pattern length, pattern id) per state
+
+    def add_word(self, word: str, value: Tuple[int, int]) -> None:
+        state = 0
+        for ch in word:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = next_state
+        self._out[state].append(value)
+
+    def make_automaton(self) -> None:
+        # Breadth-first, so every state's failure link points at an already-finished state
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(ch, 0)
+                # Patterns ending at the failure state also end here
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def iter(self, text: str) -> Iterator[Tuple[int, Tuple[int, int]]]:
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for index, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for value in out[state]:
+                yield index, value
+
+def _next_word(normalized: str, end: int) -> str:
+    rest = normalized[end:end + 40].lstrip(" /-")
+    word = []
+    for ch in rest:
+        if ch not in _WORD_CHARS:
+            break
+        word.append(ch)
+    return "".join(word)
+
+def _passes_gate(text: str, normalized: str, start: int, end: int, gate) -> bool:
+    exact, vetoes = gate
+    if exact is not None and text[start:end] not in (exact, exact.upper()):
+        return False
+    return not vetoes or _next_word(normalized, end) not in vetoes
+
+class SkillMatcher:
+    def __init__(self, taxonomy: Dict[str, Tuple[str, List[str]]] = SKILL_TAXONOMY, alias_only_names=ALIAS_ONLY_NAMES, native: Optional[bool] = None,
+                 case_sensitive_aliases=CASE_SENSITIVE_ALIASES, alias_context=AMBIGUOUS_ALIAS_CONTEXT):
+        """`native` forces (True) or disables (False) the pyahocorasick backend; by default it is used when installed."""
+        if native is None:
+            native = ahocorasick is not None
+        if native and ahocorasick is None:
+            raise RuntimeError("pyahocorasick is not installed")
+        self.backend = "pyahocorasick" if native else "python"
+        self._skills: List[Tuple[str, str]] = [] # pattern id -> (canonical name, category)
+        automaton = ahocorasick.Automaton() if native else _PyAutomaton()
+        aliases: Dict[str, int] = {}
+        for skill, (category, skill_aliases) in taxonomy.items():
+            skill_id = len(self._skills)
+            self._skills.append((skill, category))
+            names = list(skill_aliases) if skill in alias_only_names else [skill, *skill_aliases]
+            for written in names:
+                written = written.strip()
+                alias = _normalize(written)
+                if alias and alias not in aliases: # First skill to claim an alias keeps it
+                    aliases[alias] = skill_id
+                    # Exact spelling required, and next words that veto the match; None for ordinary aliases
+                    gate = (written if written in case_sensitive_aliases else None, frozenset(alias_context.get(written, ())))
+                    automaton.add_word(alias, (len(alias), skill_id, gate if gate != (None, frozenset()) else None))
+        automaton.make_automaton()
+        self._automaton = automaton
+        self.alias_count = len(aliases)
+
+    def find(self, text: str) -> List[SkillMatch]:
+        """All skill mentions in `text`, leftmost-longest and non-overlapping, in order of appearance."""
+        if not text:
+            return []
+        normalized = _normalize(text)
+        size = len(normalized)
+        candidates = []
+        for end_index, (length, skill_id, gate) in self._automaton.iter(normalized):
+            start, end = end_index - length + 1, end_index + 1
+            # Whole words only: "java" must not match inside "javascript", nor "c" at the start of "c++"
+            if start and normalized[start - 1] in _WORD_CHARS:
+                continue
+            if end < size and normalized[end] in _WORD_CHARS_AFTER:
+                continue
+            if gate is not None and not _passes_gate(text, normalized, start, end, gate):
+                continue
+            candidates.append((start, -length, skill_id))
+        candidates.sort()
+        matches = []
+        last_end = 0
+        skills = self._skills
+        for start, negative_length, skill_id in candidates:
+            if start < last_end:
+                continue # Overlaps a longer or earlier match ("github actions" wins over "github")
+            end = start - negative_length
+            skill, category = skills[skill_id]
+            matches.append(SkillMatch(skill, category, start, end, text[start:end]))
+            last_end = end
+        return matches
+
+@lru_cache(maxsize=1)
+def get_skill_matcher() -> SkillMatcher:
+    """The process-wide matcher; compiled on first use (the app warms it up at startup)."""
+    return SkillMatcher()
+
+def extract_skills(text: str) -> List[SkillMatch]:
+    return get_skill_matcher().find(text)
+
+def summarize_skills(matches: List[SkillMatch]) -> List[ExtractedSkill]:
+    """One entry per distinct skill, in order of first mention."""
+    summary: Dict[str, ExtractedSkill] = {}
+    for match in matches:
+        entry = summary.get(match.skill)
+        if entry is None:
+            entry = summary[match.skill] = ExtractedSkill(skill=match.skill, category=match.category, count=0)
+        entry.count += 1
+        entry.offsets.append((match.start, match.end))
+    return list(summary.values())
+
+def skill_names(text: str, matches: Optional[List[SkillMatch]] = None) -> List[str]:
+    matches = extract_skills(text) if matches is None else matches
+    return list(dict.fromkeys(match.skill for match in matches))
+
+def compare_skills(resume_text: str, job_description_text: str, resume_matches: Optional[List[SkillMatch]] = None, job_matches: Optional[List[SkillMatch]] = None) -> SkillComparison:
+    """Pass already-extracted matches to avoid scanning a text twice."""
+    job_skills = skill_names(job_description_text, job_matches)
+    resume_skills = skill_names(resume_text, resume_matches)
+    resume_skill_set = set(resume_skills)
+    return SkillComparison(
+        job_skills=job_skills,
+        resume_skills=resume_skills,
+        matched=[skill for skill in job_skills if skill in resume_skill_set],
+        missing=[skill for skill in job_skills if skill not in resume_skill_set],
+    )
+
+def canonicalize(text: str, matches: Optional[List[SkillMatch]] = None) -> str:
+    """`text` with every skill mention replaced by its canonical name, so "k8s" and "Kubernetes" read the same."""
+    parts = []
+    position = 0
+    for match in (extract_skills(text) if matches is None else matches):
+        parts.append(text[position:match.start])
+        parts.append(match.skill)
+        position = match.end
+    parts.append(text[position:])
+    return "".join(parts)
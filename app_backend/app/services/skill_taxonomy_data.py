@@ -0,0 +1,223 @@
+# Curated skill taxonomy: canonical name -> (category, aliases).
+# Matching is case-insensitive and on word boundaries; the canonical name itself is also an alias,
+# except for ALIAS_ONLY_NAMES (bottom of this file).
+# Keep aliases unambiguous: anything that is also a common English word ("go", "swift", "spring")
+# only appears in a form that can't be mistaken for one ("golang", "swift ui", "spring boot"), or is
+# listed in CASE_SENSITIVE_ALIASES and AMBIGUOUS_ALIAS_CONTEXT (also at the bottom).
+SKILL_TAXONOMY = {
+    # Programming languages
+    "Python": ("language", ["python3", "py3"]),
+    "Java": ("language", ["java se", "java ee", "j2ee"]),
+    "JavaScript": ("language", ["js", "es6", "es2015", "ecmascript", "java script"]),
+    "TypeScript": ("language", ["TS"]),
+    "Go": ("language", ["golang", "go lang", "go programming"]),
+    "Rust": ("language", ["rustlang"]),
+    "C": ("language", ["ansi c", "c99", "c11", "c programming", "c language", "embedded c"]),
+    "C++": ("language", ["cpp", "c plus plus", "c++11", "c++14", "c++17", "c++20"]),
+    "C#": ("language", ["csharp", "c sharp"]),
+    "Kotlin": ("language", []),
+    "Swift": ("language", ["swiftui", "swift ui", "swift programming"]),
+    "Objective-C": ("language", ["objective c", "objc"]),
+    "Ruby": ("language", []),
+    "PHP": ("language", []),
+    "Scala": ("language", []),
+    "R": ("language", ["r language", "r programming", "rstats"]),
+    "MATLAB": ("language", []),
+    "Perl": ("language", []),
+    "Haskell": ("language", []),
+    "Elixir": ("language", []),
+    "Erlang": ("language", []),
+    "Clojure": ("language", []),
+    "Dart": ("language", []),
+    "Lua": ("language", []),
+    "Julia": ("language", []),
+    "Bash": ("language", ["shell scripting", "bash scripting", "shell script"]),
+    "PowerShell": ("language", ["powershell scripting"]),
+    "SQL": ("language", ["t-sql", "tsql", "pl/sql", "plsql", "ansi sql"]),
+    "HTML": ("language", ["html5"]),
+    "CSS": ("language", ["css3"]),
+    "Sass": ("language", ["scss"]),
+    "Solidity": ("language", []),
+    "COBOL": ("language", []),
+    "Fortran": ("language", []),
+    "VBA": ("language", ["visual basic for applications"]),
+    # Web frameworks and libraries
+    "React": ("framework", ["react.js", "reactjs", "react js"]),
+    "React Native": ("framework", ["react-native"]),
+    "Angular": ("framework", ["angularjs", "angular.js"]),
+    "Vue.js": ("framework", ["vue", "vuejs", "vue js", "vue3"]),
+    "Svelte": ("framework", ["sveltekit"]),
+    "Next.js": ("framework", ["nextjs", "next js"]),
+    "Nuxt": ("framework", ["nuxt.js", "nuxtjs"]),
+    "Redux": ("framework", ["redux toolkit"]),
+    "jQuery": ("framework", []),
+    "Node.js": ("framework", ["nodejs", "node js"]),
+    "Express": ("framework", ["express.js", "expressjs", "express js"]),
+    "NestJS": ("framework", ["nest.js"]),
+    "Django": ("framework", ["django rest framework", "drf"]),
+    "Flask": ("framework", []),
+    "FastAPI": ("framework", ["fast api"]),
+    "Spring Boot": ("framework", ["springboot", "spring framework", "spring mvc"]),
+    "Ruby on Rails": ("framework", ["Rails", "ror"]),
+    "Laravel": ("framework", []),
+    "Symfony": ("framework", []),
+    "ASP.NET": ("framework", ["asp.net core", "asp net"]),
+    ".NET": ("framework", ["dotnet", "dot net", ".net core", ".net framework"]),
+    "Flutter": ("framework", []),
+    "GraphQL": ("framework", ["graph ql"]),
+    "gRPC": ("framework", []),
+    "Tailwind CSS": ("framework", ["tailwind", "tailwindcss"]),
+    "Bootstrap": ("framework", []),
+    "Storybook": ("framework", []),
+    "Webpack": ("framework", []),
+    "Vite": ("framework", []),
+    "Celery": ("framework", []),
+    "SQLAlchemy": ("framework", []),
+    "Pydantic": ("framework", []),
+    "Hibernate": ("framework", []),
+    # Data and machine learning
+    "Machine Learning": ("data", ["machine-learning", "ml models", "ml engineering", "ml pipelines", "ai/ml", "ml/ai"]),
+    "Deep Learning": ("data", ["deep-learning", "neural networks", "neural network"]),
+    "Natural Language Processing": ("data", ["nlp"]),
+    "Computer Vision": ("data", ["image recognition", "object detection"]),
+    "Large Language Models": ("data", ["llm", "llms", "large language model"]),
+    "Statistics": ("data", ["statistical analysis", "statistical modeling", "statistical modelling"]),
+    "A/B Testing": ("data", ["ab testing", "a/b tests", "split testing", "experimentation"]),
+    "Time Series Forecasting": ("data", ["time series", "time-series", "forecasting"]),
+    "pandas": ("data", []),
+    "NumPy": ("data", []),
+    "SciPy": ("data", []),
+    "scikit-learn": ("data", ["sklearn", "scikit learn"]),
+    "TensorFlow": ("data", ["tensor flow", "tf2", "keras"]),
+    "PyTorch": ("data", ["torch"]),
+    "Gradient Boosting": ("data", ["xgboost", "lightgbm", "catboost", "gradient boosted trees"]),
+    "Hugging Face": ("data", ["huggingface", "transformers library"]),
+    "LangChain": ("data", []),
+    "Apache Spark": ("data", ["Spark", "pyspark", "spark sql"]),
+    "Apache Kafka": ("data", ["kafka", "kafka streams"]),
+    "Apache Airflow": ("data", ["airflow"]),
+    "Hadoop": ("data", ["hdfs", "mapreduce"]),
+    "dbt": ("data", ["data build tool"]),
+    "MLflow": ("data", []),
+    "Jupyter": ("data", ["jupyter notebook", "jupyter notebooks", "jupyterlab"]),
+    "Tableau": ("data", []),
+    "Power BI": ("data", ["powerbi"]),
+    "Looker": ("data", []),
+    "Excel": ("data", ["microsoft excel", "ms excel", "excel spreadsheets", "advanced excel", "excel vba", "spreadsheets"]),
+    "ETL": ("data", ["elt", "data pipelines", "data pipeline"]),
+    "Data Warehousing": ("data", ["data warehouse", "data warehouses"]),
+    "Snowflake": ("data", []),
+    "BigQuery": ("data", ["google bigquery", "big query"]),
+    "Redshift": ("data", ["amazon redshift"]),
+    "Databricks": ("data", []),
+    # Databases
+    "PostgreSQL": ("database", ["postgres", "postgresql", "psql"]),
+    "MySQL": ("database", ["mariadb"]),
+    "SQLite": ("database", []),
+    "Oracle Database": ("database", ["oracle db", "oracle sql", "Oracle"]),
+    "Microsoft SQL Server": ("database", ["sql server", "mssql", "ms sql"]),
+    "MongoDB": ("database", ["mongo", "mongo db"]),
+    "Redis": ("database", []),
+    "Elasticsearch": ("database", ["elastic search", "opensearch", "elk"]),
+    "Cassandra": ("database", ["apache cassandra"]),
+    "DynamoDB": ("database", ["dynamo db", "amazon dynamodb"]),
+    "Neo4j": ("database", []),
+    "Supabase": ("database", []),
+    "Firebase": ("database", ["firestore"]),
+    "Qdrant": ("database", []),
+    "Pinecone": ("database", []),
+    "Vector Databases": ("database", ["vector database", "vector db", "vector search"]),
+    # Cloud and DevOps
+    "AWS": ("cloud", ["amazon web services", "ec2", "s3", "aws lambda", "lambda functions"]),
+    "Google Cloud": ("cloud", ["gcp", "google cloud platform"]),
+    "Azure": ("cloud", ["microsoft azure"]),
+    "Docker": ("devops", ["docker compose", "docker-compose", "containerization", "containerized", "dockerfile"]),
+    "Kubernetes": ("devops", ["k8s", "kubectl", "eks", "gke", "aks", "openshift"]),
+    "Helm": ("devops", ["helm charts", "helm chart"]),
+    "Terraform": ("devops", ["opentofu"]),
+    "Ansible": ("devops", []),
+    "CI/CD": ("devops", ["ci cd", "ci/cd pipelines", "continuous integration", "continuous delivery", "continuous deployment"]),
+    "Jenkins": ("devops", []),
+    "GitHub Actions": ("devops", ["github workflows"]),
+    "GitLab CI": ("devops", ["gitlab ci/cd", "gitlab pipelines"]),
+    "Git": ("devops", ["github", "gitlab", "bitbucket", "version control"]),
+    "Linux": ("devops", ["unix", "ubuntu", "centos", "rhel"]),
+    "Nginx": ("devops", []),
+    "Prometheus": ("devops", []),
+    "Grafana": ("devops", []),
+    "Datadog": ("devops", []),
+    "Observability": ("devops", ["monitoring and alerting", "opentelemetry", "distributed tracing"]),
+    "Serverless": ("cloud", ["serverless architecture"]),
+    "Microservices": ("architecture", ["microservice", "micro-services", "microservices architecture"]),
+    "Event-Driven Architecture": ("architecture", ["event-driven", "event driven", "event sourcing"]),
+    "REST APIs": ("architecture", ["restful", "rest api", "rest apis", "restful apis", "restful api", "rest services"]),
+    "System Design": ("architecture", ["distributed systems", "scalable systems"]),
+    "Message Queues": ("architecture", ["rabbitmq", "sqs", "pub/sub", "message broker"]),
+    "Site Reliability Engineering": ("devops", ["sre"]),
+    # Testing and quality
+    "Unit Testing": ("testing", ["unit tests", "automated testing", "test automation", "tdd", "test-driven development"]),
+    "pytest": ("testing", []),
+    "Jest": ("testing", []),
+    "Cypress": ("testing", []),
+    "Selenium": ("testing", []),
+    "Playwright": ("testing", []),
+    "JUnit": ("testing", []),
+    # Security
+    "OAuth": ("security", ["oauth2", "oauth 2.0", "openid connect", "oidc"]),
+    "JWT": ("security", ["json web tokens", "json web token"]),
+    "Application Security": ("security", ["appsec", "owasp", "secure coding"]),
+    "Penetration Testing": ("security", ["pentesting", "pen testing"]),
+    # Design and product
+    "Figma": ("design", []),
+    "Sketch": ("design", ["sketch app"]),
+    "Adobe XD": ("design", []),
+    "Adobe Photoshop": ("design", ["photoshop"]),
+    "UX Design": ("design", ["user experience", "ux", "ux/ui", "ui/ux", "user research"]),
+    "Responsive Design": ("design", ["responsive web design", "mobile-first"]),
+    "Accessibility": ("design", ["wcag", "a11y", "web accessibility"]),
+    "Product Management": ("business", ["product manager", "product roadmap", "roadmapping"]),
+    # Methods and collaboration
+    "Agile": ("methodology", ["agile methodologies", "agile development"]),
+    "Scrum": ("methodology", ["scrum master"]),
+    "Kanban": ("methodology", []),
+    "Jira": ("methodology", ["atlassian jira"]),
+    "Project Management": ("business", ["pmp", "project manager"]),
+    "Stakeholder Management": ("soft_skill", ["stakeholder communication", "stakeholder engagement"]),
+    "Leadership": ("soft_skill", ["team leadership", "people management", "mentoring", "mentorship"]),
+    "Communication": ("soft_skill", ["communication skills", "written communication", "verbal communication"]),
+    "Problem Solving": ("soft_skill", ["problem-solving", "troubleshooting"]),
+    # Business and finance
+    "Salesforce": ("business", ["sfdc"]),
+    "SAP": ("business", []),
+    "Financial Modeling": ("business", ["financial modelling", "financial analysis"]),
+    "Accounting": ("business", ["bookkeeping", "gaap", "ifrs"]),
+    "Digital Marketing": ("business", ["seo", "google ads", "content marketing"]),
+    "CRM": ("business", ["customer relationship management", "hubspot"]),
+    # Healthcare
+    "Registered Nurse": ("healthcare", ["RN", "rn license", "registered nurse license"]),
+    "BLS": ("healthcare", ["basic life support"]),
+    "ACLS": ("healthcare", ["advanced cardiovascular life support"]),
+    "Critical Care": ("healthcare", ["icu", "intensive care", "intensive care unit", "ccrn"]),
+    "Electronic Health Records": ("healthcare", ["ehr", "emr", "Epic", "cerner"]),
+    "Ventilator Management": ("healthcare", ["mechanical ventilation", "ventilated patients"]),
+    "Hemodynamic Monitoring": ("healthcare", ["hemodynamics"]),
+    "Patient Education": ("healthcare", ["patient and family education"]),
+    "Medication Administration": ("healthcare", []),
+    "HIPAA": ("healthcare", []),
+}
+
+# Canonical names that are also everyday words ("excel at", "express interest", "at the helm",
+# "communication with the team"), or single letters; these are matched only through their aliases.
+ALIAS_ONLY_NAMES = {"C", "R", "Go", "Swift", "Express", "Sketch", "Helm", "Excel", "Communication", "Leadership"}
+
+# Aliases (or canonical names) that are also ordinary lowercase words or abbreviations: matched only when
+# written exactly like this or in all capitals ("React", "REACT", but not "react quickly"; "Epic" the EHR,
+# not "an epic migration").
+CASE_SENSITIVE_ALIASES = {"TS", "React", "Epic", "RN", "Spark", "Oracle", "Rails"}
+
+# Aliases that name something else when followed by one of these words ("TS clearance" is Top Secret,
+# "React to incidents" is a verb at the start of a sentence).
+AMBIGUOUS_ALIAS_CONTEXT = {
+    "TS": ("clearance", "sci", "secret"),
+    "React": ("to", "quickly", "promptly", "swiftly", "calmly", "when"),
+}
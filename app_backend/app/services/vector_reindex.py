@@ -0,0 +1,274 @@
+# Rebuilds the resume index from resumes.raw_text into a new Qdrant collection, then switches searches to it.
+# Needed when the embedding backend, model or dimensions, the collection profile or the chunking change: an
+# existing collection is never rebuilt in place (see check_collection_schema). Run from app_backend/ with the
+# new settings in the environment:
+#   python -m app.services.vector_reindex
+#   python -m app.services.vector_reindex --concurrency 8 --page-size 1000 --no-switch
+#
+# QDRANT_RESUME_COLLECTION is used as an alias. The resumes are indexed into "<alias>_<UTC timestamp>" while
+# the live collection keeps serving. At the end, one alias update moves the alias to the new collection, so
+# searches switch atomically. The previous collection is kept for rollback unless --drop-old. On the first
+# run the name is still a plain collection: --replace-collection deletes it just before the alias is created,
+# and searches fail for that moment.
+#
+# Resumes are read in pages ordered by id, each starting after the last id of the previous page (keyset
+# pagination: every page is an index range scan, however far in, unlike OFFSET). The next page is fetched
+# while the current one is indexed. Chunk texts go through the embedding cache; misses are embedded in
+# batches, --concurrency at a time, so a reindex that keeps the model makes no embedding calls at all.
+# After each page is written, a checkpoint file records the new collection and the last id. A rerun after a
+# crash or ^C continues from there; --restart discards it.
+#
+# Resumes uploaded during the run are indexed into the live collection; a catch-up pass over resumes created
+# since the run started picks them up before the switch. Points of resumes deleted during the run may remain
+# in the new collection; search skips hits whose resume is gone from the database. Deploy changed embedding
+# settings right after the switch: until the app restarts with them, its uploads are embedded the old way.
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from qdrant_client import AsyncQdrantClient, models
+
+from app.core.config import settings
+from app.services import embedding_cache, vector_service
+from app.services.embedding_backend import get_embedding_backend
+from app.services.resume_chunker import chunk_resume
+from app.services.supabase_client import supabase_client
+
+RESUME_COLUMNS = "id, user_id, raw_text, created_at"
+
+def default_checkpoint_path() -> str:
+    return os.path.join(".cache", f"reindex-{settings.QDRANT_RESUME_COLLECTION}.json")
+
+# --- Database ---
+
+def fetch_resume_page(after_id: Optional[str], page_size: int, created_since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """The next `page_size` resumes by id after `after_id` (None: from the start)."""
+    query = supabase_client.table("resumes").select(RESUME_COLUMNS)
+    if after_id is not None:
+        query = query.gt("id", after_id)
+    if created_since is not None:
+        query = query.gte("created_at", created_since)
+    return query.order("id").limit(page_size).execute().data or []
+
+def count_resumes_after(after_id: Optional[str], created_since: Optional[str] = None) -> int:
+    """Resumes left for a pass; a resumed run counts from its checkpoint."""
+    query = supabase_client.table("resumes").select("id", count="exact")
+    if after_id is not None:
+        query = query.gt("id", after_id)
+    if created_since is not None:
+        query = query.gte("created_at", created_since)
+    return query.limit(1).execute().count or 0
+
+# --- Checkpoint ---
+
+def load_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_checkpoint(path: str, checkpoint: Dict[str, Any]) -> None:
+    # Replaced atomically: a crash mid-write leaves the previous checkpoint
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{path}.tmp", path)
+
+def new_checkpoint(alias: str, target: Optional[str]) -> Dict[str, Any]:
+    backend = get_embedding_backend()
+    started = datetime.datetime.now(datetime.timezone.utc)
+    return {
+        "alias": alias,
+        "target": target or f"{alias}_{started:%Y%m%d%H%M%S}",
+        "embedding_model": backend.model,
+        "dimension": backend.dimension,
+        "started_at": started.isoformat(),
+        "phase": "backfill", # Then "catch_up" (resumes created since started_at), then "done"
+        "last_id": None,
+        "resumes": 0,
+        "points": 0,
+        "skipped": 0, # No indexable text
+    }
+
+# --- Indexing ---
+
+async def embed_chunk_texts(texts: List[str], batch_size: int, semaphore: asyncio.Semaphore) -> List[Optional[List[float]]]:
+    """Embeddings for `texts`, from the embedding cache where possible, the misses in batches."""
+    backend = get_embedding_backend()
+    texts = [embedding_cache.normalize_text(text) for text in texts]
+    keys = [embedding_cache.cache_key(text, backend.model, backend.dimension) for text in texts]
+    embeddings = await embedding_cache.get_many(keys)
+    missing = [index for index, embedding in enumerate(embeddings) if embedding is None]
+
+    async def embed_batch(indexes: List[int]) -> None:
+        async with semaphore:
+            vectors = await vector_service.embed_texts([texts[index] for index in indexes], backend)
+        embedded = [(index, vector) for index, vector in zip(indexes, vectors) if vector is not None]
+        for index, vector in embedded:
+            embeddings[index] = vector
+        await embedding_cache.put_many([(keys[index], vector) for index, vector in embedded])
+
+    await asyncio.gather(*(embed_batch(missing[start:start + batch_size]) for start in range(0, len(missing), batch_size)))
+    return embeddings
+
+async def index_page(client: AsyncQdrantClient, collection_name: str, rows: List[Dict[str, Any]], embed_batch_size: int,
+                     upsert_batch_size: int, semaphore: asyncio.Semaphore) -> tuple:
+    """Writes the page's resumes into `collection_name`; (points written, resumes skipped). Raises if any
+    embedding failed, so the checkpoint stays before this page."""
+    resumes = [(row, chunk_resume(row.get("raw_text"))) for row in rows]
+    texts = [chunk.text for _, chunks in resumes for chunk in chunks]
+    embeddings = iter(await embed_chunk_texts(texts, embed_batch_size, semaphore))
+    points = []
+    for row, chunks in resumes:
+        vectors = [next(embeddings) for _ in chunks]
+        if any(vector is None for vector in vectors):
+            raise RuntimeError(f"Embedding failed for resume {row['id']}; rerun to continue from the checkpoint")
+        points.extend(models.PointStruct(id=point.id, vector=point.vector, payload=point.payload) for point in
+                      vector_service.resume_points(UUID(str(row["id"])), row["user_id"], row["created_at"], chunks, vectors))
+
+    async def upsert(batch: List[models.PointStruct]) -> None:
+        async with semaphore:
+            await client.upsert(collection_name=collection_name, points=batch, wait=True)
+
+    await asyncio.gather(*(upsert(points[start:start + upsert_batch_size]) for start in range(0, len(points), upsert_batch_size)))
+    return len(points), sum(1 for _, chunks in resumes if not chunks)
+
+def _progress(checkpoint: Dict[str, Any], total: int, rows: int, started: float) -> str:
+    elapsed = time.perf_counter() - started
+    rate = rows / elapsed if elapsed > 0 else 0.0
+    remaining = max(total - checkpoint["resumes"], 0)
+    eta = str(datetime.timedelta(seconds=round(remaining / rate))) if rate else "?"
+    return (f"{checkpoint['phase']}: {checkpoint['resumes']}/{total} resumes, {checkpoint['points']} points, "
+            f"{rate:.1f} rows/s, ETA {eta}")
+
+async def run_phase(client: AsyncQdrantClient, checkpoint: Dict[str, Any], checkpoint_path: str, page_size: int,
+                    embed_batch_size: int, concurrency: int, upsert_batch_size: int, created_since: Optional[str] = None) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    total = checkpoint["resumes"] + await asyncio.to_thread(count_resumes_after, checkpoint["last_id"], created_since)
+    rows_done, started = 0, time.perf_counter()
+    page = await asyncio.to_thread(fetch_resume_page, checkpoint["last_id"], page_size, created_since)
+    while page:
+        # Fetched while this page is embedded and written
+        next_page = asyncio.ensure_future(asyncio.to_thread(fetch_resume_page, str(page[-1]["id"]), page_size, created_since))
+        try:
+            points, skipped = await index_page(client, checkpoint["target"], page, embed_batch_size, upsert_batch_size, semaphore)
+        except BaseException:
+            await asyncio.gather(next_page, return_exceptions=True) # A thread can't be cancelled; don't leave it running
+            raise
+        checkpoint.update(last_id=str(page[-1]["id"]), resumes=checkpoint["resumes"] + len(page),
+                          points=checkpoint["points"] + points, skipped=checkpoint["skipped"] + skipped)
+        save_checkpoint(checkpoint_path, checkpoint)
+        rows_done += len(page)
+        print(_progress(checkpoint, total, rows_done, started))
+        page = await next_page
+
+# --- Switch ---
+
+async def current_alias_target(client: AsyncQdrantClient, alias: str) -> Optional[str]:
+    aliases = (await client.get_aliases()).aliases
+    return next((description.collection_name for description in aliases if description.alias_name == alias), None)
+
+async def switch_alias(client: AsyncQdrantClient, alias: str, target: str, replace_collection: bool = False) -> Optional[str]:
+    """Points `alias` at `target` in one alias update; returns the collection it pointed at before."""
+    previous = await current_alias_target(client, alias)
+    if previous is None and await client.collection_exists(alias):
+        if not replace_collection:
+            raise RuntimeError(f"'{alias}' is a collection, not an alias; rerun with --replace-collection to delete it and create the alias")
+        print(f"Deleting collection '{alias}' to replace it with an alias to '{target}'.")
+        await client.delete_collection(alias)
+    operations = [models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=alias))] if previous is not None else []
+    operations.append(models.CreateAliasOperation(create_alias=models.CreateAlias(collection_name=target, alias_name=alias)))
+    await client.update_collection_aliases(change_aliases_operations=operations)
+    return previous
+
+# --- Entry point ---
+
+async def reindex(checkpoint_path: str, page_size: int = 500, embed_batch_size: int = 64, concurrency: int = 4,
+                  upsert_batch_size: int = 256, target: Optional[str] = None, restart: bool = False, switch: bool = True,
+                  replace_collection: bool = False, drop_old: bool = False) -> Dict[str, Any]:
+    """Runs (or continues) the reindex described at the top of this module; returns the final checkpoint."""
+    if supabase_client is None:
+        raise RuntimeError("Supabase client not available")
+    alias = settings.QDRANT_RESUME_COLLECTION
+    vector_service.collection_profile() # An unknown profile fails before any work
+    client = await vector_service.get_qdrant_client()
+
+    checkpoint = None if restart else load_checkpoint(checkpoint_path)
+    if checkpoint is None:
+        checkpoint = new_checkpoint(alias, target)
+        if await client.collection_exists(checkpoint["target"]):
+            raise RuntimeError(f"Collection '{checkpoint['target']}' already exists; pass another --target")
+    else:
+        backend = get_embedding_backend()
+        if (checkpoint["alias"], checkpoint["embedding_model"], checkpoint["dimension"]) != (alias, backend.model, backend.dimension):
+            raise RuntimeError(f"Checkpoint {checkpoint_path} is for {checkpoint['alias']} with {checkpoint['embedding_model']} "
+                               f"({checkpoint['dimension']} dimensions); rerun with --restart")
+        if not await client.collection_exists(checkpoint["target"]):
+            raise RuntimeError(f"Collection '{checkpoint['target']}' from checkpoint {checkpoint_path} is gone; rerun with --restart")
+        print(f"Continuing into '{checkpoint['target']}' after resume {checkpoint['last_id']} ({checkpoint['phase']}, {checkpoint['resumes']} resumes done).")
+    if checkpoint["target"] == alias:
+        raise RuntimeError(f"The new collection needs a name other than '{alias}'")
+    if switch and not replace_collection and await current_alias_target(client, alias) is None and await client.collection_exists(alias):
+        raise RuntimeError(f"'{alias}' is a collection, not an alias; rerun with --replace-collection to delete it at the switch, or --no-switch")
+
+    await vector_service.prepare_resume_collection(client, checkpoint["target"])
+    save_checkpoint(checkpoint_path, checkpoint)
+    options = dict(page_size=page_size, embed_batch_size=embed_batch_size, concurrency=concurrency, upsert_batch_size=upsert_batch_size)
+    if checkpoint["phase"] == "backfill":
+        await run_phase(client, checkpoint, checkpoint_path, **options)
+        checkpoint.update(phase="catch_up", last_id=None)
+        save_checkpoint(checkpoint_path, checkpoint)
+    if not switch:
+        print(f"Indexed {checkpoint['resumes']} resumes ({checkpoint['points']} points, {checkpoint['skipped']} without text) "
+              f"into '{checkpoint['target']}'. Rerun without --no-switch to catch up and switch.")
+        return checkpoint
+
+    # Resumes created since the run started went to the live collection; ids are deterministic, so
+    # resumes indexed twice are just overwritten
+    await run_phase(client, checkpoint, checkpoint_path, created_since=checkpoint["started_at"], **options)
+    previous = await switch_alias(client, alias, checkpoint["target"], replace_collection)
+    checkpoint["phase"] = "done"
+    save_checkpoint(checkpoint_path, checkpoint)
+    print(f"'{alias}' now points at '{checkpoint['target']}' ({checkpoint['resumes']} resumes, {checkpoint['points']} points).")
+    if previous is not None and previous != checkpoint["target"]:
+        if drop_old:
+            await client.delete_collection(previous)
+            print(f"Deleted the previous collection '{previous}'.")
+        else:
+            print(f"The previous collection '{previous}' is kept; point the alias back at it to roll back.")
+    os.remove(checkpoint_path) # Finished: the next run starts a new reindex
+    return checkpoint
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the resume vector index into a new Qdrant collection and switch the alias to it")
+    parser.add_argument("--checkpoint", default=default_checkpoint_path(), help="Progress file; a rerun continues from it.")
+    parser.add_argument("--target", help="Name of the new collection (default: <alias>_<UTC timestamp>).")
+    parser.add_argument("--page-size", type=int, default=500, help="Resumes read per database query.")
+    parser.add_argument("--embed-batch-size", type=int, default=64, help="Chunk texts per embedding call.")
+    parser.add_argument("--upsert-batch-size", type=int, default=256, help="Points per Qdrant upsert.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Embedding calls and upserts in flight.")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start a new collection.")
+    parser.add_argument("--no-switch", dest="switch", action="store_false", help="Index only; a rerun catches up and switches.")
+    parser.add_argument("--replace-collection", action="store_true", help="The alias name is still a plain collection: delete it at the switch.")
+    parser.add_argument("--drop-old", action="store_true", help="Delete the collection the alias pointed at before.")
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            await reindex(args.checkpoint, args.page_size, args.embed_batch_size, args.concurrency, args.upsert_batch_size,
+                          args.target, args.restart, args.switch, args.replace_collection, args.drop_old)
+        finally:
+            await vector_service.close_qdrant_client()
+            embedding_cache.close()
+
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    main()
@@ -1,113 +1,455 @@
-import openai # For embeddings
-from qdrant_client import QdrantClient, models
-from qdrant_client.http.models import PointStruct, Distance, VectorParams # Ensure models is imported correctly if using older client version syntax. For newer, it's often just 'models'
+import asyncio
+from qdrant_client import AsyncQdrantClient, models
 from app.core.config import settings
-from typing import List, Optional
+from app.services import embedding_cache
+from app.services.embedding_backend import EmbeddingBackend, get_embedding_backend
+from app.services.micro_batcher import MicroBatcher
+from app.services.prompt_builder import count_tokens
+from app.services.resume_chunker import ResumeChunk, chunk_resume
+from app.services.vector_store import CollectionSchemaError, NumpyVectorStore, ResumeHit, VectorPoint, VectorStore
+from typing import Dict, List, NamedTuple, Optional, Sequence
 from uuid import UUID
+import uuid
 import datetime # Added for potential timestamping in payload
 
-# OpenAI embedding model details
-EMBEDDING_MODEL = "text-embedding-ada-002" # OpenAI's Ada v2 model
-EMBEDDING_DIMENSION = 1536 # Dimension for text-embedding-ada-002
+# Every Qdrant call is awaited on the async client, so an index round trip never blocks the event loop.
+# The client is created in the app lifespan (init_qdrant_client) and shared by all requests.
+qdrant_client_instance: Optional[AsyncQdrantClient] = None # Renamed to avoid conflict with module
 
-qdrant_client_instance: Optional[QdrantClient] = None # Renamed to avoid conflict with module
+# Set once the resume collection is known to exist with the expected schema, so writes skip the check.
+# Cleared when a write fails, in case the collection was dropped under us; the next write checks again.
+_collection_ready = False
+_collection_lock = asyncio.Lock()
 
-async def get_qdrant_client() -> QdrantClient:
+def embedding_dimension() -> int:
+    """The size of the resume collection's vectors: whatever the embedding backend (embedding_backend.py) produces."""
+    return get_embedding_backend().dimension
+
+def create_qdrant_client() -> AsyncQdrantClient:
+    return AsyncQdrantClient(
+        host=settings.QDRANT_HOST,
+        port=settings.QDRANT_PORT,
+        grpc_port=settings.QDRANT_GRPC_PORT,
+        prefer_grpc=settings.QDRANT_PREFER_GRPC,
+        api_key=settings.QDRANT_API_KEY if settings.QDRANT_API_KEY else None,
+        timeout=settings.QDRANT_TIMEOUT_SECONDS,
+    )
+
+async def get_qdrant_client() -> AsyncQdrantClient:
     global qdrant_client_instance
-    if qdrant_client_instance is None:
+    if qdrant_client_instance is None: # Outside the app (scripts, tests) there was no lifespan to create it
         try:
-            qdrant_client_instance = QdrantClient(
-                host=settings.QDRANT_HOST,
-                port=settings.QDRANT_PORT,
-                api_key=settings.QDRANT_API_KEY if settings.QDRANT_API_KEY else None,
-                # prefer_grpc=True, # Enable if QDRANT_PORT is set to gRPC port like 6333
-            )
-            print("Qdrant client initialized.")
+            qdrant_client_instance = create_qdrant_client()
+            print(f"Qdrant client initialized ({'gRPC' if settings.QDRANT_PREFER_GRPC else 'REST'}).")
         except Exception as e:
             print(f"Failed to initialize Qdrant client: {e}")
             raise # Re-raise to signal problem during startup or first use
     return qdrant_client_instance
 
-async def ensure_resume_collection():
-    client = await get_qdrant_client()
-    collection_name = settings.QDRANT_RESUME_COLLECTION
+async def init_qdrant_client() -> Optional[AsyncQdrantClient]:
+    """Creates the shared client at startup. Failures are logged, not raised: the app runs without the index."""
     try:
-        # Check if collection exists
-        # get_collection throws an exception if not found, so this is a valid check.
-        client.get_collection(collection_name)
-        print(f"Collection '{collection_name}' already exists.")
-    except Exception: # Exception typically means collection not found (e.g. UnexpectedResponse for HTTP, or specific gRPC error)
+        return await get_qdrant_client()
+    except Exception:
+        return None
+
+async def close_qdrant_client() -> None:
+    global qdrant_client_instance, _collection_ready
+    client, qdrant_client_instance = qdrant_client_instance, None
+    _collection_ready = False
+    if client is not None:
+        try:
+            await client.close()
+        except Exception as e:
+            print(f"Error closing Qdrant client: {e}")
+
+def collection_ready() -> bool:
+    """Whether the vector index (Qdrant collection or embedded store) is known to be usable."""
+    return get_vector_store().ready()
+
+def mark_collection_unready() -> None:
+    global _collection_ready
+    _collection_ready = False
+
+# Every search filters by user_id, so it is indexed (as the tenant key: Qdrant keeps each user's points
+# together) and searches never scan the whole collection; resume_id groups and deletes a resume's chunks;
+# created_at backs the "uploaded after" filter
+PAYLOAD_INDEXES = {
+    "user_id": models.KeywordIndexParams(type=models.KeywordIndexType.KEYWORD, is_tenant=True),
+    "resume_id": models.KeywordIndexParams(type=models.KeywordIndexType.KEYWORD),
+    "created_at": models.DatetimeIndexParams(type=models.DatetimeIndexType.DATETIME),
+}
+
+async def _ensure_payload_indexes(client: AsyncQdrantClient, collection_name: str, info: models.CollectionInfo) -> None:
+    existing = info.payload_schema or {}
+    for field_name, field_schema in PAYLOAD_INDEXES.items():
+        if field_name not in existing:
+            print(f"Creating payload index on '{field_name}' in collection '{collection_name}'.")
+            await client.create_payload_index(collection_name=collection_name, field_name=field_name, field_schema=field_schema, wait=True)
+
+class CollectionProfile(NamedTuple):
+    quantization: Optional[models.QuantizationConfig] # Compressed copy kept in RAM and searched first
+    on_disk: bool # float32 originals memory-mapped instead of held in RAM
+    oversampling: float # Quantized profiles: candidates per result rescored with the originals
+
+# QDRANT_COLLECTION_PROFILE. RAM per 1536-d point, besides the HNSW graph (~m * 8 bytes) and payload:
+# default ~6 KB; on_disk only what the page cache holds; int8 ~1.5 KB; binary ~200 B.
+# Binary quantization loses too much on small vectors; it suits 1024+ dimensions.
+COLLECTION_PROFILES = {
+    "default": CollectionProfile(None, False, 1.0),
+    "on_disk": CollectionProfile(None, True, 1.0),
+    "int8": CollectionProfile(models.ScalarQuantization(
+        scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=True)), True, 1.5),
+    "binary": CollectionProfile(models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True)), True, 3.0),
+}
+
+def collection_profile() -> CollectionProfile:
+    profile = COLLECTION_PROFILES.get(settings.QDRANT_COLLECTION_PROFILE)
+    if profile is None:
+        raise ValueError(f"Unknown QDRANT_COLLECTION_PROFILE {settings.QDRANT_COLLECTION_PROFILE!r}; expected one of {', '.join(COLLECTION_PROFILES)}")
+    return profile
+
+def _hnsw_config() -> Optional[models.HnswConfigDiff]:
+    if not settings.QDRANT_HNSW_M and not settings.QDRANT_HNSW_EF_CONSTRUCT:
+        return None # Qdrant's defaults
+    return models.HnswConfigDiff(m=settings.QDRANT_HNSW_M or None, ef_construct=settings.QDRANT_HNSW_EF_CONSTRUCT or None)
+
+def search_params() -> Optional[models.SearchParams]:
+    """Search-time settings matching the profile: quantized profiles rescore their candidates with the originals."""
+    quantization = None
+    profile = collection_profile()
+    if profile.quantization is not None:
+        quantization = models.QuantizationSearchParams(rescore=True, oversampling=settings.QDRANT_QUANTIZATION_OVERSAMPLING or profile.oversampling)
+    if quantization is None and not settings.QDRANT_SEARCH_HNSW_EF:
+        return None
+    return models.SearchParams(hnsw_ef=settings.QDRANT_SEARCH_HNSW_EF or None, quantization=quantization)
+
+def _quantization_kind(config) -> Optional[str]:
+    if isinstance(config, models.ScalarQuantization):
+        return f"scalar:{config.scalar.type.value}"
+    if isinstance(config, models.BinaryQuantization):
+        return "binary"
+    if isinstance(config, models.ProductQuantization):
+        return f"product:{config.product.compression.value}"
+    return None
+
+async def _apply_collection_profile(client: AsyncQdrantClient, collection_name: str, info: models.CollectionInfo) -> None:
+    # An existing collection is updated in place; Qdrant rebuilds the affected segments in the background
+    # while searches keep working. Only what the profile and settings pin down is compared.
+    profile = collection_profile()
+    changes = {}
+    if bool(info.config.params.vectors.on_disk) != profile.on_disk:
+        changes["vectors_config"] = {"": models.VectorParamsDiff(on_disk=profile.on_disk)}
+    hnsw = info.config.hnsw_config
+    if (settings.QDRANT_HNSW_M and hnsw.m != settings.QDRANT_HNSW_M) or \
+            (settings.QDRANT_HNSW_EF_CONSTRUCT and hnsw.ef_construct != settings.QDRANT_HNSW_EF_CONSTRUCT):
+        changes["hnsw_config"] = _hnsw_config()
+    if _quantization_kind(info.config.quantization_config) != _quantization_kind(profile.quantization):
+        changes["quantization_config"] = profile.quantization or models.Disabled.DISABLED
+    if changes:
+        print(f"Updating collection '{collection_name}' to profile '{settings.QDRANT_COLLECTION_PROFILE}': {', '.join(changes)}.")
+        await client.update_collection(collection_name=collection_name, **changes)
+
+def check_collection_schema(collection_name: str, info: models.CollectionInfo) -> None:
+    vectors = info.config.params.vectors
+    if not isinstance(vectors, models.VectorParams):
+        raise CollectionSchemaError(f"Collection '{collection_name}' uses named vectors {sorted(vectors or {})}; expected a single unnamed vector.")
+    dimension = embedding_dimension()
+    if vectors.size != dimension or vectors.distance != models.Distance.COSINE:
+        raise CollectionSchemaError(
+            f"Collection '{collection_name}' has vectors of size {vectors.size} with {vectors.distance.value} distance; "
+            f"expected size {dimension} ({get_embedding_backend().model}) with {models.Distance.COSINE.value} distance. "
+            f"Rebuild it with python -m app.services.vector_reindex."
+        )
+
+async def prepare_resume_collection(client: AsyncQdrantClient, collection_name: str) -> None:
+    """Creates `collection_name` for resume chunks if it is missing, checks its schema and applies the collection
+    profile and payload indexes. Also used by the reindex (vector_reindex.py) to build a collection beside the live one."""
+    if not await client.collection_exists(collection_name):
         print(f"Collection '{collection_name}' not found, creating it.")
-        client.recreate_collection( # Use recreate_collection for simplicity, or create_collection if specific config needed and sure it doesn't exist
-            collection_name=collection_name,
-            vectors_config=models.VectorParams(size=EMBEDDING_DIMENSION, distance=models.Distance.COSINE) # Using models.VectorParams and models.Distance
+        try:
+            profile = collection_profile()
+            await client.create_collection(
+                collection_name=collection_name,
+                vectors_config=models.VectorParams(size=embedding_dimension(), distance=models.Distance.COSINE, on_disk=profile.on_disk),
+                hnsw_config=_hnsw_config(),
+                quantization_config=profile.quantization,
+            )
+            print(f"Collection '{collection_name}' created.")
+        except Exception:
+            # Another worker may have created it between our check and our create
+            if not await client.collection_exists(collection_name):
+                raise
+    info = await client.get_collection(collection_name)
+    check_collection_schema(collection_name, info)
+    await _apply_collection_profile(client, collection_name, info)
+    await _ensure_payload_indexes(client, collection_name, info)
+
+async def ensure_resume_collection():
+    """Creates the resume collection if it is missing and checks its schema; a no-op once that has succeeded.
+    Never drops data: an existing collection with the wrong schema raises CollectionSchemaError.
+    QDRANT_RESUME_COLLECTION may be an alias (see vector_reindex.py); Qdrant resolves it for every call here."""
+    global _collection_ready
+    if _collection_ready:
+        return
+    async with _collection_lock: # Concurrent first writes check (and create) once
+        if _collection_ready:
+            return
+        client = await get_qdrant_client()
+        await prepare_resume_collection(client, settings.QDRANT_RESUME_COLLECTION)
+        _collection_ready = True
+
+async def bootstrap_resume_collection() -> bool:
+    """Startup check of the vector index. An unreachable Qdrant is logged and retried on the first write;
+    a schema mismatch or invalid store settings are raised, so a misconfigured deployment fails at startup
+    rather than per upload."""
+    store = get_vector_store()
+    store.check_settings()
+    try:
+        await store.ensure()
+        print(f"Vector index ready: {store.describe()}.")
+        return True
+    except CollectionSchemaError:
+        raise
+    except Exception as e:
+        print(f"Vector index not ready at startup ({store.describe()}): {e}")
+        return False
+
+async def embed_texts(texts: List[str], backend: Optional[EmbeddingBackend] = None) -> List[Optional[List[float]]]:
+    """Embeddings for `texts` in one backend call (the configured backend by default), in order; None for each that failed."""
+    return await (backend or get_embedding_backend()).embed(texts)
+
+# Concurrent requests share embedding calls and Qdrant writes (see micro_batcher.py); one batcher per backend model
+_embedding_batchers: Dict[str, MicroBatcher] = {}
+_upsert_batcher: Optional[MicroBatcher] = None
+
+def _embedding_batcher(backend: EmbeddingBackend) -> MicroBatcher:
+    batcher = _embedding_batchers.get(backend.model)
+    if batcher is None:
+        batcher = _embedding_batchers[backend.model] = MicroBatcher(
+            "embedding_batch", lambda texts: embed_texts(texts, backend), settings.EMBEDDING_BATCH_WINDOW_MS,
+            settings.EMBEDDING_BATCH_MAX_ITEMS, settings.EMBEDDING_BATCH_MAX_TOKENS)
+    return batcher
+
+async def _upsert_points(points: List[models.PointStruct]) -> List[None]:
+    client = await get_qdrant_client()
+    await client.upsert(collection_name=settings.QDRANT_RESUME_COLLECTION, points=points)
+    return [None] * len(points)
+
+def _point_batcher() -> MicroBatcher:
+    global _upsert_batcher
+    if _upsert_batcher is None:
+        _upsert_batcher = MicroBatcher("qdrant_upsert_batch", lambda points: _upsert_points(points),
+                                       settings.QDRANT_UPSERT_BATCH_WINDOW_MS, settings.QDRANT_UPSERT_BATCH_MAX_POINTS)
+    return _upsert_batcher
+
+def reset_batchers() -> None:
+    """Drops the batchers so they are rebuilt from the current settings."""
+    global _upsert_batcher
+    _embedding_batchers.clear()
+    _upsert_batcher = None
+
+async def get_text_embedding(text: str) -> Optional[List[float]]:
+    backend = get_embedding_backend()
+    text = embedding_cache.normalize_text(text)
+    key = embedding_cache.cache_key(text, backend.model, backend.dimension)
+    (embedding,) = await embedding_cache.get_many([key])
+    if embedding is not None:
+        return embedding
+    if settings.EMBEDDING_BATCH_WINDOW_MS <= 0:
+        embedding = (await embed_texts([text], backend))[0]
+    else:
+        embedding = await _embedding_batcher(backend).submit(text, count_tokens(text))
+    if embedding is not None:
+        await embedding_cache.put_many([(key, embedding)])
+    return embedding
+
+async def upsert_point(point: models.PointStruct) -> None:
+    if settings.QDRANT_UPSERT_BATCH_WINDOW_MS <= 0:
+        await _upsert_points([point])
+    else:
+        await _point_batcher().submit(point)
+
+def chunk_point_id(resume_id: UUID, chunk_index: int) -> str:
+    # Deterministic, so re-indexing a resume overwrites its points instead of adding new ones
+    return str(uuid.uuid5(resume_id, f"chunk-{chunk_index}"))
+
+def _resume_filter(resume_id: UUID) -> models.Filter:
+    return models.Filter(must=[models.FieldCondition(key="resume_id", match=models.MatchValue(value=str(resume_id)))])
+
+class QdrantVectorStore(VectorStore):
+    """The resume collection on the shared Qdrant client (see the functions above)."""
+    name = "qdrant"
+
+    def check_settings(self) -> None:
+        collection_profile()
+
+    async def open(self) -> None:
+        await get_qdrant_client()
+
+    async def ensure(self) -> None:
+        await ensure_resume_collection()
+
+    def ready(self) -> bool:
+        return _collection_ready
+
+    def mark_unready(self) -> None:
+        mark_collection_unready()
+
+    def describe(self) -> str:
+        return f"Qdrant collection '{settings.QDRANT_RESUME_COLLECTION}' ({settings.QDRANT_COLLECTION_PROFILE} profile)"
+
+    async def upsert(self, points: Sequence[VectorPoint]) -> None:
+        # Written together with concurrent uploads
+        await asyncio.gather(*(upsert_point(models.PointStruct(id=point.id, vector=point.vector, payload=point.payload)) for point in points))
+
+    async def delete_resume(self, resume_id: str, keep_ids: Sequence[str] = ()) -> None:
+        client = await get_qdrant_client()
+        selector = _resume_filter(resume_id)
+        if keep_ids:
+            selector = models.Filter(must=selector.must, must_not=[models.HasIdCondition(has_id=list(keep_ids))])
+        await client.delete(collection_name=settings.QDRANT_RESUME_COLLECTION, points_selector=models.FilterSelector(filter=selector))
+
+    async def search(self, user_id: str, query_vector: List[float], limit: int = 10, score_threshold: Optional[float] = None,
+                     created_after: Optional[datetime.datetime] = None) -> List[ResumeHit]:
+        await ensure_resume_collection()
+        client = await get_qdrant_client()
+        conditions = [models.FieldCondition(key="user_id", match=models.MatchValue(value=str(user_id)))]
+        if created_after is not None:
+            conditions.append(models.FieldCondition(key="created_at", range=models.DatetimeRange(gte=created_after)))
+        response = await client.query_points_groups(
+            collection_name=settings.QDRANT_RESUME_COLLECTION,
+            query=query_vector,
+            group_by="resume_id", # Qdrant collapses the chunks, so `limit` counts resumes, not chunks
+            group_size=1,
+            query_filter=models.Filter(must=conditions),
+            limit=limit,
+            score_threshold=score_threshold,
+            search_params=search_params(),
+            with_payload=["section"], # Metadata comes from the database, which is authoritative
         )
-        print(f"Collection '{collection_name}' created.")
+        return [ResumeHit(str(group.id), group.hits[0].score, (group.hits[0].payload or {}).get("section")) for group in response.groups]
 
-async def get_text_embedding(text: str, model: str = EMBEDDING_MODEL) -> Optional[List[float]]:
-    if not settings.OPENAI_API_KEY:
-        print("OPENAI_API_KEY not set. Cannot generate embeddings.")
-        return None
+    async def close(self) -> None:
+        await close_qdrant_client()
+
+# VECTOR_STORE: "qdrant", "numpy" (the embedded NumpyVectorStore, vector_store.py) or "auto" (decided once at
+# startup by init_vector_store: Qdrant if it answers, the embedded store otherwise). set_vector_store() overrides it.
+_vector_store: Optional[VectorStore] = None
+
+def _build_vector_store(name: str) -> VectorStore:
+    if name in ("qdrant", "auto"): # Outside the app's startup, "auto" has not been decided: assume the server
+        return QdrantVectorStore()
+    if name == "numpy":
+        return NumpyVectorStore(settings.VECTOR_STORE_PATH, settings.VECTOR_STORE_SNAPSHOT_EVERY)
+    raise ValueError(f"Unknown VECTOR_STORE {name!r}; expected qdrant, numpy or auto")
+
+def get_vector_store() -> VectorStore:
+    global _vector_store
+    if _vector_store is None:
+        _vector_store = _build_vector_store(settings.VECTOR_STORE)
+    return _vector_store
+
+def set_vector_store(store: Optional[VectorStore]) -> None:
+    """Use `store` for every vector operation in this process; None goes back to VECTOR_STORE."""
+    global _vector_store
+    _vector_store = store
+
+async def _qdrant_answers() -> bool:
+    client = await init_qdrant_client()
+    if client is None:
+        return False
     try:
-        aclient = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-        response = await aclient.embeddings.create(input=[text], model=model)
-        return response.data[0].embedding
+        await client.get_collections()
+        return True
     except Exception as e:
-        print(f"Error generating embedding: {e}")
+        print(f"Qdrant at {settings.QDRANT_HOST}:{settings.QDRANT_PORT} not reachable: {e}")
+        await close_qdrant_client()
+        return False
+
+async def init_vector_store() -> Optional[VectorStore]:
+    """Picks and opens the store at startup. Returns None when Qdrant is configured but its client can't be
+    created (logged; the app runs without the index). Embedded store load errors are raised."""
+    global _vector_store
+    name = settings.VECTOR_STORE
+    if name == "auto":
+        if await _qdrant_answers():
+            _vector_store = QdrantVectorStore()
+        else:
+            print(f"Using the embedded vector index at {settings.VECTOR_STORE_PATH or 'memory only'} instead of Qdrant.")
+            _vector_store = _build_vector_store("numpy")
+    else:
+        _vector_store = _build_vector_store(name)
+    if isinstance(_vector_store, QdrantVectorStore) and await init_qdrant_client() is None:
         return None
+    await _vector_store.open()
+    return _vector_store
+
+async def close_vector_store() -> None:
+    """Closes the store (the embedded one writes its final snapshot) and any Qdrant client."""
+    global _vector_store
+    store, _vector_store = _vector_store, None
+    if store is not None:
+        await store.close()
+    await close_qdrant_client()
+
+def resume_points(resume_id: UUID, user_id: UUID, created_at: str, chunks: List[ResumeChunk], embeddings: List[List[float]]) -> List[VectorPoint]:
+    """The points indexing one resume: one per chunk, tied to the resume by resume_id."""
+    return [
+        VectorPoint(
+            id=chunk_point_id(resume_id, chunk.index),
+            vector=embedding,
+            payload={
+                "user_id": str(user_id),
+                "resume_id": str(resume_id),
+                "created_at": created_at,
+                "section": chunk.section,
+                "chunk_index": chunk.index,
+            }
+        )
+        for chunk, embedding in zip(chunks, embeddings)
+    ]
 
 async def upsert_resume_embedding(resume_id: UUID, user_id: UUID, resume_text: str):
-    client = await get_qdrant_client()
-    collection_name = settings.QDRANT_RESUME_COLLECTION
+    """Indexes the resume as one point per section chunk (see resume_chunker.py), all tied to it by resume_id."""
+    store = get_vector_store()
+    await store.open() # Fail before paying for the embeddings
 
-    embedding = await get_text_embedding(resume_text)
-    if embedding is None:
-        print(f"Failed to generate embedding for resume_id: {resume_id}. Skipping Qdrant upsert.")
+    chunks = chunk_resume(resume_text)
+    # Requested together, so the chunks share one batched embeddings call
+    embeddings = await asyncio.gather(*(get_text_embedding(chunk.text) for chunk in chunks))
+    if not chunks or any(embedding is None for embedding in embeddings):
+        print(f"Failed to generate embeddings for resume_id: {resume_id}. Skipping vector upsert.")
         return
 
-    point = models.PointStruct( # Using models.PointStruct
-        id=str(resume_id),
-        vector=embedding,
-        payload={
-            "user_id": str(user_id),
-            "resume_id": str(resume_id),
-            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat() # Add timestamp for potential filtering/sorting
-        }
-    )
+    created_at = datetime.datetime.now(datetime.timezone.utc).isoformat() # Add timestamp for potential filtering/sorting
+    points = resume_points(resume_id, user_id, created_at, chunks, embeddings)
 
     try:
-        await ensure_resume_collection() # Ensure collection exists before upserting
+        await store.ensure() # A flag check once the index has been bootstrapped
 
-        client.upsert(collection_name=collection_name, points=[point])
-        print(f"Successfully upserted embedding for resume_id: {resume_id}")
+        await store.upsert(points)
+        # Chunks left over from an earlier, longer version of the resume (or its old single whole-resume point)
+        await store.delete_resume(str(resume_id), keep_ids=[point.id for point in points])
+        print(f"Successfully upserted {len(points)} chunk embeddings for resume_id: {resume_id}")
+    except CollectionSchemaError:
+        raise # Writing would fail or corrupt the index; the caller logs it loudly
     except Exception as e:
-        print(f"Error upserting embedding to Qdrant for resume_id {resume_id}: {e}")
+        store.mark_unready()
+        print(f"Error upserting embedding to the vector index for resume_id {resume_id}: {e}")
 
 async def delete_resume_embedding(resume_id: UUID):
-    client = await get_qdrant_client()
-    collection_name = settings.QDRANT_RESUME_COLLECTION
+    store = get_vector_store()
+    await store.open()
     try:
-        # Check if collection exists before attempting delete to avoid errors if it doesn't
-        # However, ensure_resume_collection would create it if it's missing.
-        # A delete operation on a non-existent collection or non-existent point usually doesn't error harshly in Qdrant,
-        # but behavior can vary. It's safer to assume collection exists if upserts are happening.
-        client.delete(
-            collection_name=collection_name,
-            points_selector=models.PointIdsList(points=[str(resume_id)]) # Using models.PointIdsList
-        )
-        print(f"Successfully deleted embedding for resume_id: {resume_id} from Qdrant.")
+        # Every chunk of the resume; a missing collection errors and is logged below
+        await store.delete_resume(str(resume_id))
+        print(f"Successfully deleted embeddings for resume_id: {resume_id} from the vector index.")
     except Exception as e:
-        # Catching specific Qdrant errors might be better if known, e.g. if collection doesn't exist after all
-        print(f"Error deleting embedding from Qdrant for resume_id {resume_id}: {e}")
-
-# Example of how to initialize Qdrant on app startup (optional, can be lazy loaded)
-# In main.py:
-# from app.services.vector_service import ensure_resume_collection, get_qdrant_client
-# @app.on_event("startup")
-# async def startup_event():
-# try:
-# await get_qdrant_client() # Initialize client
-# await ensure_resume_collection() # Ensure collection exists
-# print("Qdrant connection and collection checked successfully.")
-# except Exception as e:
-# print(f"QDRANT STARTUP ERROR: {e}")
+        print(f"Error deleting embedding from the vector index for resume_id {resume_id}: {e}")
+
+async def search_resumes(user_id: UUID, query_vector: List[float], limit: int = 10, score_threshold: Optional[float] = None,
+                         created_after: Optional[datetime.datetime] = None) -> List[ResumeHit]:
+    """The user's resumes nearest to `query_vector`, best first, each scored by its best-matching chunk.
+    Errors are raised: the caller has nothing else to show."""
+    return await get_vector_store().search(str(user_id), query_vector, limit=limit, score_threshold=score_threshold, created_after=created_after)
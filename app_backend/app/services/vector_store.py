@@ -0,0 +1,329 @@
+# Where resume chunk vectors are stored and searched. vector_service chunks and embeds resumes; a store keeps
+# the points and answers "this user's resumes nearest to a vector, best chunk per resume":
+#   - QdrantVectorStore (in vector_service.py, next to the Qdrant client and collection bootstrap).
+#   - NumpyVectorStore: embedded in the process, for small deployments and test environments without a
+#     Qdrant server. Vectors live in one contiguous float32 matrix, normalized on insert, so a search is one
+#     matrix-vector product over the user's rows. Deleted rows are tombstoned and the matrix is compacted once
+#     they make up a quarter of it. Snapshots go to VECTOR_STORE_PATH and are memory-mapped back on startup.
+#     One process owns the files: run a single worker with it.
+# Both return the same results for the same points (see test_vector_store.py); Qdrant searches exactly only
+# below its indexing threshold, above it HNSW may miss a few neighbours.
+# VECTOR_STORE picks one ("qdrant", "numpy" or "auto"); see vector_service.get_vector_store().
+import asyncio
+import datetime
+import glob
+import json
+import os
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Set
+
+import numpy as np
+
+from app.services.embedding_backend import get_embedding_backend
+
+class CollectionSchemaError(RuntimeError):
+    """The collection exists but was built for other vectors. It is never dropped or rebuilt automatically."""
+
+class VectorPoint(NamedTuple):
+    id: str
+    vector: List[float]
+    payload: Dict[str, Any] # user_id, resume_id, created_at (ISO 8601), section, chunk_index
+
+class ResumeHit(NamedTuple):
+    resume_id: str
+    score: float # Of the resume's best-matching chunk
+    section: Optional[str] # That chunk's section
+
+class VectorStore:
+    name = "base"
+
+    def check_settings(self) -> None:
+        """Raises if the store's own settings are invalid; called before anything is created."""
+
+    async def open(self) -> None:
+        """Connects or loads; raises if the store cannot be used at all."""
+
+    async def ensure(self) -> None:
+        """Creates the index if needed and checks it holds vectors of the embedding backend's size
+        (CollectionSchemaError otherwise). Cheap once it has succeeded."""
+        raise NotImplementedError
+
+    def ready(self) -> bool:
+        raise NotImplementedError
+
+    def mark_unready(self) -> None:
+        """A write failed: check the index again on the next ensure()."""
+
+    def describe(self) -> str:
+        raise NotImplementedError
+
+    async def upsert(self, points: Sequence[VectorPoint]) -> None:
+        raise NotImplementedError
+
+    async def delete_resume(self, resume_id: str, keep_ids: Sequence[str] = ()) -> None:
+        """Deletes the resume's points, except `keep_ids`."""
+        raise NotImplementedError
+
+    async def search(self, user_id: str, query_vector: List[float], limit: int = 10, score_threshold: Optional[float] = None,
+                     created_after: Optional[datetime.datetime] = None) -> List[ResumeHit]:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+def _timestamp(value) -> float:
+    moment = datetime.datetime.fromisoformat(value) if isinstance(value, str) else value
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return moment.timestamp()
+
+def _normalized(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+class NumpyVectorStore(VectorStore):
+    name = "numpy"
+
+    def __init__(self, path: str = "", snapshot_every: int = 1000):
+        self.path = path # Snapshot directory; "" keeps everything in memory
+        self.snapshot_every = snapshot_every # Changed points between snapshots (0 = only on close)
+        self._dimension = 0
+        self._vectors = np.zeros((0, 0), dtype=np.float32) # Rows [0, _count) are used; the rest is spare capacity
+        self._created = np.zeros(0, dtype=np.float64)
+        self._resume_codes = np.zeros(0, dtype=np.int64) # Row -> index into _resume_names, for grouping
+        self._count = 0
+        self._ids: List[Optional[str]] = [] # Row -> point id; None once deleted
+        self._payloads: List[Optional[Dict[str, Any]]] = []
+        self._rows: Dict[str, int] = {} # Point id -> row
+        self._user_rows: Dict[str, Set[int]] = {}
+        self._resume_rows: Dict[str, Set[int]] = {}
+        self._resume_codes_by_id: Dict[str, int] = {}
+        self._resume_names: List[str] = []
+        self._dead = 0
+        self._changes = 0 # Since the last snapshot
+        self._generation = 0
+        self._loaded = False
+        self._ready = False
+        self._snapshot_task: Optional[asyncio.Task] = None
+
+    def describe(self) -> str:
+        return f"embedded vector index ({self.path or 'memory only'}, {len(self._rows)} points)"
+
+    # --- Rows and indexes ---
+
+    def _reserve(self, rows: int) -> None:
+        if rows <= len(self._vectors):
+            return
+        capacity = max(rows, 2 * len(self._vectors), 1024)
+        vectors = np.zeros((capacity, self._dimension), dtype=np.float32)
+        vectors[:self._count] = self._vectors[:self._count] # Also copies a memory-mapped snapshot into RAM
+        created = np.zeros(capacity, dtype=np.float64)
+        created[:self._count] = self._created[:self._count]
+        codes = np.zeros(capacity, dtype=np.int64)
+        codes[:self._count] = self._resume_codes[:self._count]
+        self._vectors, self._created, self._resume_codes = vectors, created, codes
+
+    def _resume_code(self, resume_id: str) -> int:
+        code = self._resume_codes_by_id.get(resume_id)
+        if code is None:
+            code = self._resume_codes_by_id[resume_id] = len(self._resume_names)
+            self._resume_names.append(resume_id)
+        return code
+
+    def _index_row(self, row: int) -> None:
+        payload = self._payloads[row]
+        self._rows[self._ids[row]] = row
+        self._user_rows.setdefault(payload["user_id"], set()).add(row)
+        self._resume_rows.setdefault(payload["resume_id"], set()).add(row)
+
+    def _unindex_row(self, row: int) -> None:
+        payload = self._payloads[row]
+        for index, key in ((self._user_rows, payload["user_id"]), (self._resume_rows, payload["resume_id"])):
+            rows = index.get(key)
+            if rows is not None:
+                rows.discard(row)
+                if not rows:
+                    del index[key]
+
+    def _set_row(self, row: int, point: VectorPoint, vector: np.ndarray) -> None:
+        self._vectors[row] = vector
+        self._created[row] = _timestamp(point.payload["created_at"])
+        self._resume_codes[row] = self._resume_code(point.payload["resume_id"])
+        self._ids[row] = point.id
+        self._payloads[row] = dict(point.payload)
+        self._index_row(row)
+
+    def _rebuild_indexes(self) -> None:
+        self._rows, self._user_rows, self._resume_rows = {}, {}, {}
+        self._resume_codes_by_id, self._resume_names = {}, []
+        for row in range(self._count):
+            self._resume_codes[row] = self._resume_code(self._payloads[row]["resume_id"])
+            self._index_row(row)
+
+    def _compact(self) -> None:
+        alive = np.array([row for row in range(self._count) if self._ids[row] is not None], dtype=np.int64)
+        self._vectors = np.ascontiguousarray(self._vectors[alive]) if len(alive) else np.zeros((0, self._dimension), dtype=np.float32)
+        self._created = self._created[alive]
+        self._resume_codes = np.zeros(len(alive), dtype=np.int64)
+        self._ids = [self._ids[row] for row in alive]
+        self._payloads = [self._payloads[row] for row in alive]
+        self._count, self._dead = len(alive), 0
+        self._rebuild_indexes()
+
+    # --- Snapshots ---
+
+    def _snapshot_files(self, generation: int):
+        return os.path.join(self.path, f"snapshot-{generation:08d}.npy"), os.path.join(self.path, f"snapshot-{generation:08d}.json")
+
+    def _generations(self, extension: str) -> List[int]:
+        names = glob.glob(os.path.join(self.path, f"snapshot-*{extension}"))
+        return sorted(int(os.path.basename(name)[len("snapshot-"):-len(extension)]) for name in names)
+
+    def _load(self) -> None:
+        # The .json is written last, so the newest generation with one is complete
+        generations = self._generations(".json")
+        if not generations:
+            return
+        vectors_path, points_path = self._snapshot_files(generations[-1])
+        with open(points_path, encoding="utf-8") as f:
+            points = json.load(f)
+        # Copy-on-write: searches read the file through the page cache; changes stay in memory until the next snapshot
+        vectors = np.load(vectors_path, mmap_mode="c")
+        if len(vectors) != len(points["ids"]):
+            raise RuntimeError(f"Vector snapshot {vectors_path} has {len(vectors)} rows for {len(points['ids'])} points")
+        self._dimension, self._generation = points["dimension"], generations[-1]
+        self._vectors, self._count = vectors, len(vectors)
+        self._ids, self._payloads = points["ids"], points["payloads"]
+        self._created = np.array([_timestamp(payload["created_at"]) for payload in self._payloads], dtype=np.float64)
+        self._resume_codes = np.zeros(self._count, dtype=np.int64)
+        self._rebuild_indexes()
+        print(f"Loaded {self._count} vectors from {vectors_path}.")
+
+    def _write_snapshot(self, generation: int, vectors: np.ndarray, points: Dict[str, Any]) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        vectors_path, points_path = self._snapshot_files(generation)
+        for path, write in ((vectors_path, lambda f: np.save(f, vectors)), (points_path, lambda f: f.write(json.dumps(points).encode("utf-8")))):
+            with open(f"{path}.tmp", "wb") as f:
+                write(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(f"{path}.tmp", path)
+        for older in self._generations(".npy"):
+            if older < generation:
+                for path in self._snapshot_files(older):
+                    if os.path.exists(path):
+                        os.remove(path) # A memory-mapped older file stays readable until it is unmapped
+
+    async def snapshot(self) -> None:
+        """Writes the current points as a new snapshot generation, then removes the older ones."""
+        if not self.path or not self._loaded:
+            return
+        if self._dead:
+            self._compact()
+        # Copied on the event loop, so later changes don't leak into the file being written
+        vectors = np.array(self._vectors[:self._count], dtype=np.float32)
+        points = {"dimension": self._dimension, "ids": list(self._ids[:self._count]), "payloads": list(self._payloads[:self._count])}
+        self._generation += 1
+        self._changes = 0
+        await asyncio.to_thread(self._write_snapshot, self._generation, vectors, points)
+
+    def _changed(self, points: int) -> None:
+        self._changes += points
+        if self.snapshot_every and self._changes >= self.snapshot_every and self._snapshot_task is None:
+            task = asyncio.ensure_future(self.snapshot())
+            self._snapshot_task = task
+            task.add_done_callback(self._snapshot_done)
+
+    def _snapshot_done(self, task: asyncio.Task) -> None:
+        self._snapshot_task = None
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Vector snapshot to {self.path} failed: {task.exception()}") # The next change tries again
+
+    # --- VectorStore ---
+
+    async def open(self) -> None:
+        if not self._loaded:
+            if self.path:
+                self._load()
+            self._loaded = True
+
+    async def ensure(self) -> None:
+        if self._ready:
+            return
+        await self.open()
+        backend = get_embedding_backend()
+        if self._dimension != backend.dimension:
+            if self._rows:
+                raise CollectionSchemaError(
+                    f"The embedded vector index at {self.path} has vectors of size {self._dimension}; expected size {backend.dimension} "
+                    f"({backend.model}). Reindex into an empty VECTOR_STORE_PATH."
+                )
+            self._dimension = backend.dimension
+            self._compact() # Drops the rows of deleted points, which still have the old size
+            self._vectors = np.zeros((0, self._dimension), dtype=np.float32)
+        self._ready = True
+
+    def ready(self) -> bool:
+        return self._ready
+
+    def mark_unready(self) -> None:
+        self._ready = False
+
+    async def upsert(self, points: Sequence[VectorPoint]) -> None:
+        await self.ensure()
+        if not points:
+            return
+        vectors = _normalized(np.asarray([point.vector for point in points], dtype=np.float32))
+        if vectors.shape[1] != self._dimension:
+            raise ValueError(f"Vectors of size {vectors.shape[1]} can't go into an index of size {self._dimension}")
+        self._reserve(self._count + len(points))
+        for point, vector in zip(points, vectors):
+            row = self._rows.get(point.id)
+            if row is None:
+                row = self._count
+                self._count += 1
+                self._ids.append(None)
+                self._payloads.append(None)
+            else:
+                self._unindex_row(row)
+            self._set_row(row, point, vector)
+        self._changed(len(points))
+
+    async def delete_resume(self, resume_id: str, keep_ids: Sequence[str] = ()) -> None:
+        await self.open()
+        keep = set(keep_ids)
+        rows = [row for row in self._resume_rows.get(resume_id, ()) if self._ids[row] not in keep]
+        for row in rows:
+            self._unindex_row(row)
+            del self._rows[self._ids[row]]
+            self._ids[row], self._payloads[row] = None, None
+        self._dead += len(rows)
+        if self._dead * 4 > self._count:
+            self._compact()
+        if rows:
+            self._changed(len(rows))
+
+    async def search(self, user_id: str, query_vector: List[float], limit: int = 10, score_threshold: Optional[float] = None,
+                     created_after: Optional[datetime.datetime] = None) -> List[ResumeHit]:
+        await self.ensure()
+        user_rows = self._user_rows.get(str(user_id))
+        if not user_rows:
+            return []
+        rows = np.fromiter(user_rows, dtype=np.int64, count=len(user_rows))
+        if created_after is not None:
+            rows = rows[self._created[rows] >= _timestamp(created_after)]
+        query = _normalized(np.asarray(query_vector, dtype=np.float32))
+        scores = self._vectors[rows] @ query
+        order = np.argsort(-scores, kind="stable")
+        if score_threshold is not None:
+            order = order[scores[order] >= score_threshold]
+        # The first (best) chunk of each resume in score order
+        _, first = np.unique(self._resume_codes[rows[order]], return_index=True)
+        best = order[np.sort(first)][:limit]
+        return [ResumeHit(self._payloads[rows[i]]["resume_id"], float(scores[i]), self._payloads[rows[i]].get("section")) for i in best]
+
+    async def close(self) -> None:
+        if self._snapshot_task is not None:
+            await asyncio.gather(self._snapshot_task, return_exceptions=True)
+        if self._changes or self._dead:
+            await self.snapshot()
+        self._ready = False
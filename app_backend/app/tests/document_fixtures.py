@@ -0,0 +1,111 @@
+# Builders for small but real PDF and DOCX files with controlled layout, for the parser/ATS tests
+# and the ATS benchmark. The PDFs are written by hand (no PDF library needed): Helvetica text runs at
+# given positions, optional images and extra fonts.
+import io
+from typing import Dict, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+import docx
+from docx.oxml.ns import qn, nsdecls
+from docx.oxml import OxmlElement, parse_xml
+
+TextRun = Tuple[float, float, str] # (x, y, text) in points from the bottom-left corner
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def make_pdf(pages: Sequence[Sequence[TextRun]], images_per_page: Optional[Sequence[int]] = None,
+             extra_fonts: Optional[Dict[str, Dict[str, str]]] = None, font_size: float = 10,
+             width: float = 612, height: float = 792) -> bytes:
+    """A PDF with one page per entry of `pages`.
+
+    `images_per_page[i]` 1x1 images are placed on page i. `extra_fonts` maps a resource name to extra
+    font dictionary entries (e.g. {"F2": {"Subtype": "/Type3", "BaseFont": "/Icons"}}); they are added to
+    every page's resources.
+    """
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog_id = add(b"") # Filled in at the end
+    pages_id = add(b"")
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    font_refs = {"F1": font_id}
+    for name, entries in (extra_fonts or {}).items():
+        fields = {"Type": "/Font", "Subtype": "/Type1", "BaseFont": f"/{name}"}
+        fields.update(entries)
+        font_refs[name] = add(("<< " + " ".join(f"/{key} {value}" for key, value in fields.items()) + " >>").encode())
+    image_id = add(b"<< /Type /XObject /Subtype /Image /Width 1 /Height 1 /ColorSpace /DeviceGray /BitsPerComponent 8 /Length 1 >>\nstream\n\x80\nendstream")
+
+    page_ids = []
+    for index, runs in enumerate(pages):
+        image_count = images_per_page[index] if images_per_page else 0
+        ops = []
+        for x, y, text in runs:
+            ops.append(f"BT /F1 {font_size} Tf {x} {y} Td ({_escape(text)}) Tj ET")
+        for image in range(image_count):
+            ops.append(f"q 200 0 0 200 {50 + image * 10} {100 + image * 10} cm /Im{image} Do Q")
+        content = "\n".join(ops).encode("latin-1")
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        fonts = " ".join(f"/{name} {ref} 0 R" for name, ref in font_refs.items())
+        xobjects = " ".join(f"/Im{image} {image_id} 0 R" for image in range(image_count))
+        resources = f"<< /Font << {fonts} >> /XObject << {xobjects} >> >>"
+        page_ids.append(add(f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 {width} {height}] /Resources {resources} /Contents {content_id} 0 R >>".encode()))
+
+    objects[catalog_id - 1] = f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode()
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[pages_id - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref_at = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog_id, xref_at))
+    return out.getvalue()
+
+def single_column_runs(lines: Sequence[str], top: float = 740, x: float = 72, leading: float = 14) -> List[TextRun]:
+    return [(x, top - i * leading, line) for i, line in enumerate(lines)]
+
+def two_column_runs(left: Sequence[str], right: Sequence[str], top: float = 740, leading: float = 14) -> List[TextRun]:
+    return single_column_runs(left, top, 40, leading) + single_column_runs(right, top, 330, leading)
+
+def make_docx(paragraphs: Sequence[str], table_rows: Optional[Sequence[Sequence[str]]] = None, header_text: Optional[str] = None,
+              footer_text: Optional[str] = None, columns: int = 1, text_box: Optional[str] = None, fonts: Sequence[str] = ()) -> bytes:
+    document = docx.Document()
+    for index, text in enumerate(paragraphs):
+        run = document.add_paragraph().add_run(text)
+        if fonts:
+            run.font.name = fonts[index % len(fonts)]
+    if table_rows:
+        table = document.add_table(rows=len(table_rows), cols=len(table_rows[0]))
+        for row, values in zip(table.rows, table_rows):
+            for cell, value in zip(row.cells, values):
+                cell.text = value
+    section = document.sections[0]
+    if header_text:
+        section.header.paragraphs[0].text = header_text
+    if footer_text:
+        section.footer.paragraphs[0].text = footer_text
+    if columns > 1:
+        cols = section._sectPr.find(qn("w:cols"))
+        if cols is None:
+            cols = OxmlElement("w:cols")
+            section._sectPr.append(cols)
+        cols.set(qn("w:num"), str(columns))
+    if text_box:
+        # A minimal VML text box, the way older Word versions and many templates store them
+        run = document.add_paragraph().add_run()._r
+        run.append(parse_xml(
+            f'<w:pict {nsdecls("w")} xmlns:v="urn:schemas-microsoft-com:vml"><v:shape><v:textbox><w:txbxContent>'
+            f'<w:p><w:r><w:t>{escape(text_box)}</w:t></w:r></w:p></w:txbxContent></v:textbox></v:shape></w:pict>'))
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
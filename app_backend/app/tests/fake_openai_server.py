@@ -0,0 +1,85 @@
+# A tiny local stand-in for the OpenAI HTTP API, for tests that need real HTTP behaviour
+# (status codes, rate-limit headers, retries) without touching the network.
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+ANALYSIS_JSON = {
+    "match_score": 80,
+    "missing_keywords": ["kubernetes"],
+    "strength_summary": "Strong backend experience.",
+    "improvement_suggestions": ["Add metrics to achievements."],
+    "ats_compatibility_check": "Compatible."
+}
+
+def chat_completion_body(content: str) -> dict:
+    return {
+        "id": "chatcmpl-fake", "object": "chat.completion", "created": 0, "model": "gpt-3.5-turbo-0125",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+    }
+
+def embedding_body(count: int, dimension: int = 3) -> dict:
+    return {
+        "object": "list", "model": "text-embedding-ada-002",
+        "data": [{"object": "embedding", "index": i, "embedding": [0.1 * (i + 1)] * dimension} for i in range(count)],
+        "usage": {"prompt_tokens": 1, "total_tokens": 1},
+    }
+
+def error_body(message: str, error_type: str) -> dict:
+    return {"error": {"message": message, "type": error_type, "param": None, "code": None}}
+
+class FakeOpenAIServer:
+    """Serves queued responses in order; once the queue is empty, every request succeeds.
+
+    Queue entries are (status, headers, body); a None body means "a normal successful response".
+    """
+
+    def __init__(self):
+        self.responses: List[Tuple[int, Dict[str, str], Optional[dict]]] = []
+        self.requests: List[dict] = []
+        self.success_headers: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with server._lock:
+                    server.requests.append({"path": self.path, "json": payload})
+                    status, headers, body = server.responses.pop(0) if server.responses else (200, dict(server.success_headers), None)
+                if body is None:
+                    if self.path.endswith("/embeddings"):
+                        inputs = payload.get("input")
+                        body = embedding_body(len(inputs) if isinstance(inputs, list) else 1)
+                    else:
+                        body = chat_completion_body(json.dumps(ANALYSIS_JSON))
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass # Keep test output clean
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self._httpd.server_address[1]}/v1"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def queue(self, status: int, headers: Optional[Dict[str, str]] = None, body: Optional[dict] = None, times: int = 1):
+        with self._lock:
+            self.responses.extend([(status, headers or {}, body)] * times)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,11 @@
+# Reading Server-Sent Events responses in the streaming endpoint tests
+import json
+from typing import Any, List, Tuple
+
+def parse_sse(body: str) -> List[Tuple[str, Any]]:
+    """(event name, decoded data) for every event in a text/event-stream body."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
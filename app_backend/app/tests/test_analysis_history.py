@@ -0,0 +1,188 @@
+import pytest
+import datetime
+import json
+from httpx import AsyncClient
+from unittest.mock import patch, MagicMock, AsyncMock
+from uuid import uuid4
+
+from app.main import app
+from app.api.deps import get_current_user
+from app.schemas.auth_schemas import UserResponse
+from app.services import analysis_history_service
+from app.services.analysis_history_service import hash_text, store_result, prune_expired_history, ANALYSIS_TABLE
+from app.services.llm_service import LLMAnalysisResult, InterviewPrepResult, InterviewQuestion
+
+MOCK_USER_ID_STR = str(uuid4())
+RESUME = "Skills\nPython, FastAPI, PostgreSQL"
+JD = "Backend Engineer\nPython and FastAPI"
+
+LLM_RESULT = LLMAnalysisResult(match_score=81, missing_keywords=["Kubernetes"], strength_summary="Good fit.",
+                               improvement_suggestions=["Add metrics."], ats_compatibility_check="Fine.")
+PREP_RESULT = InterviewPrepResult(generated_questions=[InterviewQuestion(question="Why FastAPI?", category="Technical")],
+                                  preparation_tips=["Review the JD."])
+
+@pytest.fixture
+def override_current_user():
+    app.dependency_overrides[get_current_user] = lambda: UserResponse(id=MOCK_USER_ID_STR, email="history@example.com")
+    yield
+    app.dependency_overrides.pop(get_current_user, None)
+
+@pytest.fixture
+def history_db():
+    db = MagicMock()
+    # No stored result unless a test says otherwise
+    db.table.return_value.select.return_value.eq.return_value.eq.return_value.eq.return_value.eq.return_value.maybe_single.return_value.execute.return_value = None
+    with patch.object(analysis_history_service, "supabase_client", db), \
+         patch("app.api.routers.resumes.supabase_client", MagicMock()), \
+         patch("app.api.routers.interview_prep.supabase_client", MagicMock()):
+        yield db
+
+def _stored(db, result):
+    db.table.return_value.select.return_value.eq.return_value.eq.return_value.eq.return_value.eq.return_value.maybe_single.return_value.execute.return_value = MagicMock(data={"result": result})
+
+def _history_row(**kwargs):
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    return {"id": str(uuid4()), "resume_id": None, "jd_hash": hash_text(JD), "mode": "full", "match_score": 81,
+            "job_description_excerpt": JD, "created_at": now, "updated_at": now, **kwargs}
+
+def test_hash_text_ignores_whitespace_differences():
+    assert hash_text("Backend  Engineer\n Python ") == hash_text("Backend Engineer Python")
+    assert hash_text("Backend Engineer") != hash_text("Frontend Engineer")
+
+@pytest.mark.asyncio
+async def test_full_analysis_is_stored(override_current_user, history_db):
+    with patch("app.api.routers.resumes.analyze_resume_with_llm", new_callable=AsyncMock, return_value=LLM_RESULT) as llm_mock:
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/resumes/analyze", json={"resume_text": RESUME, "job_description_text": JD})
+
+    assert response.status_code == 200
+    assert response.json()["from_history"] is False
+    llm_mock.assert_awaited_once()
+    row = history_db.table.return_value.upsert.call_args.args[0]
+    assert (row["user_id"], row["mode"], row["match_score"]) == (MOCK_USER_ID_STR, "full", 81)
+    assert (row["resume_hash"], row["jd_hash"]) == (hash_text(RESUME), hash_text(JD))
+    assert "from_history" not in row["result"]
+    assert history_db.table.return_value.upsert.call_args.kwargs["on_conflict"] == "user_id,resume_hash,jd_hash,mode"
+
+@pytest.mark.asyncio
+async def test_identical_request_is_served_from_storage(override_current_user, history_db):
+    _stored(history_db, {**LLM_RESULT.model_dump(), "mode": "full"})
+    with patch("app.api.routers.resumes.analyze_resume_with_llm", new_callable=AsyncMock) as llm_mock:
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/resumes/analyze", json={"resume_text": RESUME, "job_description_text": JD})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["from_history"] is True
+    assert body["match_score"] == 81
+    llm_mock.assert_not_called()
+    history_db.table.return_value.upsert.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_refresh_bypasses_storage(override_current_user, history_db):
+    _stored(history_db, {**LLM_RESULT.model_dump(), "mode": "full"})
+    with patch("app.api.routers.resumes.analyze_resume_with_llm", new_callable=AsyncMock, return_value=LLM_RESULT) as llm_mock:
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/resumes/analyze", json={"resume_text": RESUME, "job_description_text": JD, "refresh": True})
+
+    assert response.json()["from_history"] is False
+    llm_mock.assert_awaited_once()
+    history_db.table.return_value.upsert.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_fast_mode_is_stored_but_never_looked_up(override_current_user, history_db):
+    _stored(history_db, {**LLM_RESULT.model_dump(), "mode": "fast"})
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.post("/resumes/analyze", json={"resume_text": RESUME, "job_description_text": JD, "mode": "fast"})
+
+    assert response.json()["from_history"] is False
+    assert history_db.table.return_value.upsert.call_args.args[0]["mode"] == "fast"
+
+def test_store_result_drops_rows_beyond_per_user_cap():
+    db = MagicMock()
+    db.table.return_value.select.return_value.eq.return_value.order.return_value.range.return_value.execute.return_value = MagicMock(data=[{"id": "old-1"}, {"id": "old-2"}])
+    with patch.object(analysis_history_service, "supabase_client", db), \
+         patch.object(analysis_history_service.settings, "ANALYSIS_HISTORY_MAX_PER_USER", 3):
+        store_result(ANALYSIS_TABLE, MOCK_USER_ID_STR, None, RESUME, JD, "full", {"match_score": 1}, 1)
+
+    db.table.return_value.select.return_value.eq.return_value.order.return_value.range.assert_called_once_with(3, 1002)
+    db.table.return_value.delete.return_value.in_.assert_called_once_with("id", ["old-1", "old-2"])
+
+def test_store_result_swallows_database_errors():
+    db = MagicMock()
+    db.table.return_value.upsert.return_value.execute.side_effect = RuntimeError("relation does not exist")
+    with patch.object(analysis_history_service, "supabase_client", db):
+        store_result(ANALYSIS_TABLE, MOCK_USER_ID_STR, None, RESUME, JD, "full", {}, None) # Must not raise
+
+@pytest.mark.asyncio
+async def test_list_analyses_pages_newest_first(override_current_user, history_db):
+    resume_id = str(uuid4())
+    query = history_db.table.return_value.select.return_value.eq.return_value.eq.return_value
+    query.order.return_value.range.return_value.execute.return_value = MagicMock(data=[_history_row(resume_id=resume_id)])
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/resumes/analyses", params={"resume_id": resume_id, "skip": 20, "limit": 10})
+
+    assert response.status_code == 200
+    assert response.json()[0]["resume_id"] == resume_id
+    assert "result" not in response.json()[0]
+    query.order.assert_called_once_with("updated_at", desc=True)
+    query.order.return_value.range.assert_called_once_with(20, 29)
+
+@pytest.mark.asyncio
+async def test_list_analyses_rejects_oversized_pages(override_current_user, history_db):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/resumes/analyses", params={"limit": 1000})
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_get_analysis_detail_and_not_found(override_current_user, history_db):
+    detail = history_db.table.return_value.select.return_value.eq.return_value.eq.return_value.maybe_single.return_value.execute
+    detail.return_value = MagicMock(data=_history_row(result={**LLM_RESULT.model_dump(), "mode": "full"}))
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        found = await ac.get(f"/resumes/analyses/{uuid4()}")
+        detail.return_value = None
+        missing = await ac.get(f"/resumes/analyses/{uuid4()}")
+
+    assert found.status_code == 200
+    assert found.json()["result"]["strength_summary"] == "Good fit."
+    assert missing.status_code == 404
+
+@pytest.mark.asyncio
+async def test_interview_prep_is_stored_then_served_from_storage(override_current_user, history_db):
+    with patch("app.api.routers.interview_prep.generate_interview_questions_with_llm", new_callable=AsyncMock, return_value=PREP_RESULT) as llm_mock:
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            first = await ac.post("/interview/generate-questions", json={"resume_text": RESUME, "job_description_text": JD})
+            stored_row = history_db.table.return_value.upsert.call_args.args[0]
+            _stored(history_db, stored_row["result"])
+            second = await ac.post("/interview/generate-questions", json={"resume_text": RESUME, "job_description_text": JD})
+
+    assert first.json()["from_history"] is False
+    assert second.json()["from_history"] is True
+    assert second.json()["generated_questions"] == first.json()["generated_questions"]
+    assert stored_row["match_score"] is None
+    llm_mock.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_interview_stream_replays_stored_result(override_current_user, history_db):
+    _stored(history_db, PREP_RESULT.model_dump())
+    with patch("app.api.routers.interview_prep.stream_interview_questions_with_llm") as stream_mock:
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/interview/generate-questions/stream", json={"resume_text": RESUME, "job_description_text": JD})
+
+    events = [block.split("\n")[0].removeprefix("event: ") for block in response.text.strip().split("\n\n")]
+    assert events == ["question", "result", "done"]
+    result = json.loads(response.text.strip().split("\n\n")[1].split("\n")[1].removeprefix("data: "))
+    assert result["from_history"] is True
+    stream_mock.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_prune_expired_history_deletes_old_rows_from_both_tables():
+    db = MagicMock()
+    db.table.return_value.delete.return_value.lt.return_value.execute.return_value = MagicMock(data=[{"id": "a"}])
+    with patch.object(analysis_history_service, "supabase_client", db), \
+         patch.object(analysis_history_service.settings, "ANALYSIS_HISTORY_RETENTION_DAYS", 30):
+        result = await prune_expired_history()
+
+    assert result == {"status": "ok", "deleted": {"resume_analyses": 1, "interview_preps": 1}}
+    cutoff = datetime.datetime.fromisoformat(db.table.return_value.delete.return_value.lt.call_args.args[1])
+    assert abs((datetime.datetime.now(datetime.timezone.utc) - cutoff).days - 30) <= 1
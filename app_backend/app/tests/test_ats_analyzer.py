@@ -0,0 +1,126 @@
+import docx
+import pytest
+from httpx import AsyncClient
+from unittest.mock import patch, MagicMock, PropertyMock
+from uuid import uuid4
+
+from app.main import app
+from app.api.deps import get_current_user
+from app.schemas.auth_schemas import UserResponse
+from app.services import ats_analyzer, file_parser_service
+from app.services.ats_analyzer import analyze_document, analyze_structure
+from app.services.file_parser_service import DocumentStructure, parse_document, parse_pdf
+from app.tests.document_fixtures import make_docx, make_pdf, single_column_runs, two_column_runs
+
+PDF = "application/pdf"
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+EXPERIENCE = [f"Built {word} services in Python and PostgreSQL, cutting p95 latency by a third for the checkout flow"
+              for word in ("payment", "billing", "search", "catalog", "pricing", "inventory", "shipping", "review", "loyalty", "refund")]
+
+def codes(report):
+    return [finding.code for finding in report.findings]
+
+@pytest.fixture
+def override_current_user():
+    app.dependency_overrides[get_current_user] = lambda: UserResponse(id=str(uuid4()), email="ats@example.com")
+    yield
+    app.dependency_overrides.pop(get_current_user, None)
+
+def test_single_column_pdf_has_no_findings():
+    text, report = analyze_document(make_pdf([single_column_runs(["Jane Doe", "Experience"] + EXPERIENCE)]), PDF)
+    assert "payment services" in text
+    assert report.findings == []
+    assert report.score == 100
+    assert report.structure.page_count == 1
+
+def test_two_column_pdf_is_flagged():
+    left = [f"Left column entry about {word}" for word in ("python", "redis", "docker", "kafka", "terraform", "aws", "sql", "go", "rust", "java")]
+    right = [f"Right {word}" for word in ("one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten")]
+    _, report = analyze_document(make_pdf([two_column_runs(left, right)]), PDF)
+    assert codes(report) == ["multi_column"]
+    assert report.score == 90
+    assert "Multi-column layout" in report.summary
+
+def test_image_only_pdf_has_no_text_layer():
+    _, report = analyze_document(make_pdf([[]], images_per_page=[1]), PDF)
+    assert codes(report) == ["no_text_layer"]
+    assert report.structure.image_count == 1
+
+def test_image_heavy_page_is_flagged():
+    pages = [single_column_runs(EXPERIENCE), [(72, 400, "Portfolio highlights: dashboards, reports and case studies")]]
+    _, report = analyze_document(make_pdf(pages, images_per_page=[0, 2]), PDF)
+    assert codes(report) == ["text_in_images"]
+    assert report.structure.image_count == 2
+
+def test_symbol_and_unmapped_fonts_are_flagged():
+    fonts = {"FontAwesome": {}, "ABCDEF+Calibri": {"Subtype": "/Type0", "Encoding": "/Identity-H"}}
+    _, report = analyze_document(make_pdf([single_column_runs(EXPERIENCE)], extra_fonts=fonts), PDF)
+    assert report.structure.symbol_fonts == ["FontAwesome"]
+    assert report.structure.unmapped_fonts == ["Calibri"]
+    assert codes(report) == ["unmapped_fonts", "symbol_fonts"]
+
+def test_lines_repeated_at_page_edges_count_as_header_footer():
+    pages = [[(72, 770, "Jane Doe - jane@example.com"), (300, 20, f"Page {number}")] + single_column_runs(EXPERIENCE, top=700)
+             for number in (1, 2)]
+    structure = parse_document(make_pdf(pages), PDF).structure
+    assert structure.header_footer_chars == 2 * len("Jane Doe - jane@example.com") + 2 * len("Page #")
+    assert structure.multi_column_pages == 0
+
+def test_docx_tables_text_boxes_columns_and_header():
+    paragraphs = ["Jane Doe", "Experience"] + EXPERIENCE
+    document = make_docx(paragraphs, table_rows=[["Python", "5 years"], ["SQL", "3 years"]], header_text="jane@example.com",
+                         columns=2, text_box="Skills: Kubernetes", fonts=["Arial", "Wingdings"])
+    text, report = analyze_document(document, DOCX)
+    assert "Kubernetes" not in text # Text box content is exactly what plain extraction misses
+    assert codes(report) == ["text_boxes", "multi_column", "tables", "header_footer", "symbol_fonts"]
+    assert report.structure.table_count == 1
+    assert report.score == 100 - 25 - 10 - 10 - 5 - 5
+
+def test_plain_docx_has_no_findings():
+    _, report = analyze_document(make_docx(["Jane Doe", "Experience"] + EXPERIENCE), DOCX)
+    assert report.findings == []
+
+def test_unreadable_file():
+    _, report = analyze_document(b"not a pdf", PDF)
+    assert codes(report) == ["unreadable"]
+    assert report.score == 75
+
+def test_short_document_is_flagged():
+    assert codes(analyze_structure(DocumentStructure(kind="pdf", page_count=1, text_chars=120))) == ["little_text"]
+
+def test_reports_are_cached_by_content_hash():
+    document = make_pdf([single_column_runs(EXPERIENCE)])
+    with patch.object(ats_analyzer, "parse_document", wraps=parse_document) as parse_mock:
+        first = analyze_document(document, PDF, "hash-cached")
+        second = analyze_document(document, PDF, "hash-cached")
+    assert parse_mock.call_count == 1
+    assert first == second
+    assert ats_analyzer.get_cached_report("hash-cached") is first[1]
+
+@pytest.mark.parametrize("kind, document, failing_probe", [
+    (PDF, lambda: make_pdf([single_column_runs(EXPERIENCE)]), lambda: patch.object(file_parser_service, "_is_multi_column", side_effect=ValueError("bad page box"))),
+    (DOCX, lambda: make_docx(EXPERIENCE), lambda: patch.object(docx.section.Section, "header", new_callable=PropertyMock, side_effect=KeyError("rId9"))),
+])
+def test_failed_layout_probe_keeps_the_text(kind, document, failing_probe):
+    with failing_probe():
+        parsed = parse_document(document(), kind)
+    assert "refund services" in parsed.text
+    assert parsed.structure.text_chars > 0
+    assert parsed.structure.parse_error
+
+def test_parse_pdf_still_returns_text():
+    assert "refund services" in parse_pdf(make_pdf([single_column_runs(EXPERIENCE)]))
+
+@pytest.mark.asyncio
+async def test_analyze_uses_stored_ats_report(override_current_user):
+    report = analyze_structure(DocumentStructure(kind="pdf", page_count=1, text_chars=2000, multi_column_pages=1))
+    supabase_mock = MagicMock()
+    supabase_mock.table.return_value.select.return_value.eq.return_value.eq.return_value.maybe_single.return_value.execute.return_value = MagicMock(
+        data={"raw_text": "Skills\nPython, FastAPI", "ats_report": report.model_dump(mode="json")})
+    with patch("app.api.routers.resumes.supabase_client", supabase_mock):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/resumes/analyze", json={"resume_id": str(uuid4()), "job_description_text": "Python, FastAPI", "mode": "fast"})
+    assert response.status_code == 200
+    assert response.json()["ats_compatibility_check"] == report.summary
+    supabase_mock.table.return_value.select.assert_called_with("raw_text, ats_report, profile")
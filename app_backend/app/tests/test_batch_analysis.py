@@ -0,0 +1,253 @@
+import pytest
+import asyncio
+from httpx import AsyncClient
+from unittest.mock import patch, MagicMock
+from uuid import uuid4
+
+from app.main import app
+from app.api.deps import get_current_user
+from app.schemas.auth_schemas import UserResponse
+from app.services.analysis_history_service import ANALYSIS_TABLE, hash_text
+from app.services.llm_service import LLMAnalysisResult
+from app.services.batch_analysis_service import BatchAnalysisPair, run_batch_analysis, summarize_batch
+from app.tests.sse_helpers import parse_sse
+
+MOCK_USER_ID_STR = str(uuid4())
+
+def _result(score: int) -> LLMAnalysisResult:
+    return LLMAnalysisResult(match_score=score, missing_keywords=[], strength_summary="S", improvement_suggestions=[], ats_compatibility_check="OK")
+
+class FakeResumes:
+    """The resumes query chain the batch route builds; range() returns that slice of the rows."""
+    def __init__(self, rows, fail_from=None):
+        self.rows = rows
+        self.fail_from = fail_from # Pages starting at or after this offset raise
+        self.ranges = []
+        self._matching = rows
+
+    def table(self, name):
+        self._matching = self.rows
+        return self
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def in_(self, column, values):
+        self._matching = [row for row in self._matching if row["id"] in values]
+        return self
+
+    def order(self, column, desc=False):
+        return self
+
+    def range(self, start, end):
+        self.ranges.append((start, end))
+        if self.fail_from is not None and start >= self.fail_from:
+            raise ConnectionError("connection reset")
+        self._page = self._matching[start:end + 1]
+        return self
+
+    def execute(self):
+        return MagicMock(data=self._page)
+
+@pytest.fixture
+def override_current_user():
+    app.dependency_overrides[get_current_user] = lambda: UserResponse(id=MOCK_USER_ID_STR, email="batch@example.com")
+    yield
+    app.dependency_overrides.pop(get_current_user, None)
+
+@pytest.fixture
+def supabase_mock():
+    with patch("app.api.routers.resumes.supabase_client") as mock:
+        yield mock
+
+@pytest.mark.asyncio
+async def test_run_batch_analysis_bounds_concurrency_and_streams_in_completion_order():
+    in_flight = 0
+    peak = 0
+
+    async def fake_analyze(resume_text, job_description_text, shared_first="resume", profile=None, ats_summary=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01 * int(resume_text))
+        in_flight -= 1
+        return _result(int(resume_text))
+
+    pairs = [BatchAnalysisPair(item_id=str(i), resume_text=str(delay), job_description_text="jd") for i, delay in enumerate([5, 1, 3, 2, 4])]
+    with patch("app.services.batch_analysis_service.analyze_resume_with_llm", fake_analyze):
+        items = [item async for item in run_batch_analysis(pairs, concurrency=2)]
+
+    assert peak == 2
+    assert sorted(item.item_id for item in items) == ["0", "1", "2", "3", "4"]
+    assert items[0].item_id == "1" # The fastest item is delivered first
+    summary = summarize_batch(items, total_ms=100.0)
+    assert summary.total == 5 and summary.succeeded == 5 and summary.failed == 0
+
+@pytest.mark.asyncio
+async def test_run_batch_analysis_reports_failed_items():
+    async def fake_analyze(resume_text, job_description_text, shared_first="resume", profile=None, ats_summary=None):
+        if resume_text == "bad":
+            raise RuntimeError("boom")
+        return None if resume_text == "none" else _result(50)
+
+    pairs = [BatchAnalysisPair(item_id=text, resume_text=text, job_description_text="jd") for text in ["ok", "bad", "none"]]
+    with patch("app.services.batch_analysis_service.analyze_resume_with_llm", fake_analyze):
+        items = {item.item_id: item async for item in run_batch_analysis(pairs, concurrency=3)}
+
+    assert items["ok"].result.match_score == 50
+    assert items["bad"].error == "LLM analysis failed." and items["bad"].result is None
+    assert items["none"].error == "LLM analysis failed."
+    assert summarize_batch(list(items.values()), 1.0).failed == 2
+
+@pytest.mark.asyncio
+async def test_batch_endpoint_one_job_description_many_resumes(override_current_user, supabase_mock):
+    resume_ids = [str(uuid4()), str(uuid4())]
+    resumes = FakeResumes([{"id": resume_ids[0], "raw_text": "resume one", "ats_report": {"summary": "Parses cleanly."}},
+                           {"id": resume_ids[1], "raw_text": "resume two"}, {"id": str(uuid4()), "raw_text": ""}])
+
+    calls = []
+    async def fake_analyze(resume_text, job_description_text, shared_first="resume", profile=None, ats_summary=None):
+        calls.append((resume_text, job_description_text, shared_first, ats_summary))
+        return _result(70)
+
+    with patch("app.services.batch_analysis_service.analyze_resume_with_llm", fake_analyze), \
+         patch("app.api.routers.resumes.supabase_client", resumes):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/resumes/analyze/batch", json={"job_description_text": "Python developer"})
+
+    assert response.status_code == 200
+    events = parse_sse(response.text)
+    assert [name for name, _ in events] == ["item", "item", "summary"]
+    assert {data["item_id"] for name, data in events if name == "item"} == set(resume_ids)
+    assert events[-1][1]["succeeded"] == 2
+    # The shared job description leads every prompt
+    assert all(shared_first == "job_description" for _, _, shared_first, _ in calls)
+    # As in /analyze, a stored ATS report is served instead of asking the model
+    assert {resume_text: ats_summary for resume_text, _, _, ats_summary in calls} == {"resume one": "Parses cleanly.", "resume two": None}
+
+@pytest.mark.asyncio
+async def test_batch_endpoint_scores_every_resume_past_the_item_limit(override_current_user):
+    rows = [{"id": str(uuid4()), "raw_text": f"resume {index}"} for index in range(5)]
+    resumes = FakeResumes(rows)
+
+    async def fake_analyze(resume_text, job_description_text, shared_first="resume", profile=None, ats_summary=None):
+        return _result(70)
+
+    with patch("app.services.batch_analysis_service.analyze_resume_with_llm", fake_analyze), \
+         patch("app.api.routers.resumes.supabase_client", resumes), \
+         patch("app.api.routers.resumes.settings.LLM_BATCH_MAX_ITEMS", 2):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/resumes/analyze/batch", json={"job_description_text": "Python developer"})
+
+    assert response.status_code == 200
+    events = parse_sse(response.text)
+    assert sorted(data["item_id"] for name, data in events if name == "item") == sorted(row["id"] for row in rows)
+    assert (events[-1][1]["total"], events[-1][1]["succeeded"]) == (5, 5)
+    assert resumes.ranges == [(0, 1), (2, 3), (4, 5)] # Paged, one page per chunk
+
+@pytest.mark.asyncio
+async def test_batch_endpoint_reports_a_page_that_fails_to_load(override_current_user):
+    resumes = FakeResumes([{"id": str(uuid4()), "raw_text": f"resume {index}"} for index in range(3)], fail_from=2)
+
+    async def fake_analyze(resume_text, job_description_text, shared_first="resume", profile=None, ats_summary=None):
+        return _result(70)
+
+    with patch("app.services.batch_analysis_service.analyze_resume_with_llm", fake_analyze), \
+         patch("app.api.routers.resumes.supabase_client", resumes), \
+         patch("app.api.routers.resumes.settings.LLM_BATCH_MAX_ITEMS", 2):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/resumes/analyze/batch", json={"job_description_text": "Python developer"})
+
+    assert [name for name, _ in parse_sse(response.text)] == ["item", "item", "error", "summary"]
+
+@pytest.mark.asyncio
+async def test_batch_endpoint_rejects_too_many_resume_ids(override_current_user, supabase_mock):
+    payload = {"job_description_text": "Python developer", "resume_ids": [str(uuid4()) for _ in range(3)]}
+    with patch("app.api.routers.resumes.settings.LLM_BATCH_MAX_ITEMS", 2):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/resumes/analyze/batch", json=payload)
+    assert response.status_code == 400
+    assert "Batch too large" in response.json()["detail"]
+    supabase_mock.table.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_batch_items_are_served_from_and_saved_to_history():
+    resume_id = uuid4()
+    pairs = [BatchAnalysisPair(item_id="seen", resume_text="resume", job_description_text="jd one", resume_id=resume_id),
+             BatchAnalysisPair(item_id="new", resume_text="resume", job_description_text="jd two", resume_id=resume_id)]
+    stored = {**_result(88).model_dump(mode="json"), "mode": "full"}
+    analyzed = []
+
+    def fake_get_stored_result(table, user_id, resume_hash, jd_hash, mode):
+        return stored if jd_hash == hash_text("jd one") and mode == "full" else None
+
+    async def fake_analyze(resume_text, job_description_text, shared_first="resume", profile=None, ats_summary=None):
+        analyzed.append(job_description_text)
+        return _result(40)
+
+    with patch("app.services.batch_analysis_service.analyze_resume_with_llm", fake_analyze), \
+         patch("app.services.batch_analysis_service.get_stored_result", side_effect=fake_get_stored_result), \
+         patch("app.services.batch_analysis_service.store_result") as store_mock:
+        items = {item.item_id: item async for item in run_batch_analysis(pairs, concurrency=2, user_id=MOCK_USER_ID_STR)}
+
+    assert (items["seen"].from_history, items["seen"].result.match_score) == (True, 88)
+    assert (items["new"].from_history, items["new"].result.match_score) == (False, 40)
+    assert analyzed == ["jd two"] # The stored one never reached the LLM
+    store_mock.assert_called_once_with(ANALYSIS_TABLE, MOCK_USER_ID_STR, resume_id, "resume", "jd two", "full",
+                                       {**_result(40).model_dump(mode="json"), "mode": "full"}, 40)
+
+@pytest.mark.asyncio
+async def test_batch_endpoint_stores_results_under_each_resume(override_current_user):
+    rows = [{"id": str(uuid4()), "raw_text": "resume one"}, {"id": str(uuid4()), "raw_text": "resume two"}]
+
+    async def fake_analyze(resume_text, job_description_text, shared_first="resume", profile=None, ats_summary=None):
+        return _result(70)
+
+    with patch("app.services.batch_analysis_service.analyze_resume_with_llm", fake_analyze), \
+         patch("app.api.routers.resumes.supabase_client", FakeResumes(rows)), \
+         patch("app.services.batch_analysis_service.get_stored_result", return_value=None), \
+         patch("app.services.batch_analysis_service.store_result") as store_mock:
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/resumes/analyze/batch", json={"job_description_text": "Python developer"})
+
+    assert response.status_code == 200
+    assert sorted(str(call.args[2]) for call in store_mock.call_args_list) == sorted(row["id"] for row in rows)
+    assert all(call.args[1] == MOCK_USER_ID_STR for call in store_mock.call_args_list)
+
+@pytest.mark.asyncio
+async def test_batch_endpoint_one_resume_many_job_descriptions(override_current_user, supabase_mock):
+    async def fake_analyze(resume_text, job_description_text, shared_first="resume", profile=None, ats_summary=None):
+        return _result(90 if "Python" in job_description_text else 20)
+
+    payload = {"resume_text": "Python engineer", "job_description_texts": ["Python role", "Accountant role"]}
+    with patch("app.services.batch_analysis_service.analyze_resume_with_llm", fake_analyze):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/resumes/analyze/batch", json=payload)
+
+    items = {data["item_id"]: data for name, data in parse_sse(response.text) if name == "item"}
+    assert items["0"]["result"]["match_score"] == 90
+    assert items["1"]["result"]["match_score"] == 20
+
+@pytest.mark.asyncio
+async def test_batch_endpoint_rejects_oversized_batch(override_current_user, supabase_mock):
+    payload = {"resume_text": "resume", "job_description_texts": ["jd"] * 3}
+    with patch("app.api.routers.resumes.settings.LLM_BATCH_MAX_ITEMS", 2):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/resumes/analyze/batch", json=payload)
+    assert response.status_code == 400
+    assert "Batch too large" in response.json()["detail"]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("payload", [
+    {"job_description_text": "jd", "job_description_texts": ["jd"]},
+    {"resume_ids": [str(uuid4())]},
+    {"job_description_texts": ["jd"]},
+    {"job_description_text": "jd", "resume_text": "resume"},
+])
+async def test_batch_endpoint_validates_mode(override_current_user, payload):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.post("/resumes/analyze/batch", json=payload)
+    assert response.status_code == 422
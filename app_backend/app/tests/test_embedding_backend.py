@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+from unittest.mock import patch, MagicMock
+from uuid import uuid4
+
+from qdrant_client import AsyncQdrantClient
+
+from app.core.config import settings
+from app.services import embedding_backend, embedding_cache, vector_service
+from app.services.embedding_backend import (
+    HashingEmbeddingBackend,
+    LocalEmbeddingBackend,
+    OpenAIEmbeddingBackend,
+    get_embedding_backend,
+    set_embedding_backend,
+)
+
+def cosine(a, b):
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+@pytest.mark.asyncio
+async def test_hashing_backend_is_deterministic_unit_length():
+    backend = HashingEmbeddingBackend(dimension=256)
+    first, second, empty = await backend.embed(["Python backend engineer", "Python backend engineer", ""])
+
+    assert len(first) == 256
+    assert first == second
+    assert np.linalg.norm(first) == pytest.approx(1.0)
+    assert np.linalg.norm(empty) == pytest.approx(1.0) # Still usable as a cosine vector
+
+def test_hashing_backend_ranks_shared_words_higher():
+    backend = HashingEmbeddingBackend(dimension=1024)
+    query = backend.vector("senior python backend engineer")
+
+    assert cosine(query, backend.vector("Backend engineer, Python and FastAPI")) > cosine(query, backend.vector("Pastry chef and baker"))
+
+@pytest.mark.parametrize("backend_name, model, dimensions, expected_type, expected_dimension", [
+    ("hashing", "text-embedding-ada-002", 0, HashingEmbeddingBackend, 1024),
+    ("hashing", "text-embedding-ada-002", 128, HashingEmbeddingBackend, 128),
+    ("openai", "text-embedding-ada-002", 0, OpenAIEmbeddingBackend, 1536),
+    ("openai", "text-embedding-3-large", 0, OpenAIEmbeddingBackend, 3072),
+    ("openai", "text-embedding-3-large", 256, OpenAIEmbeddingBackend, 256),
+])
+def test_backend_follows_settings(backend_name, model, dimensions, expected_type, expected_dimension):
+    with patch.dict(embedding_backend._backends, clear=True), \
+         patch.multiple(settings, EMBEDDING_BACKEND=backend_name, EMBEDDING_MODEL=model, EMBEDDING_DIMENSIONS=dimensions):
+        backend = get_embedding_backend()
+        assert isinstance(backend, expected_type)
+        assert vector_service.embedding_dimension() == expected_dimension
+
+def test_unknown_backend():
+    with patch.dict(embedding_backend._backends, clear=True), patch.object(settings, "EMBEDDING_BACKEND", "word2vec"), pytest.raises(ValueError):
+        get_embedding_backend()
+
+def fake_sentence_transformers(dimension=384):
+    module = MagicMock()
+    model = module.SentenceTransformer.return_value
+    model.get_sentence_embedding_dimension.return_value = dimension
+    model.encode.side_effect = lambda texts, **kwargs: np.ones((len(texts), dimension), dtype=np.float32) / np.sqrt(dimension)
+    return module
+
+@pytest.mark.asyncio
+async def test_local_backend_loads_once_and_encodes_in_batches():
+    module = fake_sentence_transformers()
+    with patch.object(embedding_backend, "sentence_transformers", module):
+        backend = LocalEmbeddingBackend("all-MiniLM-L6-v2", runtime="onnx", batch_size=16)
+        assert backend.dimension == 384
+        embeddings = await backend.embed(["a", "b", "c"])
+        await backend.embed(["d"])
+
+    assert len(embeddings) == 3 and len(embeddings[0]) == 384
+    module.SentenceTransformer.assert_called_once_with("all-MiniLM-L6-v2", device="cpu", backend="onnx", truncate_dim=None)
+    model = module.SentenceTransformer.return_value
+    assert model.encode.call_count == 2
+    assert model.encode.call_args_list[0].kwargs["batch_size"] == 16
+    assert model.encode.call_args_list[0].kwargs["normalize_embeddings"] is True
+
+@pytest.mark.asyncio
+async def test_local_backend_without_sentence_transformers():
+    with patch.object(embedding_backend, "sentence_transformers", None):
+        backend = LocalEmbeddingBackend("all-MiniLM-L6-v2")
+        with pytest.raises(RuntimeError, match="sentence-transformers"):
+            backend.dimension
+        assert await backend.embed(["a"]) == [None]
+    with pytest.raises(ValueError):
+        LocalEmbeddingBackend("all-MiniLM-L6-v2", runtime="tensorflow")
+
+@pytest.mark.asyncio
+async def test_collection_follows_the_backend_dimension():
+    # Offline end to end: hashing embeddings into a real in-process Qdrant
+    set_embedding_backend(HashingEmbeddingBackend(dimension=64))
+    vector_service.qdrant_client_instance = AsyncQdrantClient(location=":memory:")
+    vector_service.mark_collection_unready()
+    vector_service.reset_batchers()
+    try:
+        with patch.object(settings, "EMBEDDING_CACHE_PATH", ""):
+            embedding_cache.close()
+            user_id, python_resume, chef_resume = uuid4(), uuid4(), uuid4()
+            await vector_service.upsert_resume_embedding(python_resume, user_id, "Skills\nPython, FastAPI, PostgreSQL")
+            await vector_service.upsert_resume_embedding(chef_resume, user_id, "Skills\nPastry, baking, menu planning")
+
+            info = await vector_service.qdrant_client_instance.get_collection(settings.QDRANT_RESUME_COLLECTION)
+            assert info.config.params.vectors.size == 64
+            hits = await vector_service.search_resumes(user_id, await vector_service.get_text_embedding("Python developer"), limit=2)
+            assert hits[0].resume_id == str(python_resume)
+    finally:
+        set_embedding_backend(None)
+        await vector_service.close_qdrant_client()
+        vector_service.reset_batchers()
+        embedding_cache.close()
+
+@pytest.mark.asyncio
+async def test_existing_collection_of_another_size_is_rejected():
+    vector_service.qdrant_client_instance = AsyncQdrantClient(location=":memory:")
+    vector_service.mark_collection_unready()
+    try:
+        await vector_service.ensure_resume_collection() # Created for the default backend
+        vector_service.mark_collection_unready()
+        set_embedding_backend(HashingEmbeddingBackend(dimension=64))
+        with pytest.raises(vector_service.CollectionSchemaError, match="hashing-64"):
+            await vector_service.ensure_resume_collection()
+    finally:
+        set_embedding_backend(None)
+        await vector_service.close_qdrant_client()
@@ -0,0 +1,126 @@
+import sqlite3
+import subprocess
+import sys
+import threading
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services import embedding_cache, metrics, vector_service
+
+@pytest.fixture
+def cache_path(tmp_path):
+    path = str(tmp_path / "cache" / "embeddings.sqlite3")
+    with patch.multiple(settings, EMBEDDING_CACHE_PATH=path, EMBEDDING_CACHE_SIZE=2):
+        embedding_cache.close()
+        metrics.reset()
+        yield path
+    embedding_cache.close()
+
+def key(text, model="model-a", dimension=3):
+    return embedding_cache.cache_key(embedding_cache.normalize_text(text), model, dimension)
+
+def test_key_ignores_spacing_but_not_model_or_dimension():
+    assert key("Senior  Engineer \nPython\n\n") == key("Senior Engineer\nPython")
+    assert key("resume") != key("resume", model="model-b")
+    assert key("resume") != key("resume", dimension=256)
+    assert key("resume") != key("another resume")
+
+def test_memory_then_disk_tier(cache_path):
+    embedding_cache.put(key("resume"), [0.1, 0.2, 0.3])
+
+    assert embedding_cache.get(key("resume")) == pytest.approx([0.1, 0.2, 0.3])
+    assert metrics.get_counter("embedding_cache.memory_hits") == 1
+
+    embedding_cache.clear_memory() # A new worker: only the file has it
+    assert embedding_cache.get(key("resume")) == pytest.approx([0.1, 0.2, 0.3])
+    assert metrics.get_counter("embedding_cache.disk_hits") == 1
+    assert embedding_cache.get(key("resume", model="model-b")) is None
+    assert metrics.get_counter("embedding_cache.misses") == 1
+
+def test_vectors_are_stored_as_float32(cache_path):
+    embedding_cache.put(key("resume"), [0.1, 0.2, 0.3])
+
+    with sqlite3.connect(cache_path) as connection:
+        (blob,) = connection.execute("SELECT vector FROM embeddings").fetchone()
+        (journal_mode,) = connection.execute("PRAGMA journal_mode").fetchone()
+    assert len(blob) == 3 * 4
+    assert np.frombuffer(blob, dtype=np.float32).tolist() == pytest.approx([0.1, 0.2, 0.3])
+    assert journal_mode == "wal"
+
+def test_memory_tier_is_bounded(cache_path):
+    with patch.object(settings, "EMBEDDING_CACHE_PATH", ""):
+        embedding_cache.close()
+        for index in range(3):
+            embedding_cache.put(key(f"resume {index}"), [float(index)] * 3)
+
+        assert embedding_cache.get(key("resume 0")) is None # Least recently used, evicted
+        assert embedding_cache.get(key("resume 2")) == [2.0, 2.0, 2.0]
+
+def test_unusable_disk_tier_falls_back_to_memory(tmp_path):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    with patch.object(settings, "EMBEDDING_CACHE_PATH", str(blocker / "embeddings.sqlite3")):
+        embedding_cache.close()
+        embedding_cache.put(key("resume"), [1.0, 2.0, 3.0])
+        assert embedding_cache.get(key("resume")) == [1.0, 2.0, 3.0]
+    embedding_cache.close()
+
+def test_shared_between_processes(cache_path):
+    # Another worker process writes; this one reads it from disk
+    script = (
+        "from app.core.config import settings\n"
+        "from app.services import embedding_cache\n"
+        f"settings.EMBEDDING_CACHE_PATH = {cache_path!r}\n"
+        "embedding_cache.put(embedding_cache.cache_key('resume', 'model-a', 3), [4.0, 5.0, 6.0])\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True, capture_output=True)
+
+    assert embedding_cache.get(key("resume")) == [4.0, 5.0, 6.0]
+
+@pytest.mark.asyncio
+async def test_get_text_embedding_embeds_each_text_once(cache_path):
+    with patch.object(vector_service, "embed_texts", new_callable=AsyncMock) as mock_embed:
+        mock_embed.side_effect = lambda texts, backend: [[0.5, 0.25, 0.125] for _ in texts]
+
+        first = await vector_service.get_text_embedding("Senior  Engineer\nPython")
+        embedding_cache.clear_memory()
+        second = await vector_service.get_text_embedding("Senior Engineer \nPython\n\n")
+
+    assert first == second == [0.5, 0.25, 0.125]
+    mock_embed.assert_awaited_once()
+    assert mock_embed.call_args.args[0] == ["Senior Engineer\nPython"] # The normalized text is what gets embedded
+
+@pytest.mark.asyncio
+async def test_failed_embedding_is_not_cached(cache_path):
+    with patch.object(vector_service, "embed_texts", new_callable=AsyncMock) as mock_embed:
+        mock_embed.side_effect = [[None], [[1.0, 1.0, 1.0]]]
+
+        assert await vector_service.get_text_embedding("resume") is None
+        assert await vector_service.get_text_embedding("resume") == [1.0, 1.0, 1.0]
+    assert mock_embed.await_count == 2
+
+@pytest.mark.asyncio
+async def test_async_api_keeps_disk_io_off_the_event_loop(cache_path):
+    loop_thread = threading.get_ident()
+    disk_threads = []
+
+    def record(function):
+        def wrapper(*args):
+            disk_threads.append(threading.get_ident())
+            return function(*args)
+        return wrapper
+
+    with patch.object(embedding_cache, "_read_disk", record(embedding_cache._read_disk)), \
+         patch.object(embedding_cache, "_write_disk", record(embedding_cache._write_disk)):
+        await embedding_cache.put_many([(key("resume"), [0.1, 0.2, 0.3]), (key("cover letter"), [0.3, 0.2, 0.1])])
+        assert await embedding_cache.get_many([key("resume")]) == [pytest.approx([0.1, 0.2, 0.3])] # From memory, inline
+        embedding_cache.clear_memory()
+        assert await embedding_cache.get_many([key("cover letter"), key("unknown")]) == [pytest.approx([0.3, 0.2, 0.1]), None]
+
+    assert len(disk_threads) == 2 # One write, one read for both misses
+    assert loop_thread not in disk_threads
+    assert metrics.get_counter("embedding_cache.disk_hits") == 1
+    assert metrics.get_counter("embedding_cache.misses") == 1
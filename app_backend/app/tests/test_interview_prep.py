@@ -92,7 +92,7 @@ async def test_generate_questions_endpoint_with_text(mock_generate_questions_ser
     assert data["generated_questions"][0]["question"] == "What is FastAPI?"
     assert data["preparation_tips"][0] == "Review Python basics."
     # Verify the service function was called with the correct arguments
-    mock_generate_questions_service_call.assert_called_once_with("My awesome resume.", "Python developer role.")
+    mock_generate_questions_service_call.assert_called_once_with("My awesome resume.", "Python developer role.", profile=None)
 
 @pytest.mark.asyncio
 @patch("app.api.routers.interview_prep.generate_interview_questions_with_llm")
@@ -129,7 +129,7 @@ async def test_generate_questions_endpoint_with_resume_id(
     assert len(data["generated_questions"]) == 1
     assert data["generated_questions"][0]["category"] == "Situational"
     # Verify the service function was called with text fetched from DB
-    mock_generate_questions_service_call.assert_called_once_with("Resume text fetched from database.", "Challenging role description.")
+    mock_generate_questions_service_call.assert_called_once_with("Resume text fetched from database.", "Challenging role description.", profile=None)
 
 
 @pytest.mark.asyncio
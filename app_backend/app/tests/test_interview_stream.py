@@ -0,0 +1,143 @@
+import pytest
+import json
+from httpx import AsyncClient
+from unittest.mock import patch, MagicMock, AsyncMock
+from uuid import uuid4
+
+from app.main import app
+from app.api.deps import get_current_user
+from app.schemas.auth_schemas import UserResponse
+from app.services import metrics
+from app.services.json_stream import JsonArrayItemStream
+from app.services.llm_service import InterviewQuestion, InterviewPrepResult, InterviewStreamError
+from app.tests.sse_helpers import parse_sse
+
+MOCK_USER_ID_STR = str(uuid4())
+
+LLM_DOCUMENT = json.dumps({
+    "generated_questions": [
+        {"category": "Behavioral", "question": "Tell me about a {difficult} \"launch\"."},
+        {"category": "Technical", "question": "How does FastAPI handle [dependencies]?"},
+        {"category": "Situational", "question": "What would you do if the build broke?"}
+    ],
+    "preparation_tips": ["Review the JD.", "Prepare STAR stories."]
+})
+
+@pytest.fixture
+def override_current_user():
+    app.dependency_overrides[get_current_user] = lambda: UserResponse(id=MOCK_USER_ID_STR, email="stream@example.com")
+    yield
+    app.dependency_overrides.pop(get_current_user, None)
+
+@pytest.fixture
+def supabase_available():
+    with patch("app.api.routers.interview_prep.supabase_client", MagicMock()):
+        yield
+
+def _stream_chunks(text: str, size: int):
+    async def chunks():
+        for start in range(0, len(text), size):
+            chunk = MagicMock()
+            chunk.choices = [MagicMock()]
+            chunk.choices[0].delta.content = text[start:start + size]
+            yield chunk
+    return chunks()
+
+def test_json_array_item_stream_emits_items_as_they_close():
+    parser = JsonArrayItemStream("generated_questions")
+    emitted = []
+    for position, char in enumerate(LLM_DOCUMENT):
+        for item in parser.feed(char):
+            emitted.append((position, item))
+
+    assert [item["category"] for _, item in emitted] == ["Behavioral", "Technical", "Situational"]
+    assert emitted[0][1]["question"] == 'Tell me about a {difficult} "launch".'
+    # The first question is available long before the document is finished
+    assert emitted[0][0] < len(LLM_DOCUMENT) // 2
+    assert json.loads(parser.buffer) == json.loads(LLM_DOCUMENT)
+
+def test_json_array_item_stream_ignores_other_keys():
+    parser = JsonArrayItemStream("generated_questions")
+    assert parser.feed('{"preparation_tips": [{"not": "a question"}], ') == []
+    assert parser.feed('"generated_questions": [{"category": "A", "question": "Q"}]}') == [{"category": "A", "question": "Q"}]
+
+@pytest.mark.asyncio
+async def test_stream_service_yields_questions_then_result():
+    from app.services.llm_service import stream_interview_questions_with_llm
+    metrics.reset()
+    with patch("app.services.llm_service.openai.AsyncOpenAI") as mock_constructor, \
+         patch("app.services.llm_service.settings.OPENAI_API_KEY", "sk-test"):
+        mock_client = AsyncMock()
+        mock_constructor.return_value = mock_client
+        mock_client.chat.completions.create = AsyncMock(return_value=_stream_chunks(LLM_DOCUMENT, 7))
+
+        items = [item async for item in stream_interview_questions_with_llm("resume", "jd")]
+
+    assert [type(i) for i in items] == [InterviewQuestion] * 3 + [InterviewPrepResult]
+    assert items[-1].preparation_tips == ["Review the JD.", "Prepare STAR stories."]
+    assert mock_client.chat.completions.create.call_args.kwargs["stream"] is True
+    assert metrics.snapshot()["latencies_ms"]["interview_stream.time_to_first_question_ms"]["count"] == 1
+
+@pytest.mark.asyncio
+async def test_stream_service_invalid_document_raises():
+    from app.services.llm_service import stream_interview_questions_with_llm
+    with patch("app.services.llm_service.openai.AsyncOpenAI") as mock_constructor, \
+         patch("app.services.llm_service.settings.OPENAI_API_KEY", "sk-test"):
+        mock_client = AsyncMock()
+        mock_constructor.return_value = mock_client
+        mock_client.chat.completions.create = AsyncMock(return_value=_stream_chunks('Sorry, I cannot generate questions for this.', 5))
+
+        with pytest.raises(InterviewStreamError):
+            async for _ in stream_interview_questions_with_llm("resume", "jd"):
+                pass
+
+@pytest.mark.asyncio
+async def test_stream_service_repairs_truncated_document():
+    from app.services.llm_service import stream_interview_questions_with_llm
+    with patch("app.services.llm_service.openai.AsyncOpenAI") as mock_constructor, \
+         patch("app.services.llm_service.settings.OPENAI_API_KEY", "sk-test"):
+        mock_client = AsyncMock()
+        mock_constructor.return_value = mock_client
+        mock_client.chat.completions.create = AsyncMock(return_value=_stream_chunks('{"generated_questions": [{"category": "A", "question": "Q"}', 5))
+
+        items = [item async for item in stream_interview_questions_with_llm("resume", "jd")]
+
+    assert items[-1] == InterviewPrepResult(generated_questions=[InterviewQuestion(category="A", question="Q")])
+
+@pytest.mark.asyncio
+async def test_stream_endpoint_sends_sse_events(override_current_user, supabase_available):
+    async def fake_stream(resume_text, job_description_text, profile=None):
+        yield InterviewQuestion(category="Technical", question="What is FastAPI?")
+        yield InterviewPrepResult(generated_questions=[InterviewQuestion(category="Technical", question="What is FastAPI?")],
+                                  preparation_tips=["Review Python basics."])
+
+    with patch("app.api.routers.interview_prep.stream_interview_questions_with_llm", fake_stream):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/interview/generate-questions/stream", json={"resume_text": "resume", "job_description_text": "jd"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+    assert [name for name, _ in events] == ["question", "result", "done"]
+    assert events[0][1] == {"question": "What is FastAPI?", "category": "Technical"}
+    assert events[1][1]["preparation_tips"] == ["Review Python basics."]
+    assert events[2][1]["time_to_first_question_ms"] is not None
+
+@pytest.mark.asyncio
+async def test_stream_endpoint_reports_llm_failure_as_error_event(override_current_user, supabase_available):
+    async def failing_stream(resume_text, job_description_text, profile=None):
+        raise InterviewStreamError("LLM request failed.")
+        yield # pragma: no cover
+
+    with patch("app.api.routers.interview_prep.stream_interview_questions_with_llm", failing_stream):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/interview/generate-questions/stream", json={"resume_text": "resume", "job_description_text": "jd"})
+
+    events = parse_sse(response.text)
+    assert events == [("error", {"detail": "Failed to generate interview questions from LLM service: LLM request failed."})]
+
+@pytest.mark.asyncio
+async def test_stream_endpoint_rejects_empty_job_description(override_current_user, supabase_available):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.post("/interview/generate-questions/stream", json={"resume_text": "resume", "job_description_text": "  "})
+    assert response.status_code == 400
@@ -0,0 +1,139 @@
+import pytest
+from httpx import AsyncClient
+from unittest.mock import patch, MagicMock
+from uuid import uuid4
+
+from app.main import app
+from app.api.deps import get_current_user
+from app.schemas.auth_schemas import UserResponse
+from app.services import job_description_service, metrics
+from app.services.analysis_history_service import hash_text
+from app.services.scoring_service import score_resume_locally
+from app.services.job_description_service import JOB_DESCRIPTION_VERSION, get_job_description, normalize_job_description, parse_job_description
+
+MOCK_USER_ID_STR = str(uuid4())
+
+PLAIN_JD = """Backend Engineer at Globex
+
+Responsibilities
+- Build FastAPI services
+- Own the PostgreSQL schema
+
+Requirements
+- 3+ years with Python
+- Experience with Kubernetes
+
+Benefits
+- Gym membership
+
+Globex is an equal opportunity employer.
+Apply now"""
+
+HTML_JD = """<html><head><style>.x { color: red }</style></head><body>
+<h1>Backend Engineer at Globex</h1>
+<h2>Responsibilities</h2><ul><li>Build FastAPI services</li><li>Own the PostgreSQL&nbsp;schema</li></ul>
+<h2>Requirements</h2><ul><li>3+ years with Python</li><li>Experience with Kubernetes</li><li>3+ years with Python</li></ul>
+<h2>Benefits</h2><ul><li>Gym membership</li></ul>
+<p>Globex is an equal opportunity employer.</p><script>track()</script><p>Apply now</p></body></html>"""
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    job_description_service.clear_cache()
+    metrics.reset()
+    yield
+    job_description_service.clear_cache()
+    metrics.reset()
+
+@pytest.fixture
+def override_current_user():
+    app.dependency_overrides[get_current_user] = lambda: UserResponse(id=MOCK_USER_ID_STR, email="jd@example.com")
+    yield
+    app.dependency_overrides.pop(get_current_user, None)
+
+@pytest.fixture
+def jd_db():
+    db = MagicMock()
+    # Nothing stored unless a test says otherwise
+    db.table.return_value.select.return_value.eq.return_value.maybe_single.return_value.execute.return_value = None
+    with patch.object(job_description_service, "supabase_client", db):
+        yield db
+
+def test_html_boilerplate_benefits_and_repeats_are_removed():
+    text = normalize_job_description(HTML_JD)
+    assert "<" not in text and "track()" not in text and "color: red" not in text
+    assert "PostgreSQL schema" in text
+    assert text.count("3+ years with Python") == 1
+    for dropped in ("Gym membership", "equal opportunity", "Apply now"):
+        assert dropped not in text
+
+def test_html_and_plain_copies_hash_the_same():
+    assert parse_job_description(HTML_JD).jd_hash == parse_job_description(PLAIN_JD).jd_hash
+
+def test_requirements_responsibilities_and_skills_are_extracted():
+    parsed = parse_job_description(PLAIN_JD)
+    assert parsed.title == "Backend Engineer at Globex"
+    assert parsed.requirements == ["3+ years with Python", "Experience with Kubernetes"]
+    assert parsed.responsibilities == ["Build FastAPI services", "Own the PostgreSQL schema"]
+    assert {"Python", "FastAPI", "PostgreSQL", "Kubernetes"} <= set(parsed.skills)
+    assert parsed.tokens < parsed.source_tokens
+
+def test_parsed_once_then_served_from_memory(jd_db):
+    first = get_job_description(PLAIN_JD)
+    second = get_job_description(HTML_JD) # Same posting, different markup
+    assert first is second
+    assert jd_db.table.return_value.upsert.call_count == 1
+    assert jd_db.table.return_value.upsert.call_args.args[0]["jd_hash"] == first.jd_hash
+    assert (metrics.get_counter("jd_cache.parsed"), metrics.get_counter("jd_cache.memory_hits")) == (1, 1)
+
+def test_stored_parse_is_reused_and_older_versions_are_parsed_again(jd_db):
+    stored = parse_job_description(PLAIN_JD).model_dump(mode="json")
+    stored["title"] = "From the table"
+    jd_db.table.return_value.select.return_value.eq.return_value.maybe_single.return_value.execute.return_value = MagicMock(data={"parsed": stored})
+    assert get_job_description(PLAIN_JD).title == "From the table"
+    assert metrics.get_counter("jd_cache.store_hits") == 1
+
+    job_description_service.clear_cache()
+    stored["version"] = JOB_DESCRIPTION_VERSION - 1
+    assert get_job_description(PLAIN_JD).title == "Backend Engineer at Globex"
+    assert metrics.get_counter("jd_cache.parsed") == 1
+
+@pytest.mark.asyncio
+async def test_analyze_links_the_job_application(override_current_user, jd_db):
+    job_application_id = str(uuid4())
+    jd_db.table.return_value.select.return_value.eq.return_value.eq.return_value.maybe_single.return_value.execute.return_value = \
+        MagicMock(data={"id": job_application_id, "jd_hash": None})
+    with patch("app.api.routers.resumes.supabase_client", MagicMock()):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/resumes/analyze", json={"resume_text": "Skills\nPython, FastAPI", "job_description_text": HTML_JD,
+                                                               "job_application_id": job_application_id, "mode": "fast"})
+    assert response.status_code == 200
+    jd_db.table.return_value.update.assert_called_once_with({"jd_hash": hash_text(normalize_job_description(PLAIN_JD))})
+    assert "Kubernetes" in response.json()["missing_keywords"]
+
+@pytest.mark.asyncio
+async def test_analyze_by_job_application_uses_its_stored_description(override_current_user, jd_db):
+    parsed = parse_job_description(PLAIN_JD)
+    jd_db.table.return_value.select.return_value.eq.return_value.eq.return_value.maybe_single.return_value.execute.return_value = \
+        MagicMock(data={"id": "app", "jd_hash": parsed.jd_hash})
+    jd_db.table.return_value.select.return_value.eq.return_value.maybe_single.return_value.execute.return_value = \
+        MagicMock(data={"parsed": parsed.model_dump(mode="json")})
+    with patch("app.api.routers.resumes.supabase_client", MagicMock()), \
+         patch("app.api.routers.resumes.score_resume_locally", wraps=score_resume_locally) as score_mock:
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/resumes/analyze", json={"resume_text": "Skills\nPython, FastAPI", "job_application_id": str(uuid4()), "mode": "fast"})
+    assert response.status_code == 200
+    assert score_mock.call_args.args[1] == parsed.text
+
+@pytest.mark.asyncio
+async def test_unknown_job_application_is_not_found(override_current_user, jd_db):
+    jd_db.table.return_value.select.return_value.eq.return_value.eq.return_value.maybe_single.return_value.execute.return_value = MagicMock(data=None)
+    with patch("app.api.routers.resumes.supabase_client", MagicMock()):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/resumes/analyze", json={"resume_text": "Python", "job_application_id": str(uuid4()), "mode": "fast"})
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_a_job_description_source_is_required(override_current_user):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.post("/interview/generate-questions", json={"resume_text": "Python"})
+    assert response.status_code == 422
@@ -0,0 +1,109 @@
+import pytest
+import json
+from pathlib import Path
+
+from app.services import llm_service, metrics
+from app.services.json_repair import JSONRepairError, MissingFieldsError, coerce_score, normalize_key, parse_json_lenient
+from app.services.llm_backend import LLMBackend, LLMCompletion, set_llm_backend
+from app.services.llm_service import ANALYSIS_FIELDS, INTERVIEW_SCHEMA, LLMAnalysisResult, ResponseSchema
+
+FIXTURES = json.loads((Path(__file__).parent / "fixtures" / "malformed_llm_outputs.json").read_text())["cases"]
+SCHEMAS = {"analysis": ResponseSchema(LLMAnalysisResult, ANALYSIS_FIELDS), "interview": INTERVIEW_SCHEMA}
+
+GOOD_ANALYSIS = {"match_score": 78, "missing_keywords": ["Kubernetes"], "strength_summary": "Strong Python.",
+                 "improvement_suggestions": ["Mention Kubernetes."], "ats_compatibility_check": "Parses cleanly."}
+
+class QueueBackend(LLMBackend):
+    """Hands out the given answers in order and records the messages of every call."""
+    name = "queue"
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.calls = []
+
+    async def complete(self, messages, max_tokens=None, temperature=None, model=None):
+        self.calls.append(messages)
+        return LLMCompletion(content=self.answers.pop(0), model=model or "queue")
+
+@pytest.fixture
+def queue_backend():
+    metrics.reset()
+    def use(*answers):
+        backend = QueueBackend(*answers)
+        set_llm_backend(backend)
+        return backend
+    yield use
+    set_llm_backend(None)
+    llm_service._inflight_calls.clear()
+    metrics.reset()
+
+@pytest.mark.parametrize("case", FIXTURES, ids=[case["name"] for case in FIXTURES])
+def test_malformed_output_fixtures(case):
+    schema = SCHEMAS[case["schema"]]
+    if case.get("error"):
+        with pytest.raises(JSONRepairError):
+            parse_json_lenient(case["raw"])
+        return
+    data, repairs = parse_json_lenient(case["raw"])
+    if "missing" in case:
+        with pytest.raises(MissingFieldsError) as missing:
+            llm_service._build_result(case["schema"], schema, data, repairs)
+        assert missing.value.fields == case["missing"]
+    else:
+        assert llm_service._build_result(case["schema"], schema, data, repairs).model_dump() == case["expected"]
+
+def test_valid_json_needs_no_repairs():
+    assert parse_json_lenient(json.dumps(GOOD_ANALYSIS)) == (GOOD_ANALYSIS, [])
+
+def test_repairs_are_named():
+    _, repairs = parse_json_lenient('Sure!\n```json\n{"a": [1, 2,], "b": True\n```')
+    assert repairs == ["code_fence", "trailing_commas", "python_literals", "truncated"]
+
+@pytest.mark.parametrize("value, expected", [(87, 87), ("87%", 87), ("8.7/10", 87), (0.87, 87), ("0.87", 87), ("0.7%", 1), (112, 100), ("-3", 0), (1, 1)])
+def test_coerce_score(value, expected):
+    assert coerce_score(value) == expected
+
+@pytest.mark.parametrize("value", [float("inf"), float("-inf"), float("nan"), "n/a"])
+def test_coerce_score_rejects_non_numbers(value):
+    with pytest.raises(ValueError):
+        coerce_score(value)
+
+def test_normalize_key():
+    assert {normalize_key(key) for key in ("matchScore", "Match Score", "match-score", "match_score")} == {"match_score"}
+
+@pytest.mark.asyncio
+async def test_out_of_range_score_is_clamped_instead_of_failing(queue_backend):
+    backend = queue_backend(json.dumps({**GOOD_ANALYSIS, "match_score": 105}))
+    result = await llm_service._analyze_resume_with_llm("resume", "jd")
+    assert result.match_score == 100
+    assert len(backend.calls) == 1
+    assert metrics.get_counter("llm_repair.analysis.repaired") == 1
+
+@pytest.mark.asyncio
+async def test_missing_fields_are_re_asked_for_alone(queue_backend):
+    partial = {key: value for key, value in GOOD_ANALYSIS.items() if key != "ats_compatibility_check"}
+    backend = queue_backend(json.dumps(partial), '{"ats_compatibility_check": "Parses cleanly."}')
+    result = await llm_service._analyze_resume_with_llm("resume", "jd")
+
+    assert result.model_dump() == GOOD_ANALYSIS
+    follow_up = backend.calls[1]
+    assert follow_up[:2] == backend.calls[0]
+    assert follow_up[2] == {"role": "assistant", "content": json.dumps(partial)}
+    assert follow_up[3]["content"].endswith("Return JSON with keys: ats_compatibility_check.")
+    assert metrics.get_counter("llm_repair.analysis.reasks") == 1
+
+@pytest.mark.asyncio
+async def test_re_ask_happens_once(queue_backend):
+    partial = {key: value for key, value in GOOD_ANALYSIS.items() if key != "strength_summary"}
+    backend = queue_backend(json.dumps(partial), "{}")
+    assert await llm_service._analyze_resume_with_llm("resume", "jd") is None
+    assert len(backend.calls) == 2
+
+@pytest.mark.asyncio
+async def test_missing_interview_questions_are_re_asked_for(queue_backend):
+    questions = [{"category": "Technical", "question": "How do you scale FastAPI?"}]
+    backend = queue_backend('{"preparation_tips": ["Review the JD."]}', json.dumps({"generated_questions": questions}))
+    result = await llm_service._generate_interview_questions_with_llm("resume", "jd")
+    assert [question.model_dump() for question in result.generated_questions] == questions
+    assert result.preparation_tips == ["Review the JD."]
+    assert len(backend.calls) == 2
@@ -0,0 +1,110 @@
+import pytest
+import statistics
+import time
+from unittest.mock import patch
+
+from app.services import llm_service, llm_governor, llm_backend
+from app.services.llm_backend import FakeLLMBackend, OpenAIBackend, get_llm_backend, set_llm_backend
+from app.services.llm_service import InterviewQuestion, InterviewPrepResult
+from app.tests.fake_openai_server import FakeOpenAIServer
+from benchmarks.fake_llm_server import FakeLLMServer
+
+@pytest.fixture
+def fake_backend():
+    backend = FakeLLMBackend()
+    set_llm_backend(backend)
+    yield backend
+    set_llm_backend(None)
+    llm_service._inflight_calls.clear()
+
+@pytest.mark.asyncio
+async def test_fake_backend_answers_every_prompt_deterministically(fake_backend):
+    with patch.object(llm_service.settings, "OPENAI_API_KEY", ""): # The fake needs no key
+        first = await llm_service.analyze_resume_with_llm("Python resume", "Python job")
+        again = await llm_service.analyze_resume_with_llm("Python resume", "Python job")
+        other = await llm_service.analyze_resume_with_llm("Java resume", "Python job")
+        narrative = await llm_service.analyze_resume_narrative_with_llm("Python resume", "Python job", ["Redis"])
+        prep = await llm_service.generate_interview_questions_with_llm("Python resume", "Python job")
+
+    assert first == again
+    assert 35 <= first.match_score <= 95
+    assert first.match_score != other.match_score
+    assert narrative.strength_summary == "Fake strength summary."
+    assert 3 <= len(prep.generated_questions) <= 6
+
+@pytest.mark.asyncio
+async def test_fake_backend_streams_interview_questions(fake_backend):
+    items = [item async for item in llm_service.stream_interview_questions_with_llm("Python resume", "Python job")]
+    questions = [item for item in items if isinstance(item, InterviewQuestion)]
+    assert isinstance(items[-1], InterviewPrepResult)
+    assert questions == items[-1].generated_questions
+
+@pytest.mark.asyncio
+async def test_fake_backend_waits_for_sampled_latency():
+    backend = FakeLLMBackend(latency_ms=50)
+    started = time.perf_counter()
+    await backend.complete([{"role": "user", "content": "Return JSON with keys: match_score."}])
+    assert time.perf_counter() - started >= 0.05
+
+@pytest.mark.parametrize("jitter", ["uniform", "normal", "lognormal"])
+def test_jitter_distributions_have_the_configured_mean(jitter):
+    backend = FakeLLMBackend(latency_ms=800, jitter=jitter, jitter_ms=200, seed=1)
+    samples = [backend.sample_latency_ms() for _ in range(20000)]
+    assert statistics.mean(samples) == pytest.approx(800, rel=0.03)
+    assert min(samples) >= 0
+
+def test_exponential_jitter_is_a_tail_on_top_of_the_base_latency():
+    backend = FakeLLMBackend(latency_ms=500, jitter="exponential", jitter_ms=100, seed=1)
+    samples = [backend.sample_latency_ms() for _ in range(20000)]
+    assert min(samples) >= 500
+    assert statistics.mean(samples) == pytest.approx(600, rel=0.03)
+
+def test_lognormal_jitter_is_right_skewed():
+    backend = FakeLLMBackend(latency_ms=800, jitter="lognormal", jitter_ms=400, seed=1)
+    samples = sorted(backend.sample_latency_ms() for _ in range(20000))
+    assert statistics.median(samples) < 800 < samples[int(len(samples) * 0.99)] - 800
+
+def test_same_seed_same_latencies():
+    first = FakeLLMBackend(latency_ms=800, jitter="normal", jitter_ms=100, seed=7)
+    second = FakeLLMBackend(latency_ms=800, jitter="normal", jitter_ms=100, seed=7)
+    assert [first.sample_latency_ms() for _ in range(5)] == [second.sample_latency_ms() for _ in range(5)]
+
+def test_unknown_jitter_or_backend_is_rejected():
+    with pytest.raises(ValueError):
+        FakeLLMBackend(jitter="pareto")
+    with patch.object(llm_backend.settings, "LLM_BACKEND", "does-not-exist"), pytest.raises(ValueError):
+        get_llm_backend()
+
+def test_backend_is_picked_from_settings():
+    with patch.object(llm_backend.settings, "LLM_BACKEND", "fake"):
+        assert isinstance(get_llm_backend(), FakeLLMBackend)
+    with patch.object(llm_backend.settings, "LLM_BACKEND", "openai_compatible"):
+        assert get_llm_backend().name == "openai_compatible"
+
+@pytest.mark.asyncio
+async def test_configured_model_is_sent():
+    llm_governor.reset_governors()
+    with FakeOpenAIServer() as server, \
+         patch.multiple(llm_backend.settings, OPENAI_API_KEY="sk-test", OPENAI_BASE_URL=server.base_url, LLM_MODEL="gpt-4o-mini"):
+        result = await llm_service._analyze_resume_with_llm("resume", "jd")
+    llm_governor.reset_governors()
+    assert result.match_score == 80
+    assert server.requests[0]["json"]["model"] == "gpt-4o-mini"
+
+@pytest.mark.asyncio
+async def test_openai_compatible_backend_needs_no_api_key():
+    llm_governor.reset_governors()
+    with FakeLLMServer(FakeLLMBackend()) as server, \
+         patch.multiple(llm_backend.settings, OPENAI_API_KEY="", OPENAI_BASE_URL=server.base_url, LLM_BACKEND="openai_compatible"):
+        result = await llm_service._analyze_resume_with_llm("Python resume", "Python job")
+        items = [item async for item in llm_service.stream_interview_questions_with_llm("Python resume", "Python job")]
+    llm_governor.reset_governors()
+
+    assert result.strength_summary == "Fake strength summary."
+    assert isinstance(items[-1], InterviewPrepResult) and items[-1].generated_questions
+
+@pytest.mark.asyncio
+async def test_openai_backend_without_key_is_not_configured():
+    with patch.multiple(llm_backend.settings, OPENAI_API_KEY="", LLM_BACKEND="openai"):
+        assert not OpenAIBackend().is_configured()
+        assert await llm_service._analyze_resume_with_llm("resume", "jd") is None
@@ -0,0 +1,171 @@
+import pytest
+import asyncio
+import time
+from httpx import AsyncClient
+from unittest.mock import patch, MagicMock
+from uuid import uuid4
+
+from app.main import app
+from app.api.deps import get_current_user
+from app.schemas.auth_schemas import UserResponse
+from app.services import embedding_cache, llm_service, llm_governor
+from app.services.llm_governor import TokenBucket, CircuitBreaker, UpstreamUnavailableError, get_governor
+from app.tests.fake_openai_server import FakeOpenAIServer, error_body
+
+RATE_LIMITED = error_body("Rate limit reached", "requests")
+SERVER_ERROR = error_body("The server had an error", "server_error")
+
+@pytest.fixture
+def fake_openai():
+    llm_governor.reset_governors()
+    with FakeOpenAIServer() as server, \
+         patch.multiple(llm_governor.settings, OPENAI_API_KEY="sk-test", OPENAI_BASE_URL=server.base_url,
+                        OPENAI_MAX_RETRIES=2, OPENAI_RETRY_BASE_DELAY=0.01, OPENAI_RETRY_MAX_DELAY=0.05,
+                        OPENAI_CIRCUIT_FAILURE_THRESHOLD=3, OPENAI_CIRCUIT_RESET_SECONDS=0.2,
+                        OPENAI_CHAT_RPM=6000, OPENAI_CHAT_TPM=0, EMBEDDING_CACHE_PATH=""):
+        embedding_cache.close()
+        yield server
+    embedding_cache.close()
+    llm_governor.reset_governors()
+    llm_service._inflight_calls.clear()
+
+@pytest.mark.asyncio
+async def test_rate_limited_call_is_retried_and_rate_reduced(fake_openai):
+    fake_openai.queue(429, {"retry-after-ms": "20"}, RATE_LIMITED)
+
+    started = time.perf_counter()
+    result = await llm_service.analyze_resume_with_llm("resume", "jd")
+
+    assert result is not None and result.match_score == 80
+    assert len(fake_openai.requests) == 2
+    assert time.perf_counter() - started >= 0.02 # Honoured retry-after
+    governor = get_governor("openai_chat")
+    # 429 halved the rate; the following success added a little back
+    assert governor.requests.rate_per_minute < 6000
+
+@pytest.mark.asyncio
+async def test_persistent_server_errors_raise_upstream_unavailable(fake_openai):
+    fake_openai.queue(500, body=SERVER_ERROR, times=3)
+
+    with pytest.raises(UpstreamUnavailableError):
+        await llm_service.analyze_resume_with_llm("resume", "jd")
+    assert len(fake_openai.requests) == 3 # First attempt plus two retries
+
+@pytest.mark.asyncio
+async def test_circuit_opens_and_fails_fast_then_recovers(fake_openai):
+    fake_openai.queue(503, body=SERVER_ERROR, times=3)
+    with pytest.raises(UpstreamUnavailableError):
+        await llm_service.analyze_resume_with_llm("resume one", "jd")
+    governor = get_governor("openai_chat")
+    assert governor.breaker.state == CircuitBreaker.OPEN
+
+    # While open, calls fail without reaching the upstream
+    with pytest.raises(UpstreamUnavailableError) as exc_info:
+        await llm_service.analyze_resume_with_llm("resume two", "jd")
+    assert len(fake_openai.requests) == 3
+    assert exc_info.value.retry_after > 0
+
+    # After the reset timeout a single probe goes through and closes the circuit
+    await asyncio.sleep(0.25)
+    result = await llm_service.analyze_resume_with_llm("resume three", "jd")
+    assert result is not None
+    assert governor.breaker.state == CircuitBreaker.CLOSED
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(fake_openai):
+    fake_openai.queue(400, body=error_body("Bad request", "invalid_request_error"))
+
+    result = await llm_service.analyze_resume_with_llm("resume", "jd")
+
+    assert result is None
+    assert len(fake_openai.requests) == 1
+    assert get_governor("openai_chat").breaker.state == CircuitBreaker.CLOSED
+
+@pytest.mark.asyncio
+async def test_rate_limit_headers_adjust_rates(fake_openai):
+    fake_openai.success_headers = {"x-ratelimit-limit-requests": "3000", "x-ratelimit-remaining-requests": "100"}
+
+    await llm_service.analyze_resume_with_llm("resume", "jd")
+
+    governor = get_governor("openai_chat")
+    # The account's real limit becomes the ceiling; the rate was halved because fewer than 10% of requests remain
+    assert governor.max_rpm == 3000
+    assert governor.requests.rate_per_minute < 3000
+    # Unlimited TPM stays unlimited when the API reports no token limit
+    assert governor.tokens.rate_per_minute == 0
+
+@pytest.mark.asyncio
+async def test_embeddings_go_through_the_governor(fake_openai):
+    from app.services.vector_service import get_text_embedding
+    fake_openai.queue(429, {"retry-after-ms": "10"}, RATE_LIMITED)
+
+    embedding = await get_text_embedding("resume text")
+
+    assert embedding == [0.1, 0.1, 0.1]
+    assert len(fake_openai.requests) == 2
+    assert fake_openai.requests[0]["path"].endswith("/embeddings")
+
+@pytest.mark.asyncio
+async def test_analyze_endpoint_returns_503_when_upstream_unavailable(fake_openai):
+    fake_openai.queue(500, body=SERVER_ERROR, times=3)
+    app.dependency_overrides[get_current_user] = lambda: UserResponse(id=str(uuid4()), email="governor@example.com")
+    try:
+        with patch("app.api.routers.resumes.supabase_client", MagicMock()):
+            async with AsyncClient(app=app, base_url="http://test") as ac:
+                response = await ac.post("/resumes/analyze", json={"resume_text": "resume", "job_description_text": "jd"})
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+    assert response.status_code == 503
+    assert "temporarily unavailable" in response.json()["detail"]
+
+@pytest.mark.asyncio
+async def test_token_bucket_waits_when_empty():
+    bucket = TokenBucket(rate_per_minute=600, burst_seconds=0.1) # 10/s, capacity 1
+    assert await bucket.acquire(1) == 0
+    started = time.perf_counter()
+    waited = await bucket.acquire(1)
+    assert waited > 0
+    assert time.perf_counter() - started >= 0.08
+
+@pytest.mark.asyncio
+async def test_token_bucket_zero_rate_is_unlimited():
+    bucket = TokenBucket(rate_per_minute=0)
+    for _ in range(100):
+        assert await bucket.acquire(10_000) == 0
+
+def test_circuit_breaker_allows_single_half_open_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    breaker.before_call() # The probe
+    with pytest.raises(UpstreamUnavailableError):
+        breaker.before_call()
+    breaker.record_success()
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+@pytest.mark.asyncio
+async def test_probe_cancelled_while_waiting_for_the_rate_limit_releases_the_circuit():
+    governor = llm_governor.OutboundGovernor("test", rpm=60, tpm=0, max_concurrency=1, max_retries=0, base_delay=0.01,
+                                             max_delay=0.01, failure_threshold=1, reset_timeout=0)
+    governor.breaker.record_failure() # Open; with no reset timeout the next call is the half-open probe
+    governor.requests._tokens = 0 # The probe waits about a second for the request bucket
+
+    async def succeed():
+        return "ok"
+
+    probe = asyncio.ensure_future(governor.call(succeed))
+    await asyncio.sleep(0.01)
+    assert governor.breaker.state == CircuitBreaker.HALF_OPEN
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    governor.requests._tokens = governor.requests.capacity
+    assert await governor.call(succeed) == "ok" # The next call is the new probe, not rejected as half-open
+    assert governor.breaker.state == CircuitBreaker.CLOSED
+
+def test_parse_reset_seconds():
+    assert llm_governor._parse_reset_seconds("6m0s") == 360
+    assert llm_governor._parse_reset_seconds("20ms") == pytest.approx(0.02)
+    assert llm_governor._parse_reset_seconds(None) is None
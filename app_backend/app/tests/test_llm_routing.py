@@ -0,0 +1,165 @@
+import pytest
+import json
+from httpx import AsyncClient
+from unittest.mock import patch
+
+from app.main import app
+from app.services import llm_service, metrics
+from app.services.llm_backend import LLMBackend, LLMCompletion, LLMStream, set_llm_backend
+from app.services.llm_service import InterviewPrepResult, InterviewQuestion, route_stats
+from app.services.scoring_service import compute_local_score
+
+RESUME = "Skills\nPython, FastAPI, PostgreSQL, Docker"
+JD = "Backend Engineer\nPython, FastAPI, PostgreSQL and Kubernetes"
+LOCAL_SCORE = compute_local_score(RESUME, JD).match_score
+
+def analysis(score=LOCAL_SCORE, **overrides) -> str:
+    document = {"match_score": score, "missing_keywords": ["Kubernetes"], "strength_summary": "Solid backend fit.",
+                "improvement_suggestions": ["Add Kubernetes."], "ats_compatibility_check": "Readable."}
+    document.update(overrides)
+    return json.dumps({key: value for key, value in document.items() if value is not None})
+
+def interview(count: int) -> str:
+    questions = [{"category": "Technical", "question": f"Question {i}?"} for i in range(count)]
+    return json.dumps({"generated_questions": questions, "preparation_tips": ["Review the JD."]})
+
+class ScriptedBackend(LLMBackend):
+    """Answers with a fixed document per model and records which models were asked."""
+    name = "scripted"
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.models = []
+        self.prompts = []
+
+    async def complete(self, messages, max_tokens=None, temperature=None, model=None):
+        self.models.append(model)
+        self.prompts.append(messages)
+        return LLMCompletion(content=self.answers[model], model=model)
+
+    async def stream(self, messages, max_tokens=None, temperature=None, model=None):
+        self.models.append(model)
+        content = self.answers[model]
+
+        async def deltas():
+            for start in range(0, len(content), 16):
+                yield content[start:start + 16]
+
+        return LLMStream(deltas())
+
+@pytest.fixture
+def routing():
+    metrics.reset()
+    with patch.multiple(llm_service.settings, LLM_MODEL="default-model", LLM_FAST_MODEL="fast-model", LLM_STRONG_MODEL="strong-model",
+                        LLM_ROUTE_ANALYSIS="tiered", LLM_ROUTE_NARRATIVE="tiered", LLM_ROUTE_INTERVIEW="tiered"):
+        def use(answers):
+            backend = ScriptedBackend(answers)
+            set_llm_backend(backend)
+            return backend
+        yield use
+    set_llm_backend(None)
+    llm_service._inflight_calls.clear()
+    metrics.reset()
+
+@pytest.mark.asyncio
+async def test_default_route_uses_llm_model_only(routing):
+    backend = routing({"default-model": analysis()})
+    with patch.object(llm_service.settings, "LLM_ROUTE_ANALYSIS", "default"):
+        result = await llm_service._analyze_resume_with_llm(RESUME, JD)
+    assert result.match_score == LOCAL_SCORE
+    assert backend.models == ["default-model"]
+
+@pytest.mark.asyncio
+async def test_confident_fast_answer_is_not_escalated(routing):
+    backend = routing({"fast-model": analysis(), "strong-model": analysis()})
+    result = await llm_service._analyze_resume_with_llm(RESUME, JD)
+    assert result.strength_summary == "Solid backend fit."
+    assert backend.models == ["fast-model"]
+    assert metrics.get_counter("llm_route.analysis.escalations") == 0
+    assert metrics.snapshot()["latencies_ms"]["llm_route.analysis.fast_ms"]["count"] == 1
+
+@pytest.mark.parametrize("fast_answer, reason, models", [
+    (analysis(score="unknown"), "missing_fields", ["fast-model", "fast-model", "strong-model"]), # Re-asked once first
+    (analysis(strength_summary=None), "missing_fields", ["fast-model", "fast-model", "strong-model"]),
+    ("I can't evaluate this resume.", "invalid_json", ["fast-model", "strong-model"]),
+    (analysis(strength_summary="  "), "thin_output", ["fast-model", "strong-model"]),
+    (analysis(score=100 if LOCAL_SCORE < 50 else 0), "score_disagreement", ["fast-model", "strong-model"]),
+])
+@pytest.mark.asyncio
+async def test_bad_or_unreliable_fast_answer_escalates(routing, fast_answer, reason, models):
+    backend = routing({"fast-model": fast_answer, "strong-model": analysis(strength_summary="Strong model says so.")})
+    result = await llm_service._analyze_resume_with_llm(RESUME, JD)
+    assert result.strength_summary == "Strong model says so."
+    assert backend.models == models
+    assert metrics.get_counter(f"llm_route.analysis.escalations.{reason}") == 1
+    assert metrics.snapshot()["latencies_ms"]["llm_route.analysis.strong_ms"]["count"] == 1
+
+@pytest.mark.asyncio
+async def test_low_confidence_fast_answer_is_kept_when_strong_answer_is_invalid(routing):
+    routing({"fast-model": analysis(strength_summary=" "), "strong-model": "{not json"})
+    result = await llm_service._analyze_resume_with_llm(RESUME, JD)
+    assert result.match_score == LOCAL_SCORE
+    assert metrics.get_counter("llm_route.analysis.fallbacks") == 1
+
+@pytest.mark.asyncio
+async def test_invalid_answers_from_every_tier_give_none(routing):
+    routing({"fast-model": "{not json", "strong-model": "Sorry, no JSON here."})
+    assert await llm_service._analyze_resume_with_llm(RESUME, JD) is None
+
+@pytest.mark.asyncio
+async def test_narrative_without_suggestions_for_known_gaps_escalates(routing):
+    narrative = {"strength_summary": "Fine.", "ats_compatibility_check": "Readable."}
+    backend = routing({"fast-model": json.dumps({**narrative, "improvement_suggestions": []}),
+                       "strong-model": json.dumps({**narrative, "improvement_suggestions": ["Add Kubernetes."]})})
+    result = await llm_service._analyze_resume_narrative_with_llm(RESUME, JD, ["Kubernetes"])
+    assert result.improvement_suggestions == ["Add Kubernetes."]
+    assert backend.models == ["fast-model", "strong-model"]
+
+@pytest.mark.parametrize("feature", ["analysis", "narrative"])
+@pytest.mark.asyncio
+async def test_stored_ats_summary_is_served_instead_of_asking_the_model(routing, feature):
+    answer = analysis(ats_compatibility_check=None)
+    backend = routing({"fast-model": answer, "strong-model": answer})
+    if feature == "analysis":
+        result = await llm_service._analyze_resume_with_llm(RESUME, JD, ats_summary="Parses cleanly.")
+    else:
+        result = await llm_service._analyze_resume_narrative_with_llm(RESUME, JD, ["Kubernetes"], ats_summary="Parses cleanly.")
+    assert result.ats_compatibility_check == "Parses cleanly."
+    assert backend.models == ["fast-model"] # Neither re-asked for the field nor escalated as thin output
+    assert "ats_compatibility_check" not in backend.prompts[0][0]["content"]
+
+@pytest.mark.asyncio
+async def test_interview_with_too_few_questions_escalates(routing):
+    backend = routing({"fast-model": interview(1), "strong-model": interview(5)})
+    result = await llm_service._generate_interview_questions_with_llm(RESUME, JD)
+    assert len(result.generated_questions) == 5
+    assert backend.models == ["fast-model", "strong-model"]
+    assert metrics.get_counter("llm_route.interview.escalations.too_few_questions") == 1
+
+@pytest.mark.asyncio
+async def test_stream_streams_fast_tier_and_replaces_result_on_escalation(routing):
+    backend = routing({"fast-model": interview(2), "strong-model": interview(6)})
+    items = [item async for item in llm_service.stream_interview_questions_with_llm(RESUME, JD)]
+    assert len([item for item in items if isinstance(item, InterviewQuestion)]) == 2
+    assert isinstance(items[-1], InterviewPrepResult) and len(items[-1].generated_questions) == 6
+    assert backend.models == ["fast-model", "strong-model"]
+
+@pytest.mark.asyncio
+async def test_unknown_route_fails_the_call(routing):
+    routing({"default-model": analysis()})
+    with patch.object(llm_service.settings, "LLM_ROUTE_ANALYSIS", "cheapest"):
+        assert await llm_service._analyze_resume_with_llm(RESUME, JD) is None
+
+@pytest.mark.asyncio
+async def test_escalation_rate_is_exported(routing):
+    routing({"fast-model": interview(1), "strong-model": interview(5)})
+    await llm_service._generate_interview_questions_with_llm(RESUME, JD)
+    routing({"fast-model": interview(4), "strong-model": interview(5)})
+    await llm_service._generate_interview_questions_with_llm(RESUME, JD)
+
+    assert route_stats()["interview"] == {"route": "tiered", "calls": 2, "escalations": 1, "escalation_rate": 0.5}
+    with patch.object(llm_service.settings, "BACKGROUND_TASK_ADMIN_SECRET", "secret"):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.get("/admin-tasks/metrics", headers={"X-Admin-Secret": "secret"})
+    assert response.json()["llm_routes"]["interview"]["escalation_rate"] == 0.5
+    assert "llm_route.interview.fast_ms" in response.json()["latencies_ms"]
@@ -0,0 +1,112 @@
+import pytest
+import asyncio
+import json
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from app.services import llm_service
+from app.services.llm_service import analyze_resume_with_llm, run_single_flight, make_request_key
+
+MOCK_ANALYSIS = {
+    "match_score": 75,
+    "missing_keywords": ["docker"],
+    "strength_summary": "Solid backend experience.",
+    "improvement_suggestions": ["Quantify achievements."],
+    "ats_compatibility_check": "Compatible."
+}
+
+def _completion(data: dict) -> MagicMock:
+    mock_choice = MagicMock()
+    mock_choice.message.content = json.dumps(data)
+    mock_completion = MagicMock()
+    mock_completion.choices = [mock_choice]
+    return mock_completion
+
+@pytest.fixture
+def slow_openai_create():
+    # create() takes a little while so concurrent callers overlap
+    with patch("app.services.llm_service.openai.AsyncOpenAI") as mock_constructor, \
+         patch.object(llm_service.settings, "OPENAI_API_KEY", "sk-test"):
+        mock_client = AsyncMock()
+        mock_constructor.return_value = mock_client
+
+        async def slow_create(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return _completion(MOCK_ANALYSIS)
+
+        mock_client.chat.completions.create = AsyncMock(side_effect=slow_create)
+        yield mock_client.chat.completions.create
+    llm_service._inflight_calls.clear()
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_requests_share_one_call(slow_openai_create):
+    results = await asyncio.gather(*[analyze_resume_with_llm("resume", "jd") for _ in range(5)])
+
+    assert slow_openai_create.await_count == 1
+    assert all(r is not None and r.match_score == 75 for r in results)
+    # Every caller gets its own copy of the result
+    assert len({id(r) for r in results}) == 5
+    assert llm_service._inflight_calls == {}
+
+@pytest.mark.asyncio
+async def test_different_requests_are_not_coalesced(slow_openai_create):
+    await asyncio.gather(analyze_resume_with_llm("resume A", "jd"), analyze_resume_with_llm("resume B", "jd"))
+    assert slow_openai_create.await_count == 2
+
+@pytest.mark.asyncio
+async def test_sequential_requests_are_not_cached(slow_openai_create):
+    await analyze_resume_with_llm("resume", "jd")
+    await analyze_resume_with_llm("resume", "jd")
+    assert slow_openai_create.await_count == 2
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_call(slow_openai_create):
+    first = asyncio.create_task(analyze_resume_with_llm("resume", "jd"))
+    second = asyncio.create_task(analyze_resume_with_llm("resume", "jd"))
+    await asyncio.sleep(0.01)
+
+    first.cancel() # e.g. the first tab disconnected
+    result = await second
+
+    assert first.cancelled()
+    assert result is not None and result.match_score == 75
+    assert slow_openai_create.await_count == 1
+
+@pytest.mark.asyncio
+async def test_last_waiter_cancelling_cancels_shared_call():
+    started = asyncio.Event()
+    finished = False
+
+    async def work():
+        nonlocal finished
+        started.set()
+        await asyncio.sleep(10)
+        finished = True
+
+    key = make_request_key("test", "x")
+    waiter = asyncio.create_task(run_single_flight(key, work))
+    await started.wait()
+    shared_task = llm_service._inflight_calls[key].task
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    await asyncio.sleep(0)
+
+    assert shared_task.cancelled()
+    assert not finished
+    assert key not in llm_service._inflight_calls
+
+@pytest.mark.asyncio
+async def test_shared_call_exception_reaches_every_waiter():
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    key = make_request_key("test", "fail")
+    results = await asyncio.gather(run_single_flight(key, failing), run_single_flight(key, failing), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert key not in llm_service._inflight_calls
+
+def test_request_key_separates_parts():
+    assert make_request_key("analysis", "ab", "c") != make_request_key("analysis", "a", "bc")
+    assert make_request_key("analysis", "a", "b") != make_request_key("interview_prep", "a", "b")
@@ -0,0 +1,126 @@
+import pytest
+import json
+from pathlib import Path
+from httpx import AsyncClient
+from unittest.mock import patch, AsyncMock, MagicMock
+from uuid import uuid4
+
+from app.main import app
+from app.api.deps import get_current_user
+from app.schemas.auth_schemas import UserResponse
+from app.services.llm_service import LLMNarrativeResult
+from app.services.scoring_service import compute_local_score, tokenize, _terms
+
+CORPUS = json.loads((Path(__file__).parent / "fixtures" / "scoring_corpus.json").read_text())
+
+JD = """Backend Engineer
+Requirements:
+- Python, FastAPI or Django
+- PostgreSQL, Redis
+- Docker and Kubernetes on AWS"""
+
+STRONG_RESUME = """Skills
+Python, FastAPI, PostgreSQL, Redis, Docker, Kubernetes, AWS
+Experience
+- Built FastAPI services on Kubernetes in AWS backed by PostgreSQL and Redis"""
+
+@pytest.fixture
+def override_current_user():
+    app.dependency_overrides[get_current_user] = lambda: UserResponse(id=str(uuid4()), email="scoring@example.com")
+    yield
+    app.dependency_overrides.pop(get_current_user, None)
+
+def test_tokenize_keeps_tech_tokens_and_drops_noise():
+    assert tokenize("C++, C#, Node.js and CI/CD with 5+ years.") == ["c++", "c#", "node.js", "ci/cd", "years"]
+
+def test_bigrams_stay_within_phrases():
+    terms = _terms("Machine learning, Redis\nFastAPI or Django")
+    assert "machine learning" in terms
+    assert "learning redis" not in terms
+    assert "fastapi django" not in terms
+
+def test_strong_match_scores_higher_than_partial_and_unrelated():
+    partial = "Skills\nPython, Flask, MySQL, Docker"
+    unrelated = "Registered Nurse with ICU experience, BLS and ACLS certified."
+    strong_score = compute_local_score(STRONG_RESUME, JD)
+    partial_score = compute_local_score(partial, JD)
+    unrelated_score = compute_local_score(unrelated, JD)
+
+    assert strong_score.match_score > partial_score.match_score > unrelated_score.match_score
+    assert unrelated_score.match_score == 0
+    assert 0 <= partial_score.match_score <= 100
+
+def test_missing_keywords_are_ranked_job_terms_absent_from_resume():
+    score = compute_local_score("Skills\nPython, Flask, MySQL, Docker", JD)
+    assert "Python" not in score.missing_keywords
+    assert {"FastAPI", "Kubernetes", "AWS"} <= set(score.missing_keywords)
+    assert "Python" in score.matched_keywords
+    # Generic posting words are never reported as gaps
+    assert "requirements" not in score.missing_keywords
+
+def test_embedding_similarity_is_blended_in():
+    lexical = compute_local_score("Skills\nPython, Flask", JD)
+    similar = compute_local_score("Skills\nPython, Flask", JD, embedding_similarity=0.98)
+    dissimilar = compute_local_score("Skills\nPython, Flask", JD, embedding_similarity=0.70)
+    assert dissimilar.match_score < lexical.match_score < similar.match_score
+
+def test_empty_job_description_scores_zero():
+    assert compute_local_score(STRONG_RESUME, "and the of").match_score == 0
+
+def test_fixture_corpus_accuracy_against_reference_scores():
+    # Guards the documented accuracy (benchmarks/README.md) against regressions in the scoring engine
+    errors = []
+    for pair in CORPUS["pairs"]:
+        score = compute_local_score(CORPUS["resumes"][pair["resume"]], CORPUS["job_descriptions"][pair["job_description"]])
+        errors.append(abs(score.match_score - pair["reference_score"]))
+    assert sum(errors) / len(errors) <= 10
+
+@pytest.mark.asyncio
+async def test_analyze_fast_mode_makes_no_llm_call(override_current_user):
+    with patch("app.api.routers.resumes.supabase_client", MagicMock()), \
+         patch("app.api.routers.resumes.analyze_resume_with_llm", new_callable=AsyncMock) as full_mock, \
+         patch("app.api.routers.resumes.analyze_resume_narrative_with_llm", new_callable=AsyncMock) as narrative_mock:
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/resumes/analyze", json={"resume_text": STRONG_RESUME, "job_description_text": JD, "mode": "fast"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["mode"] == "fast"
+    assert body["match_score"] == body["local_score"]["match_score"] > 50
+    assert body["strength_summary"]
+    full_mock.assert_not_called()
+    narrative_mock.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_analyze_hybrid_mode_uses_local_score_and_llm_narrative(override_current_user):
+    narrative = LLMNarrativeResult(strength_summary="Solid backend profile.", improvement_suggestions=["Quantify impact."], ats_compatibility_check="Compatible.")
+    partial = "Skills\nPython, Flask, MySQL, Docker"
+    with patch("app.api.routers.resumes.supabase_client", MagicMock()), \
+         patch("app.api.routers.resumes.analyze_resume_with_llm", new_callable=AsyncMock) as full_mock, \
+         patch("app.api.routers.resumes.analyze_resume_narrative_with_llm", new_callable=AsyncMock, return_value=narrative) as narrative_mock:
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/resumes/analyze", json={"resume_text": partial, "job_description_text": JD, "mode": "hybrid"})
+
+    assert response.status_code == 200
+    body = response.json()
+    local = compute_local_score(partial, JD)
+    assert body["match_score"] == local.match_score
+    assert body["missing_keywords"] == local.missing_keywords
+    assert body["strength_summary"] == "Solid backend profile."
+    full_mock.assert_not_called()
+    # The LLM is told about the locally found gaps so the narrative agrees with them
+    assert narrative_mock.call_args.args[2] == local.missing_keywords
+
+@pytest.mark.asyncio
+async def test_analyze_hybrid_mode_fails_when_narrative_fails(override_current_user):
+    with patch("app.api.routers.resumes.supabase_client", MagicMock()), \
+         patch("app.api.routers.resumes.analyze_resume_narrative_with_llm", new_callable=AsyncMock, return_value=None):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/resumes/analyze", json={"resume_text": STRONG_RESUME, "job_description_text": JD, "mode": "hybrid"})
+    assert response.status_code == 500
+
+@pytest.mark.asyncio
+async def test_analyze_rejects_unknown_mode(override_current_user):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.post("/resumes/analyze", json={"resume_text": "r", "job_description_text": "jd", "mode": "turbo"})
+    assert response.status_code == 422
@@ -1,4 +1,5 @@
 import pytest
+from unittest.mock import patch
 from httpx import AsyncClient
 from app.main import app # Import your FastAPI app instance
 
@@ -8,3 +9,16 @@ async def test_health_check():
         response = await ac.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+@pytest.mark.asyncio
+async def test_readiness_check():
+    with patch("app.main.vector_service.collection_ready", return_value=False):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json() == {"status": "degraded", "vector_index": False}
+
+    with patch("app.main.vector_service.collection_ready", return_value=True):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.get("/health/ready")
+    assert response.json() == {"status": "ok", "vector_index": True}
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from app.services import metrics
+from app.services.micro_batcher import MicroBatcher
+
+def recording_flush(batches):
+    async def flush(items):
+        batches.append(list(items))
+        return [item * 10 for item in items]
+    return flush
+
+@pytest.mark.asyncio
+async def test_concurrent_submissions_share_one_flush():
+    metrics.reset()
+    batches = []
+    batcher = MicroBatcher("test_batch", recording_flush(batches), window_ms=20, max_items=100)
+
+    results = await asyncio.gather(*(batcher.submit(index) for index in range(5)))
+
+    assert results == [0, 10, 20, 30, 40] # Each caller gets its own result
+    assert batches == [[0, 1, 2, 3, 4]]
+    assert metrics.get_counter("test_batch.batches") == 1
+    assert metrics.get_counter("test_batch.items") == 5
+    assert metrics.snapshot()["latencies_ms"]["test_batch.wait_ms"]["count"] == 5
+
+@pytest.mark.asyncio
+async def test_max_items_flushes_without_waiting():
+    batches = []
+    batcher = MicroBatcher("test_batch", recording_flush(batches), window_ms=10000, max_items=2)
+
+    results = await asyncio.wait_for(asyncio.gather(*(batcher.submit(index) for index in range(4))), timeout=1)
+
+    assert results == [0, 10, 20, 30]
+    assert batches == [[0, 1], [2, 3]]
+
+@pytest.mark.asyncio
+async def test_max_cost_starts_a_new_batch():
+    batches = []
+    batcher = MicroBatcher("test_batch", recording_flush(batches), window_ms=20, max_items=100, max_cost=100)
+
+    await asyncio.gather(batcher.submit(1, cost=60), batcher.submit(2, cost=60), batcher.submit(3, cost=30))
+
+    assert batches == [[1], [2, 3]]
+
+@pytest.mark.asyncio
+async def test_zero_window_sends_each_item_alone():
+    batches = []
+    batcher = MicroBatcher("test_batch", recording_flush(batches), window_ms=0, max_items=100)
+
+    await asyncio.gather(batcher.submit(1), batcher.submit(2))
+
+    assert batches == [[1], [2]]
+
+@pytest.mark.asyncio
+async def test_failed_flush_fails_every_caller_in_the_batch():
+    async def flush(items):
+        raise ValueError("upstream down")
+    batcher = MicroBatcher("test_batch", flush, window_ms=5, max_items=100)
+
+    results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    assert [str(result) for result in results] == ["upstream down", "upstream down"]
+
+@pytest.mark.asyncio
+async def test_wrong_result_count_is_an_error():
+    async def flush(items):
+        return [1]
+    batcher = MicroBatcher("test_batch", flush, window_ms=5, max_items=100)
+
+    results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_break_the_batch():
+    batches = []
+    batcher = MicroBatcher("test_batch", recording_flush(batches), window_ms=20, max_items=100)
+
+    cancelled = asyncio.ensure_future(batcher.submit(1))
+    kept = asyncio.ensure_future(batcher.submit(2))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    assert await kept == 20
+    assert batches == [[1, 2]]
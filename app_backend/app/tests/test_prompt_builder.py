@@ -0,0 +1,102 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+from app.services import prompt_builder
+from app.services.prompt_builder import compact_to_budget, split_sections, normalize_whitespace, strip_boilerplate, build_prompt_inputs, get_tokenizer
+
+@pytest.fixture(autouse=True)
+def approximate_tokenizer():
+    # Keep token counts deterministic and offline regardless of whether tiktoken is installed
+    prompt_builder._compact_cached.cache_clear()
+    with patch("app.services.prompt_builder.get_tokenizer", return_value=prompt_builder._ApproximateTokenizer()):
+        yield
+    prompt_builder._compact_cached.cache_clear()
+
+RESUME = """Jane Doe
+jane@example.com
+
+Summary
+Backend engineer with 8 years of experience.
+
+Skills
+Python, FastAPI, PostgreSQL, Docker, Kubernetes
+
+Work Experience
+Senior Engineer, Acme (2020 - 2026)
+- Built a payments API serving 50k requests per minute.
+- Led the migration to Kubernetes.
+Page 1 of 2
+
+Hobbies & Interests
+- Trail running, chess, amateur astronomy, landscape photography and cooking.
+- Organising the neighbourhood book club and weekend hiking trips.
+
+References
+References available upon request.
+"""
+
+def test_text_within_budget_is_untouched():
+    result = compact_to_budget(RESUME, budget=10_000)
+    assert result.text == RESUME
+    assert result.steps == []
+    assert result.tokens == result.original_tokens
+
+def test_split_sections_recognises_headings():
+    names = [name for name, _ in split_sections(RESUME)]
+    assert names == ["header", "summary", "skills", "experience", "hobbies", "references"]
+
+def test_normalize_whitespace_collapses_spaces_blank_lines_and_repeats():
+    text = "Jane   Doe\n\n\n\nJane Doe\nJane Doe\n\tPython\t\tGo  "
+    assert normalize_whitespace(text) == "Jane Doe\n\nJane Doe\nPython Go"
+
+def test_strip_boilerplate_removes_known_lines():
+    text = "Python\nPage 2 of 3\nReferences available upon request.\nWe are an equal opportunity employer.\nGo"
+    assert strip_boilerplate(text) == "Python\nGo"
+
+def test_low_value_sections_dropped_before_core_sections():
+    full = compact_to_budget(RESUME, budget=10_000).tokens
+    result = compact_to_budget(RESUME, budget=full - 25)
+
+    assert result.tokens <= full - 25
+    assert "hobbies" in result.dropped_sections
+    assert "Kubernetes" in result.text and "payments API" in result.text
+    assert "Trail running" not in result.text
+    assert "truncate_sections" not in result.steps
+
+def test_tight_budget_truncates_but_keeps_protected_sections():
+    result = compact_to_budget(RESUME * 20, budget=60)
+
+    assert result.tokens <= 60
+    assert "truncate_sections" in result.steps
+    assert "Python" in result.text # Skills survive
+    assert "References" not in result.text
+
+def test_build_prompt_inputs_applies_per_section_budgets():
+    with patch.object(prompt_builder.settings, "LLM_RESUME_TOKEN_BUDGET", 40), \
+         patch.object(prompt_builder.settings, "LLM_JD_TOKEN_BUDGET", 10_000):
+        inputs = build_prompt_inputs(RESUME * 10, "Python developer wanted.")
+
+    assert inputs.resume.tokens <= 40
+    assert inputs.resume.was_compacted
+    assert inputs.job_description.text == "Python developer wanted."
+    assert not inputs.job_description.was_compacted
+
+def test_approximate_tokenizer_truncate_respects_limit():
+    tokenizer = prompt_builder._ApproximateTokenizer()
+    text = "one, two three. four"
+    assert tokenizer.count(text) == 6
+    assert tokenizer.truncate(text, 3) == "one, two"
+    assert tokenizer.truncate(text, 100) == text
+    assert tokenizer.truncate(text, 0) == ""
+
+def test_unknown_model_without_fallback_encoding_uses_the_estimate():
+    # Offline, with no cached BPE file: tiktoken can't load even its fallback encoding
+    fake_tiktoken = MagicMock()
+    fake_tiktoken.encoding_for_model.side_effect = KeyError("future-model")
+    fake_tiktoken.get_encoding.side_effect = ConnectionError("no network")
+    get_tokenizer.cache_clear()
+    try:
+        with patch.object(prompt_builder, "tiktoken", fake_tiktoken):
+            assert isinstance(get_tokenizer("future-model"), prompt_builder._ApproximateTokenizer)
+    finally:
+        get_tokenizer.cache_clear()
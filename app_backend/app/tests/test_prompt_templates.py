@@ -0,0 +1,87 @@
+import pytest
+import json
+from httpx import AsyncClient
+from unittest.mock import patch
+
+from app.main import app
+from app.services import llm_service, llm_governor, llm_backend, metrics
+from app.services.llm_backend import FakeLLMBackend, PREFIX_CACHE_MIN_TOKENS, set_llm_backend
+from app.services.prompt_templates import ANALYSIS_TEMPLATE, INTERVIEW_TEMPLATE, TEMPLATES, build_messages
+from app.tests.fake_openai_server import ANALYSIS_JSON, FakeOpenAIServer, chat_completion_body
+from benchmarks.sample_corpus import make_job_description, make_resume
+
+RESUME = make_resume(1, jobs=8, bullets_per_job=8) # Long enough for the prompt prefix to pass 1024 tokens
+JOB_DESCRIPTIONS = [make_job_description(seed, 8) for seed in (1, 2, 3)]
+
+@pytest.fixture
+def fake_backend():
+    metrics.reset()
+    backend = FakeLLMBackend()
+    set_llm_backend(backend)
+    with patch.object(llm_service.settings, "LLM_RESUME_INPUT", "text"):
+        yield backend
+    set_llm_backend(None)
+    llm_service._inflight_calls.clear()
+    metrics.reset()
+
+def test_static_instructions_then_resume_then_job_description():
+    first = build_messages(ANALYSIS_TEMPLATE, "resume A", "job X", "details")
+    second = build_messages(ANALYSIS_TEMPLATE, "resume A", "job Y", "other details")
+    assert first[0] == second[0] == {"role": "system", "content": ANALYSIS_TEMPLATE.system}
+    assert first[1]["content"] == "Resume:\nresume A\n---\n\nJob description:\njob X\n---\n\ndetails"
+    assert second[1]["content"].startswith("Resume:\nresume A\n---\n\nJob description:\n")
+
+def test_shared_job_description_can_lead():
+    messages = build_messages(INTERVIEW_TEMPLATE, "resume A", "job X", shared_first="job_description")
+    assert messages[1]["content"] == "Job description:\njob X\n---\n\nResume:\nresume A\n---"
+
+def test_templates_are_versioned_and_hold_nothing_per_call():
+    assert {template.name for template in TEMPLATES.values()} == {"analysis-v2", "narrative-v2", "interview-v2"}
+    for template in TEMPLATES.values():
+        assert "{" not in template.system or template is INTERVIEW_TEMPLATE # Only the interview example document has braces
+
+def test_fake_prefix_cache_counts_the_shared_prefix():
+    backend = FakeLLMBackend()
+    first = build_messages(ANALYSIS_TEMPLATE, RESUME, JOB_DESCRIPTIONS[0])
+    second = build_messages(ANALYSIS_TEMPLATE, RESUME, JOB_DESCRIPTIONS[1])
+    assert backend.cached_tokens(first) == 0
+    cached = backend.cached_tokens(second)
+    assert cached >= PREFIX_CACHE_MIN_TOKENS and cached % 128 == 0
+    assert backend.cached_tokens(build_messages(ANALYSIS_TEMPLATE, "short resume", "short job")) == 0 # Below the minimum
+
+@pytest.mark.asyncio
+async def test_cached_tokens_are_recorded_per_feature(fake_backend):
+    for job_description in JOB_DESCRIPTIONS:
+        await llm_service._analyze_resume_with_llm(RESUME, job_description)
+    stats = llm_service.prompt_cache_stats()["analysis"]
+    assert stats["template"] == "analysis-v2"
+    assert stats["requests"] == 3
+    assert stats["cache_hit_rate"] == pytest.approx(2 / 3, abs=1e-3)
+    assert 0 < stats["cached_tokens"] < stats["prompt_tokens"]
+
+@pytest.mark.asyncio
+async def test_streamed_interview_usage_is_recorded(fake_backend):
+    for job_description in JOB_DESCRIPTIONS[:2]:
+        [item async for item in llm_service.stream_interview_questions_with_llm(RESUME, job_description)]
+    assert llm_service.prompt_cache_stats()["interview"]["cache_hit_rate"] == 0.5
+
+@pytest.mark.asyncio
+async def test_openai_cached_tokens_are_read_from_usage():
+    llm_governor.reset_governors()
+    metrics.reset()
+    body = chat_completion_body(json.dumps(ANALYSIS_JSON))
+    body["usage"] = {"prompt_tokens": 2048, "completion_tokens": 10, "total_tokens": 2058, "prompt_tokens_details": {"cached_tokens": 1536}}
+    with FakeOpenAIServer() as server, patch.multiple(llm_backend.settings, OPENAI_API_KEY="sk-test", OPENAI_BASE_URL=server.base_url):
+        server.queue(200, body=body)
+        await llm_service._analyze_resume_with_llm("resume", "jd")
+        await llm_service._analyze_resume_with_llm("resume", "jd") # Default usage, without cache details
+    llm_governor.reset_governors()
+
+    stats = llm_service.prompt_cache_stats()["analysis"]
+    assert (stats["requests"], stats["prompt_tokens"], stats["cached_tokens"]) == (2, 2048, 1536)
+    assert stats["cached_token_rate"] == 0.75
+    with patch.object(llm_service.settings, "BACKGROUND_TASK_ADMIN_SECRET", "secret"):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.get("/admin-tasks/metrics", headers={"X-Admin-Secret": "secret"})
+    assert response.json()["llm_prompt_cache"]["analysis"]["cached_tokens"] == 1536
+    metrics.reset()
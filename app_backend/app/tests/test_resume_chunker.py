@@ -0,0 +1,74 @@
+import pytest
+from unittest.mock import patch
+
+from app.services import prompt_builder
+from app.services.prompt_builder import count_tokens
+from app.services.resume_chunker import chunk_resume
+
+@pytest.fixture(autouse=True)
+def approximate_tokenizer():
+    # Keep token counts deterministic and offline regardless of whether tiktoken is installed
+    with patch("app.services.prompt_builder.get_tokenizer", return_value=prompt_builder._ApproximateTokenizer()):
+        yield
+
+RESUME = """Jane Doe
+jane@example.com
+
+Skills
+Python, FastAPI, PostgreSQL, Docker, Kubernetes
+
+Work Experience
+Senior Engineer, Acme (2020 - 2026)
+- Built a payments API serving 50k requests per minute.
+- Led the migration to Kubernetes.
+Page 1 of 2
+
+Hobbies & Interests
+Climbing, chess
+
+References
+Available on request
+"""
+
+def test_chunks_follow_sections_in_order():
+    chunks = chunk_resume(RESUME, max_tokens=512, max_chunks=24)
+
+    assert [chunk.section for chunk in chunks] == ["header", "skills", "experience"]
+    assert [chunk.index for chunk in chunks] == [0, 1, 2]
+    assert chunks[0].text == "Jane Doe\njane@example.com"
+    assert chunks[1].text == "Skills\nPython, FastAPI, PostgreSQL, Docker, Kubernetes"
+    assert "Page 1 of 2" not in chunks[2].text # Boilerplate is stripped
+
+def test_long_sections_are_windowed_under_the_budget():
+    bullets = "\n".join(f"- Shipped feature number {i} for the billing platform team." for i in range(40))
+    chunks = chunk_resume(f"Work Experience\n{bullets}", max_tokens=60, max_chunks=100)
+
+    assert len(chunks) > 1
+    assert all(chunk.section == "experience" for chunk in chunks)
+    assert all(chunk.text.startswith("Work Experience\n") for chunk in chunks) # Every window keeps its heading
+    assert all(count_tokens(chunk.text) <= 60 for chunk in chunks)
+    assert sum(chunk.text.count("- Shipped") for chunk in chunks) == 40 # No line lost or repeated
+
+def test_a_single_overlong_line_is_split():
+    line = " ".join(f"word{i}" for i in range(400))
+    chunks = chunk_resume(f"Summary\n{line}", max_tokens=50, max_chunks=100)
+
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk.text) <= 50 for chunk in chunks)
+    assert " ".join(" ".join(chunk.text.splitlines()[1:]) for chunk in chunks) == line
+
+def test_chunk_count_is_capped():
+    bullets = "\n".join(f"- Shipped feature number {i} for the billing platform team." for i in range(40))
+    chunks = chunk_resume(f"Work Experience\n{bullets}", max_tokens=30, max_chunks=3)
+
+    assert [chunk.index for chunk in chunks] == [0, 1, 2]
+
+def test_defaults_come_from_settings():
+    with patch("app.services.resume_chunker.settings") as settings:
+        settings.VECTOR_CHUNK_MAX_TOKENS = 512
+        settings.VECTOR_MAX_CHUNKS = 1
+        assert len(chunk_resume(RESUME)) == 1
+
+@pytest.mark.parametrize("text", ["", None, "References\nAvailable on request"])
+def test_nothing_to_index(text):
+    assert chunk_resume(text, max_tokens=512, max_chunks=24) == []
@@ -0,0 +1,113 @@
+import pytest
+import datetime
+import json
+from unittest.mock import patch
+
+from app.services import llm_service
+from app.services.llm_backend import LLMBackend, LLMCompletion, set_llm_backend
+from app.services.resume_profile import RESUME_PROFILE_VERSION, build_profile, get_resume_profile, profile_from_stored, render_profile
+
+TODAY = datetime.date(2026, 10, 1)
+
+RESUME = """Jane Doe
+jane.doe@example.com | +1 (555) 123-4567 | linkedin.com/in/janedoe
+
+Summary
+Backend engineer building payment and data platforms in Python.
+
+Experience
+Senior Software Engineer, Acme Payments | Jan 2022 - Present
+- Led the migration of the billing service to FastAPI, cutting p95 latency by 40%
+- Mentored four engineers
+- Built PostgreSQL partitioning for 2B ledger rows
+- Attended weekly planning meetings
+Software Engineer, Widgets Inc
+Jun 2018 - Dec 2021
+- Shipped Docker-based CI pipelines used by 30 teams
+- Wrote internal documentation
+
+Education
+BSc Computer Science, State University, 2018
+
+Skills
+Python, FastAPI, PostgreSQL, Docker, Kubernetes
+
+Hobbies
+Competitive sailing and sourdough baking
+"""
+
+GOOD_ANALYSIS = {"match_score": 70, "missing_keywords": [], "strength_summary": "Good.",
+                 "improvement_suggestions": ["None."], "ats_compatibility_check": "Readable."}
+
+class RecordingBackend(LLMBackend):
+    name = "recording"
+
+    def __init__(self):
+        self.calls = []
+
+    async def complete(self, messages, max_tokens=None, temperature=None, model=None):
+        self.calls.append(messages)
+        return LLMCompletion(content=json.dumps(GOOD_ANALYSIS), model=model or "recording")
+
+@pytest.fixture
+def recording_backend():
+    backend = RecordingBackend()
+    set_llm_backend(backend)
+    yield backend
+    set_llm_backend(None)
+    llm_service._inflight_calls.clear()
+
+def test_profile_keeps_roles_skills_and_education():
+    profile = build_profile(RESUME, today=TODAY)
+    assert [role.title for role in profile.roles] == ["Senior Software Engineer, Acme Payments", "Software Engineer, Widgets Inc"]
+    assert profile.roles[1].dates == "Jun 2018 - Dec 2021"
+    assert profile.roles[0].highlights[0].startswith("Led the migration")
+    assert "Attended weekly planning meetings" not in profile.roles[0].highlights # Only the strongest bullets are kept
+    assert profile.seniority == "senior"
+    assert profile.years_experience == 8.2 # Jun 2018 to Oct 2026
+    assert "Python" in sum(profile.skills.values(), [])
+    assert profile.education == ["BSc Computer Science, State University, 2018"]
+    assert profile.profile_tokens < profile.source_tokens
+
+def test_profile_drops_contact_details_and_hobbies():
+    rendered = render_profile(build_profile(RESUME, today=TODAY))
+    assert "sailing" not in rendered
+    assert "jane.doe@example.com" not in rendered
+    assert "Seniority: senior (~8.2 years)" in rendered
+
+def test_overlapping_roles_are_counted_once():
+    text = "Experience\nEngineer, A | 2016 - 2020\nConsultant, B | 2018 - 2020\n"
+    assert build_profile(text, today=TODAY).years_experience == 4
+
+@pytest.mark.parametrize("title, level", [("Engineering Manager, A", "lead"), ("Staff Engineer, A", "principal"),
+                                          ("VP of Engineering, A", "executive"), ("Data Analyst, A", "junior")])
+def test_seniority_comes_from_the_latest_title(title, level):
+    text = f"Experience\n{title} | Jan 2025 - Present\n"
+    assert build_profile(text, today=TODAY).seniority == level
+
+def test_stored_profile_from_an_older_version_is_rebuilt():
+    stored = build_profile(RESUME, today=TODAY).model_dump(mode="json")
+    assert profile_from_stored(stored) is not None
+    assert profile_from_stored({**stored, "version": RESUME_PROFILE_VERSION - 1}) is None
+    assert profile_from_stored(None) is None
+    assert get_resume_profile(RESUME, {**stored, "version": 0}).version == RESUME_PROFILE_VERSION
+
+@pytest.mark.asyncio
+async def test_prompt_carries_the_profile_instead_of_the_text(recording_backend):
+    await llm_service._analyze_resume_with_llm(RESUME, "Backend engineer, Python and Kubernetes")
+    prompt = recording_backend.calls[0][-1]["content"]
+    assert "Seniority: senior" in prompt
+    assert "sailing" not in prompt
+
+@pytest.mark.asyncio
+async def test_stored_profile_is_used_for_interview_prep(recording_backend):
+    profile = build_profile(RESUME, today=TODAY)
+    profile.summary = "Stored summary marker."
+    await llm_service._generate_interview_questions_with_llm(RESUME, "Backend engineer", profile=profile)
+    assert "Stored summary marker." in recording_backend.calls[0][-1]["content"]
+
+@pytest.mark.asyncio
+async def test_text_input_setting_sends_the_raw_text(recording_backend):
+    with patch.object(llm_service.settings, "LLM_RESUME_INPUT", "text"):
+        await llm_service._analyze_resume_with_llm(RESUME, "Backend engineer, Python and Kubernetes")
+    assert "sailing" in recording_backend.calls[0][-1]["content"]
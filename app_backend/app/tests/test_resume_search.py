@@ -0,0 +1,163 @@
+import datetime
+import pytest
+from httpx import AsyncClient
+from unittest.mock import patch, MagicMock, AsyncMock
+from uuid import uuid4
+
+import numpy as np
+from qdrant_client import AsyncQdrantClient
+
+from app.main import app
+from app.api.deps import get_current_user
+from app.core.config import settings
+from app.schemas.auth_schemas import UserResponse
+from app.services import vector_service
+
+MOCK_USER_ID = uuid4()
+OTHER_USER_ID = uuid4()
+
+def vector(*weights):
+    # Unit vectors in the first few dimensions, so similarities are easy to reason about
+    values = np.zeros(vector_service.embedding_dimension(), dtype=np.float32)
+    values[:len(weights)] = weights
+    return (values / np.linalg.norm(values)).tolist()
+
+def resume_row(resume_id, filename):
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    return {"id": str(resume_id), "filename": filename, "content_hash": None, "storage_path": None, "created_at": now, "updated_at": now}
+
+@pytest.fixture
+def override_current_user():
+    app.dependency_overrides[get_current_user] = lambda: UserResponse(id=str(MOCK_USER_ID), email="search@example.com")
+    yield
+    app.dependency_overrides.pop(get_current_user, None)
+
+@pytest.fixture
+async def qdrant():
+    # A real (in-process) Qdrant, so filters and ranking are Qdrant's own
+    vector_service.qdrant_client_instance = AsyncQdrantClient(location=":memory:")
+    vector_service.mark_collection_unready()
+    vector_service.reset_batchers()
+    yield vector_service.qdrant_client_instance
+    await vector_service.close_qdrant_client()
+    vector_service.reset_batchers()
+
+async def index(resume_id, user_id, embedding):
+    with patch.object(vector_service, "get_text_embedding", AsyncMock(return_value=embedding)):
+        await vector_service.upsert_resume_embedding(resume_id, user_id, "resume text")
+
+async def search(body, db_rows):
+    db = MagicMock()
+    db.table.return_value.select.return_value.eq.return_value.in_.return_value.execute.return_value = MagicMock(data=db_rows)
+    with patch("app.api.routers.resumes.supabase_client", db), \
+         patch("app.api.routers.resumes.get_text_embedding", AsyncMock(return_value=vector(1, 0, 0))) as embed:
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/resumes/search", json=body)
+    return response, db, embed
+
+@pytest.mark.asyncio
+async def test_search_ranks_only_the_users_resumes(override_current_user, qdrant):
+    close, far, someone_elses = uuid4(), uuid4(), uuid4()
+    await index(close, MOCK_USER_ID, vector(1, 0.1, 0))
+    await index(far, MOCK_USER_ID, vector(0.2, 1, 0))
+    await index(someone_elses, OTHER_USER_ID, vector(1, 0, 0))
+
+    response, db, embed = await search({"query": "python backend engineer"}, [resume_row(far, "far.pdf"), resume_row(close, "close.pdf")])
+
+    assert response.status_code == 200
+    results = response.json()
+    assert [result["filename"] for result in results] == ["close.pdf", "far.pdf"]
+    assert results[0]["score"] > results[1]["score"]
+    embed.assert_awaited_once_with("python backend engineer")
+    db.table.return_value.select.return_value.eq.assert_called_once_with("user_id", str(MOCK_USER_ID))
+    assert sorted(db.table.return_value.select.return_value.eq.return_value.in_.call_args.args[1]) == sorted([str(close), str(far)])
+
+@pytest.mark.asyncio
+async def test_search_skips_resumes_missing_from_the_database(override_current_user, qdrant):
+    kept, deleted = uuid4(), uuid4()
+    await index(kept, MOCK_USER_ID, vector(1, 0, 0))
+    await index(deleted, MOCK_USER_ID, vector(1, 0.5, 0))
+
+    response, _, _ = await search({"query": "python", "limit": 5}, [resume_row(kept, "kept.pdf")])
+
+    assert [result["id"] for result in response.json()] == [str(kept)]
+
+@pytest.mark.asyncio
+async def test_search_filters_by_score_and_upload_date(override_current_user, qdrant):
+    resume_id = uuid4()
+    await index(resume_id, MOCK_USER_ID, vector(0, 1, 0)) # Orthogonal to the query
+
+    response, db, _ = await search({"query": "python", "score_threshold": 0.5}, [])
+    assert response.json() == []
+    db.table.assert_not_called() # Nothing to look up
+
+    tomorrow = (datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=1)).isoformat()
+    response, _, _ = await search({"query": "python", "created_after": tomorrow}, [resume_row(resume_id, "old.pdf")])
+    assert response.json() == []
+
+@pytest.mark.asyncio
+async def test_search_by_job_description(override_current_user, qdrant):
+    response, _, embed = await search({"job_description_text": "Backend Engineer\n\nRequirements\n- Python  and FastAPI"}, [])
+
+    assert response.status_code == 200
+    assert embed.call_args.args[0].startswith("Backend Engineer") # The normalized job description
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("body", [{}, {"query": ""}, {"query": "python", "job_description_text": "jd"}, {"query": "python", "limit": 0}])
+async def test_search_request_validation(override_current_user, body):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.post("/resumes/search", json=body)
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_search_without_embeddings_is_unavailable(override_current_user):
+    with patch("app.api.routers.resumes.supabase_client", MagicMock()), \
+         patch("app.api.routers.resumes.get_text_embedding", AsyncMock(return_value=None)):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/resumes/search", json={"query": "python"})
+    assert response.status_code == 503
+
+@pytest.mark.asyncio
+async def test_search_with_qdrant_down_is_unavailable(override_current_user):
+    with patch("app.api.routers.resumes.supabase_client", MagicMock()), \
+         patch("app.api.routers.resumes.get_text_embedding", AsyncMock(return_value=vector(1))), \
+         patch("app.api.routers.resumes.search_resumes", AsyncMock(side_effect=Exception("connection refused"))):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/resumes/search", json={"query": "python"})
+    assert response.status_code == 503
+
+async def index_sections(resume_id, user_id, section_vectors):
+    # One embedding per chunk, picked by the section heading the chunk starts with
+    text = "\n".join(f"{heading}\n{heading} details" for heading in section_vectors)
+    async def embed(chunk_text):
+        return section_vectors[chunk_text.splitlines()[0]]
+    with patch.object(vector_service, "get_text_embedding", AsyncMock(side_effect=embed)):
+        await vector_service.upsert_resume_embedding(resume_id, user_id, text)
+
+@pytest.mark.asyncio
+async def test_search_matches_a_single_section_once_per_resume(override_current_user, qdrant):
+    specialist, generalist = uuid4(), uuid4()
+    # Only the specialist's skills section is close to the query; the rest of the resume is not
+    await index_sections(specialist, MOCK_USER_ID, {"Summary": vector(0, 1, 0), "Skills": vector(1, 0, 0), "Education": vector(0, 0, 1)})
+    await index_sections(generalist, MOCK_USER_ID, {"Summary": vector(1, 1, 0), "Skills": vector(1, 1, 1)})
+
+    response, _, _ = await search({"query": "python", "limit": 2}, [resume_row(specialist, "specialist.pdf"), resume_row(generalist, "generalist.pdf")])
+
+    results = response.json()
+    assert [result["filename"] for result in results] == ["specialist.pdf", "generalist.pdf"] # One result per resume, not per chunk
+    assert results[0]["matched_section"] == "skills"
+    assert results[0]["score"] == pytest.approx(1.0)
+    assert results[1]["matched_section"] == "summary"
+
+@pytest.mark.asyncio
+async def test_reindexing_and_deleting_remove_old_chunks(qdrant):
+    resume_id = uuid4()
+    await index_sections(resume_id, MOCK_USER_ID, {"Summary": vector(1, 0, 0), "Skills": vector(0, 1, 0), "Education": vector(0, 0, 1)})
+    assert (await qdrant.count(settings.QDRANT_RESUME_COLLECTION)).count == 3
+
+    await index_sections(resume_id, MOCK_USER_ID, {"Summary": vector(1, 0, 0)}) # A shorter new version
+    points, _ = await qdrant.scroll(settings.QDRANT_RESUME_COLLECTION, with_payload=True)
+    assert [point.payload["section"] for point in points] == ["summary"]
+
+    await vector_service.delete_resume_embedding(resume_id)
+    assert (await qdrant.count(settings.QDRANT_RESUME_COLLECTION)).count == 0
@@ -7,6 +7,8 @@ import io
 
 from app.main import app # Your FastAPI app
 from app.schemas.auth_schemas import UserResponse
+from app.services.ats_analyzer import analyze_structure
+from app.services.file_parser_service import DocumentStructure
 
 MOCK_USER_ID_STR = str(uuid4())
 MOCK_USER_EMAIL = "resumetest@example.com"
@@ -52,7 +54,8 @@ async def test_upload_resume_pdf_success(mock_supabase_client):
     mock_resume_id = uuid4()
 
     # Mock file parser service functions
-    with patch("app.api.routers.resumes.parse_pdf", return_value="Parsed PDF text") as mock_parse_pdf, \
+    ats_report = analyze_structure(DocumentStructure(kind="pdf", page_count=1, text_chars=2000))
+    with patch("app.api.routers.resumes.analyze_document", return_value=("Parsed PDF text", ats_report)) as mock_analyze_document, \
          patch("app.api.routers.resumes.calculate_sha256_hash", return_value="testhash123") as mock_hash:
 
         # Mock Supabase responses
@@ -76,7 +79,9 @@ async def test_upload_resume_pdf_success(mock_supabase_client):
         assert data["raw_text"] == "Parsed PDF text"
         assert data["content_hash"] == "testhash123"
         assert data["user_id"] == MOCK_USER_ID_STR
-        mock_parse_pdf.assert_called_once_with(mock_pdf_content)
+        mock_analyze_document.assert_called_once_with(mock_pdf_content, "application/pdf", "testhash123")
+        assert mock_supabase_client.table.return_value.insert.call_args.args[0]["ats_report"]["score"] == 100
+        assert mock_supabase_client.table.return_value.insert.call_args.args[0]["profile"]["version"] == 1
         mock_hash.assert_called_once_with(mock_pdf_content)
         mock_supabase_client.table.return_value.insert.assert_called_once()
 
@@ -86,7 +91,7 @@ async def test_upload_resume_duplicate_hash_for_user(mock_supabase_client):
     mock_pdf_content = b"duplicate content"
     existing_resume_data = sample_resume_db_dict(content_hash="duplicatehash", raw_text="Existing text")
 
-    with patch("app.api.routers.resumes.parse_pdf", return_value="Parsed text"), \
+    with patch("app.api.routers.resumes.analyze_document", return_value=("Parsed text", analyze_structure(DocumentStructure(kind="pdf")))), \
          patch("app.api.routers.resumes.calculate_sha256_hash", return_value="duplicatehash"):
 
         # Mock Supabase to return existing resume on hash check
@@ -0,0 +1,133 @@
+import pytest
+from httpx import AsyncClient
+from unittest.mock import patch, MagicMock
+from uuid import uuid4
+
+from app.main import app
+from app.api.deps import get_current_user
+from app.schemas.auth_schemas import UserResponse
+from app.services import skill_taxonomy
+from app.services.skill_taxonomy import SkillMatcher, extract_skills, summarize_skills, compare_skills, canonicalize
+from app.services.scoring_service import compute_local_score
+
+TEXT = "Ran K8S on AWS (EKS) with Terraform; GitHub Actions for CI/CD. C++, C# and Node.js; JavaScript, not Java."
+
+BACKENDS = [False] + ([True] if skill_taxonomy.ahocorasick is not None else [])
+
+@pytest.fixture
+def override_current_user():
+    app.dependency_overrides[get_current_user] = lambda: UserResponse(id=str(uuid4()), email="skills@example.com")
+    yield
+    app.dependency_overrides.pop(get_current_user, None)
+
+@pytest.mark.parametrize("native", BACKENDS)
+def test_synonyms_are_normalized_with_offsets(native):
+    matches = SkillMatcher(native=native).find(TEXT)
+    assert [match.skill for match in matches] == [
+        "Kubernetes", "AWS", "Kubernetes", "Terraform", "GitHub Actions", "CI/CD", "C++", "C#", "Node.js", "JavaScript", "Java"]
+    for match in matches:
+        assert TEXT[match.start:match.end] == match.text
+    assert matches[0].text == "K8S"
+
+@pytest.mark.parametrize("native", BACKENDS)
+def test_matches_whole_words_only(native):
+    matcher = SkillMatcher(native=native)
+    # "ts" inside "results", "java" inside "javascript", "excel" as a verb, "go" as a verb
+    assert matcher.find("Great results. I excel at javascript and go the extra mile.") == [
+        skill_taxonomy.SkillMatch("JavaScript", "language", 26, 36, "javascript")]
+
+@pytest.mark.parametrize("native", BACKENDS)
+@pytest.mark.parametrize("text", [
+    "Active TS clearance required.",
+    "TS/SCI eligible",
+    "Able to react quickly under pressure.",
+    "React quickly to production incidents.",
+    "Strong communication and leadership.",
+    "Led an epic migration across stakeholders.",
+    "Sparked interest; the oracle of the team.",
+])
+def test_ordinary_words_are_not_skills(native, text):
+    assert SkillMatcher(native=native).find(text) == []
+
+@pytest.mark.parametrize("native", BACKENDS)
+def test_ambiguous_aliases_match_as_written(native):
+    matches = SkillMatcher(native=native).find("JS/TS, React, REACT; Epic EHR; RN; written communication")
+    assert [match.skill for match in matches] == ["JavaScript", "TypeScript", "React", "React", "Electronic Health Records",
+                                                  "Electronic Health Records", "Registered Nurse", "Communication"]
+
+@pytest.mark.parametrize("native", BACKENDS)
+def test_multi_word_skills_match_across_line_breaks(native):
+    matches = SkillMatcher(native=native).find("Applied Machine\nLearning and Spring Boot")
+    assert [match.skill for match in matches] == ["Machine Learning", "Spring Boot"]
+
+def test_backends_agree_on_a_long_document():
+    if skill_taxonomy.ahocorasick is None:
+        pytest.skip("pyahocorasick not installed")
+    from benchmarks.sample_corpus import sample_corpus
+    text = "\n".join(resume + jd for _, resume, jd in sample_corpus())
+    assert SkillMatcher(native=True).find(text) == SkillMatcher(native=False).find(text)
+
+def test_summarize_and_compare():
+    summary = summarize_skills(extract_skills(TEXT))
+    kubernetes = summary[0]
+    assert (kubernetes.skill, kubernetes.count) == ("Kubernetes", 2)
+    assert kubernetes.offsets == [(4, 7), (16, 19)]
+
+    comparison = compare_skills("Python, k8s and Postgres", "We need Python, Kubernetes, PostgreSQL and Redis")
+    assert comparison.matched == ["Python", "Kubernetes", "PostgreSQL"]
+    assert comparison.missing == ["Redis"]
+
+def test_canonicalize_replaces_aliases():
+    assert canonicalize("k8s and postgres") == "Kubernetes and PostgreSQL"
+
+def test_local_score_counts_synonyms_as_matches():
+    jd = "Requirements:\n- Kubernetes\n- PostgreSQL\n- JavaScript"
+    with_aliases = compute_local_score("Skills\nk8s, Postgres, JS", jd)
+    assert with_aliases.missing_keywords == []
+    assert with_aliases.matched_keywords[:3] == ["Kubernetes", "PostgreSQL", "JavaScript"]
+    assert with_aliases.match_score > 80
+
+@pytest.mark.asyncio
+async def test_extract_endpoint_with_text(override_current_user):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.post("/skills/extract", json={"text": TEXT, "job_description_text": "Kubernetes, Redis"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["skills"][0] == {"skill": "Kubernetes", "category": "devops", "count": 2, "offsets": [[4, 7], [16, 19]]}
+    assert body["comparison"]["missing"] == ["Redis"]
+    assert body["scanned_chars"] == len(TEXT)
+
+@pytest.mark.asyncio
+async def test_extract_endpoint_with_resume_id(override_current_user):
+    supabase_mock = MagicMock()
+    supabase_mock.table.return_value.select.return_value.eq.return_value.eq.return_value.maybe_single.return_value.execute.return_value = MagicMock(data={"raw_text": "Django and React"})
+    with patch("app.api.routers.skills.supabase_client", supabase_mock):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/skills/extract", json={"resume_id": str(uuid4())})
+    assert response.status_code == 200
+    assert [skill["skill"] for skill in response.json()["skills"]] == ["Django", "React"]
+
+@pytest.mark.asyncio
+async def test_extract_endpoint_requires_one_source(override_current_user):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.post("/skills/extract", json={})
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_analysis_prompt_is_prepopulated_with_skills():
+    from app.services import llm_service, llm_backend
+    captured = {}
+
+    async def create(**kwargs):
+        captured.update(kwargs)
+        raise RuntimeError("stop here")
+
+    client = MagicMock()
+    client.chat.completions.create = create
+    with patch.object(llm_backend.OpenAIBackend, "_client", return_value=client), \
+         patch.object(llm_service.settings, "OPENAI_API_KEY", "sk-test"):
+        await llm_service._analyze_resume_with_llm("Python and k8s", "Python, Kubernetes, Redis")
+
+    prompt = captured["messages"][1]["content"]
+    assert "Skills required by the job description: Python, Kubernetes, Redis." in prompt
+    assert "Required skills not found in the resume: Redis." in prompt
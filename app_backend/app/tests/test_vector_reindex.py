@@ -0,0 +1,151 @@
+import datetime
+import pytest
+from unittest.mock import patch, MagicMock
+from uuid import UUID, uuid4
+
+from qdrant_client import AsyncQdrantClient
+
+from app.core.config import settings
+from app.services import embedding_cache, vector_reindex, vector_service
+from app.services.embedding_backend import HashingEmbeddingBackend, set_embedding_backend
+
+ALIAS = "reindex_resumes"
+USER_ID = str(uuid4())
+
+def resume_row(text, created_at="2026-01-01T00:00:00+00:00"):
+    return {"id": str(uuid4()), "user_id": USER_ID, "raw_text": text, "created_at": created_at}
+
+class FakeResumes:
+    """The resumes table as the keyset queries see it: ordered by id, filtered by id and created_at."""
+    def __init__(self, rows):
+        self.rows = rows
+        self.pages = [] # after_id of every page fetched
+
+    def _matching(self, after_id, created_since):
+        return sorted((row for row in self.rows if (after_id is None or row["id"] > after_id)
+                       and (created_since is None or row["created_at"] >= created_since)), key=lambda row: row["id"])
+
+    def fetch(self, after_id, page_size, created_since=None):
+        self.pages.append(after_id)
+        return self._matching(after_id, created_since)[:page_size]
+
+    def count(self, after_id, created_since=None):
+        return len(self._matching(after_id, created_since))
+
+@pytest.fixture
+async def qdrant():
+    set_embedding_backend(HashingEmbeddingBackend(32))
+    vector_service.qdrant_client_instance = AsyncQdrantClient(location=":memory:")
+    vector_service.mark_collection_unready()
+    with patch.object(settings, "QDRANT_RESUME_COLLECTION", ALIAS), patch.object(settings, "EMBEDDING_CACHE_PATH", ""), \
+         patch.object(vector_reindex, "supabase_client", MagicMock()):
+        embedding_cache.close()
+        yield vector_service.qdrant_client_instance
+    set_embedding_backend(None)
+    await vector_service.close_qdrant_client()
+    embedding_cache.close()
+
+def fake_table(rows):
+    table = FakeResumes(rows)
+    return table, patch.multiple(vector_reindex, fetch_resume_page=table.fetch, count_resumes_after=table.count)
+
+async def resume_ids_in(client, collection_name):
+    points, _ = await client.scroll(collection_name, limit=1000, with_payload=True)
+    return {point.payload["resume_id"] for point in points}
+
+def test_pages_are_keyset_queries():
+    db = MagicMock()
+    query = db.table.return_value.select.return_value
+    query.gt.return_value.order.return_value.limit.return_value.execute.return_value = MagicMock(data=[{"id": "b"}])
+    with patch.object(vector_reindex, "supabase_client", db):
+        assert vector_reindex.fetch_resume_page("a", 100) == [{"id": "b"}]
+    query.gt.assert_called_once_with("id", "a")
+    query.gt.return_value.order.assert_called_once_with("id")
+    query.gt.return_value.order.return_value.limit.assert_called_once_with(100)
+
+@pytest.mark.asyncio
+async def test_reindex_builds_a_new_collection_and_switches_the_alias(qdrant, tmp_path):
+    rows = [resume_row(f"Skills\nPython, FastAPI, skill{i}") for i in range(7)] + [resume_row("")]
+    table, fake = fake_table(rows)
+    checkpoint_path = str(tmp_path / "reindex.json")
+    with fake:
+        first = await vector_reindex.reindex(checkpoint_path, page_size=3, target=f"{ALIAS}_1")
+        assert await vector_reindex.current_alias_target(qdrant, ALIAS) == f"{ALIAS}_1"
+        assert await resume_ids_in(qdrant, ALIAS) == {row["id"] for row in rows[:7]}
+        assert (first["resumes"], first["skipped"], first["phase"]) == (8, 1, "done")
+
+        # The app searches through the alias
+        hits = await vector_service.search_resumes(UUID(USER_ID), await vector_service.get_text_embedding("Python skill3"), limit=1)
+        assert hits[0].resume_id == rows[3]["id"]
+
+        # A second reindex moves the alias and keeps the old collection for rollback
+        await vector_reindex.reindex(checkpoint_path, page_size=3, target=f"{ALIAS}_2")
+    assert await vector_reindex.current_alias_target(qdrant, ALIAS) == f"{ALIAS}_2"
+    assert await qdrant.collection_exists(f"{ALIAS}_1")
+    assert not (tmp_path / "reindex.json").exists()
+
+@pytest.mark.asyncio
+async def test_rerun_continues_from_the_checkpoint(qdrant, tmp_path):
+    rows = [resume_row(f"Summary\nEngineer number {i}") for i in range(10)]
+    table, fake = fake_table(rows)
+    checkpoint_path = str(tmp_path / "reindex.json")
+    embed_texts = vector_service.embed_texts
+    calls = 0
+
+    async def fail_on_third_page(texts, backend=None):
+        nonlocal calls
+        calls += 1
+        return [None] * len(texts) if calls == 3 else await embed_texts(texts, backend)
+
+    with fake, patch.object(vector_service, "embed_texts", fail_on_third_page), pytest.raises(RuntimeError, match="Embedding failed"):
+        await vector_reindex.reindex(checkpoint_path, page_size=3, embed_batch_size=3, concurrency=1, target=f"{ALIAS}_1")
+    checkpoint = vector_reindex.load_checkpoint(checkpoint_path)
+    ordered = sorted(row["id"] for row in rows)
+    assert (checkpoint["phase"], checkpoint["resumes"], checkpoint["last_id"]) == ("backfill", 6, ordered[5])
+    assert await vector_reindex.current_alias_target(qdrant, ALIAS) is None # Not switched
+
+    table.pages.clear()
+    with fake:
+        done = await vector_reindex.reindex(checkpoint_path, page_size=3, target=f"{ALIAS}_ignored")
+    assert table.pages[0] == ordered[5] # Picked up after the last page written
+    assert done["resumes"] == 10
+    assert await vector_reindex.current_alias_target(qdrant, ALIAS) == f"{ALIAS}_1"
+    assert await resume_ids_in(qdrant, ALIAS) == set(ordered)
+
+@pytest.mark.asyncio
+async def test_resumes_created_during_the_run_are_caught_up(qdrant, tmp_path):
+    rows = [resume_row("Skills\nGo, Rust")]
+    table, fake = fake_table(rows)
+    checkpoint_path = str(tmp_path / "reindex.json")
+    with fake:
+        await vector_reindex.reindex(checkpoint_path, target=f"{ALIAS}_1", switch=False)
+        # Uploaded after the backfill, so only the catch-up pass sees it
+        late = resume_row("Skills\nElixir", created_at=(datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=1)).isoformat())
+        rows.append(late)
+        await vector_reindex.reindex(checkpoint_path)
+    assert await resume_ids_in(qdrant, ALIAS) == {rows[0]["id"], late["id"]}
+
+@pytest.mark.asyncio
+async def test_plain_collection_is_only_replaced_when_asked(qdrant, tmp_path):
+    await vector_service.ensure_resume_collection() # The app's own collection, under the alias name
+    table, fake = fake_table([resume_row("Skills\nPython")])
+    with fake:
+        with pytest.raises(RuntimeError, match="--replace-collection"):
+            await vector_reindex.reindex(str(tmp_path / "reindex.json"), target=f"{ALIAS}_1")
+        await vector_reindex.reindex(str(tmp_path / "reindex.json"), target=f"{ALIAS}_1", replace_collection=True)
+    assert await vector_reindex.current_alias_target(qdrant, ALIAS) == f"{ALIAS}_1"
+    assert [collection.name for collection in (await qdrant.get_collections()).collections] == [f"{ALIAS}_1"]
+
+@pytest.mark.asyncio
+async def test_checkpoint_for_another_model_is_refused(qdrant, tmp_path):
+    checkpoint_path = str(tmp_path / "reindex.json")
+    table, fake = fake_table([resume_row("Skills\nPython")])
+    with fake:
+        await vector_reindex.reindex(checkpoint_path, target=f"{ALIAS}_1", switch=False)
+        set_embedding_backend(HashingEmbeddingBackend(64))
+        with pytest.raises(RuntimeError, match="--restart"):
+            await vector_reindex.reindex(checkpoint_path)
+        done = await vector_reindex.reindex(checkpoint_path, target=f"{ALIAS}_2", restart=True)
+    assert done["dimension"] == 64
+    info = await qdrant.get_collection(ALIAS)
+    assert info.config.params.vectors.size == 64
@@ -0,0 +1,178 @@
+import datetime
+import os
+import pytest
+from unittest.mock import patch, AsyncMock
+from uuid import uuid4
+
+import numpy as np
+from qdrant_client import AsyncQdrantClient
+
+from app.core.config import settings
+from app.services import vector_service
+from app.services.embedding_backend import HashingEmbeddingBackend, set_embedding_backend
+from app.services.vector_store import CollectionSchemaError, NumpyVectorStore, VectorPoint
+
+DIMENSION = 16
+BASE_TIME = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+
+@pytest.fixture(autouse=True)
+def small_embeddings():
+    set_embedding_backend(HashingEmbeddingBackend(DIMENSION))
+    yield
+    set_embedding_backend(None)
+
+@pytest.fixture
+async def qdrant_store():
+    vector_service.qdrant_client_instance = AsyncQdrantClient(location=":memory:")
+    vector_service.mark_collection_unready()
+    vector_service.reset_batchers()
+    yield vector_service.QdrantVectorStore()
+    await vector_service.close_qdrant_client()
+    vector_service.reset_batchers()
+
+def make_points(rng, users, resumes_per_user=6):
+    """Resumes of 1-4 chunks each, created over ten days, vectors at random (so no two scores tie)."""
+    points = []
+    for user_id in users:
+        for _ in range(resumes_per_user):
+            resume_id = uuid4()
+            created_at = (BASE_TIME + datetime.timedelta(days=int(rng.integers(10)))).isoformat()
+            for chunk_index in range(int(rng.integers(1, 5))):
+                points.append(VectorPoint(
+                    id=vector_service.chunk_point_id(resume_id, chunk_index),
+                    vector=rng.standard_normal(DIMENSION).tolist(),
+                    payload={"user_id": user_id, "resume_id": str(resume_id), "created_at": created_at,
+                             "section": f"section-{chunk_index}", "chunk_index": chunk_index},
+                ))
+    return points
+
+SEARCHES = [
+    {"limit": 10},
+    {"limit": 3},
+    {"limit": 10, "score_threshold": 0.2},
+    {"limit": 10, "created_after": BASE_TIME + datetime.timedelta(days=5)},
+    {"limit": 2, "score_threshold": 0.0, "created_after": BASE_TIME + datetime.timedelta(days=3)},
+]
+
+async def assert_same_results(expected_store, actual_store, users, queries):
+    for user_id in users:
+        for query in queries:
+            for options in SEARCHES:
+                expected = await expected_store.search(user_id, query, **options)
+                actual = await actual_store.search(user_id, query, **options)
+                assert [(hit.resume_id, hit.section) for hit in actual] == [(hit.resume_id, hit.section) for hit in expected]
+                assert [hit.score for hit in actual] == pytest.approx([hit.score for hit in expected], abs=1e-5)
+
+@pytest.mark.asyncio
+async def test_numpy_store_matches_qdrant(qdrant_store, tmp_path):
+    rng = np.random.default_rng(7)
+    users = [str(uuid4()) for _ in range(3)]
+    points = make_points(rng, users)
+    queries = rng.standard_normal((4, DIMENSION)).tolist()
+    numpy_store = NumpyVectorStore(str(tmp_path), snapshot_every=0)
+    for store in (qdrant_store, numpy_store):
+        await store.ensure()
+        await store.upsert(points)
+    await assert_same_results(qdrant_store, numpy_store, users, queries)
+
+    # A deleted resume, and one reindexed with fewer chunks
+    deleted, shortened = points[0].payload["resume_id"], points[-1].payload["resume_id"]
+    kept = [point for point in points if point.payload["resume_id"] == shortened][:1]
+    for store in (qdrant_store, numpy_store):
+        await store.delete_resume(deleted)
+        await store.upsert(kept)
+        await store.delete_resume(shortened, keep_ids=[point.id for point in kept])
+    await assert_same_results(qdrant_store, numpy_store, users, queries)
+    assert deleted not in {hit.resume_id for hit in await numpy_store.search(points[0].payload["user_id"], queries[0], limit=100)}
+
+    # Reloaded from its snapshot, memory-mapped
+    await numpy_store.close()
+    reloaded = NumpyVectorStore(str(tmp_path))
+    await reloaded.open()
+    await assert_same_results(qdrant_store, reloaded, users, queries)
+    assert isinstance(reloaded._vectors, np.memmap)
+
+@pytest.mark.asyncio
+async def test_deleted_rows_are_compacted():
+    store = NumpyVectorStore()
+    points = make_points(np.random.default_rng(1), [str(uuid4())], resumes_per_user=8)
+    await store.upsert(points)
+    resumes = list(dict.fromkeys(point.payload["resume_id"] for point in points))
+
+    for resume_id in resumes[:5]:
+        await store.delete_resume(resume_id)
+
+    remaining = [point for point in points if point.payload["resume_id"] in resumes[5:]]
+    assert store._dead * 4 <= store._count # Compacted once a quarter of the rows were dead
+    assert sorted(store._rows) == sorted(point.id for point in remaining)
+    assert {hit.resume_id for hit in await store.search(points[0].payload["user_id"], points[0].vector, limit=10)} == set(resumes[5:])
+
+@pytest.mark.asyncio
+async def test_snapshots_are_written_in_the_background(tmp_path):
+    store = NumpyVectorStore(str(tmp_path), snapshot_every=5)
+    await store.upsert(make_points(np.random.default_rng(2), [str(uuid4())], resumes_per_user=4)[:5])
+    await store._snapshot_task
+
+    assert sorted(os.listdir(tmp_path)) == ["snapshot-00000001.json", "snapshot-00000001.npy"]
+    await store.upsert(make_points(np.random.default_rng(3), [str(uuid4())], resumes_per_user=1)[:1])
+    await store.close() # The change since is written too, and the older generation removed
+    assert sorted(os.listdir(tmp_path)) == ["snapshot-00000002.json", "snapshot-00000002.npy"]
+
+@pytest.mark.asyncio
+async def test_index_of_another_size_is_rejected(tmp_path):
+    store = NumpyVectorStore(str(tmp_path))
+    await store.upsert(make_points(np.random.default_rng(4), [str(uuid4())], resumes_per_user=1))
+    await store.close()
+
+    set_embedding_backend(HashingEmbeddingBackend(DIMENSION * 2))
+    with pytest.raises(CollectionSchemaError, match="hashing-32"):
+        await NumpyVectorStore(str(tmp_path)).ensure()
+
+@pytest.mark.asyncio
+async def test_service_indexes_into_the_numpy_store():
+    store = NumpyVectorStore()
+    vector_service.set_vector_store(store)
+    vector_service.reset_batchers()
+    try:
+        with patch.object(settings, "EMBEDDING_CACHE_PATH", ""):
+            user_id, python_resume, chef_resume = uuid4(), uuid4(), uuid4()
+            await vector_service.upsert_resume_embedding(python_resume, user_id, "Skills\nPython, FastAPI, PostgreSQL")
+            await vector_service.upsert_resume_embedding(chef_resume, user_id, "Skills\nPastry, baking, menu planning")
+            query = await vector_service.get_text_embedding("Python developer")
+            hits = await vector_service.search_resumes(user_id, query, limit=2)
+            assert hits[0].resume_id == str(python_resume)
+            assert vector_service.collection_ready()
+
+            await vector_service.delete_resume_embedding(python_resume)
+            assert [hit.resume_id for hit in await vector_service.search_resumes(user_id, query, limit=2)] == [str(chef_resume)]
+    finally:
+        vector_service.set_vector_store(None)
+        vector_service.reset_batchers()
+
+@pytest.mark.parametrize("name, expected_type", [("qdrant", vector_service.QdrantVectorStore), ("auto", vector_service.QdrantVectorStore), ("numpy", NumpyVectorStore)])
+def test_store_follows_settings(name, expected_type):
+    with patch.object(settings, "VECTOR_STORE", name):
+        vector_service.set_vector_store(None)
+        try:
+            assert isinstance(vector_service.get_vector_store(), expected_type)
+        finally:
+            vector_service.set_vector_store(None)
+
+def test_unknown_store():
+    with patch.object(settings, "VECTOR_STORE", "faiss"), pytest.raises(ValueError):
+        vector_service.set_vector_store(None)
+        vector_service.get_vector_store()
+
+@pytest.mark.asyncio
+async def test_auto_falls_back_to_numpy_without_qdrant():
+    client = AsyncMock()
+    client.get_collections.side_effect = ConnectionError("refused")
+    with patch.multiple(settings, VECTOR_STORE="auto", VECTOR_STORE_PATH=""), \
+         patch.object(vector_service, "create_qdrant_client", return_value=client):
+        try:
+            store = await vector_service.init_vector_store()
+            assert isinstance(store, NumpyVectorStore)
+            assert vector_service.get_vector_store() is store
+            client.close.assert_awaited_once()
+        finally:
+            await vector_service.close_vector_store()
@@ -0,0 +1,61 @@
+# Cost of the structural ATS check at upload: plain text extraction (what upload used to do) versus
+# parse_document + analyze_structure, per document, for typical PDF and DOCX resumes.
+#
+#   python -m benchmarks.bench_ats_analyzer
+#   python -m benchmarks.bench_ats_analyzer --repeat 50
+import argparse
+import io
+import statistics
+import time
+
+import docx
+import PyPDF2
+
+from app.services.ats_analyzer import analyze_document
+from app.tests.document_fixtures import make_docx, make_pdf, single_column_runs, two_column_runs
+from benchmarks.sample_corpus import sample_corpus
+
+PDF = "application/pdf"
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+def _plain_pdf(content: bytes) -> str:
+    return "".join(page.extract_text() or "" for page in PyPDF2.PdfReader(io.BytesIO(content)).pages)
+
+def _plain_docx(content: bytes) -> str:
+    return "\n".join(para.text for para in docx.Document(io.BytesIO(content)).paragraphs)
+
+def _documents():
+    lines = [line for _, resume, _ in sample_corpus()[:3] for line in resume.splitlines() if line.strip()]
+    lines = [line[:90] for line in lines]
+    one_column = [single_column_runs(lines[start:start + 48]) for start in range(0, 96, 48)]
+    two_columns = [two_column_runs([line[:40] for line in lines[start:start + 48]], [line[:40] for line in lines[start + 48:start + 96]])
+                   for start in (0, 96)]
+    return [
+        ("pdf, 2 pages", PDF, make_pdf(one_column), _plain_pdf),
+        ("pdf, 2 pages, 2 columns", PDF, make_pdf(two_columns), _plain_pdf),
+        ("docx", DOCX, make_docx(lines[:96]), _plain_docx),
+        ("docx, table + text box", DOCX, make_docx(lines[:96], table_rows=[["Python", "5 years"]] * 10, header_text="jane@example.com", text_box="Skills"), _plain_docx),
+    ]
+
+def _median_ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="ATS analyzer cost per document")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'document':<26} {'KB':>5} {'text ms':>8} {'text+ATS ms':>12} {'score':>6}")
+    for name, mime_type, content, plain in _documents():
+        text_ms = _median_ms(lambda: plain(content), args.repeat)
+        ats_ms = _median_ms(lambda: analyze_document(content, mime_type), args.repeat) # No content hash: never cached
+        _, report = analyze_document(content, mime_type)
+        print(f"{name:<26} {len(content) / 1024:>5.1f} {text_ms:>8.2f} {ats_ms:>12.2f} {report.score:>6}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# Recall, memory and latency of the resume collection profiles (QDRANT_COLLECTION_PROFILE), HNSW settings and
+# shortened embeddings. Loads the same vectors into one collection per configuration, each created by the app's
+# own bootstrap, and runs the same queries through vector_service.search_resumes. Recall@k is against exact
+# float32 neighbours at full dimension, computed with NumPy. RAM is estimated from the profile (see estimate_memory).
+#
+# Needs a running Qdrant; the in-process one searches exactly and ignores HNSW and quantization settings:
+#   docker run -p 6333:6333 -p 6334:6334 qdrant/qdrant
+#   python -m benchmarks.bench_collection_profiles --points 200000
+#   python -m benchmarks.bench_collection_profiles --profiles default,int8,binary --hnsw-m 16,32 --search-ef 64,128,256
+#   python -m benchmarks.bench_collection_profiles --vectors embeddings.npy --dimensions 1536,512,256   # real embeddings
+#   python -m benchmarks.bench_collection_profiles --url :memory: --points 2000 --dimensions 64   # smoke test, no server
+import argparse
+import asyncio
+import contextlib
+import io
+import math
+import time
+import uuid
+from unittest.mock import patch
+
+import numpy as np
+from qdrant_client import AsyncQdrantClient, models
+
+from app.core.config import settings
+from app.services import vector_service
+from app.services.embedding_backend import HashingEmbeddingBackend, set_embedding_backend
+from benchmarks.bench_llm_endpoints import percentile
+
+BENCH_USER = uuid.UUID(int=1) # Every point belongs to one user, so the search covers the whole collection
+
+def point_id(index: int) -> str:
+    return str(uuid.UUID(int=(1 << 64) + int(index)))
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+def make_data(args):
+    """(points, queries), unit float32 rows. Synthetic data is clustered: uniformly random high-dimensional
+    vectors are all about equally far apart, which makes every index look worse than on real embeddings."""
+    if args.vectors:
+        vectors = normalize(np.load(args.vectors, mmap_mode="r")[:args.points + args.queries].astype(np.float32))
+        return vectors[args.queries:], vectors[:args.queries] # Queries are held out of the index
+    rng = np.random.default_rng(args.seed)
+    dimension = max(args.dimensions)
+    centers = rng.standard_normal((args.clusters, dimension), dtype=np.float32)
+    def sample(count):
+        return normalize(centers[rng.integers(args.clusters, size=count)] + args.noise * rng.standard_normal((count, dimension), dtype=np.float32))
+    return sample(args.points), sample(args.queries)
+
+def exact_neighbours(points: np.ndarray, queries: np.ndarray, k: int) -> list:
+    scores = np.concatenate([queries @ points[start:start + 100_000].T for start in range(0, len(points), 100_000)], axis=1)
+    top = np.argpartition(-scores, k, axis=1)[:, :k]
+    return [{point_id(index) for index in row} for row in top]
+
+def estimate_memory(profile: str, points: int, dimension: int, m: int) -> tuple:
+    """(RAM, disk) bytes for the vectors and the HNSW graph; payload and its indexes are the same for every profile.
+    Level 0 of the graph holds up to 2*m links of 4 bytes per point; the upper levels add little."""
+    config = vector_service.COLLECTION_PROFILES[profile]
+    original = 4 * dimension
+    quantized = {"scalar": dimension, "binary": math.ceil(dimension / 8)}
+    in_ram = quantized["scalar" if isinstance(config.quantization, models.ScalarQuantization) else "binary"] \
+        if config.quantization is not None else (0 if config.on_disk else original)
+    graph = 2 * m * 4
+    return points * (in_ram + graph), points * original if config.on_disk else 0
+
+async def load(client: AsyncQdrantClient, collection_name: str, vectors: np.ndarray, args) -> None:
+    next_batch = iter(range(0, len(vectors), args.batch_size))
+
+    async def worker():
+        for start in next_batch:
+            batch = vectors[start:start + args.batch_size]
+            ids = [point_id(start + offset) for offset in range(len(batch))]
+            payloads = [{"user_id": str(BENCH_USER), "resume_id": id_, "section": "summary"} for id_ in ids]
+            await client.upsert(collection_name=collection_name, points=models.Batch(ids=ids, vectors=batch.tolist(), payloads=payloads), wait=False)
+
+    await asyncio.gather(*(worker() for _ in range(args.load_concurrency)))
+    while (await client.get_collection(collection_name)).status != models.CollectionStatus.GREEN: # Indexing done
+        await asyncio.sleep(1)
+
+async def measure(queries: np.ndarray, truth: list, args) -> tuple:
+    latencies, recalls = [], []
+    next_query = iter(range(len(queries)))
+
+    async def worker():
+        for index in next_query:
+            started = time.perf_counter()
+            hits = await vector_service.search_resumes(BENCH_USER, queries[index].tolist(), limit=args.k)
+            latencies.append((time.perf_counter() - started) * 1000)
+            recalls.append(len({hit.resume_id for hit in hits} & truth[index]) / args.k)
+
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return float(np.mean(recalls)), percentile(latencies, 50), percentile(latencies, 95)
+
+async def bench(args) -> None:
+    client = AsyncQdrantClient(location=":memory:") if args.url == ":memory:" else \
+        AsyncQdrantClient(url=args.url, prefer_grpc=args.prefer_grpc, timeout=300)
+    vector_service.qdrant_client_instance = client
+    points, queries = make_data(args)
+    truth = exact_neighbours(points, queries, args.k)
+    print(f"points={len(points)} queries={len(queries)} k={args.k} source={args.vectors or f'{args.clusters} synthetic clusters'}")
+    print(f"{'profile':<8} {'dim':>5} {'m':>3} {'ef':>5} {f'recall@{args.k}':>10} {'p50 ms':>8} {'p95 ms':>8} {'RAM MB':>8} {'disk MB':>8} {'load s':>7}")
+    try:
+        for dimension in args.dimensions:
+            # Shortened the way the embeddings API shortens text-embedding-3 vectors: leading dimensions, renormalized
+            vectors, query_vectors = normalize(points[:, :dimension]), normalize(queries[:, :dimension])
+            for profile in args.profiles:
+                for m in args.hnsw_m:
+                    collection_name = f"bench_profile_{profile}_{dimension}d_m{m}"
+                    with patch.multiple(settings, QDRANT_RESUME_COLLECTION=collection_name, QDRANT_COLLECTION_PROFILE=profile,
+                                        QDRANT_HNSW_M=m, QDRANT_HNSW_EF_CONSTRUCT=args.ef_construct):
+                        set_embedding_backend(HashingEmbeddingBackend(dimension)) # Sizes the collection; the vectors are ours
+                        if await client.collection_exists(collection_name):
+                            await client.delete_collection(collection_name) # Only ever the benchmark's own collections
+                        vector_service.mark_collection_unready()
+                        started = time.perf_counter()
+                        with contextlib.redirect_stdout(io.StringIO()):
+                            await vector_service.ensure_resume_collection() # The app's bootstrap applies the profile
+                        await load(client, collection_name, vectors, args)
+                        load_seconds = time.perf_counter() - started
+                        ram, disk = estimate_memory(profile, len(vectors), dimension, m)
+                        for ef in args.search_ef:
+                            with patch.object(settings, "QDRANT_SEARCH_HNSW_EF", ef):
+                                recall, p50, p95 = await measure(query_vectors, truth, args)
+                            print(f"{profile:<8} {dimension:>5} {m:>3} {ef:>5} {recall:>10.3f} {p50:>8.1f} {p95:>8.1f} "
+                                  f"{ram / 2**20:>8.0f} {disk / 2**20:>8.0f} {load_seconds:>7.0f}")
+                        if not args.keep:
+                            await client.delete_collection(collection_name)
+    finally:
+        vector_service.mark_collection_unready()
+        set_embedding_backend(None)
+        await vector_service.close_qdrant_client()
+
+def int_list(value: str) -> list:
+    return [int(item) for item in value.split(",")]
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall / memory / latency of Qdrant collection profiles")
+    parser.add_argument("--url", default=f"http://{settings.QDRANT_HOST}:{settings.QDRANT_PORT}", help='Qdrant URL, or ":memory:".')
+    parser.add_argument("--prefer-grpc", action="store_true")
+    parser.add_argument("--profiles", default=",".join(vector_service.COLLECTION_PROFILES))
+    parser.add_argument("--dimensions", type=int_list, default=[vector_service.embedding_dimension()],
+                        help="Comma-separated; smaller values keep the leading dimensions of each vector.")
+    parser.add_argument("--hnsw-m", type=int_list, default=[16])
+    parser.add_argument("--ef-construct", type=int, default=100)
+    parser.add_argument("--search-ef", type=int_list, default=[64, 128, 256])
+    parser.add_argument("--points", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--vectors", help="A .npy file of real embeddings (rows); the first --queries rows are the queries.")
+    parser.add_argument("--clusters", type=int, default=2000)
+    parser.add_argument("--noise", type=float, default=0.6, help="Spread of synthetic points around their cluster centre.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--load-concurrency", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--keep", action="store_true", help="Keep the collections (e.g. to inspect memory in the Qdrant dashboard).")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    args.profiles = args.profiles.split(",")
+    asyncio.run(bench(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# Concurrent resume uploads with embedding and Qdrant-write micro-batching at several window sizes.
+# The embeddings API is faked: each call waits for one of OPENAI_MAX_CONCURRENCY slots, then takes
+# --call-ms plus --per-item-ms per input, so batching pays off the way it does against OpenAI, where
+# concurrency and RPM, not input count, are the limit. Qdrant runs in memory behind a simulated
+# --rtt-ms round trip (see bench_vector_upsert.py).
+#
+#   python -m benchmarks.bench_embedding_batcher
+#   python -m benchmarks.bench_embedding_batcher --windows 0,5,20 --uploads 2000 --concurrency 128
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+from typing import List
+from unittest.mock import patch
+from uuid import uuid4
+
+import numpy as np
+
+from app.core.config import settings
+from app.services import metrics, vector_service
+from benchmarks.bench_llm_endpoints import percentile
+from benchmarks.bench_vector_upsert import BENCH_COLLECTION, make_client
+from benchmarks.sample_corpus import sample_corpus
+
+def fake_embed_texts_factory(call_ms: float, per_item_ms: float, slots: int):
+    semaphore = asyncio.Semaphore(slots)
+
+    async def fake_embed_texts(texts: List[str], backend=None):
+        async with semaphore:
+            metrics.increment("bench.embedding_calls")
+            await asyncio.sleep((call_ms + per_item_ms * len(texts)) / 1000)
+        return [np.random.default_rng(abs(hash(text))).uniform(-1, 1, vector_service.embedding_dimension()).tolist() for text in texts]
+    return fake_embed_texts
+
+async def run(window_ms: float, args) -> dict:
+    metrics.reset()
+    vector_service.reset_batchers()
+    vector_service.qdrant_client_instance = make_client("async", None, False, args.rtt_ms)
+    texts = [resume for _, resume, _ in sample_corpus()]
+    latencies = []
+    counter = iter(range(args.uploads))
+
+    async def worker():
+        for index in counter:
+            started = time.perf_counter()
+            await vector_service.upsert_resume_embedding(uuid4(), uuid4(), f"{texts[index % len(texts)]}\nUpload {index}")
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    with patch.object(settings, "EMBEDDING_BATCH_WINDOW_MS", window_ms), \
+            patch.object(settings, "QDRANT_UPSERT_BATCH_WINDOW_MS", window_ms), \
+            patch.object(vector_service, "embed_texts", fake_embed_texts_factory(args.call_ms, args.per_item_ms, settings.OPENAI_MAX_CONCURRENCY)):
+        try:
+            with contextlib.redirect_stdout(io.StringIO()): # vector_service logs every upsert
+                await vector_service.ensure_resume_collection()
+                started = time.perf_counter()
+                await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+                elapsed = time.perf_counter() - started
+        finally:
+            await vector_service.close_qdrant_client()
+            vector_service.reset_batchers()
+    waits = metrics.snapshot()["latencies_ms"].get("embedding_batch.wait_ms", {})
+    return {"uploads_per_s": len(latencies) / elapsed, "p50": percentile(latencies, 50), "p95": percentile(latencies, 95),
+            "added_p95": waits.get("p95", 0.0), "embedding_calls": metrics.get_counter("bench.embedding_calls"),
+            "qdrant_writes": metrics.get_counter("qdrant_upsert_batch.batches") or len(latencies)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding / upsert micro-batching benchmark")
+    parser.add_argument("--windows", default="0,2,5,10,25,50", help="Batch windows in ms; 0 disables batching.")
+    parser.add_argument("--uploads", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--call-ms", type=float, default=150, help="Fixed latency of one embeddings API call.")
+    parser.add_argument("--per-item-ms", type=float, default=1, help="Extra latency per input in a call.")
+    parser.add_argument("--rtt-ms", type=float, default=2)
+    args = parser.parse_args()
+
+    print(f"uploads={args.uploads} concurrency={args.concurrency} embedding call={args.call_ms:g} ms + {args.per_item_ms:g} ms/item "
+          f"slots={settings.OPENAI_MAX_CONCURRENCY} qdrant rtt={args.rtt_ms:g} ms")
+    print(f"{'window ms':>9} {'uploads/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'added p95 ms':>13} {'embed calls':>12} {'qdrant writes':>14}")
+    # No embedding cache: every run embeds the same texts
+    with patch.multiple(settings, QDRANT_RESUME_COLLECTION=BENCH_COLLECTION, EMBEDDING_CACHE_SIZE=0, EMBEDDING_CACHE_PATH=""):
+        for window in args.windows.split(","):
+            stats = asyncio.run(run(float(window), args))
+            print(f"{float(window):>9g} {stats['uploads_per_s']:>10.1f} {stats['p50']:>8.0f} {stats['p95']:>8.0f} {stats['added_p95']:>13.1f} "
+                  f"{stats['embedding_calls']:>12.0f} {stats['qdrant_writes']:>14.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# Latency and throughput of the LLM-backed endpoints at a fixed concurrency, against the fake LLM backend,
+# so load tests cost nothing and don't touch the network. Requests go through the whole app in-process
+# (routing, validation, prompt building, single-flight, parsing); the database is stubbed out.
+#
+#   python -m benchmarks.bench_llm_endpoints
+#   python -m benchmarks.bench_llm_endpoints --concurrency 64 --requests 1000 --latency-ms 800 --jitter lognormal --jitter-ms 250
+#   python -m benchmarks.bench_llm_endpoints --transport http   # fake served over HTTP: adds the OpenAI SDK and the governor
+#
+# Every request uses a distinct job description so single-flight never merges them.
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+from typing import Callable, Dict, List, Tuple
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+import httpx
+
+from app.main import app
+from app.api.deps import get_current_user
+from app.core.config import settings
+from app.schemas.auth_schemas import UserResponse
+from app.services import analysis_history_service, llm_governor
+from app.services.llm_backend import FakeLLMBackend, JITTER_DISTRIBUTIONS, OpenAIBackend, set_llm_backend
+from benchmarks.fake_llm_server import FakeLLMServer
+from benchmarks.sample_corpus import sample_corpus
+
+ENDPOINTS: Dict[str, Tuple[str, Callable[[str, str], dict]]] = {
+    "analyze-full": ("/resumes/analyze", lambda resume, jd: {"resume_text": resume, "job_description_text": jd, "mode": "full", "refresh": True}),
+    "analyze-hybrid": ("/resumes/analyze", lambda resume, jd: {"resume_text": resume, "job_description_text": jd, "mode": "hybrid", "refresh": True}),
+    "interview": ("/interview/generate-questions", lambda resume, jd: {"resume_text": resume, "job_description_text": jd, "refresh": True}),
+    "interview-stream": ("/interview/generate-questions/stream", lambda resume, jd: {"resume_text": resume, "job_description_text": jd, "refresh": True}),
+}
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def run_load(client: httpx.AsyncClient, path: str, make_body, pairs, requests: int, concurrency: int):
+    latencies, errors = [], 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for index in counter:
+            _, resume, jd = pairs[index % len(pairs)]
+            body = make_body(resume, f"{jd}\nReference {index}")
+            started = time.perf_counter()
+            response = await client.post(path, json=body)
+            if response.status_code != 200 or "event: error" in response.text:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+async def bench(args):
+    pairs = sample_corpus()
+    print(f"transport={args.transport} concurrency={args.concurrency} requests={args.requests} "
+          f"llm latency={args.latency_ms} ms jitter={args.jitter} ±{args.jitter_ms} ms")
+    reference = FakeLLMBackend(args.latency_ms, args.jitter, args.jitter_ms, seed=args.seed + 1)
+    samples = [reference.sample_latency_ms() for _ in range(10000)]
+    print(f"fake LLM alone: p50={percentile(samples, 50):.0f} p95={percentile(samples, 95):.0f} p99={percentile(samples, 99):.0f} ms")
+    print(f"{'endpoint':<18} {'ok':>6} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        for name in args.endpoints.split(","):
+            path, make_body = ENDPOINTS[name]
+            with contextlib.redirect_stdout(io.StringIO()): # The app's own request logging
+                latencies, errors, elapsed = await run_load(client, path, make_body, pairs, args.requests, args.concurrency)
+            print(f"{name:<18} {len(latencies) - errors:>6} {errors:>6} {percentile(latencies, 50):>8.0f} {percentile(latencies, 95):>8.0f} "
+                  f"{percentile(latencies, 99):>8.0f} {len(latencies) / elapsed:>8.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM endpoint load benchmark against the fake backend")
+    parser.add_argument("--transport", choices=["inprocess", "http"], default="inprocess")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=400, help="Requests per endpoint.")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--jitter", choices=JITTER_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--jitter-ms", type=float, default=250)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    backend = FakeLLMBackend(args.latency_ms, args.jitter, args.jitter_ms, seed=args.seed)
+    app.dependency_overrides[get_current_user] = lambda: UserResponse(id=str(uuid4()), email="bench@example.com")
+    with contextlib.ExitStack() as stack:
+        # No database: routers only check that a client exists, and history lookups/writes become no-ops
+        stack.enter_context(patch("app.api.routers.resumes.supabase_client", MagicMock()))
+        stack.enter_context(patch("app.api.routers.interview_prep.supabase_client", MagicMock()))
+        stack.enter_context(patch.object(analysis_history_service, "supabase_client", None))
+        stack.enter_context(patch.object(settings, "LOCAL_SCORING_USE_EMBEDDINGS", False))
+        if args.transport == "http":
+            server = stack.enter_context(FakeLLMServer(backend))
+            stack.enter_context(patch.object(settings, "OPENAI_BASE_URL", server.base_url))
+            # Measure the app, not our own client-side rate limits
+            stack.enter_context(patch.object(settings, "OPENAI_CHAT_RPM", 0))
+            stack.enter_context(patch.object(settings, "OPENAI_CHAT_TPM", 0))
+            stack.enter_context(patch.object(settings, "OPENAI_MAX_CONCURRENCY", max(args.concurrency, settings.OPENAI_MAX_CONCURRENCY)))
+            llm_governor.reset_governors()
+            set_llm_backend(OpenAIBackend(require_api_key=False))
+        else:
+            set_llm_backend(backend)
+        try:
+            asyncio.run(bench(args))
+        finally:
+            set_llm_backend(None)
+            llm_governor.reset_governors()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# Accuracy and speed of the local scoring engine against reference (LLM) scores on the fixture corpus.
+#
+#   python -m benchmarks.bench_local_scoring                        # accuracy + timing with the current constants
+#   python -m benchmarks.bench_local_scoring --fit                  # grid-search blend weights and calibration
+#   python -m benchmarks.bench_local_scoring --refresh-references   # re-score the corpus with the LLM (needs OPENAI_API_KEY)
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.services import scoring_service
+
+CORPUS_PATH = Path(__file__).resolve().parent.parent / "app" / "tests" / "fixtures" / "scoring_corpus.json"
+
+def load_corpus() -> dict:
+    return json.loads(CORPUS_PATH.read_text())
+
+def _pairs(corpus: dict):
+    for pair in corpus["pairs"]:
+        yield pair, corpus["resumes"][pair["resume"]], corpus["job_descriptions"][pair["job_description"]]
+
+def _ranks(values):
+    order = np.argsort(values, kind="stable")
+    ranks = np.empty(len(values))
+    ranks[order] = np.arange(len(values))
+    return ranks
+
+def accuracy(local, reference) -> dict:
+    local, reference = np.asarray(local, dtype=float), np.asarray(reference, dtype=float)
+    errors = np.abs(local - reference)
+    return {
+        "mae": float(errors.mean()),
+        "within_15": float((errors <= 15).mean()),
+        "spearman": float(np.corrcoef(_ranks(local), _ranks(reference))[0, 1]),
+    }
+
+def _fit(components, reference):
+    # components: rows of (coverage, bm25_strength, cosine)
+    best = None
+    for coverage_w, bm25_w in itertools.product(np.arange(0.3, 0.95, 0.05), np.arange(0.0, 0.55, 0.05)):
+        cosine_w = 1 - coverage_w - bm25_w
+        if cosine_w < -1e-9:
+            continue
+        blends = components @ np.array([coverage_w, bm25_w, cosine_w])
+        for k in np.arange(2.0, 10.01, 0.1):
+            scores = np.round(100 * (1 - np.exp(-k * blends)))
+            mae = float(np.abs(scores - reference).mean())
+            if best is None or mae < best[0]:
+                best = (mae, coverage_w, bm25_w, cosine_w, k)
+    return best
+
+async def _refresh_references(corpus: dict) -> None:
+    from app.services.llm_service import analyze_resume_with_llm
+    for pair, resume_text, jd_text in _pairs(corpus):
+        result = await analyze_resume_with_llm(resume_text, jd_text)
+        if result is not None:
+            pair["reference_score"] = result.match_score
+            print(f"{pair['resume']} / {pair['job_description']}: {result.match_score}")
+    CORPUS_PATH.write_text(json.dumps(corpus, indent=2) + "\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Local scoring accuracy benchmark")
+    parser.add_argument("--repeat", type=int, default=50, help="Timing repetitions per pair.")
+    parser.add_argument("--fit", action="store_true", help="Grid-search blend weights and calibration k against the references.")
+    parser.add_argument("--refresh-references", action="store_true", help="Replace reference scores with live LLM scores.")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    if args.refresh_references:
+        asyncio.run(_refresh_references(corpus))
+
+    reference, local, components, timings = [], [], [], []
+    print(f"{'resume':<18} {'job':<10} {'reference':>9} {'local':>6} {'ms':>6}")
+    for pair, resume_text, jd_text in _pairs(corpus):
+        runs = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            score = scoring_service.compute_local_score(resume_text, jd_text)
+            runs.append((time.perf_counter() - start) * 1000)
+        ms = statistics.median(runs)
+        timings.append(ms)
+        reference.append(pair["reference_score"])
+        local.append(score.match_score)
+        components.append((score.coverage, score.bm25_strength, score.cosine_similarity))
+        print(f"{pair['resume']:<18} {pair['job_description']:<10} {pair['reference_score']:>9} {score.match_score:>6} {ms:>6.2f}")
+
+    result = accuracy(local, reference)
+    print(f"\npairs={len(local)} MAE={result['mae']:.1f} within±15={result['within_15']:.0%} spearman={result['spearman']:.2f} "
+          f"median_ms={statistics.median(timings):.2f} max_ms={max(timings):.2f}")
+
+    if args.fit:
+        mae, coverage_w, bm25_w, cosine_w, k = _fit(np.array(components), np.array(reference, dtype=float))
+        print(f"best fit: MAE={mae:.1f} COVERAGE_WEIGHT={coverage_w:.2f} BM25_WEIGHT={bm25_w:.2f} COSINE_WEIGHT={cosine_w:.2f} CALIBRATION_K={k:.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# Token counts and latency before/after prompt compaction over the sample corpus.
+#
+#   python -m benchmarks.bench_prompt_builder            # token counts + compaction overhead
+#   python -m benchmarks.bench_prompt_builder --live     # also time real analysis calls (needs OPENAI_API_KEY)
+import argparse
+import asyncio
+import contextlib
+import io
+import statistics
+import time
+
+from app.core.config import settings
+from app.services import prompt_builder
+from benchmarks.sample_corpus import sample_corpus
+
+def _time_ms(fn, repeat: int) -> float:
+    timings = []
+    with contextlib.redirect_stdout(io.StringIO()): # Silence the per-call compaction log line
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+async def _live_latency_ms(resume_text: str, jd_text: str, compact: bool) -> float:
+    from app.services import llm_service
+    resume_budget, jd_budget = settings.LLM_RESUME_TOKEN_BUDGET, settings.LLM_JD_TOKEN_BUDGET
+    if not compact: # An effectively unlimited budget sends the raw text, as before compaction existed
+        settings.LLM_RESUME_TOKEN_BUDGET = settings.LLM_JD_TOKEN_BUDGET = 10**9
+    try:
+        start = time.perf_counter()
+        await llm_service.analyze_resume_with_llm(resume_text, jd_text)
+        return (time.perf_counter() - start) * 1000
+    finally:
+        settings.LLM_RESUME_TOKEN_BUDGET, settings.LLM_JD_TOKEN_BUDGET = resume_budget, jd_budget
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt compaction benchmark")
+    parser.add_argument("--repeat", type=int, default=20, help="Compaction timing repetitions per document.")
+    parser.add_argument("--live", action="store_true", help="Also measure end-to-end analysis latency against the real API.")
+    args = parser.parse_args()
+
+    tokenizer = prompt_builder.get_tokenizer()
+    print(f"tokenizer={tokenizer.name} resume_budget={settings.LLM_RESUME_TOKEN_BUDGET} jd_budget={settings.LLM_JD_TOKEN_BUDGET}")
+    header = f"{'document':<10} {'tokens before':>13} {'tokens after':>12} {'saved':>6} {'build ms':>9}"
+    if args.live:
+        header += f" {'llm ms before':>13} {'llm ms after':>12}"
+    print(header)
+
+    total_before = total_after = 0
+    for label, resume_text, jd_text in sample_corpus():
+        before = tokenizer.count(resume_text) + tokenizer.count(jd_text)
+        with contextlib.redirect_stdout(io.StringIO()):
+            inputs = prompt_builder.build_prompt_inputs(resume_text, jd_text)
+        after = inputs.resume.tokens + inputs.job_description.tokens
+        build_ms = _time_ms(lambda: prompt_builder.build_prompt_inputs(resume_text, jd_text), args.repeat)
+        total_before += before
+        total_after += after
+        row = f"{label:<10} {before:>13} {after:>12} {1 - after / before:>6.0%} {build_ms:>9.2f}"
+        if args.live:
+            row += f" {asyncio.run(_live_latency_ms(resume_text, jd_text, compact=False)):>13.0f}"
+            row += f" {asyncio.run(_live_latency_ms(resume_text, jd_text, compact=True)):>12.0f}"
+        print(row)
+    print(f"{'total':<10} {total_before:>13} {total_after:>12} {1 - total_after / total_before:>6.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# Share of prompt tokens the provider could serve from its prefix cache, per prompt layout and workload.
+# Runs analysis calls against FakeLLMBackend, whose simulated prefix cache follows OpenAI's rules
+# (longest previously seen prefix, 128-token steps, from 1024 tokens), so no API calls are made.
+#
+#   python -m benchmarks.bench_prompt_cache
+#   python -m benchmarks.bench_prompt_cache --resume-input text   # send the resume text instead of its profile
+import argparse
+import asyncio
+import contextlib
+import io
+
+from app.core.config import settings
+from app.services import llm_service, metrics
+from app.services.llm_backend import FakeLLMBackend, set_llm_backend
+from benchmarks.sample_corpus import make_job_description, sample_corpus
+
+async def _run(pairs, shared_first: str) -> dict:
+    metrics.reset()
+    set_llm_backend(FakeLLMBackend()) # A fresh, empty cache per run
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for resume_text, jd_text in pairs:
+                await llm_service._analyze_resume_with_llm(resume_text, jd_text, shared_first)
+        return llm_service.prompt_cache_stats()["analysis"]
+    finally:
+        set_llm_backend(None)
+        metrics.reset()
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt prefix cache benchmark")
+    parser.add_argument("--jobs-per-resume", type=int, default=5, help="Job descriptions each resume is analyzed against.")
+    parser.add_argument("--resume-input", choices=["profile", "text"], default=settings.LLM_RESUME_INPUT)
+    args = parser.parse_args()
+    settings.LLM_RESUME_INPUT = args.resume_input
+
+    resumes = [resume_text for _, resume_text, _ in sample_corpus()]
+    job_descriptions = [make_job_description(seed, 10) for seed in range(args.jobs_per_resume)]
+    workloads = {
+        # The common case: a user checks their resume against several postings
+        "resume vs many JDs": [(resume, jd) for resume in resumes for jd in job_descriptions],
+        # A batch screening many resumes against one posting
+        "JD vs many resumes": [(resume, jd) for jd in job_descriptions for resume in resumes],
+    }
+    print(f"template={llm_service.ANALYSIS_TEMPLATE.name} resume_input={args.resume_input} resumes={len(resumes)} jds={len(job_descriptions)}")
+    print(f"{'workload':<20} {'shared first':<16} {'requests':>8} {'cache hits':>10} {'cached tokens':>13}")
+    for label, pairs in workloads.items():
+        for shared_first in ("resume", "job_description"):
+            stats = asyncio.run(_run(pairs, shared_first))
+            print(f"{label:<20} {shared_first:<16} {stats['requests']:>8} {stats['cache_hit_rate']:>10.0%} {stats['cached_token_rate']:>13.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# Latency of POST /resumes/search's Qdrant query (vector_service.search_resumes) on a large collection.
+# Loads --points random vectors spread over --users users into a collection created by the app's own
+# bootstrap (so it has the same payload indexes), then times filtered top-10 searches for random users. Each point
+# stands for a one-chunk resume; search_resumes still groups the hits by resume_id, as it does in the app.
+# --compare-unindexed drops the user_id index afterwards and measures again.
+#
+# Needs a running Qdrant; 1M 1536-d float32 points take about 6 GB of RAM (less with quantization):
+#   docker run -p 6333:6333 -p 6334:6334 qdrant/qdrant
+#   python -m benchmarks.bench_resume_search --points 1000000
+#   python -m benchmarks.bench_resume_search --skip-load --compare-unindexed   # reuse the loaded collection
+#   python -m benchmarks.bench_resume_search --url :memory: --points 5000 --dimension 64   # smoke test, no server
+import argparse
+import asyncio
+import contextlib
+import datetime
+import io
+import time
+import uuid
+from unittest.mock import patch
+
+import numpy as np
+from qdrant_client import AsyncQdrantClient, models
+
+from app.core.config import settings
+from app.services import vector_service
+from app.services.embedding_backend import HashingEmbeddingBackend, set_embedding_backend
+from benchmarks.bench_llm_endpoints import percentile
+
+BENCH_COLLECTION = "bench_resume_search"
+
+def user_id(index: int) -> uuid.UUID:
+    return uuid.UUID(int=index + 1)
+
+async def load(client: AsyncQdrantClient, args) -> None:
+    rng = np.random.default_rng(args.seed)
+    started = time.perf_counter()
+    next_batch = iter(range(0, args.points, args.batch_size))
+    created = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+    async def worker():
+        for start in next_batch:
+            count = min(args.batch_size, args.points - start)
+            vectors = rng.standard_normal((count, args.dimension), dtype=np.float32)
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+            ids = [str(uuid.UUID(int=(1 << 64) + start + offset)) for offset in range(count)]
+            payloads = [{"user_id": str(user_id((start + offset) % args.users)), "resume_id": point_id,
+                         "created_at": (created + datetime.timedelta(minutes=start + offset)).isoformat()}
+                        for offset, point_id in enumerate(ids)]
+            await client.upsert(collection_name=BENCH_COLLECTION, points=models.Batch(ids=ids, vectors=vectors.tolist(), payloads=payloads), wait=False)
+            done = start + count
+            if done % (args.batch_size * 50) == 0 or done == args.points:
+                elapsed = time.perf_counter() - started
+                print(f"  loaded {done}/{args.points} ({done / elapsed:.0f} points/s)")
+
+    await asyncio.gather(*(worker() for _ in range(args.load_concurrency)))
+    while (await client.get_collection(BENCH_COLLECTION)).status != models.CollectionStatus.GREEN: # Indexing done
+        await asyncio.sleep(1)
+    print(f"  loaded and indexed in {time.perf_counter() - started:.0f} s")
+
+async def measure(args, label: str) -> None:
+    rng = np.random.default_rng(args.seed + 1)
+    queries = rng.standard_normal((args.queries, args.dimension), dtype=np.float32)
+    latencies = []
+    next_query = iter(range(args.queries))
+
+    async def worker():
+        for index in next_query:
+            started = time.perf_counter()
+            await vector_service.search_resumes(user_id(int(rng.integers(args.users))), queries[index].tolist(), limit=10)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<22} {percentile(latencies, 50):>8.1f} {percentile(latencies, 95):>8.1f} {percentile(latencies, 99):>8.1f} {len(latencies) / elapsed:>8.0f}")
+
+async def bench(args) -> None:
+    client = AsyncQdrantClient(location=":memory:") if args.url == ":memory:" else \
+        AsyncQdrantClient(url=args.url, prefer_grpc=args.prefer_grpc, timeout=300)
+    vector_service.qdrant_client_instance = client
+    try:
+        if not args.skip_load:
+            if await client.collection_exists(BENCH_COLLECTION):
+                await client.delete_collection(BENCH_COLLECTION) # Only ever the benchmark's own collection
+            with contextlib.redirect_stdout(io.StringIO()):
+                await vector_service.ensure_resume_collection() # The app's bootstrap: same vector params and payload indexes
+            print(f"loading {args.points} points for {args.users} users")
+            await load(client, args)
+        vector_service.mark_collection_unready() # Re-check the schema, in case the collection was reused
+        with contextlib.redirect_stdout(io.StringIO()):
+            await vector_service.ensure_resume_collection()
+        count = (await client.count(BENCH_COLLECTION, exact=True)).count
+        print(f"points={count} users={args.users} dimension={args.dimension} queries={args.queries} concurrency={args.concurrency}")
+        print(f"{'':<22} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'qps':>8}")
+        await measure(args, "user_id indexed")
+        if args.compare_unindexed:
+            await client.delete_payload_index(BENCH_COLLECTION, "user_id", wait=True)
+            await measure(args, "user_id not indexed")
+            await client.create_payload_index(BENCH_COLLECTION, "user_id", vector_service.PAYLOAD_INDEXES["user_id"], wait=True)
+    finally:
+        await vector_service.close_qdrant_client()
+
+def main():
+    parser = argparse.ArgumentParser(description="Filtered resume search latency on a large Qdrant collection")
+    parser.add_argument("--url", default=f"http://{settings.QDRANT_HOST}:{settings.QDRANT_PORT}", help='Qdrant URL, or ":memory:".')
+    parser.add_argument("--prefer-grpc", action="store_true")
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--dimension", type=int, default=vector_service.embedding_dimension())
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--load-concurrency", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--skip-load", action="store_true", help="Reuse the collection from an earlier run.")
+    parser.add_argument("--compare-unindexed", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # The collection is sized by the embedding backend; the vectors themselves are random
+    set_embedding_backend(HashingEmbeddingBackend(args.dimension))
+    with patch.object(settings, "QDRANT_RESUME_COLLECTION", BENCH_COLLECTION):
+        asyncio.run(bench(args))
+
+if __name__ == "__main__":
+    main()
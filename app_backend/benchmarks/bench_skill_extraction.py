@@ -0,0 +1,63 @@
+# Skill extraction throughput (MB/s of text scanned) for both automaton backends, plus the
+# naive alternative of one regex search per alias for comparison.
+#
+#   python -m benchmarks.bench_skill_extraction
+#   python -m benchmarks.bench_skill_extraction --megabytes 20
+import argparse
+import re
+import time
+
+from app.services import skill_taxonomy
+from app.services.skill_taxonomy_data import SKILL_TAXONOMY, ALIAS_ONLY_NAMES
+from benchmarks.sample_corpus import sample_corpus
+
+def _text_of_size(megabytes: float) -> str:
+    documents = [text for _, resume, jd in sample_corpus() for text in (resume, jd)]
+    corpus = "\n\n".join(documents)
+    target = int(megabytes * 1024 * 1024)
+    return (corpus + "\n\n") * (target // (len(corpus) + 2) + 1)
+
+def _throughput(fn, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return len(text.encode("utf-8")) / (1024 * 1024) / best
+
+def _regex_per_alias():
+    patterns = []
+    for skill, (_, aliases) in SKILL_TAXONOMY.items():
+        names = list(aliases) if skill in ALIAS_ONLY_NAMES else [skill, *aliases]
+        patterns += [re.compile(r"(?<![\w])" + re.escape(name.lower()) + r"(?![\w+#])") for name in names]
+    def scan(text: str):
+        lowered = text.lower()
+        return [m for pattern in patterns for m in pattern.finditer(lowered)]
+    return scan
+
+def main():
+    parser = argparse.ArgumentParser(description="Skill extraction throughput benchmark")
+    parser.add_argument("--megabytes", type=float, default=5.0, help="Size of the scanned text.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    text = _text_of_size(args.megabytes)
+    print(f"text={len(text.encode('utf-8')) / (1024 * 1024):.1f} MB aliases={skill_taxonomy.get_skill_matcher().alias_count}")
+    print(f"{'backend':<16} {'build ms':>9} {'MB/s':>8} {'matches':>9}")
+
+    backends = ["pyahocorasick", "python"] if skill_taxonomy.ahocorasick is not None else ["python"]
+    for backend in backends:
+        start = time.perf_counter()
+        matcher = skill_taxonomy.SkillMatcher(native=backend == "pyahocorasick")
+        build_ms = (time.perf_counter() - start) * 1000
+        matches = len(matcher.find(text))
+        print(f"{backend:<16} {build_ms:>9.1f} {_throughput(matcher.find, text, args.repeat):>8.2f} {matches:>9}")
+
+    small = text[: 1024 * 1024] # The regex baseline is slow; measure it on 1 MB
+    start = time.perf_counter()
+    regex_scan = _regex_per_alias()
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"{'regex-per-alias':<16} {build_ms:>9.1f} {_throughput(regex_scan, small, 1):>8.2f} {'-':>9}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# Throughput of concurrent resume uploads into the vector index, with the Qdrant client awaited
+# ("async", AsyncQdrantClient as vector_service now uses it) versus called synchronously inside the
+# coroutines ("sync", the old QdrantClient behaviour). Embeddings are faked with a fixed delay, so no
+# OpenAI calls are made. Also reports the worst event-loop stall seen by a 5 ms ticker while uploading:
+# that stall is what every other request on the worker waits through.
+#
+# By default both clients run Qdrant in memory and each call pays a simulated network round trip
+# (--rtt-ms; time.sleep for the sync client, asyncio.sleep for the async one). --url measures a real server.
+#
+#   python -m benchmarks.bench_vector_upsert
+#   python -m benchmarks.bench_vector_upsert --uploads 1000 --concurrency 64 --rtt-ms 2
+#   python -m benchmarks.bench_vector_upsert --url http://localhost:6333 [--prefer-grpc]
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import time
+from typing import List, Optional
+from unittest.mock import patch
+from uuid import uuid4
+
+from qdrant_client import AsyncQdrantClient, QdrantClient
+
+from app.core.config import settings
+from app.services import vector_service
+from benchmarks.bench_llm_endpoints import percentile
+from benchmarks.sample_corpus import sample_corpus
+
+BENCH_COLLECTION = "bench_vector_upsert"
+
+class SimulatedNetwork:
+    """Wraps a client so every call costs `rtt_ms` first: blocking for a sync client, awaited for an async one.
+    Either way the wrapped methods are awaitable, as vector_service expects."""
+    def __init__(self, client, rtt_ms: float, blocking: bool):
+        self._client = client
+        self._rtt = rtt_ms / 1000
+        self._blocking = blocking
+
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+
+        async def call(*args, **kwargs):
+            if self._blocking:
+                time.sleep(self._rtt)
+                return method(*args, **kwargs)
+            await asyncio.sleep(self._rtt)
+            return await method(*args, **kwargs)
+        return call
+
+def make_client(mode: str, url: Optional[str], prefer_grpc: bool, rtt_ms: float) -> SimulatedNetwork:
+    if mode == "sync":
+        client = QdrantClient(url=url, prefer_grpc=prefer_grpc) if url else QdrantClient(location=":memory:")
+    else:
+        client = AsyncQdrantClient(url=url, prefer_grpc=prefer_grpc) if url else AsyncQdrantClient(location=":memory:")
+    return SimulatedNetwork(client, 0 if url else rtt_ms, blocking=mode == "sync")
+
+def fake_embedding_factory(embed_ms: float):
+    async def fake_embedding(text: str) -> List[float]:
+        await asyncio.sleep(embed_ms / 1000) # The OpenAI call, which is awaited either way
+        rng = random.Random(hash(text))
+        return [rng.uniform(-1, 1) for _ in range(vector_service.embedding_dimension())]
+    return fake_embedding
+
+async def watch_loop(stop: asyncio.Event, stalls: List[float], interval: float = 0.005):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        stalls.append((time.perf_counter() - started - interval) * 1000)
+
+async def run(mode: str, args) -> dict:
+    client = make_client(mode, args.url, args.prefer_grpc, args.rtt_ms)
+    vector_service.qdrant_client_instance = client
+    texts = [resume for _, resume, _ in sample_corpus()]
+    latencies, stalls = [], []
+    counter = iter(range(args.uploads))
+
+    async def worker():
+        for index in counter:
+            started = time.perf_counter()
+            await vector_service.upsert_resume_embedding(uuid4(), uuid4(), f"{texts[index % len(texts)]}\nUpload {index}")
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(watch_loop(stop, stalls))
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()): # vector_service logs every upsert
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+    finally:
+        stop.set()
+        await watcher
+        with contextlib.suppress(Exception):
+            await client.delete_collection(BENCH_COLLECTION)
+        await vector_service.close_qdrant_client()
+    return {"uploads_per_s": len(latencies) / elapsed, "p50": percentile(latencies, 50), "p95": percentile(latencies, 95),
+            "max_stall": max(stalls, default=0.0)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent vector upsert throughput, sync vs async Qdrant client")
+    parser.add_argument("--uploads", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--embed-ms", type=float, default=50, help="Simulated embedding call latency.")
+    parser.add_argument("--rtt-ms", type=float, default=2, help="Simulated Qdrant round trip for the in-memory clients.")
+    parser.add_argument("--url", default=None, help="A running Qdrant server instead of the in-memory one.")
+    parser.add_argument("--prefer-grpc", action="store_true")
+    parser.add_argument("--modes", default="sync,async")
+    args = parser.parse_args()
+
+    target = args.url or f"in-memory, simulated rtt {args.rtt_ms:g} ms"
+    print(f"qdrant={target} uploads={args.uploads} concurrency={args.concurrency} embedding={args.embed_ms:g} ms")
+    print(f"{'client':<8} {'uploads/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'max loop stall ms':>18}")
+    with patch.object(settings, "QDRANT_RESUME_COLLECTION", BENCH_COLLECTION), \
+            patch.object(vector_service, "get_text_embedding", fake_embedding_factory(args.embed_ms)):
+        for mode in args.modes.split(","):
+            stats = asyncio.run(run(mode, args))
+            print(f"{mode:<8} {stats['uploads_per_s']:>10.1f} {stats['p50']:>8.0f} {stats['p95']:>8.0f} {stats['max_stall']:>18.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# An OpenAI-compatible chat completions server backed by FakeLLMBackend: same deterministic answers and
+# latency distributions, but over real HTTP, so load tests also exercise the OpenAI SDK, connection
+# pooling and the outbound governor. Point the app at it with
+#
+#   python -m benchmarks.fake_llm_server --port 8089 --latency-ms 800 --jitter lognormal --jitter-ms 250
+#   LLM_BACKEND=openai_compatible OPENAI_BASE_URL=http://127.0.0.1:8089/v1 uvicorn app.main:app
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from app.services.llm_backend import FakeLLMBackend, JITTER_DISTRIBUTIONS, prompt_tokens
+from app.services.prompt_builder import count_tokens
+
+def _usage(content: str, prompt_tokens: int, cached_tokens: int) -> dict:
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": count_tokens(content), "total_tokens": prompt_tokens + count_tokens(content),
+            "prompt_tokens_details": {"cached_tokens": cached_tokens}}
+
+def _completion_body(content: str, model: str, prompt_tokens: int, cached_tokens: int = 0) -> dict:
+    return {
+        "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()), "model": model,
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": _usage(content, prompt_tokens, cached_tokens),
+    }
+
+def _chunk_body(delta: dict, model: str, finish_reason=None) -> dict:
+    return {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+
+class FakeLLMServer:
+    """Runs in a background thread; use as a context manager. `base_url` ends in /v1 like the real API."""
+
+    def __init__(self, backend: FakeLLMBackend, host: str = "127.0.0.1", port: int = 0):
+        self.backend = backend
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # Keep-alive, like the real API
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                messages = payload.get("messages") or []
+                model = payload.get("model") or "fake"
+                content = server.backend.render(messages)
+                cached_tokens = server.backend.cached_tokens(messages)
+                delay = server.backend.sample_latency_ms() / 1000
+                if payload.get("stream"):
+                    usage = _usage(content, prompt_tokens(messages), cached_tokens) if (payload.get("stream_options") or {}).get("include_usage") else None
+                    self._stream(content, model, delay, usage)
+                else:
+                    time.sleep(delay)
+                    self._send_json(_completion_body(content, model, prompt_tokens(messages), cached_tokens))
+
+            def _send_json(self, body: dict):
+                data = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, content: str, model: str, delay: float, usage: Optional[dict]):
+                backend = server.backend
+                size = backend.stream_chunk_chars
+                chunks = [content[start:start + size] for start in range(0, len(content), size)]
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                time.sleep(delay * backend.first_token_fraction)
+                gap = delay * (1 - backend.first_token_fraction) / max(len(chunks) - 1, 1)
+                events = [_chunk_body({"role": "assistant", "content": chunk} if index == 0 else {"content": chunk}, model)
+                          for index, chunk in enumerate(chunks)]
+                events.append(_chunk_body({}, model, finish_reason="stop"))
+                if usage is not None: # Asked for with stream_options.include_usage, like the real API
+                    events.append({**_chunk_body({}, model), "choices": [], "usage": usage})
+                for index, event in enumerate(events):
+                    if 0 < index < len(chunks):
+                        time.sleep(gap)
+                    self._write_chunk(f"data: {json.dumps(event)}\n\n".encode())
+                self._write_chunk(b"data: [DONE]\n\n")
+                self._write_chunk(b"")
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self.base_url = f"http://{host}:{self._httpd.server_address[1]}/v1"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible fake LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--jitter", choices=JITTER_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--jitter-ms", type=float, default=250)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    backend = FakeLLMBackend(latency_ms=args.latency_ms, jitter=args.jitter, jitter_ms=args.jitter_ms, seed=args.seed)
+    with FakeLLMServer(backend, args.host, args.port) as server:
+        print(f"Fake LLM server listening on {server.base_url} ({args.latency_ms} ms, {args.jitter} jitter {args.jitter_ms} ms)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# Deterministic synthetic resumes and job descriptions for the benchmarks.
+# Sizes range from a one-page resume to a padded multi-page CV with the usual
+# boilerplate (page footers, repeated headers, references, hobbies).
+import random
+from typing import List, Tuple
+
+SKILLS = ["Python", "FastAPI", "Django", "PostgreSQL", "Redis", "Docker", "Kubernetes", "AWS", "GCP", "Terraform",
+          "React", "TypeScript", "Node.js", "GraphQL", "Kafka", "Spark", "Airflow", "Pandas", "NumPy", "scikit-learn",
+          "PyTorch", "TensorFlow", "CI/CD", "GitHub Actions", "Linux", "Go", "Java", "Spring Boot", "MongoDB", "Elasticsearch"]
+VERBS = ["Designed", "Built", "Led", "Migrated", "Optimized", "Automated", "Maintained", "Scaled", "Refactored", "Launched"]
+OBJECTS = ["a payments API", "the data pipeline", "an internal analytics dashboard", "the search service", "a recommendation engine",
+           "the CI/CD workflow", "a multi-tenant SaaS backend", "the monitoring stack", "a customer onboarding flow", "the billing system"]
+OUTCOMES = ["reducing latency by {n}%", "cutting infrastructure cost by {n}%", "serving {n}k requests per minute",
+            "improving conversion by {n}%", "supporting {n} internal teams", "shrinking build times by {n}%"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Enterprises", "Hooli", "Vandelay Imports"]
+HOBBIES = ["Trail running and hiking", "Amateur astronomy", "Chess club organiser", "Landscape photography", "Playing jazz piano",
+           "Volunteering at the local food bank", "Competitive cycling", "Cooking regional Italian food"]
+
+def _bullet(rng: random.Random) -> str:
+    return f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(SKILLS)} and {rng.choice(SKILLS)}, " \
+           f"{rng.choice(OUTCOMES).format(n=rng.randint(5, 90))}."
+
+def make_resume(seed: int, jobs: int, bullets_per_job: int, padding_pages: int = 0) -> str:
+    rng = random.Random(seed)
+    name = f"Candidate {seed}"
+    lines = [name, f"candidate{seed}@example.com | +1 555 01{seed:02d} | linkedin.com/in/candidate{seed}", "",
+             "Professional Summary", f"Software engineer with {jobs * 2} years of experience building backend systems.", "",
+             "Skills", ", ".join(rng.sample(SKILLS, 12)), "", "Work Experience"]
+    for job in range(jobs):
+        lines += ["", f"Senior Engineer, {rng.choice(COMPANIES)} ({2024 - job * 2} - {2026 - job * 2})"]
+        lines += [_bullet(rng) for _ in range(bullets_per_job)]
+        if job % 2 == 1: # PDF extraction artefacts: page footer and repeated name header
+            lines += ["", f"Page {job // 2 + 1} of {jobs // 2 + 1}", name, ""]
+    lines += ["", "Education", "B.Sc. Computer Science, State University, 2012", "",
+              "Hobbies & Interests"] + [f"- {h}" for h in rng.sample(HOBBIES, 4)]
+    for _ in range(padding_pages):
+        lines += ["", "Volunteer Experience"] + [f"- {rng.choice(HOBBIES)} with a community group, {rng.choice(OUTCOMES).format(n=rng.randint(5, 90))}." for _ in range(25)]
+    lines += ["", "References", "References available upon request."]
+    return "\n".join(lines)
+
+def make_job_description(seed: int, requirement_count: int) -> str:
+    rng = random.Random(10_000 + seed)
+    lines = [f"Backend Engineer at {rng.choice(COMPANIES)}", "", "About Us",
+             "We are a fast-growing company on a mission to make hiring delightful. " * 3, "",
+             "Responsibilities"] + [_bullet(rng).replace("- ", "- You will ", 1) for _ in range(requirement_count)]
+    lines += ["", "Requirements"] + [f"- {rng.randint(2, 8)}+ years with {skill}" for skill in rng.sample(SKILLS, min(requirement_count, len(SKILLS)))]
+    lines += ["", "What We Offer", "- Competitive salary", "- Remote-friendly", "- Learning budget", "",
+              "Acme Corp is an equal opportunity employer. All qualified applicants will receive consideration for employment.",
+              "Apply now"]
+    return "\n".join(lines)
+
+def sample_corpus() -> List[Tuple[str, str, str]]:
+    """Returns (label, resume_text, job_description_text) triples of increasing size."""
+    return [
+        ("one-page", make_resume(1, jobs=2, bullets_per_job=4), make_job_description(1, 6)),
+        ("two-page", make_resume(2, jobs=4, bullets_per_job=6), make_job_description(2, 8)),
+        ("senior-cv", make_resume(3, jobs=8, bullets_per_job=8), make_job_description(3, 12)),
+        ("padded-cv", make_resume(4, jobs=10, bullets_per_job=10, padding_pages=3), make_job_description(4, 16)),
+        ("huge-cv", make_resume(5, jobs=16, bullets_per_job=14, padding_pages=8), make_job_description(5, 24)),
+    ]
@@ -0,0 +1,3 @@
+-- Structural ATS compatibility report computed when a resume is uploaded
+-- (app/services/ats_analyzer.py). Rows uploaded earlier get it on their next re-upload.
+alter table public.resumes add column if not exists ats_report jsonb;
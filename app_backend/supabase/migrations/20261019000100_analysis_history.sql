@@ -0,0 +1,46 @@
+-- Stored /resumes/analyze and /interview/generate-questions results (app/services/analysis_history_service.py).
+-- One row per (user, resume text hash, job description hash, mode); identical requests are served from here.
+create table if not exists public.resume_analyses (
+    id uuid primary key default gen_random_uuid(),
+    user_id uuid not null references auth.users (id) on delete cascade,
+    resume_id uuid references public.resumes (id) on delete set null,
+    resume_hash text not null,
+    jd_hash text not null,
+    mode text not null,
+    match_score integer,
+    job_description_excerpt text,
+    result jsonb not null,
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now(),
+    unique (user_id, resume_hash, jd_hash, mode)
+);
+
+create table if not exists public.interview_preps (
+    id uuid primary key default gen_random_uuid(),
+    user_id uuid not null references auth.users (id) on delete cascade,
+    resume_id uuid references public.resumes (id) on delete set null,
+    resume_hash text not null,
+    jd_hash text not null,
+    mode text not null,
+    match_score integer,
+    job_description_excerpt text,
+    result jsonb not null,
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now(),
+    unique (user_id, resume_hash, jd_hash, mode)
+);
+
+-- Listing (newest first, optionally per resume) and retention pruning
+create index if not exists resume_analyses_user_updated_idx on public.resume_analyses (user_id, updated_at desc);
+create index if not exists resume_analyses_user_resume_idx on public.resume_analyses (user_id, resume_id, updated_at desc);
+create index if not exists resume_analyses_updated_idx on public.resume_analyses (updated_at);
+create index if not exists interview_preps_user_updated_idx on public.interview_preps (user_id, updated_at desc);
+create index if not exists interview_preps_user_resume_idx on public.interview_preps (user_id, resume_id, updated_at desc);
+create index if not exists interview_preps_updated_idx on public.interview_preps (updated_at);
+
+alter table public.resume_analyses enable row level security;
+alter table public.interview_preps enable row level security;
+create policy "Users manage their own analyses" on public.resume_analyses
+    for all using (auth.uid() = user_id) with check (auth.uid() = user_id);
+create policy "Users manage their own interview preps" on public.interview_preps
+    for all using (auth.uid() = user_id) with check (auth.uid() = user_id);
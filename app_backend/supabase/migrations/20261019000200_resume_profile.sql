@@ -0,0 +1,4 @@
+-- Compact, job-description-independent resume profile computed when a resume is uploaded
+-- (app/services/resume_profile.py) and sent to the LLM instead of the full text. Rows uploaded
+-- earlier get it on their next re-upload; until then prompts build it from raw_text.
+alter table public.resumes add column if not exists profile jsonb;
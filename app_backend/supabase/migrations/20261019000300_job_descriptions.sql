@@ -0,0 +1,16 @@
+-- Normalized, parsed job descriptions (app/services/job_description_service.py), one row per hash of the
+-- normalized text and shared by every user who pastes the same posting. Written and read by the backend
+-- with the service key only.
+create table if not exists public.job_descriptions (
+    jd_hash text primary key,
+    version integer not null,
+    title text,
+    parsed jsonb not null,
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now()
+);
+
+alter table public.job_descriptions enable row level security;
+
+-- The posting a job application was analyzed against, so later requests can name the application instead
+alter table public.job_applications add column if not exists jd_hash text references public.job_descriptions (jd_hash) on delete set null;